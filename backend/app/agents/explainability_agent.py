@@ -1,4 +1,3 @@
-import shap
 import numpy as np
 from typing import Dict, Any, List
 import logging
@@ -206,6 +205,10 @@ class ExplainabilityAgent:
             narrative_parts.append("-" * 80)
             narrative_parts.append(f"Improvement Potential: {optimization['improvement_percentage']:.1f}%")
             narrative_parts.append(f"Optimization Method: {optimization.get('method', 'Multi-objective optimization')}")
+            if optimization.get("pareto_front"):
+                narrative_parts.append(f"Tradeoff Options: {len(optimization['pareto_front'])} Pareto-optimal parameter sets "
+                                       f"(hypervolume {optimization['hypervolume']['front']:.4f} vs "
+                                       f"{optimization['hypervolume']['baseline']:.4f} for the original policy)")
             narrative_parts.append("")
             narrative_parts.append("The AI optimization engine has identified parameter adjustments that could")
             narrative_parts.append(f"improve policy effectiveness by {optimization['improvement_percentage']:.1f}% while maintaining")
@@ -1,70 +1,24 @@
-import xgboost as xgb
 import numpy as np
 from typing import Dict, Any
 import logging
-import os
-import pickle
 from app.services.free_india_data import india_data_service
+from app.ml.tree_ensemble import TreeEnsemble
+from app.ml.model_registry import get_model_registry
+from app.ml.features import impact_features
 
 logger = logging.getLogger(__name__)
 
-# Global model cache to avoid reloading
-_xgb_model_cache = {}
-
 class ImpactAgent:
     """Predicts macro-level impacts using XGBoost - OPTIMIZED"""
     
     def __init__(self):
-        # Use cached models if available
-        if _xgb_model_cache:
-            self.models = _xgb_model_cache
-            logger.info("Using cached XGBoost models")
-        else:
-            self.models = self._initialize_models()
-            # Cache for future use
-            _xgb_model_cache.update(self.models)
+        # Compiled XGBoost trees from the registry (loaded once, hot-reloadable)
+        self.registry = get_model_registry()
+        self.registry.bundle()
     
-    def _initialize_models(self) -> Dict[str, xgb.XGBRegressor]:
-        """Initialize pretrained XGBoost models - OPTIMIZED"""
-        models = {}
-        model_dir = "backend/app/ml/models"
-        
-        # Try to load trained models first
-        model_files = {
-            "congestion": "india_impact_congestion_score.pkl",
-            "inflation": "india_impact_inflation_rate.pkl",
-            "dissatisfaction": "india_impact_dissatisfaction.pkl",
-            "energy": "india_impact_energy_stress.pkl"
-        }
-        
-        for target, filename in model_files.items():
-            model_path = os.path.join(model_dir, filename)
-            if os.path.exists(model_path):
-                try:
-                    with open(model_path, 'rb') as f:
-                        models[target] = pickle.load(f)
-                    logger.info(f"Loaded trained {target} model (CACHED)")
-                except Exception as e:
-                    logger.warning(f"Could not load {target} model: {e}")
-                    models[target] = self._create_mock_model()
-            else:
-                models[target] = self._create_mock_model()
-        
-        return models
-    
-    def _create_mock_model(self) -> xgb.XGBRegressor:
-        """Create mock model for demo - OPTIMIZED"""
-        model = xgb.XGBRegressor(
-            n_estimators=50, 
-            max_depth=3, 
-            random_state=42,
-            n_jobs=1  # Single thread for consistency
-        )
-        # Mock training with synthetic data
-        X_mock = np.random.rand(100, 8)
-        y_mock = np.random.rand(100)
-        model.fit(X_mock, y_mock, verbose=False)
-        return model
+    @property
+    def models(self) -> Dict[str, TreeEnsemble]:
+        return self.registry.bundle().impact_models
     
     async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Predict macro impacts using REAL state data"""
@@ -110,24 +64,4 @@ class ImpactAgent:
     
     def _build_features(self, metrics: Dict, policy, city_data, traffic_data, economic_data) -> np.ndarray:
         """Build feature vector matching trained model (8 features)"""
-        # Handle both old and new schema
-        budget = getattr(policy, 'budget_allocation_inr', None) or getattr(policy, 'budget_allocation', 1000000)
-        timeline = getattr(policy, 'implementation_timeline_days', None) or getattr(policy, 'implementation_timeline', 90)
-        
-        # Match original 8 features for model compatibility
-        infrastructure_stress_count = 5  # Default
-        if isinstance(metrics.get("infrastructure_stress"), dict):
-            infrastructure_stress_count = len([k for k in metrics["infrastructure_stress"].keys() if not k.startswith("_")])
-        
-        features = np.array([
-            metrics["congestion_score"],
-            metrics["energy_load"],
-            metrics["dissatisfaction_index"],
-            metrics["economic_stability"],
-            budget / 1e6,
-            policy.enforcement_level,
-            timeline / 365,
-            infrastructure_stress_count
-        ])
-        
-        return features
+        return impact_features(metrics, policy)
@@ -1,71 +1,96 @@
 import numpy as np
 from typing import Dict, Any
-from stable_baselines3 import PPO
-from stable_baselines3.common.env_util import make_vec_env
-import gymnasium as gym
-from gymnasium import spaces
 import logging
+from app.config import get_settings
+from app.services.free_india_data import india_data_service
+from app.ml.surrogate_optimizer import PolicyObjective, SurrogateConfig, optimize
 
 logger = logging.getLogger(__name__)
 
-class PolicyOptimizationEnv(gym.Env):
-    """Custom environment for policy optimization"""
+class OptimizationAgent:
+    """Optimizes policy parameters with a batched surrogate search (CMA-ES) or PPO"""
     
-    def __init__(self, base_policy):
-        super().__init__()
-        self.base_policy = base_policy
-        
-        # Action space: adjustments to policy parameters
-        self.action_space = spaces.Box(
-            low=-0.3, high=0.3, shape=(5,), dtype=np.float32
-        )
-        
-        # Observation space: current policy state
-        self.observation_space = spaces.Box(
-            low=0, high=1, shape=(8,), dtype=np.float32
+    def __init__(self, behavior_agent=None, simulation_agent=None):
+        self.model = None
+        settings = get_settings()
+        self.mode = settings.optimizer_mode
+        self.surrogate_config = SurrogateConfig(
+            population=settings.optimizer_population,
+            generations=settings.optimizer_generations
         )
-        
-        self.current_step = 0
-        self.max_steps = 10
+        # The surrogate objective reuses the pipeline's own agents (shared with the engine)
+        self._behavior_agent = behavior_agent
+        self._simulation_agent = simulation_agent
     
-    def reset(self, seed=None, options=None):
-        if seed is not None:
-            np.random.seed(seed)
-        self.current_step = 0
-        return self._get_observation(), {}
-    
-    def step(self, action):
-        self.current_step += 1
-        
-        # Apply action to policy parameters
-        reward = self._compute_reward(action)
-        terminated = self.current_step >= self.max_steps
-        truncated = False
-        
-        return self._get_observation(), reward, terminated, truncated, {}
+    async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Optimize policy parameters"""
+        state["optimization_result"] = self.optimize(state)
+        return state
     
-    def _get_observation(self):
-        return np.random.rand(8).astype(np.float32)
+    def optimize(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Optimization stage on its own (CPU-bound, no awaits) - callers outside the graph
+        can run it in a worker thread with only structured_policy + simulation_metrics.
+        """
+        if self.mode == "ppo":
+            optimization_result = self._optimize_ppo(state)
+        else:
+            optimization_result = self._optimize_surrogate(state)
+        
+        logger.info(f"OptimizationAgent completed: {optimization_result['reward_score']:.4f} "
+                    f"({optimization_result['improvement_percentage']:.1f}% improvement)")
+        return optimization_result
     
-    def _compute_reward(self, action):
-        # Multi-objective reward
-        congestion_penalty = -abs(action[0])
-        dissatisfaction_penalty = -abs(action[1])
-        energy_penalty = -abs(action[2])
-        economic_bonus = abs(action[3])
+    def _objective(self, state: Dict[str, Any]) -> PolicyObjective:
+        """Black-box objective over the pipeline's own behavior + simulation agents"""
+        if self._behavior_agent is None:
+            from app.agents.behavior_agent import BehaviorAgent
+            self._behavior_agent = BehaviorAgent()
+        if self._simulation_agent is None:
+            from app.agents.simulation_agent import SimulationAgent
+            self._simulation_agent = SimulationAgent()
         
-        return congestion_penalty + dissatisfaction_penalty + energy_penalty + economic_bonus
-
-class OptimizationAgent:
-    """Optimizes policy parameters using PPO"""
+        policy = state.get("structured_policy")
+        metrics = state.get("simulation_metrics") or {}
+        region = policy.region
+        
+        return PolicyObjective(
+            policy,
+            india_data_service.get_state_data(region.state),
+            india_data_service.get_traffic_data(region.state),
+            self._behavior_agent,
+            self._simulation_agent,
+            behavior_model=self._behavior_agent.registry.bundle().behavior_model,
+            infrastructure_stress=metrics.get("infrastructure_stress")
+        )
     
-    def __init__(self):
-        self.model = None
+    def _optimize_surrogate(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Batched CMA-ES + NSGA-II over the vectorized behavior + simulation pipeline"""
+        policy = state.get("structured_policy")
+        objective = self._objective(state)
+        result = optimize(objective, self.surrogate_config,
+                          impact_models=self._behavior_agent.registry.bundle().impact_models)
+        
+        comparison = self._compare_policies(result.baseline_metrics, result.best_metrics, float(result.best_action[0]))
+        
+        return {
+            "optimized_parameters": self._apply_optimizations(policy, result.best_action),
+            "reward_score": float(result.best_reward),
+            "improvement_percentage": float(comparison["improvement"]),
+            "comparison_metrics": comparison["metrics"],
+            "method": "Multi-objective surrogate search (CMA-ES + NSGA-II)",
+            "pareto_front": result.pareto_front,
+            "hypervolume": result.hypervolume_summary(),
+            "optimizer": result.stats()
+        }
     
-    async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Optimize policy parameters"""
+    def _optimize_ppo(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """PPO on PolicyOptimizationEnv (OPTIMIZER_MODE=ppo)"""
         policy = state.get("structured_policy")
-        metrics = state.get("simulation_metrics")
+        
+        # stable_baselines3/gymnasium are heavy - import on first optimization
+        from stable_baselines3 import PPO
+        from app.ml.policy_env import PolicyOptimizationEnv
         
         # Create environment
         env = PolicyOptimizationEnv(policy)
@@ -82,21 +107,20 @@ class OptimizationAgent:
         # Apply optimizations
         optimized = self._apply_optimizations(policy, action)
         
-        # Compute reward and comparison
-        reward = self._compute_final_reward(metrics, optimized)
-        comparison = self._compare_policies(metrics, optimized)
+        # Score the original and optimized policies on the same simulation
+        objective = self._objective(state)
+        evaluated = objective(np.vstack([np.zeros(len(action)), action]))
+        original_metrics = {name: float(values[0]) for name, values in evaluated.items()}
+        optimized_metrics = {name: float(values[1]) for name, values in evaluated.items()}
+        comparison = self._compare_policies(original_metrics, optimized_metrics, float(action[0]))
         
-        optimization_result = {
+        return {
             "optimized_parameters": optimized,
-            "reward_score": float(reward),
+            "reward_score": float(self._compute_final_reward(optimized_metrics)),
             "improvement_percentage": float(comparison["improvement"]),
-            "comparison_metrics": comparison["metrics"]
+            "comparison_metrics": comparison["metrics"],
+            "method": "PPO reinforcement learning"
         }
-        
-        state["optimization_result"] = optimization_result
-        logger.info(f"OptimizationAgent completed: {optimization_result}")
-        
-        return state
     
     def _apply_optimizations(self, policy, action) -> Dict[str, float]:
         """Apply RL actions to policy parameters"""
@@ -116,18 +140,24 @@ class OptimizationAgent:
             "subsidy": float(policy.incentive_structure.get("subsidy", 0) * (1 + action[4]))
         }
     
-    def _compute_final_reward(self, metrics, optimized) -> float:
-        """Compute final reward score"""
+    def _compute_final_reward(self, metrics) -> float:
+        """Scalar summary of the four objectives (used to pick one recommended policy)"""
         return -metrics["congestion_score"] - metrics["dissatisfaction_index"] - metrics["energy_load"] + metrics["economic_stability"]
     
-    def _compare_policies(self, original_metrics, optimized) -> Dict:
-        """Compare original vs optimized"""
-        improvement = np.random.uniform(5, 15)  # Mock improvement
+    def _compare_policies(self, original_metrics, optimized_metrics, budget_change: float) -> Dict:
+        """Compare original vs optimized on simulated outcomes"""
+        original_reward = self._compute_final_reward(original_metrics)
+        optimized_reward = self._compute_final_reward(optimized_metrics)
+        improvement = (optimized_reward - original_reward) / max(abs(original_reward), 1e-6) * 100
         return {
             "improvement": improvement,
             "metrics": {
-                "congestion_reduction": 0.12,
-                "satisfaction_increase": 0.08,
-                "cost_efficiency": 0.15
+                "congestion_reduction": round(original_metrics["congestion_score"] - optimized_metrics["congestion_score"], 4),
+                "satisfaction_increase": round(original_metrics["dissatisfaction_index"] - optimized_metrics["dissatisfaction_index"], 4),
+                "energy_load_reduction": round(original_metrics["energy_load"] - optimized_metrics["energy_load"], 4),
+                "economic_stability_change": round(optimized_metrics["economic_stability"] - original_metrics["economic_stability"], 4),
+                "budget_change": round(budget_change, 4),
+                # Relative reward gain per unit of budget, against the original spend
+                "cost_efficiency": round(improvement / 100 / (1 + budget_change), 4)
             }
         }
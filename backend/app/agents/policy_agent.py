@@ -11,6 +11,41 @@ import re
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+def related_policies(policy_type: str, state: str) -> List[Dict]:
+    """Related policies from the knowledge base (static data - same inputs, same list)"""
+    try:
+        # Search for related policies
+        related = policy_kb.get_related_policies(policy_type, state)
+        
+        # Also search by keywords
+        keywords = {
+            "transportation": ["transport", "traffic", "metro", "bus", "road"],
+            "electric_mobility": ["electric", "ev", "charging", "vehicle"],
+            "environmental": ["environment", "pollution", "green", "clean"],
+            "housing": ["housing", "affordable", "rent", "shelter"],
+            "economic": ["economic", "industry", "business", "investment"],
+            "tax": ["tax", "gst", "duty", "levy"],
+            "subsidy": ["subsidy", "support", "assistance", "benefit"]
+        }
+        
+        search_terms = keywords.get(policy_type, [policy_type])
+        for term in search_terms:
+            related.extend(policy_kb.search_policies(term))
+        
+        # Remove duplicates
+        seen = set()
+        unique_related = []
+        for policy in related:
+            policy_id = f"{policy.get('state', '')}_{policy.get('policy', '')}"
+            if policy_id not in seen:
+                seen.add(policy_id)
+                unique_related.append(policy)
+        
+        return unique_related[:10]  # Return top 10 related policies
+    except Exception as e:
+        logger.error(f"Error getting related policies: {e}")
+        return []
+
 class PolicyAgent:
     """Extracts structured policy parameters from natural language - Indian context"""
     
@@ -53,38 +88,7 @@ class PolicyAgent:
     
     def _get_related_policies(self, policy_type: str, state: str) -> List[Dict]:
         """Get related policies from knowledge base"""
-        try:
-            # Search for related policies
-            related = policy_kb.get_related_policies(policy_type, state)
-            
-            # Also search by keywords
-            keywords = {
-                "transportation": ["transport", "traffic", "metro", "bus", "road"],
-                "electric_mobility": ["electric", "ev", "charging", "vehicle"],
-                "environmental": ["environment", "pollution", "green", "clean"],
-                "housing": ["housing", "affordable", "rent", "shelter"],
-                "economic": ["economic", "industry", "business", "investment"],
-                "tax": ["tax", "gst", "duty", "levy"],
-                "subsidy": ["subsidy", "support", "assistance", "benefit"]
-            }
-            
-            search_terms = keywords.get(policy_type, [policy_type])
-            for term in search_terms:
-                related.extend(policy_kb.search_policies(term))
-            
-            # Remove duplicates
-            seen = set()
-            unique_related = []
-            for policy in related:
-                policy_id = f"{policy.get('state', '')}_{policy.get('policy', '')}"
-                if policy_id not in seen:
-                    seen.add(policy_id)
-                    unique_related.append(policy)
-            
-            return unique_related[:10]  # Return top 10 related policies
-        except Exception as e:
-            logger.error(f"Error getting related policies: {e}")
-            return []
+        return related_policies(policy_type, state)
     
     def _demo_extraction_india(self, text: str, region: IndianRegion) -> IndianStructuredPolicy:
         """Fast deterministic extraction for demo - Indian context"""
@@ -1,4 +1,3 @@
-import networkx as nx
 import numpy as np
 from typing import Dict, Any
 import logging
@@ -22,8 +21,10 @@ class SimulationAgent:
             self.infrastructure_graph = self._build_infrastructure()
             _infrastructure_cache['infrastructure_graph'] = self.infrastructure_graph
     
-    def _build_infrastructure(self) -> nx.Graph:
+    def _build_infrastructure(self) -> "nx.Graph":
         """Create synthetic city infrastructure graph - OPTIMIZED"""
+        import networkx as nx
+        
         # Use faster graph generation
         G = nx.barabasi_albert_graph(100, 3, seed=42)  # Deterministic for caching
         
@@ -64,18 +65,59 @@ class SimulationAgent:
         if not state_data or not traffic_data:
             return self._fallback_simulation(policy, behavior)
         
+        budget = getattr(policy, 'budget_allocation_inr', 100000000)
+        arrays = self._run_simulation_batch(
+            policy, behavior, state_data, traffic_data,
+            budget=np.array([budget], dtype=np.float64),
+            enforcement=np.array([policy.enforcement_level], dtype=np.float64)
+        )
+        metrics = {name: float(values[0]) for name, values in arrays.items()}
+        
+        # Infrastructure stress (real calculation based on vehicle density)
+        vehicle_density = state_data["vehicles"] / state_data["area_sq_km"]
+        stress_factor = min(1.0, vehicle_density / 10000)  # 10k vehicles/sq km is high
+        current_congestion = traffic_data["congestion_level"] / 100
+        
+        return {
+            "congestion_score": round(metrics["congestion_score"], 3),
+            "energy_load": round(metrics["energy_load"], 3),
+            "dissatisfaction_index": round(metrics["dissatisfaction_index"], 3),
+            "economic_stability": round(metrics["economic_stability"], 3),
+            "infrastructure_stress": {
+                "vehicle_density_per_sqkm": round(vehicle_density, 1),
+                "stress_level": round(stress_factor, 3),
+                "current_congestion_percent": round(current_congestion * 100, 1),
+                "projected_congestion_percent": round(metrics["congestion_score"] * 100, 1),
+                "congestion_reduction_percent": round(metrics["congestion_reduction"] * 100, 1)
+            }
+        }
+    
+    def _run_simulation_batch(self, policy, behavior, state_data, traffic_data,
+                              budget: np.ndarray, enforcement: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized core of _run_simulation for many candidate policies at once.
+        budget/enforcement: (n,) candidate values; behavior values may be scalars or (n,) arrays.
+        Infrastructure changes are shared by every candidate. Returns unrounded (n,) arrays.
+        """
+        n = len(budget)
+        if not state_data or not traffic_data:
+            fallback = self._fallback_simulation(policy, behavior)
+            return {
+                name: np.full(n, fallback[name], dtype=np.float64)
+                for name in ("congestion_score", "energy_load", "dissatisfaction_index", "economic_stability")
+            } | {"congestion_reduction": np.zeros(n)}
+        
         # Real baseline data
         population = state_data["population"]
         vehicles = state_data["vehicles"]
         current_congestion = traffic_data["congestion_level"] / 100  # Normalize to 0-1
-        avg_speed = traffic_data["avg_speed_kmph"]
         
         # Policy effects based on real data
-        adaptation = behavior["adaptation_rate"]
-        compliance = behavior["compliance_probability"]
+        compliance = np.asarray(behavior["compliance_probability"], dtype=np.float64)
+        satisfaction = np.asarray(behavior["satisfaction_score"], dtype=np.float64)
         
         # Budget per capita (real calculation)
-        budget = getattr(policy, 'budget_allocation_inr', 100000000)
+        budget = np.asarray(budget, dtype=np.float64)
         budget_per_capita = budget / population
         
         # Congestion calculation based on infrastructure changes
@@ -88,40 +130,30 @@ class SimulationAgent:
         metro_impact = (metro_stations * 0.02) * compliance  # Each station reduces 2%
         bus_impact = (bus_routes * 0.01) * compliance  # Each route reduces 1%
         
-        congestion_reduction = min(0.25, lane_impact + metro_impact + bus_impact)
-        new_congestion = max(0.1, current_congestion - congestion_reduction)
+        congestion_reduction = np.broadcast_to(np.minimum(0.25, lane_impact + metro_impact + bus_impact), (n,))
+        new_congestion = np.maximum(0.1, current_congestion - congestion_reduction)
         
         # Energy load (based on EV infrastructure)
         charging_stations = policy.infrastructure_changes.get("charging_stations", 0)
         ev_adoption_rate = min(0.15, (charging_stations / vehicles) * 100) if vehicles > 0 else 0.05
-        energy_load = 0.3 + (ev_adoption_rate * 2)  # Base load + EV load
+        energy_load = np.full(n, 0.3 + (ev_adoption_rate * 2))  # Base load + EV load
         
         # Dissatisfaction (based on budget adequacy and enforcement)
-        budget_adequacy = min(1.0, budget_per_capita / 500)  # ₹500 per capita is good
-        enforcement_stress = policy.enforcement_level * 0.3
-        dissatisfaction = max(0.1, 0.5 - (budget_adequacy * 0.3) + enforcement_stress - (behavior["satisfaction_score"] * 0.2))
+        budget_adequacy = np.minimum(1.0, budget_per_capita / 500)  # ₹500 per capita is good
+        enforcement_stress = np.asarray(enforcement, dtype=np.float64) * 0.3
+        dissatisfaction = np.maximum(0.1, 0.5 - (budget_adequacy * 0.3) + enforcement_stress - (satisfaction * 0.2))
         
         # Economic stability (based on budget impact on state economy)
         state_gdp_estimate = population * 200000  # Rough estimate: ₹2 lakh per capita
         budget_to_gdp = budget / state_gdp_estimate
-        economic_stability = min(1.0, 0.7 + (budget_to_gdp * 10) - (dissatisfaction * 0.2))
-        
-        # Infrastructure stress (real calculation based on vehicle density)
-        vehicle_density = vehicles / state_data["area_sq_km"]
-        stress_factor = min(1.0, vehicle_density / 10000)  # 10k vehicles/sq km is high
+        economic_stability = np.minimum(1.0, 0.7 + (budget_to_gdp * 10) - (dissatisfaction * 0.2))
         
         return {
-            "congestion_score": round(new_congestion, 3),
-            "energy_load": round(energy_load, 3),
-            "dissatisfaction_index": round(dissatisfaction, 3),
-            "economic_stability": round(economic_stability, 3),
-            "infrastructure_stress": {
-                "vehicle_density_per_sqkm": round(vehicle_density, 1),
-                "stress_level": round(stress_factor, 3),
-                "current_congestion_percent": round(current_congestion * 100, 1),
-                "projected_congestion_percent": round(new_congestion * 100, 1),
-                "congestion_reduction_percent": round(congestion_reduction * 100, 1)
-            }
+            "congestion_score": new_congestion,
+            "energy_load": energy_load,
+            "dissatisfaction_index": dissatisfaction,
+            "economic_stability": economic_stability,
+            "congestion_reduction": congestion_reduction
         }
     
     def _fallback_simulation(self, policy, behavior) -> Dict[str, float]:
@@ -0,0 +1,173 @@
+"""
+Knowledge Base Query Plan Benchmark
+Case-insensitive $regex lookups (collection scans) vs the token-array lookups
+KnowledgeBaseService uses now (multikey index scans), compared with explain().
+
+Needs a real MongoDB server - the local stand-in has no query planner. Seeds a
+scratch database with copies of the built-in knowledge base and drops it afterwards.
+
+Usage:
+    python -m app.benchmarks.knowledge_queries
+    python -m app.benchmarks.knowledge_queries --copies 200 --repeat 50 --database civicsim_bench
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.knowledge_base_service import related_policies_filter, impact_area_filter
+
+RELATED_QUERIES = [("transport", None), ("electric", "Karnataka"), ("tax", None), ("housing", "Maharashtra")]
+IMPACT_QUERIES = ["employment", "Digital payments", "agriculture"]
+
+
+def legacy_related_filter(policy_type: str, state: Optional[str] = None) -> Dict:
+    """The $regex filter get_related_policies used before the token arrays"""
+    query = {"$or": [
+        {"policy_type": {"$regex": policy_type, "$options": "i"}},
+        {"category": {"$regex": policy_type, "$options": "i"}},
+        {"impact_areas": {"$regex": policy_type, "$options": "i"}}
+    ]}
+    if state:
+        query["$or"].append({"state": state})
+    return query
+
+
+def legacy_impact_filter(impact_area: str) -> Dict:
+    """The $regex filter get_policies_by_impact_area used before the token arrays"""
+    return {"impact_areas": {"$regex": impact_area, "$options": "i"}}
+
+
+def policy_documents(copies: int = 1) -> List[Dict]:
+    """The built-in knowledge base flattened into policy documents, repeated `copies` times"""
+    from app.knowledge.policy_knowledge_base import policy_kb
+
+    documents = []
+    for copy in range(copies):
+        for state, categories in policy_kb.policies.items():
+            for category, policies in categories.items():
+                if not isinstance(policies, dict):
+                    continue
+                for policy_key, data in policies.items():
+                    document = dict(data) if isinstance(data, dict) else {"value": data}
+                    document.update(
+                        state=state,
+                        level="national" if state == "national" else "state",
+                        category=category,
+                        policy_key=policy_key if copy == 0 else f"{policy_key}_{copy}"
+                    )
+                    documents.append(document)
+    return documents
+
+
+def plan_stages(explain: Dict[str, Any]) -> List[str]:
+    """Stages of the winning plan, leaf last, with index names: ["FETCH", "IXSCAN search_tokens_idx"]"""
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    winning = winning.get("queryPlan", winning)  # slot-based engine nests the classic plan
+
+    stages = []
+
+    def walk(stage: Dict):
+        label = stage.get("stage", "?")
+        if stage.get("indexName"):
+            label += f" {stage['indexName']}"
+        stages.append(label)
+        if "inputStage" in stage:
+            walk(stage["inputStage"])
+        for child in stage.get("inputStages", []):
+            walk(child)
+
+    walk(winning)
+    return stages
+
+
+def summarize(name: str, variant: str, explain: Dict[str, Any], wall_ms: float) -> Dict[str, Any]:
+    stats = explain.get("executionStats", {})
+    stages = plan_stages(explain)
+    return {
+        "query": name,
+        "variant": variant,
+        "plan": " > ".join(stages),
+        "collscan": any(stage.startswith("COLLSCAN") for stage in stages),
+        "returned": stats.get("nReturned", 0),
+        "docs_examined": stats.get("totalDocsExamined", 0),
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "server_ms": stats.get("executionTimeMillis", 0),
+        "wall_ms": round(wall_ms, 3)
+    }
+
+
+async def bench_query(collection, name: str, variant: str, query: Dict, repeat: int) -> Dict[str, Any]:
+    explain = await collection.find(query).explain()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await collection.find(query).to_list(length=None)
+        samples.append(time.perf_counter() - start)
+    return summarize(name, variant, explain, float(np.median(samples) * 1000))
+
+
+def format_results(rows: List[Dict[str, Any]], documents: int) -> str:
+    lines = [
+        f"Knowledge base lookups over {documents:,} policies (median wall time)",
+        f"{'query':<34} {'variant':<7} {'returned':>8} {'docs':>7} {'keys':>7} {'wall ms':>8}  plan"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['query']:<34} {row['variant']:<7} {row['returned']:>8} {row['docs_examined']:>7} "
+            f"{row['keys_examined']:>7} {row['wall_ms']:>8.2f}  {row['plan']}"
+        )
+    return "\n".join(lines)
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    from app.config import get_settings
+    from app.db import create_mongo_client
+    from app.services.knowledge_base_service import KnowledgeBaseService
+
+    settings = get_settings()
+    if args.uri:
+        settings = settings.model_copy(update={"mongodb_uri": args.uri})
+    client = create_mongo_client(settings)
+    try:
+        await client.drop_database(args.database)
+        kb = KnowledgeBaseService(client, args.database)
+        documents = policy_documents(args.copies)
+        await kb.bulk_insert_policies(documents)
+        await kb.initialize_indexes()
+
+        rows = []
+        for policy_type, state in RELATED_QUERIES:
+            name = f"related type={policy_type}" + (f" state={state}" if state else "")
+            rows.append(await bench_query(kb.policies_collection, name, "regex",
+                                          legacy_related_filter(policy_type, state), args.repeat))
+            rows.append(await bench_query(kb.policies_collection, name, "tokens",
+                                          related_policies_filter(policy_type, state), args.repeat))
+        for area in IMPACT_QUERIES:
+            name = f"impact area={area}"
+            rows.append(await bench_query(kb.policies_collection, name, "regex", legacy_impact_filter(area), args.repeat))
+            rows.append(await bench_query(kb.policies_collection, name, "tokens", impact_area_filter(area), args.repeat))
+
+        print(format_results(rows, len(documents)))
+        return rows
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare regex scans with token index lookups via explain()")
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGODB_URI)")
+    parser.add_argument("--database", default="civicsim_ai_bench", help="Scratch database, dropped before and after")
+    parser.add_argument("--copies", type=int, default=100, help="Copies of the knowledge base to load")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
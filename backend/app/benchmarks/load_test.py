@@ -0,0 +1,249 @@
+"""
+In-process Load Testing Harness - 100% FREE
+Drives the FastAPI app through httpx's ASGI transport (no network, no server)
+against the local MongoDB stand-in.
+
+Usage:
+    python -m app.benchmarks.load_test --concurrency 16 --duration 30
+    python -m app.benchmarks.load_test --mix simulate=1,knowledge=3,state_data=6 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = {"simulate": 1, "knowledge": 3, "state_data": 6}
+
+SAMPLE_POLICIES = [
+    "Expand metro rail network with ₹500 crore budget to reduce traffic congestion",
+    "Introduce ₹50 congestion charge during peak hours",
+    "Provide ₹5000 subsidy for electric two-wheelers and add 200 charging stations",
+    "Build 10,000 affordable housing units with ₹200 crore allocation",
+]
+
+SAMPLE_QUERIES = ["metro", "electricity", "housing", "women", "farmers", "startup"]
+
+
+@dataclass
+class LoadTestConfig:
+    """Parameters for a single load test run"""
+    concurrency: int = 8
+    duration: float = 10.0
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    enable_optimization: bool = False
+    lag_interval: float = 0.05
+    seed: int = 42
+    log_level: str = "WARNING"
+
+
+@dataclass
+class RequestSample:
+    kind: str
+    latency: float
+    status: int
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse 'simulate=1,knowledge=3' into a weight mapping"""
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown request kind '{kind}'. Must be one of: {', '.join(DEFAULT_MIX)}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    arr = np.asarray(values) * 1000  # milliseconds
+    p50, p90, p95, p99 = np.percentile(arr, [50, 90, 95, 99])
+    return {
+        "p50": round(float(p50), 2),
+        "p90": round(float(p90), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "max": round(float(arr.max()), 2),
+        "mean": round(float(arr.mean()), 2),
+    }
+
+
+class LoadTester:
+    """Concurrent simulated clients against the in-process ASGI app"""
+
+    def __init__(self, config: LoadTestConfig):
+        self.config = config
+        self.samples: List[RequestSample] = []
+        self.loop_lags: List[float] = []
+        self._rng = random.Random(config.seed)
+        self._states: List[str] = []
+
+    async def setup(self):
+        """Point the app at the local Mongo stand-in and build the ASGI client"""
+        from app.main import app
+        from app.db import db
+        from app.config import get_settings
+        from app.services.local_mongo import LocalMongoClient
+        from app.services.knowledge_base_service import initialize_kb_service
+        from app.services.free_india_data import india_data_service
+
+        # Importing app.main installs the production log handlers; per-request
+        # INFO logging would otherwise dominate both console and timings
+        logging.getLogger().setLevel(self.config.log_level)
+
+        settings = get_settings()
+        db.client = LocalMongoClient()
+        await initialize_kb_service(db.client, settings.mongodb_db_name)
+
+        self._states = india_data_service.get_states_list()
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            timeout=None
+        )
+
+    async def teardown(self):
+        await self.client.aclose()
+
+    def _next_request(self):
+        kinds = list(self.config.mix)
+        kind = self._rng.choices(kinds, weights=[self.config.mix[k] for k in kinds])[0]
+        state = self._rng.choice(self._states)
+
+        if kind == "simulate":
+            return kind, "POST", "/india/simulate", {
+                "policy_text": self._rng.choice(SAMPLE_POLICIES),
+                "region": {"state": state},
+                "enable_optimization": self.config.enable_optimization
+            }
+        if kind == "knowledge":
+            return kind, "GET", f"/knowledge/search?q={self._rng.choice(SAMPLE_QUERIES)}", None
+        return kind, "GET", f"/india/state-data/{state}", None
+
+    async def _client_loop(self, deadline: float):
+        while time.perf_counter() < deadline:
+            kind, method, url, body = self._next_request()
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, json=body)
+                status = response.status_code
+            except Exception as e:
+                logger.warning(f"Request {method} {url} failed: {e}")
+                status = 0
+            self.samples.append(RequestSample(kind, time.perf_counter() - start, status))
+
+    async def _lag_monitor(self, deadline: float):
+        """Measure event-loop lag as oversleep of a fixed-interval timer"""
+        interval = self.config.lag_interval
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lags.append(max(0.0, time.perf_counter() - start - interval))
+
+    async def run(self) -> Dict:
+        """Run the configured load and return the report"""
+        await self.setup()
+        try:
+            start = time.perf_counter()
+            deadline = start + self.config.duration
+            await asyncio.gather(
+                self._lag_monitor(deadline),
+                *(self._client_loop(deadline) for _ in range(self.config.concurrency))
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            await self.teardown()
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict:
+        by_kind: Dict[str, List[RequestSample]] = {}
+        for sample in self.samples:
+            by_kind.setdefault(sample.kind, []).append(sample)
+
+        def summarize(samples: List[RequestSample]) -> Dict:
+            ok = [s.latency for s in samples if 200 <= s.status < 300]
+            return {
+                "requests": len(samples),
+                "errors": len(samples) - len(ok),
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "latency_ms": _percentiles([s.latency for s in samples]),
+            }
+
+        return {
+            "config": {
+                "concurrency": self.config.concurrency,
+                "duration_s": self.config.duration,
+                "mix": self.config.mix,
+                "enable_optimization": self.config.enable_optimization,
+            },
+            "elapsed_s": round(elapsed, 2),
+            "overall": summarize(self.samples),
+            "by_kind": {kind: summarize(samples) for kind, samples in sorted(by_kind.items())},
+            "event_loop_lag_ms": _percentiles(self.loop_lags),
+        }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"Load test: concurrency={report['config']['concurrency']} "
+        f"duration={report['config']['duration_s']}s mix={report['config']['mix']}",
+        f"{'kind':<12}{'reqs':>8}{'errors':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+    ]
+    rows = list(report["by_kind"].items()) + [("overall", report["overall"])]
+    for kind, stats in rows:
+        lat = stats["latency_ms"]
+        lines.append(
+            f"{kind:<12}{stats['requests']:>8}{stats['errors']:>8}{stats['throughput_rps']:>10}"
+            f"{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}{lat['max']:>10}"
+        )
+    lag = report["event_loop_lag_ms"]
+    lines.append(f"event loop lag (ms): mean={lag['mean']} p99={lag['p99']} max={lag['max']}")
+    return "\n".join(lines)
+
+
+async def run_load_test(config: Optional[LoadTestConfig] = None) -> Dict:
+    return await LoadTester(config or LoadTestConfig()).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test for CivicSim AI")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent simulated clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Request weights, e.g. simulate=1,knowledge=3,state_data=6")
+    parser.add_argument("--optimize", action="store_true", help="Enable optimization in simulate requests")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING", help="Application log level during the run")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    config = LoadTestConfig(
+        concurrency=args.concurrency,
+        duration=args.duration,
+        mix=args.mix,
+        enable_optimization=args.optimize,
+        seed=args.seed,
+        log_level=args.log_level.upper()
+    )
+    report = asyncio.run(run_load_test(config))
+
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
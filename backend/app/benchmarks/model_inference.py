@@ -0,0 +1,119 @@
+"""
+Model Inference Benchmarks
+Latency of each inference backend for the agent models, single-row and batched.
+
+Usage:
+    python -m app.benchmarks.model_inference
+    python -m app.benchmarks.model_inference --repeat 2000 --batch 512
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "ml" / "models"
+
+
+def time_call(fn: Callable, repeat: int) -> float:
+    """Median wall time per call in microseconds"""
+    for _ in range(min(50, repeat)):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1e6)
+
+
+def bench_behavior(repeat: int, batch: int) -> List[Dict]:
+    """Eager float32 LSTM vs TorchScript int8 export vs pure-NumPy forward pass"""
+    import torch
+    from app.ml.networks import IndianBehaviorLSTM
+    from app.ml.model_export import export_behavior_torchscript, export_behavior_numpy
+    from app.ml.numpy_lstm import NumpyLSTM
+
+    model = IndianBehaviorLSTM()
+    model.load_state_dict(torch.load(MODEL_DIR / "india_behavior_lstm.pth", map_location="cpu"))
+    model.eval()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scripted = torch.jit.load(str(export_behavior_torchscript(model, tmp)))
+        numpy_model = NumpyLSTM.load(export_behavior_numpy(model, tmp))
+
+    single = torch.randn(1, 1, 10)
+    batched = torch.randn(batch, 1, 10)
+
+    results = []
+    for name, fn in (("eager float32", model), ("torchscript int8", scripted)):
+        with torch.no_grad():
+            results.append({
+                "model": "behavior_lstm",
+                "backend": name,
+                "single_us": time_call(lambda: fn(single), repeat),
+                "batch_us": time_call(lambda: fn(batched), max(1, repeat // 10)),
+            })
+
+    single_np, batched_np = single.numpy(), batched.numpy()
+    results.append({
+        "model": "behavior_lstm",
+        "backend": "numpy float32",
+        "single_us": time_call(lambda: numpy_model.predict(single_np), repeat),
+        "batch_us": time_call(lambda: numpy_model.predict(batched_np), max(1, repeat // 10)),
+    })
+    return results
+
+
+def bench_impact(repeat: int, batch: int) -> List[Dict]:
+    """XGBRegressor.predict vs raw-booster inplace_predict vs compiled NumPy trees"""
+    import pickle
+    import warnings
+    from app.ml.tree_ensemble import TreeEnsemble
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with open(MODEL_DIR / "india_impact_congestion_score.pkl", "rb") as f:
+            model = pickle.load(f)
+    booster = model.get_booster()
+    compiled = TreeEnsemble.from_booster(model)
+
+    rng = np.random.default_rng(0)
+    single = rng.random((1, 8), dtype=np.float32)
+    batched = rng.random((batch, 8), dtype=np.float32)
+
+    results = []
+    for name, fn in (("sklearn predict", model.predict),
+                     ("booster inplace", booster.inplace_predict),
+                     ("compiled numpy", compiled.predict)):
+        results.append({
+            "model": "impact_xgb",
+            "backend": name,
+            "single_us": time_call(lambda: fn(single), repeat),
+            "batch_us": time_call(lambda: fn(batched), max(1, repeat // 10)),
+        })
+    return results
+
+
+def format_results(results: List[Dict], batch: int) -> str:
+    lines = [f"{'model':<16}{'backend':<22}{'1 row (µs)':>14}{f'{batch} rows (µs)':>18}"]
+    for r in results:
+        lines.append(f"{r['model']:<16}{r['backend']:<22}{r['single_us']:>14.1f}{r['batch_us']:>18.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model inference backends")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    results = bench_behavior(args.repeat, args.batch) + bench_impact(args.repeat, args.batch)
+    print(format_results(results, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Pre-fork Memory Sharing Measurement
+Compares worker memory when every worker loads its own models against loading
+them once in the master before fork (PRELOAD_MODELS=true).
+
+Each mode runs in a fresh interpreter that mimics the gunicorn master: it
+optionally preloads, forks N workers, lets each worker run inference, then
+reads per-process USS/PSS from /proc (Linux only).
+
+Usage:
+    python -m app.benchmarks.prefork_memory --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+MODES = ("per_worker", "preload")
+
+
+def _worker(preloaded: bool, ready_w: int, release_r: int, inferences: int):
+    """Body of a forked worker: load (if needed), run inference, wait to be measured"""
+    from app.services.model_warmup import warm_up, _run_dummy_inference
+    from app.services.simulation_engine import get_simulation_engine
+
+    if preloaded:
+        from app.services.prefork import after_fork_in_worker
+        after_fork_in_worker()
+    else:
+        asyncio.run(warm_up())
+
+    engine = get_simulation_engine()
+    for _ in range(inferences):
+        _run_dummy_inference(engine)
+
+    os.write(ready_w, b"1")
+    os.read(release_r, 1)
+    os._exit(0)
+
+
+def _memory(pid: int) -> Dict[str, float]:
+    import psutil
+    info = psutil.Process(pid).memory_full_info()
+    return {
+        "rss_mb": round(info.rss / 1024 / 1024, 1),
+        "uss_mb": round(info.uss / 1024 / 1024, 1),
+        "pss_mb": round(info.pss / 1024 / 1024, 1),
+    }
+
+
+def run_mode(mode: str, workers: int, inferences: int) -> Dict:
+    """Run one mode in this process (acting as the master) and return measurements"""
+    from app.services.prefork import limit_native_threads
+    limit_native_threads()
+
+    preloaded = mode == "preload"
+    if preloaded:
+        from app.services.prefork import preload_shared_state
+        preload_shared_state()
+
+    pids: List[int] = []
+    ready_r, ready_w = os.pipe()
+    release_r, release_w = os.pipe()
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            _worker(preloaded, ready_w, release_r, inferences)
+        pids.append(pid)
+
+    for _ in range(workers):
+        os.read(ready_r, 1)
+
+    master = _memory(os.getpid())
+    per_worker = [_memory(pid) for pid in pids]
+
+    os.write(release_w, b"1" * workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "master": master,
+        "worker_avg_uss_mb": round(sum(w["uss_mb"] for w in per_worker) / workers, 1),
+        "worker_avg_rss_mb": round(sum(w["rss_mb"] for w in per_worker) / workers, 1),
+        "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in per_worker), 1),
+        "per_worker": per_worker,
+    }
+
+
+def measure(workers: int = 4, inferences: int = 3) -> Dict[str, Dict]:
+    """Run every mode in its own interpreter so the modes can't share state"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    results = {}
+    for mode in MODES:
+        completed = subprocess.run(
+            [sys.executable, "-m", "app.benchmarks.prefork_memory",
+             "--run-mode", mode, "--workers", str(workers), "--inferences", str(inferences)],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+    return results
+
+
+def format_report(results: Dict[str, Dict]) -> str:
+    lines = [f"{'mode':<12}{'workers':>8}{'worker USS':>12}{'worker RSS':>12}{'total PSS':>12}  (MB)"]
+    for mode, r in results.items():
+        lines.append(
+            f"{mode:<12}{r['workers']:>8}{r['worker_avg_uss_mb']:>12}{r['worker_avg_rss_mb']:>12}{r['total_pss_mb']:>12}"
+        )
+    baseline, shared = results["per_worker"], results["preload"]
+    saved = baseline["total_pss_mb"] - shared["total_pss_mb"]
+    lines.append(
+        f"Preloading saves {saved:.1f} MB total "
+        f"({saved / baseline['total_pss_mb'] * 100:.0f}% of proportional memory)"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pre-fork model sharing savings")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--inferences", type=int, default=3, help="Dummy inferences per worker")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        import logging
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(run_mode(args.run_mode, args.workers, args.inferences)))
+        return
+
+    print(format_report(measure(args.workers, args.inferences)))
+
+
+if __name__ == "__main__":
+    main()
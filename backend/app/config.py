@@ -6,6 +6,18 @@ class Settings(BaseSettings):
     # MongoDB
     mongodb_uri: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "civicsim_ai"
+    mongo_max_pool_size: int = 50  # Connections per server per process
+    mongo_min_pool_size: int = 5  # Kept open so bursts don't pay for TCP/TLS handshakes
+    mongo_max_idle_time_ms: int = 300000  # Idle connections above the minimum are closed after this
+    mongo_wait_queue_timeout_ms: int = 5000  # Max wait for a free connection when the pool is exhausted
+    mongo_server_selection_timeout_ms: int = 5000  # Fail fast when no suitable server is reachable
+    mongo_connect_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: int = 30000  # Per-operation network timeout
+    mongo_compressors: str = "zstd,snappy,zlib"  # Wire compression, first one both sides support (installed modules only)
+    knowledge_read_preference: str = "secondaryPreferred"  # Knowledge-base reads may go to secondaries
+    knowledge_summary_ttl: int = 300  # Seconds the /knowledge/v2/states overview is cached (writes invalidate it)
+    mongo_command_monitoring: bool = True  # Per-collection/command latency histograms in /performance/metrics
+    slow_query_ms: int = 100  # Commands slower than this are logged with their filter shape
     
     # Security
     secret_key: str = "change-this-in-production"
@@ -40,6 +52,33 @@ class Settings(BaseSettings):
     # ML optimizations
     use_gpu: bool = False  # Set to True if GPU available
     model_precision: str = "float32"  # or "float16" for faster inference
+    behavior_inference_backend: str = "auto"  # auto (numpy > torchscript > eager), numpy or torch
+    warmup_on_startup: bool = True  # Preload models + dummy inference before /ready
+    preload_models: bool = False  # Load models in the gunicorn master, share across workers
+    allow_mock_models: bool = False  # Fall back to random models when no version is registered (dev/tests only)
+    registry_reload_interval: int = 30  # Seconds between checks for a newly promoted model version (0 = off)
+    registry_admin_token: str = ""  # X-Admin-Token required by POST /models/reload (empty = endpoint disabled)
+    optimizer_mode: str = "surrogate"  # surrogate (batched CMA-ES over the simulation) or ppo
+    optimizer_population: int = 256  # Candidates evaluated per CMA-ES generation
+    optimizer_generations: int = 30
+    
+    # Background jobs (/jobs)
+    job_workers: int = 2  # Jobs run concurrently per process
+    job_queue_size: int = 100  # Queued jobs before submissions are refused with 503
+    job_tenant_concurrency: int = 2  # Running jobs per tenant (X-Tenant-ID header)
+    job_timeout: int = 600  # Seconds before a running job is failed
+    job_heartbeat_interval: int = 30  # Running jobs are failed as interrupted after 3 missed heartbeats
+    
+    # Admission control in front of the simulation pipeline
+    admission_max_in_flight: int = 2  # Pipelines running at once per process
+    admission_queue_size: int = 8  # Requests allowed to wait for a slot; more get 429
+    admission_queue_timeout: float = 10.0  # Seconds a request may wait before 429
+    
+    # Buffered simulation writes
+    bulk_write_batch_size: int = 100  # Documents per insert_many
+    bulk_write_interval: float = 1.0  # Seconds between flushes of a partial batch
+    blob_min_bytes: int = 1024  # Bulky fields at least this large are stored once by reference
+    blob_compression: str = "none"  # none, zlib or zstd (needs zstandard installed) for stored blobs
     
     class Config:
         env_file = ".env"
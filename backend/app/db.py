@@ -1,18 +1,71 @@
+import importlib.util
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.config import get_settings
+from pymongo import ReadPreference
+from app.config import get_settings, Settings
+from app.services.mongo_pool import get_pool_metrics
+from app.services.mongo_commands import get_command_metrics
 
 settings = get_settings()
 
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST
+}
+
+# Wire compressor -> module the driver needs for it
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
 class Database:
     client: AsyncIOMotorClient = None
-    
+
 db = Database()
 
+def read_preference(name: str):
+    """pymongo read preference for a setting value like "secondaryPreferred" """
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference {name!r}, expected one of {sorted(READ_PREFERENCES)}")
+    return READ_PREFERENCES[name]
+
+def available_compressors(names: str) -> str:
+    """The configured wire compressors whose modules are installed, in preference order"""
+    wanted = [name.strip() for name in names.split(",") if name.strip()]
+    return ",".join(
+        name for name in wanted
+        if name in _COMPRESSOR_MODULES and importlib.util.find_spec(_COMPRESSOR_MODULES[name])
+    )
+
+def create_mongo_client(config: Optional[Settings] = None, **overrides) -> AsyncIOMotorClient:
+    """The one place Motor clients are built: pool sizing, timeouts, compression, pool and query metrics from settings"""
+    config = config or settings
+    options = {
+        "maxPoolSize": config.mongo_max_pool_size,
+        "minPoolSize": config.mongo_min_pool_size,
+        "maxIdleTimeMS": config.mongo_max_idle_time_ms,
+        "waitQueueTimeoutMS": config.mongo_wait_queue_timeout_ms,
+        "serverSelectionTimeoutMS": config.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": config.mongo_connect_timeout_ms,
+        "socketTimeoutMS": config.mongo_socket_timeout_ms,
+        "appname": "civicsim-ai",
+        "event_listeners": [get_pool_metrics()]
+    }
+    if config.mongo_command_monitoring:
+        options["event_listeners"].append(get_command_metrics())
+    compressors = available_compressors(config.mongo_compressors)
+    if compressors:
+        options["compressors"] = compressors
+    options.update(overrides)
+    return AsyncIOMotorClient(config.mongodb_uri, **options)
+
 async def get_database():
-    return db.client[settings.database_name]
+    return db.client[settings.mongodb_db_name]
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.mongodb_url)
+    db.client = create_mongo_client()
     await db.client.admin.command('ping')
     print("Connected to MongoDB")
 
@@ -4,8 +4,8 @@ Adds indexes for faster queries - 100% FREE (MongoDB Atlas free tier)
 """
 
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import get_settings
+from app.db import create_mongo_client
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -14,8 +14,8 @@ logger = logging.getLogger(__name__)
 async def optimize_database():
     """Add indexes to MongoDB collections for faster queries"""
     settings = get_settings()
-    client = AsyncIOMotorClient(settings.mongodb_url)
-    db = client[settings.database_name]
+    client = create_mongo_client(settings)
+    db = client[settings.mongodb_db_name]
     
     logger.info("Starting database optimization...")
     
@@ -42,6 +42,7 @@ async def optimize_database():
     logger.info("Creating indexes for optimization_results...")
     await db.optimization_results.create_index("original_policy_id")
     await db.optimization_results.create_index("reward_score")
+    await db.optimization_results.create_index([("simulation_id", 1), ("created_at", -1)])  # results per simulation
     
     # Indexes for agent_logs collection
     logger.info("Creating indexes for agent_logs...")
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.db import connect_to_mongo, close_mongo_connection, db
-from app.routes import policy_routes, simulation_routes, india_routes, performance_routes, knowledge_routes, knowledge_mongo_routes
+from app.routes import policy_routes, simulation_routes, india_routes, performance_routes, knowledge_routes, knowledge_mongo_routes, model_routes, job_routes
 from app.services.knowledge_base_service import initialize_kb_service
+from app.services.model_warmup import start_warmup, skip_warmup, get_readiness
+from app.services.job_scheduler import get_job_scheduler
+from app.services.bulk_writer import get_bulk_writer
 from app.config import get_settings
 from app.logging_config import setup_logging
 import logging
@@ -40,16 +44,33 @@ async def startup_event():
     logger.info(f"Allowed Origins: {allowed_origins}")
     
     await connect_to_mongo()
-    await initialize_kb_service(db.client, settings.mongodb_db_name)
+    await initialize_kb_service(
+        db.client, settings.mongodb_db_name, settings.knowledge_read_preference, settings.knowledge_summary_ttl
+    )
+    
+    # Background jobs for long-running simulations (/jobs)
+    await get_job_scheduler().start(db.client[settings.mongodb_db_name])
+    await get_bulk_writer().start(db.client[settings.mongodb_db_name])
+    
+    # Warm up models in the background; /ready reports when it's done
+    if get_readiness()["ready"]:
+        logger.info("🤖 ML/DL models preloaded in gunicorn master - shared across workers")
+    elif settings.warmup_on_startup:
+        start_warmup()
+        logger.info("🤖 ML/DL model warm-up started (see /ready)")
+    else:
+        skip_warmup()
+        logger.info("🤖 ML/DL model warm-up disabled - models load on first request")
     
     logger.info("✅ CivicSim AI backend started successfully!")
     logger.info("📊 6 AI Agents ready")
     logger.info("🇮🇳 36 States & UTs covered")
-    logger.info("🤖 ML/DL models loaded and cached")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down CivicSim AI")
+    await get_job_scheduler().stop()
+    await get_bulk_writer().stop()  # durable: flush buffered simulations before the client closes
     await close_mongo_connection()
     logger.info("✅ Shutdown complete")
 
@@ -65,6 +86,14 @@ async def health_check():
         "ml_models": 6
     }
 
+# Readiness endpoint - only ready once models are warmed up
+@app.get("/ready")
+async def readiness_check():
+    readiness = get_readiness()
+    if not readiness["ready"]:
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
+
 # Include routers
 app.include_router(policy_routes.router)
 app.include_router(simulation_routes.router)
@@ -72,6 +101,8 @@ app.include_router(india_routes.router)
 app.include_router(performance_routes.router)
 app.include_router(knowledge_routes.router)
 app.include_router(knowledge_mongo_routes.router)
+app.include_router(model_routes.router)
+app.include_router(job_routes.router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,177 @@
+"""
+Simulation Schema Migration - 100% FREE
+Rewrites db.indian_simulations documents in the compact v2 schema (app.services.simulation_schema)
+and reports storage size before and after
+
+- documents without schema_version are read in batches, their blobs resolved,
+  compacted, re-split into (optionally compressed) blobs and replaced in place
+- a replace only happens if the document is still unversioned, so it is safe to
+  re-run or to run while the API is writing v2 documents
+- blobs no longer referenced by any simulation are removed afterwards
+- v2 documents written while v2 still dropped real_data_used get it back (it is
+  indexed, so queries on it would otherwise miss them)
+- sizes are BSON bytes: documents plus the blobs they reference, each blob counted once
+
+Usage:
+    python -m app.migrate_simulations --dry-run
+    python -m app.migrate_simulations --compression zstd --batch-size 500
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, Set
+
+import bson
+from pymongo.errors import BulkWriteError
+
+from app.services.bulk_writer import BLOB_COLLECTION, BufferedWriter, split_blobs, blob_compression
+from app.services.simulation_schema import SCHEMA_VERSION, compact_indian_simulation
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "indian_simulations"
+UNVERSIONED = {"schema_version": {"$exists": False}}
+# Early v2 documents left out real_data_used, but only when it was True
+MISSING_REAL_DATA_FLAG = {"schema_version": {"$gte": SCHEMA_VERSION}, "real_data_used": {"$exists": False}}
+
+
+async def _blob_bytes(database, ids: Set[str]) -> int:
+    if not ids:
+        return 0
+    total = 0
+    async for blob in database[BLOB_COLLECTION].find({"_id": {"$in": list(ids)}}):
+        total += len(bson.encode(blob))
+    return total
+
+
+async def _referenced_blobs(database) -> Set[str]:
+    referenced = set()
+    for name in (COLLECTION, "simulations"):
+        async for doc in database[name].find({"blobs": {"$exists": True}}, {"blobs": 1}):
+            referenced.update(doc["blobs"].values())
+    return referenced
+
+
+async def migrate_simulations(database, batch_size: int = 200, compression: str = "none",
+                              blob_min_bytes: int = 1024, dry_run: bool = False) -> Dict[str, Any]:
+    """Migrate every unversioned simulation; returns the size report"""
+    compression = blob_compression(compression)
+    reader = BufferedWriter(blob_min_bytes=blob_min_bytes)  # only used to resolve existing blobs
+    collection = database[COLLECTION]
+
+    report = {"documents": 0, "dry_run": dry_run, "compression": compression,
+              "document_bytes_before": 0, "document_bytes_after": 0}
+    blobs_before: Set[str] = set()
+    blobs_after: Dict[str, int] = {}
+    last_id = None
+
+    while True:
+        query = dict(UNVERSIONED)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await collection.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        new_blobs = {}
+        replacements = []
+        for doc in batch:
+            report["document_bytes_before"] += len(bson.encode(doc))
+            blobs_before.update((doc.get("blobs") or {}).values())
+
+            full = await reader.resolve_blobs(database, dict(doc))
+            compact = compact_indian_simulation(full)
+            for blob in split_blobs(COLLECTION, compact, blob_min_bytes, compression):
+                new_blobs.setdefault(blob["_id"], blob)
+            report["document_bytes_after"] += len(bson.encode(compact))
+            for key in (compact.get("blobs") or {}).values():
+                blobs_after.setdefault(key, 0)
+            replacements.append(compact)
+
+        for key, blob in new_blobs.items():
+            blobs_after[key] = len(bson.encode(blob))
+
+        if not dry_run:
+            if new_blobs:
+                try:
+                    await database[BLOB_COLLECTION].insert_many(list(new_blobs.values()), ordered=False)
+                except BulkWriteError:
+                    pass  # content-addressed: a duplicate is the same blob
+            for compact in replacements:
+                await collection.replace_one({"_id": compact["_id"], **UNVERSIONED}, compact)
+
+        report["documents"] += len(batch)
+        logger.info(f"Migrated {report['documents']} simulations to schema v{SCHEMA_VERSION}")
+
+    report["blob_bytes_before"] = await _blob_bytes(database, blobs_before)
+    # Blobs that already existed keep their stored encoding
+    existing = {key for key, size in blobs_after.items() if not size}
+    report["blob_bytes_after"] = (await _blob_bytes(database, existing)
+                                  + sum(size for size in blobs_after.values() if size))
+
+    report["restored_flags"] = await collection.count_documents(MISSING_REAL_DATA_FLAG)
+    if not dry_run and report["restored_flags"]:
+        await collection.update_many(MISSING_REAL_DATA_FLAG, {"$set": {"real_data_used": True}})
+
+    report["pruned_blobs"] = 0
+    if not dry_run and blobs_before:
+        orphans = blobs_before - await _referenced_blobs(database)
+        if orphans:
+            result = await database[BLOB_COLLECTION].delete_many({"_id": {"$in": list(orphans)}})
+            report["pruned_blobs"] = result.deleted_count
+
+    before = report["document_bytes_before"] + report["blob_bytes_before"]
+    after = report["document_bytes_after"] + report["blob_bytes_after"]
+    report["bytes_before"], report["bytes_after"] = before, after
+    report["saved_percent"] = round(100 * (1 - after / before), 1) if before else 0.0
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    docs = max(report["documents"], 1)
+    rows = [
+        ("documents", report["document_bytes_before"], report["document_bytes_after"]),
+        ("blobs", report["blob_bytes_before"], report["blob_bytes_after"]),
+        ("total", report["bytes_before"], report["bytes_after"])
+    ]
+    lines = [
+        f"{report['documents']} simulations -> schema v{SCHEMA_VERSION}"
+        f" (blob compression: {report['compression']}{', dry run' if report['dry_run'] else ''})",
+        f"{'':<10} {'before':>12} {'after':>12} {'per doc before':>15} {'per doc after':>14}"
+    ]
+    for name, before, after in rows:
+        lines.append(f"{name:<10} {before:>12,} {after:>12,} {before // docs:>15,} {after // docs:>14,}")
+    lines.append(f"saved {report['saved_percent']}%, pruned {report['pruned_blobs']} unreferenced blobs, "
+                 f"restored real_data_used on {report['restored_flags']} v2 documents")
+    return "\n".join(lines)
+
+
+async def _main(args):
+    from app.config import get_settings
+    from app.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings)
+    try:
+        report = await migrate_simulations(
+            client[settings.mongodb_db_name],
+            batch_size=args.batch_size,
+            compression=args.compression or settings.blob_compression,
+            blob_min_bytes=settings.blob_min_bytes,
+            dry_run=args.dry_run
+        )
+        print(format_report(report))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Migrate stored simulations to the compact schema")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--compression", choices=["none", "zlib", "zstd"], help="Defaults to BLOB_COMPRESSION")
+    parser.add_argument("--dry-run", action="store_true", help="Report sizes without writing")
+    asyncio.run(_main(parser.parse_args()))
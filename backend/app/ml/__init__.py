@@ -0,0 +1 @@
+# ML models, networks and training
@@ -0,0 +1,62 @@
+"""
+Model Feature Builders - 100% FREE
+Single definition of the feature vectors the agents feed their models, shared
+by serving (BehaviorAgent, ImpactAgent) and retraining on stored simulations.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def behavior_features(policy, state_data: Optional[Dict] = None) -> np.ndarray:
+    """Convert policy parameters to feature vector with real state context"""
+    # Handle both old and new schema
+    budget = getattr(policy, 'budget_allocation_inr', None) or getattr(policy, 'budget_allocation', 1000000)
+    timeline = getattr(policy, 'implementation_timeline_days', None) or getattr(policy, 'implementation_timeline', 90)
+
+    # Base features
+    features = [
+        budget / 1e6,  # Budget in millions
+        timeline / 365,  # Timeline in years
+        policy.enforcement_level,
+        policy.incentive_structure.get("tax_reduction", 0) if isinstance(policy.incentive_structure.get("tax_reduction", 0), (int, float)) else policy.incentive_structure.get("tax_reduction_percent", 0) / 100,
+        policy.incentive_structure.get("subsidy", 0) if isinstance(policy.incentive_structure.get("subsidy", 0), (int, float)) else policy.incentive_structure.get("subsidy_inr", 0) / 1000,
+        policy.infrastructure_changes.get("new_lanes", 0),
+        policy.infrastructure_changes.get("charging_stations", 0) / 100,
+    ]
+
+    # Add real state context if available
+    if state_data:
+        features.extend([
+            state_data["literacy_rate"] / 100,
+            state_data["median_income_inr"] / 50000,
+            state_data["urban_percentage"] / 100
+        ])
+    else:
+        features.extend([0.7, 0.7, 0.7])  # Default values
+
+    return np.array(features)
+
+
+def impact_features(metrics: Dict, policy) -> np.ndarray:
+    """Build feature vector matching trained model (8 features)"""
+    # Handle both old and new schema
+    budget = getattr(policy, 'budget_allocation_inr', None) or getattr(policy, 'budget_allocation', 1000000)
+    timeline = getattr(policy, 'implementation_timeline_days', None) or getattr(policy, 'implementation_timeline', 90)
+
+    # Match original 8 features for model compatibility
+    infrastructure_stress_count = 5  # Default
+    if isinstance(metrics.get("infrastructure_stress"), dict):
+        infrastructure_stress_count = len([k for k in metrics["infrastructure_stress"].keys() if not k.startswith("_")])
+
+    return np.array([
+        metrics["congestion_score"],
+        metrics["energy_load"],
+        metrics["dissatisfaction_index"],
+        metrics["economic_stability"],
+        budget / 1e6,
+        policy.enforcement_level,
+        timeline / 365,
+        infrastructure_stress_count
+    ])
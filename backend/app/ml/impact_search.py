@@ -0,0 +1,187 @@
+"""
+Parallel Hyperparameter Search for Impact Models - 100% FREE
+Fans target x hyperparameter configurations out over a process pool and keeps
+the best XGBoost model per target by validation R². The test split plays no part
+in the choice: score_on_test() scores each winner on it once, afterwards.
+
+Cores are budgeted, not oversubscribed: with W pool workers on C cores each
+job trains with n_jobs = C // W, and every model uses tree_method="hist".
+"""
+
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REPORT_JSON = "impact_search_report.json"
+REPORT_MD = "impact_search_report.md"
+
+# Fixed configuration the trainer used before the search existed - always evaluated for comparison
+BASELINE_PARAMS = {"n_estimators": 100, "max_depth": 5, "learning_rate": 0.1}
+
+DEFAULT_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [3, 5, 7],
+    "learning_rate": [0.05, 0.1],
+    "subsample": [0.8, 1.0]
+}
+
+# Per-process training data, installed once by the pool initializer instead of pickled per job
+_worker_data: Dict[str, Any] = {}
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict[str, Any]]:
+    """Cartesian product of a parameter grid, baseline first and never duplicated"""
+    keys = sorted(grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    baseline = dict(BASELINE_PARAMS)
+    return [baseline] + [c for c in configs if c != baseline]
+
+
+def plan_workers(n_jobs_total: int, max_workers: Optional[int] = None) -> Tuple[int, int]:
+    """(pool workers, xgboost threads per job) so workers * threads <= cores"""
+    cores = os.cpu_count() or 1
+    workers = max(1, min(max_workers or cores, cores, n_jobs_total))
+    return workers, max(1, cores // workers)
+
+
+def _init_worker(X_train: np.ndarray, X_val: np.ndarray, targets: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+    _worker_data.update(X_train=X_train, X_val=X_val, targets=targets)
+
+
+def _fit_job(target: str, params: Dict[str, Any], n_jobs: int, seed: int) -> Dict[str, Any]:
+    """Train one (target, params) configuration inside a pool worker"""
+    import xgboost as xgb
+    from sklearn.metrics import r2_score
+
+    X_train, X_val = _worker_data["X_train"], _worker_data["X_val"]
+    y_train, y_val = _worker_data["targets"][target]
+
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(tree_method="hist", n_jobs=n_jobs, random_state=seed, **params)
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    return {
+        "target": target,
+        "params": params,
+        "train_r2": float(r2_score(y_train, model.predict(X_train))),
+        "val_r2": float(r2_score(y_val, model.predict(X_val))),
+        "fit_seconds": round(fit_seconds, 3),
+        "model": bytes(model.get_booster().save_raw("ubj"))
+    }
+
+
+def search_impact_models(X_train: np.ndarray, X_val: np.ndarray,
+                         targets: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                         grid: Optional[Dict[str, List]] = None, max_workers: Optional[int] = None,
+                         seed: int = 42) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    targets: name -> (y_train, y_val).
+    Returns (best XGBRegressor per target, report dict).
+    """
+    import xgboost as xgb
+
+    configs = expand_grid(grid or DEFAULT_GRID)
+    jobs = [(target, params) for target in targets for params in configs]
+    workers, threads = plan_workers(len(jobs), max_workers)
+    logger.info(f"Hyperparameter search: {len(jobs)} jobs ({len(targets)} targets x {len(configs)} configs) "
+                f"on {workers} workers x {threads} threads")
+
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    # spawn: workers must not inherit OpenMP/torch thread pools from the parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(X_train, X_val, targets)) as pool:
+        futures = [pool.submit(_fit_job, target, params, threads, seed) for target, params in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    wall_seconds = time.perf_counter() - start
+
+    best_models = {}
+    report_targets = {}
+    for target in targets:
+        ranked = sorted((r for r in results if r["target"] == target), key=lambda r: r["val_r2"], reverse=True)
+        best = ranked[0]
+        baseline = next(r for r in ranked if r["params"] == BASELINE_PARAMS)
+
+        model = xgb.XGBRegressor()
+        model.load_model(bytearray(best["model"]))
+        best_models[target] = model
+
+        report_targets[target] = {
+            "best": {k: v for k, v in best.items() if k != "model"},
+            "baseline_val_r2": baseline["val_r2"],
+            "improvement": best["val_r2"] - baseline["val_r2"],
+            "ranking": [{k: v for k, v in r.items() if k not in ("model", "target")} for r in ranked]
+        }
+        logger.info(f"  {target}: best val R²={best['val_r2']:.4f} (baseline {baseline['val_r2']:.4f}) "
+                    f"with {best['params']}")
+
+    report = {
+        "jobs": len(jobs),
+        "workers": workers,
+        "threads_per_job": threads,
+        "wall_seconds": round(wall_seconds, 2),
+        "cpu_fit_seconds": round(sum(r["fit_seconds"] for r in results), 2),
+        "grid": grid or DEFAULT_GRID,
+        "targets": report_targets
+    }
+    return best_models, report
+
+
+def score_on_test(models: Dict[str, Any], report: Dict[str, Any], X_test: np.ndarray,
+                  y_test: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """R² of each selected model on the held-out test split, also recorded in the report"""
+    from sklearn.metrics import r2_score
+
+    scores = {}
+    for target, model in models.items():
+        scores[target] = float(r2_score(y_test[target], model.predict(X_test)))
+        report["targets"][target]["test_r2"] = scores[target]
+        logger.info(f"  {target}: test R²={scores[target]:.4f} "
+                    f"(selected on val R²={report['targets'][target]['best']['val_r2']:.4f})")
+    return scores
+
+
+def write_report(report: Dict[str, Any], save_dir) -> Path:
+    """JSON report plus a Markdown comparison table next to the models"""
+    save_dir = Path(save_dir)
+    with open(save_dir / REPORT_JSON, "w") as f:
+        json.dump(report, f, indent=2)
+
+    lines = [
+        "# Impact Model Hyperparameter Search",
+        "",
+        f"{report['jobs']} jobs on {report['workers']} workers x {report['threads_per_job']} threads, "
+        f"{report['wall_seconds']}s wall ({report['cpu_fit_seconds']}s total fit time)",
+        ""
+    ]
+    for target, info in report["targets"].items():
+        lines += [
+            f"## {target}",
+            "",
+            f"Best val R² {info['best']['val_r2']:.4f} vs baseline {info['baseline_val_r2']:.4f} "
+            f"({info['improvement']:+.4f})" + (f", test R² {info['test_r2']:.4f}" if "test_r2" in info else ""),
+            "",
+            "| rank | params | val R² | train R² | fit (s) |",
+            "|---:|---|---:|---:|---:|"
+        ]
+        for rank, r in enumerate(info["ranking"], 1):
+            params = ", ".join(f"{k}={v}" for k, v in sorted(r["params"].items()))
+            lines.append(f"| {rank} | {params} | {r['val_r2']:.4f} | {r['train_r2']:.4f} | {r['fit_seconds']} |")
+        lines.append("")
+
+    path = save_dir / REPORT_MD
+    path.write_text("\n".join(lines))
+    return path
@@ -0,0 +1,335 @@
+"""
+Incremental Retraining - 100% FREE
+Learns from simulations stored in db.indian_simulations without retraining from scratch
+
+Each run:
+  1. streams documents newer than the saved watermark (cursor batch_size + projection)
+  2. rebuilds the exact feature vectors the agents serve with (app.ml.features)
+  3. continues boosting each impact model from the current version (xgb_model= warm start)
+  4. fine-tunes the behavior LSTM from its current weights
+  5. registers a new version, promoting it only if validation loss didn't regress
+
+Labels come only from `observed_outcomes` (measured results attached after the
+fact). The stored outputs are no substitute: `behavior_output` is the LSTM's own
+prediction, and `impact_predictions` copies simulation metrics that are already
+impact-model inputs (plus a constant inflation figure). Training on them would
+teach the models to echo themselves. A model family with fewer observed labels
+than its minimum is carried over unchanged.
+
+Usage:
+    python -m app.ml.incremental_training
+    python -m app.ml.incremental_training --min-documents 200 --no-promote
+"""
+
+import argparse
+import asyncio
+import copy
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.ml.features import behavior_features, impact_features
+from app.ml.model_registry import ModelRegistry, BEHAVIOR_OUTPUTS, REGISTRY_DIR, get_model_registry
+from app.services.free_india_data import india_data_service
+
+logger = logging.getLogger(__name__)
+
+STATE_ID = "incremental_training"
+
+# Only the fields needed to rebuild features and labels leave the server
+SIMULATION_PROJECTION = {
+    "_id": 1,
+    "timestamp": 1,
+    "region.state": 1,
+    "structured_policy": 1,
+    "results.simulation_metrics": 1,
+    "observed_outcomes": 1
+}
+
+# Training target -> key in observed_outcomes.impact
+IMPACT_LABEL_KEYS = {
+    "congestion_score": "congestion_score",
+    "inflation_rate": "inflation_rate",
+    "dissatisfaction": "dissatisfaction_index",
+    "energy_stress": "energy_stress"
+}
+
+
+@dataclass
+class IncrementalConfig:
+    batch_size: int = 500  # Mongo cursor batch size
+    max_documents: int = 100_000  # per run; the watermark picks up the rest next time
+    min_documents: int = 50  # skip runs with too little new data
+    boost_rounds: int = 20
+    boost_learning_rate: float = 0.05
+    lstm_epochs: int = 5
+    lstm_learning_rate: float = 1e-4
+    min_behavior_labels: int = 50  # observed behavior outcomes needed to fine-tune the LSTM
+    min_impact_labels: int = 50  # observed impact outcomes needed to boost the impact models
+    validation_fraction: float = 0.2
+    max_regression: float = 0.02  # tolerated relative val-loss increase before refusing to promote
+    promote: bool = True
+    seed: int = 42
+
+
+def document_rows(doc: Dict) -> Optional[Dict[str, Any]]:
+    """Features and observed labels for one stored simulation, or None if it has none (or can't be used)"""
+    try:
+        results = doc["results"]
+        policy = SimpleNamespace(**doc["structured_policy"])
+        metrics = results["simulation_metrics"]
+        observed = doc.get("observed_outcomes") or {}
+
+        behavior_labels = observed.get("behavior")  # never the stored behavior_output (model's own guess)
+        impact_labels = observed.get("impact")  # never the stored impact_predictions (echo of the inputs)
+        if not behavior_labels and not impact_labels:
+            return None
+        state_data = india_data_service.get_state_data(doc["region"]["state"])
+
+        return {
+            "behavior_X": behavior_features(policy, state_data),
+            "behavior_y": [float(behavior_labels[k]) for k in BEHAVIOR_OUTPUTS] if behavior_labels else None,
+            "impact_X": impact_features(metrics, policy),
+            "impact_y": {
+                target: float(impact_labels[observed_key] if observed_key in impact_labels else impact_labels[target])
+                for target, observed_key in IMPACT_LABEL_KEYS.items()
+            } if impact_labels else None
+        }
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+
+
+def _watermark_query(watermark: Optional[Dict]) -> Dict:
+    """Documents strictly after (timestamp, _id) of the last one trained on"""
+    if not watermark:
+        return {}
+    return {"$or": [
+        {"timestamp": {"$gt": watermark["timestamp"]}},
+        {"timestamp": watermark["timestamp"], "_id": {"$gt": watermark["_id"]}}
+    ]}
+
+
+async def stream_training_data(collection, watermark: Optional[Dict], config: IncrementalConfig) -> Dict[str, Any]:
+    """Read new simulations with observed outcomes batch by batch into compact float32 arrays"""
+    cursor = (
+        collection.find({**_watermark_query(watermark), "observed_outcomes": {"$exists": True}}, SIMULATION_PROJECTION)
+        .sort([("timestamp", 1), ("_id", 1)])
+        .batch_size(config.batch_size)
+        .limit(config.max_documents)
+    )
+
+    behavior_X: List[np.ndarray] = []
+    behavior_y: List[List[float]] = []
+    impact_X: List[np.ndarray] = []
+    impact_y: Dict[str, List[float]] = {target: [] for target in IMPACT_LABEL_KEYS}
+    seen, skipped, labelled, last = 0, 0, 0, None
+
+    async for doc in cursor:
+        seen += 1
+        last = {"timestamp": doc["timestamp"], "_id": doc["_id"]}
+        rows = document_rows(doc)
+        if rows is None:
+            skipped += 1
+            continue
+        if rows["behavior_y"] is not None:
+            behavior_X.append(rows["behavior_X"])
+            behavior_y.append(rows["behavior_y"])
+        if rows["impact_y"] is not None:
+            impact_X.append(rows["impact_X"])
+            for target, value in rows["impact_y"].items():
+                impact_y[target].append(value)
+        labelled += 1
+
+    return {
+        "documents": seen,
+        "skipped": skipped,
+        "rows": labelled,
+        "behavior_rows": len(behavior_X),
+        "impact_rows": len(impact_X),
+        "watermark": last,
+        "behavior_X": np.array(behavior_X, dtype=np.float32).reshape(-1, 10),
+        "behavior_y": np.array(behavior_y, dtype=np.float32).reshape(-1, len(BEHAVIOR_OUTPUTS)),
+        "impact_X": np.array(impact_X, dtype=np.float32).reshape(-1, 8),
+        "impact_y": {t: np.array(v, dtype=np.float32) for t, v in impact_y.items()}
+    }
+
+
+def _mse(y_true: np.ndarray, y_pred: np.ndarray) -> float:
+    return float(np.mean((np.asarray(y_true) - np.asarray(y_pred)) ** 2))
+
+
+def train_increment(registry: ModelRegistry, data: Dict[str, Any], config: IncrementalConfig) -> Dict[str, Any]:
+    """CPU-bound part: warm-start every model from the current version and register the result"""
+    import xgboost as xgb
+    from app.ml.lstm_training import TrainingConfig, make_loaders, train_lstm, evaluate
+    import torch
+
+    parent_version = registry.current_version()
+    behavior_parent, impact_parents, scaler = registry.load_trainable(parent_version)
+
+    rng = np.random.default_rng(config.seed)
+
+    def split(rows: int):
+        order = rng.permutation(rows)
+        n_val = max(1, int(len(order) * config.validation_fraction))
+        return order[:n_val], order[n_val:]
+
+    comparison = {}
+
+    # Impact models: continue boosting on top of the existing trees, on observed outcomes only
+    impact_models = impact_parents
+    impact_trained = data["impact_rows"] >= config.min_impact_labels
+    if impact_trained:
+        impact_models = {}
+        val_idx, train_idx = split(data["impact_rows"])
+        X_train, X_val = data["impact_X"][train_idx], data["impact_X"][val_idx]
+        for target, parent in impact_parents.items():
+            y = data["impact_y"][target]
+            model = xgb.XGBRegressor(
+                n_estimators=config.boost_rounds,
+                learning_rate=config.boost_learning_rate,
+                tree_method="hist",
+                random_state=config.seed
+            )
+            model.fit(X_train, y[train_idx], xgb_model=parent.get_booster())
+            impact_models[target] = model
+            comparison[target] = {
+                "parent_val_mse": _mse(y[val_idx], parent.predict(X_val)),
+                "new_val_mse": _mse(y[val_idx], model.predict(X_val))
+            }
+    else:
+        logger.info(f"Impact models kept as is: {data['impact_rows']} observed outcomes "
+                    f"(< {config.min_impact_labels})")
+
+    # Behavior LSTM: a few low learning-rate epochs from the current weights, on observed outcomes only
+    behavior_model = behavior_parent
+    behavior_trained = data["behavior_rows"] >= config.min_behavior_labels
+    if behavior_trained:
+        behavior_model = copy.deepcopy(behavior_parent)
+        val_idx, train_idx = split(data["behavior_rows"])
+        lstm_config = TrainingConfig(
+            epochs=config.lstm_epochs,
+            batch_size=64,
+            learning_rate=config.lstm_learning_rate,
+            patience=2,
+            seed=config.seed
+        )
+        train_loader, val_loader = make_loaders(
+            data["behavior_X"][train_idx], data["behavior_y"][train_idx],
+            data["behavior_X"][val_idx], data["behavior_y"][val_idx], lstm_config
+        )
+        parent_loss = evaluate(behavior_parent.eval(), val_loader, torch.nn.MSELoss())
+        result = train_lstm(behavior_model, train_loader, val_loader, lstm_config)
+        comparison["behavior"] = {"parent_val_mse": parent_loss, "new_val_mse": result.best_val_loss}
+    else:
+        logger.info(f"Behavior LSTM kept as is: {data['behavior_rows']} observed outcomes "
+                    f"(< {config.min_behavior_labels})")
+
+    regressed = [
+        name for name, c in comparison.items()
+        if c["new_val_mse"] > c["parent_val_mse"] * (1 + config.max_regression) + 1e-12
+    ]
+    promote = config.promote and not regressed
+
+    version = registry.register(
+        behavior_model, impact_models, scaler,
+        metadata={
+            "source": "incremental",
+            "parent_version": parent_version,
+            "documents": data["documents"],
+            "rows": data["rows"],
+            "behavior_rows": data["behavior_rows"],
+            "impact_rows": data["impact_rows"],
+            "behavior_trained": behavior_trained,
+            "impact_trained": impact_trained,
+            "comparison": comparison,
+            "regressed": regressed,
+            "training_config": asdict(config)
+        },
+        promote=promote
+    )
+    if regressed:
+        logger.warning(f"Registered {version} without promoting - validation regressed for {regressed}")
+
+    return {
+        "status": "promoted" if promote else "registered",
+        "version": version,
+        "parent_version": parent_version,
+        "behavior_trained": behavior_trained,
+        "impact_trained": impact_trained,
+        "comparison": comparison,
+        "regressed": regressed
+    }
+
+
+async def run_incremental_training(database, registry: Optional[ModelRegistry] = None,
+                                   config: Optional[IncrementalConfig] = None) -> Dict[str, Any]:
+    """Stream new simulations, warm-start training, register; advances the watermark on success"""
+    registry = registry or get_model_registry()
+    config = config or IncrementalConfig()
+    start = time.perf_counter()
+
+    state = await database.training_state.find_one({"_id": STATE_ID}) or {}
+    data = await stream_training_data(database.indian_simulations, state.get("watermark"), config)
+    logger.info(f"Incremental training: {data['documents']} new documents, {data['rows']} with observed outcomes")
+
+    if data["rows"] < config.min_documents:
+        return {"status": "skipped", "reason": f"only {data['rows']} new rows (< {config.min_documents})",
+                "documents": data["documents"]}
+    if data["behavior_rows"] < config.min_behavior_labels and data["impact_rows"] < config.min_impact_labels:
+        return {"status": "skipped", "documents": data["documents"],
+                "reason": f"too few observed outcomes ({data['behavior_rows']} behavior, {data['impact_rows']} impact)"}
+
+    summary = await asyncio.to_thread(train_increment, registry, data, config)
+
+    await database.training_state.update_one(
+        {"_id": STATE_ID},
+        {"$set": {
+            "watermark": data["watermark"],
+            "last_version": summary["version"],
+            "last_run": datetime.utcnow()
+        }},
+        upsert=True
+    )
+
+    summary.update(documents=data["documents"], rows=data["rows"], behavior_rows=data["behavior_rows"],
+                   impact_rows=data["impact_rows"], seconds=round(time.perf_counter() - start, 2))
+    logger.info(f"✅ Incremental training complete: {summary['status']} {summary['version']}")
+    return summary
+
+
+async def _main(args):
+    from app.config import get_settings
+    from app.db import create_mongo_client
+
+    settings = get_settings()
+    client = create_mongo_client(settings)
+    try:
+        config = IncrementalConfig(
+            batch_size=args.batch_size,
+            min_documents=args.min_documents,
+            boost_rounds=args.boost_rounds,
+            lstm_epochs=args.lstm_epochs,
+            promote=not args.no_promote
+        )
+        summary = await run_incremental_training(client[settings.mongodb_db_name], ModelRegistry(REGISTRY_DIR), config)
+        print(summary)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Retrain models incrementally from stored simulations")
+    parser.add_argument("--batch-size", type=int, default=500, help="Mongo cursor batch size")
+    parser.add_argument("--min-documents", type=int, default=50)
+    parser.add_argument("--boost-rounds", type=int, default=20)
+    parser.add_argument("--lstm-epochs", type=int, default=5)
+    parser.add_argument("--no-promote", action="store_true", help="Register without moving CURRENT")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,187 @@
+"""
+LSTM Training Loop - 100% FREE
+DataLoader-based training for the behavior LSTM with per-epoch validation,
+early stopping, checkpoint/resume and throughput reporting.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+
+logger = logging.getLogger(__name__)
+
+LAST_CHECKPOINT = "behavior_lstm_last.pt"
+BEST_CHECKPOINT = "behavior_lstm_best.pt"
+
+
+@dataclass
+class TrainingConfig:
+    epochs: int = 50
+    batch_size: int = 64
+    learning_rate: float = 1e-3
+    num_threads: Optional[int] = None  # torch intra-op threads (None = torch default)
+    num_workers: int = 0  # DataLoader workers; in-memory tensors rarely need any
+    patience: int = 5  # epochs without val improvement before stopping (0 = never stop early)
+    min_delta: float = 1e-4
+    checkpoint_dir: Optional[str] = None
+    resume: bool = False
+    seed: int = 42
+
+
+@dataclass
+class TrainingResult:
+    best_val_loss: float
+    best_epoch: int
+    epochs_run: int
+    stopped_early: bool
+    train_seconds: float
+    samples_per_sec: float
+    history: List[Dict[str, float]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, float]:
+        return {k: v for k, v in asdict(self).items() if k != "history"}
+
+
+def make_loaders(X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, y_val: np.ndarray,
+                 config: TrainingConfig) -> Tuple[DataLoader, DataLoader]:
+    """Wrap (n, features) arrays as single-timestep sequences in shuffled/ordered loaders"""
+    def dataset(X, y):
+        return TensorDataset(
+            torch.as_tensor(np.asarray(X), dtype=torch.float32).unsqueeze(1),
+            torch.as_tensor(np.asarray(y), dtype=torch.float32)
+        )
+
+    generator = torch.Generator().manual_seed(config.seed)
+    train_loader = DataLoader(
+        dataset(X_train, y_train), batch_size=config.batch_size, shuffle=True,
+        num_workers=config.num_workers, generator=generator,
+        persistent_workers=config.num_workers > 0
+    )
+    # Validation only runs forward passes, so it can use much larger batches
+    val_loader = DataLoader(dataset(X_val, y_val), batch_size=max(config.batch_size, 4096))
+    return train_loader, val_loader
+
+
+def evaluate(model: nn.Module, loader: DataLoader, criterion) -> float:
+    model.eval()
+    total, count = 0.0, 0
+    with torch.no_grad():
+        for batch_X, batch_y in loader:
+            total += criterion(model(batch_X), batch_y).item() * len(batch_X)
+            count += len(batch_X)
+    return total / count
+
+
+def _save_checkpoint(path: Path, model, optimizer, epoch: int, best_val_loss: float, best_epoch: int,
+                     stale_epochs: int, history: List[Dict]):
+    tmp = path.with_suffix(".tmp")
+    torch.save({
+        "epoch": epoch,
+        "model_state": model.state_dict(),
+        "optimizer_state": optimizer.state_dict(),
+        "best_val_loss": best_val_loss,
+        "best_epoch": best_epoch,
+        "stale_epochs": stale_epochs,
+        "history": history
+    }, tmp)
+    tmp.replace(path)  # never leave a half-written checkpoint behind
+
+
+def train_lstm(model: nn.Module, train_loader: DataLoader, val_loader: DataLoader,
+               config: TrainingConfig) -> TrainingResult:
+    """Train in place; the model ends up holding the best validation weights"""
+    if config.num_threads:
+        torch.set_num_threads(config.num_threads)
+    torch.manual_seed(config.seed)
+
+    criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=config.learning_rate)
+
+    checkpoint_dir = Path(config.checkpoint_dir) if config.checkpoint_dir else None
+    if checkpoint_dir:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    start_epoch, best_val_loss, best_epoch, stale_epochs = 0, float("inf"), 0, 0
+    history: List[Dict[str, float]] = []
+    best_state = None
+
+    if config.resume and checkpoint_dir and (checkpoint_dir / LAST_CHECKPOINT).exists():
+        state = torch.load(checkpoint_dir / LAST_CHECKPOINT, map_location="cpu", weights_only=False)
+        model.load_state_dict(state["model_state"])
+        optimizer.load_state_dict(state["optimizer_state"])
+        start_epoch = state["epoch"]
+        best_val_loss, best_epoch = state["best_val_loss"], state["best_epoch"]
+        stale_epochs, history = state["stale_epochs"], state["history"]
+        if (checkpoint_dir / BEST_CHECKPOINT).exists():
+            best_state = torch.load(checkpoint_dir / BEST_CHECKPOINT, map_location="cpu", weights_only=False)["model_state"]
+        logger.info(f"Resumed from epoch {start_epoch} (best val loss {best_val_loss:.4f})")
+
+    samples_seen, train_seconds = 0, 0.0
+    stopped_early = False
+    epoch = start_epoch
+
+    for epoch in range(start_epoch + 1, config.epochs + 1):
+        model.train()
+        total_loss = 0.0
+        epoch_start = time.perf_counter()
+        for batch_X, batch_y in train_loader:
+            optimizer.zero_grad()
+            loss = criterion(model(batch_X), batch_y)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(batch_X)
+            samples_seen += len(batch_X)
+        epoch_seconds = time.perf_counter() - epoch_start
+        train_seconds += epoch_seconds
+
+        train_loss = total_loss / len(train_loader.dataset)
+        val_loss = evaluate(model, val_loader, criterion)
+        history.append({
+            "epoch": epoch,
+            "train_loss": train_loss,
+            "val_loss": val_loss,
+            "samples_per_sec": len(train_loader.dataset) / epoch_seconds
+        })
+
+        if val_loss < best_val_loss - config.min_delta:
+            best_val_loss, best_epoch, stale_epochs = val_loss, epoch, 0
+            best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            if checkpoint_dir:
+                _save_checkpoint(checkpoint_dir / BEST_CHECKPOINT, model, optimizer, epoch,
+                                 best_val_loss, best_epoch, stale_epochs, history)
+        else:
+            stale_epochs += 1
+
+        if checkpoint_dir:
+            _save_checkpoint(checkpoint_dir / LAST_CHECKPOINT, model, optimizer, epoch,
+                             best_val_loss, best_epoch, stale_epochs, history)
+
+        if epoch % 10 == 0 or epoch == config.epochs:
+            logger.info(f"Epoch {epoch}/{config.epochs}, Train Loss: {train_loss:.4f}, "
+                        f"Val Loss: {val_loss:.4f}, {history[-1]['samples_per_sec']:,.0f} samples/s")
+
+        if config.patience and stale_epochs >= config.patience:
+            stopped_early = True
+            logger.info(f"Early stopping at epoch {epoch} (best epoch {best_epoch}, val loss {best_val_loss:.4f})")
+            break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    model.eval()
+
+    return TrainingResult(
+        best_val_loss=best_val_loss,
+        best_epoch=best_epoch,
+        epochs_run=epoch,
+        stopped_early=stopped_early,
+        train_seconds=round(train_seconds, 3),
+        samples_per_sec=round(samples_seen / train_seconds, 1) if train_seconds else 0.0,
+        history=history
+    )
@@ -0,0 +1,103 @@
+"""
+Inference-optimized model exports
+Turns trained models into formats that load and run faster than eager PyTorch.
+
+Usage (export from already-trained artifacts):
+    python -m app.ml.model_export --model-dir app/ml/models
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.ml.numpy_lstm import NUMPY_WEIGHTS_FILE
+from app.ml.tree_ensemble import TreeEnsemble, TREE_ENSEMBLE_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+BEHAVIOR_TORCHSCRIPT_FILE = "india_behavior_lstm_int8.pt"
+
+
+def quantize_behavior_model(model: nn.Module) -> nn.Module:
+    """Dynamic int8 quantization of LSTM and Linear layers (weights int8, activations float)"""
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+    )
+
+
+def export_behavior_torchscript(model: nn.Module, save_dir, input_size: int = 10) -> Path:
+    """Trace the int8-quantized behavior LSTM to TorchScript and save it"""
+    quantized = quantize_behavior_model(model)
+    example = torch.zeros(1, 1, input_size)
+    with torch.no_grad():
+        traced = torch.jit.trace(quantized, example)
+
+    path = Path(save_dir) / BEHAVIOR_TORCHSCRIPT_FILE
+    traced.save(str(path))
+    logger.info(f"✅ Exported TorchScript int8 behavior model: {path}")
+    return path
+
+
+def _behavior_head(model: nn.Module) -> list:
+    """Describe the feed-forward head after the LSTM for the NumPy evaluator"""
+    if hasattr(model, "fc1"):
+        return [["linear", "fc1"], ["relu"], ["linear", "fc2"], ["sigmoid"]]
+    return [["linear", "fc"], ["sigmoid"]]
+
+
+def export_behavior_numpy(model: nn.Module, save_dir) -> Path:
+    """Save behavior LSTM weights as .npz for torch-free NumPy inference"""
+    weights = {
+        name: tensor.detach().cpu().numpy().astype(np.float32)
+        for name, tensor in model.state_dict().items()
+    }
+    path = Path(save_dir) / NUMPY_WEIGHTS_FILE
+    np.savez(
+        path,
+        num_layers=np.array(model.lstm.num_layers),
+        head=np.array(json.dumps(_behavior_head(model))),
+        **weights
+    )
+    logger.info(f"✅ Exported NumPy behavior weights: {path}")
+    return path
+
+
+def export_impact_trees(model, save_dir, target: str) -> Path:
+    """Compile a trained impact XGBRegressor into flat tree arrays for ImpactAgent"""
+    path = Path(save_dir) / f"india_impact_{target}{TREE_ENSEMBLE_SUFFIX}"
+    TreeEnsemble.from_booster(model).save(path)
+    logger.info(f"✅ Exported compiled {target} trees: {path}")
+    return path
+
+
+def export_all(model_dir: str):
+    """Export inference variants from the trained artifacts in model_dir"""
+    import pickle
+    from app.ml.networks import IndianBehaviorLSTM
+
+    model_dir = Path(model_dir)
+    model = IndianBehaviorLSTM()
+    model.load_state_dict(torch.load(model_dir / "india_behavior_lstm.pth", map_location="cpu"))
+    export_behavior_torchscript(model, model_dir)
+    export_behavior_numpy(model, model_dir)
+
+    for path in sorted(model_dir.glob("india_impact_*.pkl")):
+        target = path.stem[len("india_impact_"):]
+        with open(path, "rb") as f:
+            export_impact_trees(pickle.load(f), model_dir, target)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Export inference-optimized model variants")
+    parser.add_argument("--model-dir", default=str(Path(__file__).resolve().parent / "models"))
+    args = parser.parse_args()
+
+    export_all(args.model_dir)
@@ -0,0 +1,463 @@
+"""
+Model Registry - 100% FREE
+Versioned, hash-verified model artifacts with atomic hot reload
+
+Layout (paths resolve from this file, not the working directory):
+    app/ml/models/registry/
+        CURRENT                 # name of the active version
+        v1/manifest.json        # sha256 per artifact, feature schema, training metadata
+        v1/behavior_lstm.pth    # state_dict, loaded with torch.load(mmap=True, weights_only=True)
+        v1/behavior_lstm.npz    # NumPy LSTM weights (no torch needed)
+        v1/behavior_lstm_int8.pt
+        v1/behavior_scaler.json
+        v1/impact_<target>.ubj  # XGBoost UBJSON booster
+        v1/impact_<target>.trees.npz
+
+Nothing is unpickled at load time. Agents fetch the active ModelBundle per
+request; reload() builds a complete new bundle first and then swaps a single
+reference, so in-flight requests keep the version they started with. Workers
+follow a newly promoted CURRENT on a background thread, never inside bundle().
+
+Usage:
+    python -m app.ml.model_registry list
+    python -m app.ml.model_registry import-legacy   # register the flat pickles once
+    python -m app.ml.model_registry promote v2
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.ml.numpy_lstm import NumpyLSTM
+from app.ml.tree_ensemble import TreeEnsemble, TREE_ENSEMBLE_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(__file__).resolve().parent / "models"
+REGISTRY_DIR = MODELS_DIR / "registry"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_FORMAT = 1
+
+BEHAVIOR_WEIGHTS = "behavior_lstm.pth"
+BEHAVIOR_NUMPY = "behavior_lstm.npz"
+BEHAVIOR_TORCHSCRIPT = "behavior_lstm_int8.pt"
+BEHAVIOR_SCALER = "behavior_scaler.json"
+
+# Feature order built by app.ml.features (what the agents feed the models)
+BEHAVIOR_FEATURES = [
+    "budget_millions", "timeline_years", "enforcement_level", "tax_reduction", "subsidy",
+    "new_lanes", "charging_stations_hundreds", "literacy_rate", "income_ratio", "urban_percentage"
+]
+BEHAVIOR_OUTPUTS = ["adaptation_rate", "compliance_probability", "satisfaction_score", "economic_impact_personal"]
+IMPACT_FEATURES = [
+    "congestion_score", "energy_load", "dissatisfaction_index", "economic_stability",
+    "budget_millions", "enforcement_level", "timeline_years", "infrastructure_stress_count"
+]
+# ImpactAgent key -> training target name
+IMPACT_TARGETS = {
+    "congestion": "congestion_score",
+    "inflation": "inflation_rate",
+    "dissatisfaction": "dissatisfaction",
+    "energy": "energy_stress"
+}
+
+
+class ModelIntegrityError(Exception):
+    """An artifact is missing or doesn't match the hash in its manifest"""
+
+
+@dataclass
+class ModelBundle:
+    """One consistent set of loaded models"""
+    version: str
+    behavior_model: Any
+    behavior_backend: str
+    impact_models: Dict[str, TreeEnsemble]
+    behavior_scaler: Optional[Dict[str, List[float]]] = None
+    manifest: Dict[str, Any] = field(default_factory=dict)
+    loaded_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    @property
+    def is_mock(self) -> bool:
+        return self.version == "mock"
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "behavior_backend": self.behavior_backend,
+            "impact_models": sorted(self.impact_models),
+            "loaded_at": self.loaded_at,
+            "mock": self.is_mock
+        }
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Versioned model store with an atomically swapped active bundle"""
+
+    def __init__(self, root: Path = REGISTRY_DIR, reload_interval: float = 0):
+        self.root = Path(root)
+        self.reload_interval = reload_interval
+        self._bundle: Optional[ModelBundle] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._reloader: Optional[threading.Thread] = None
+
+    # ---- versions -------------------------------------------------------
+
+    def versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        found = [p.name for p in self.root.iterdir() if (p / MANIFEST_FILE).exists()]
+        return sorted(found, key=lambda v: int(v[1:]) if v[1:].isdigit() else 0)
+
+    def current_version(self) -> Optional[str]:
+        pointer = self.root / CURRENT_FILE
+        if not pointer.exists():
+            return None
+        return pointer.read_text().strip() or None
+
+    def version_dir(self, version: str) -> Path:
+        """Directory of a registered version; any other name (e.g. "../..") is not found"""
+        if version not in self.versions():
+            raise FileNotFoundError(f"Model version {version} not found in {self.root}")
+        return self.root / version
+
+    def read_manifest(self, version: str) -> Dict[str, Any]:
+        with open(self.version_dir(version) / MANIFEST_FILE) as f:
+            return json.load(f)
+
+    def verify(self, version: str) -> Dict[str, Any]:
+        """Check every artifact against the manifest hashes"""
+        manifest = self.read_manifest(version)
+        for name, info in manifest["artifacts"].items():
+            path = self.version_dir(version) / name
+            if not path.exists():
+                raise ModelIntegrityError(f"{version}/{name} is missing")
+            if _sha256(path) != info["sha256"]:
+                raise ModelIntegrityError(f"{version}/{name} does not match its manifest hash")
+        return manifest
+
+    def promote(self, version: str):
+        """Point CURRENT at a version (atomic rename, safe for concurrent readers)"""
+        self.verify(version)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".current-")
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.root / CURRENT_FILE)
+        logger.info(f"Model version {version} promoted")
+
+    # ---- registration ---------------------------------------------------
+
+    def register(self, behavior_model, impact_models: Dict[str, Any], behavior_scaler=None,
+                 metadata: Optional[Dict[str, Any]] = None, promote: bool = True) -> str:
+        """
+        Write a new version from trained models.
+        behavior_model: torch nn.Module; impact_models: training target -> XGBRegressor;
+        behavior_scaler: fitted StandardScaler or {"mean": [...], "scale": [...]} (stored as JSON).
+        """
+        import torch
+        from app.ml.model_export import export_behavior_numpy, export_behavior_torchscript
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        existing = [int(v[1:]) for v in self.versions() if v[1:].isdigit()]
+        version = f"v{max(existing, default=0) + 1}"
+
+        # Build in a temp dir and rename, so a half-written version is never visible
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix=f".{version}-"))
+        try:
+            torch.save(behavior_model.state_dict(), staging / BEHAVIOR_WEIGHTS)
+            export_behavior_numpy(behavior_model, staging).rename(staging / BEHAVIOR_NUMPY)
+            export_behavior_torchscript(behavior_model, staging).rename(staging / BEHAVIOR_TORCHSCRIPT)
+            if behavior_scaler is not None:
+                if not isinstance(behavior_scaler, dict):
+                    behavior_scaler = {
+                        "mean": [float(v) for v in behavior_scaler.mean_],
+                        "scale": [float(v) for v in behavior_scaler.scale_]
+                    }
+                with open(staging / BEHAVIOR_SCALER, "w") as f:
+                    json.dump(behavior_scaler, f)
+
+            for target, model in impact_models.items():
+                booster = model.get_booster() if hasattr(model, "get_booster") else model
+                booster.save_model(str(staging / f"impact_{target}.ubj"))
+                TreeEnsemble.from_booster(booster).save(staging / f"impact_{target}{TREE_ENSEMBLE_SUFFIX}")
+
+            manifest = {
+                "format": MANIFEST_FORMAT,
+                "version": version,
+                "created_at": datetime.utcnow().isoformat(),
+                "behavior": {
+                    "architecture": type(behavior_model).__name__,
+                    "features": BEHAVIOR_FEATURES,
+                    "outputs": BEHAVIOR_OUTPUTS
+                },
+                "impact": {
+                    "features": IMPACT_FEATURES,
+                    "targets": sorted(impact_models)
+                },
+                "metadata": metadata or {},
+                "artifacts": {
+                    p.name: {"sha256": _sha256(p), "bytes": p.stat().st_size}
+                    for p in sorted(staging.iterdir())
+                }
+            }
+            with open(staging / MANIFEST_FILE, "w") as f:
+                json.dump(manifest, f, indent=2)
+
+            staging.chmod(0o755)
+            os.rename(staging, self.root / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"✅ Registered model version {version}")
+        if promote:
+            self.promote(version)
+        return version
+
+    # ---- loading --------------------------------------------------------
+
+    def load(self, version: Optional[str] = None) -> ModelBundle:
+        """Verify and load a version (default: CURRENT) without touching the active bundle"""
+        version = version or self.current_version()
+        if version is None:
+            return self._mock_bundle()
+
+        start = time.perf_counter()
+        manifest = self.verify(version)
+        version_dir = self.version_dir(version)
+
+        behavior_model, backend = self._load_behavior(version_dir, manifest)
+
+        impact_models = {}
+        for key, target in IMPACT_TARGETS.items():
+            if target not in manifest["impact"]["targets"]:
+                raise ModelIntegrityError(f"{version} has no impact model for {target}")
+            impact_models[key] = self._load_impact(version_dir, target)
+
+        scaler = None
+        if BEHAVIOR_SCALER in manifest["artifacts"]:
+            with open(version_dir / BEHAVIOR_SCALER) as f:
+                scaler = json.load(f)
+
+        logger.info(f"Loaded model version {version} ({backend}) in {time.perf_counter() - start:.3f}s")
+        return ModelBundle(
+            version=version,
+            behavior_model=behavior_model,
+            behavior_backend=backend,
+            impact_models=impact_models,
+            behavior_scaler=scaler,
+            manifest=manifest
+        )
+
+    def _load_behavior(self, version_dir: Path, manifest: Dict[str, Any]):
+        """Pick the behavior backend: NumPy > TorchScript int8 > eager (per settings)"""
+        backend = get_settings().behavior_inference_backend
+        artifacts = manifest["artifacts"]
+
+        if backend in ("auto", "numpy") and BEHAVIOR_NUMPY in artifacts:
+            return NumpyLSTM.load(version_dir / BEHAVIOR_NUMPY), "numpy"
+        if backend == "numpy":
+            raise ModelIntegrityError(f"NumPy behavior backend requested but {BEHAVIOR_NUMPY} is not registered")
+
+        import torch
+        if BEHAVIOR_TORCHSCRIPT in artifacts:
+            model = torch.jit.load(str(version_dir / BEHAVIOR_TORCHSCRIPT), map_location=torch.device("cpu"))
+            return model.eval(), "torchscript_int8"
+
+        from app.ml import networks
+        model = getattr(networks, manifest["behavior"]["architecture"])()
+        # mmap keeps weights in the page cache instead of copying them onto the heap
+        state = torch.load(version_dir / BEHAVIOR_WEIGHTS, map_location="cpu", mmap=True, weights_only=True)
+        model.load_state_dict(state)
+        return model.eval(), "torch"
+
+    def _load_impact(self, version_dir: Path, target: str) -> TreeEnsemble:
+        compiled = version_dir / f"impact_{target}{TREE_ENSEMBLE_SUFFIX}"
+        if compiled.exists():
+            return TreeEnsemble.load(compiled)
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(str(version_dir / f"impact_{target}.ubj"))
+        return TreeEnsemble.from_booster(booster)
+
+    def load_trainable(self, version: Optional[str] = None):
+        """
+        Trainable copies of a version for continued training:
+        (torch behavior model, training target -> XGBRegressor, scaler dict or None)
+        """
+        import torch
+        import xgboost as xgb
+        from app.ml import networks
+
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No registered model version in {self.root}")
+        manifest = self.verify(version)
+        version_dir = self.version_dir(version)
+
+        behavior_model = getattr(networks, manifest["behavior"]["architecture"])()
+        behavior_model.load_state_dict(torch.load(version_dir / BEHAVIOR_WEIGHTS, map_location="cpu", weights_only=True))
+
+        impact_models = {}
+        for target in manifest["impact"]["targets"]:
+            model = xgb.XGBRegressor()
+            model.load_model(str(version_dir / f"impact_{target}.ubj"))
+            impact_models[target] = model
+
+        scaler = None
+        if BEHAVIOR_SCALER in manifest["artifacts"]:
+            with open(version_dir / BEHAVIOR_SCALER) as f:
+                scaler = json.load(f)
+        return behavior_model, impact_models, scaler
+
+    def _mock_bundle(self) -> ModelBundle:
+        """Random-weight models for demos - only when explicitly allowed"""
+        if not get_settings().allow_mock_models:
+            raise FileNotFoundError(
+                f"No registered model version in {self.root} and ALLOW_MOCK_MODELS is off - "
+                "run python -m app.ml.train_india_models"
+            )
+        logger.warning(f"⚠️ No registered models in {self.root} - using RANDOM mock models")
+
+        import xgboost as xgb
+        from app.ml.networks import BehaviorLSTM
+
+        impact_models = {}
+        for key in IMPACT_TARGETS:
+            model = xgb.XGBRegressor(n_estimators=50, max_depth=3, random_state=42, n_jobs=1)
+            model.fit(np.random.rand(100, 8), np.random.rand(100), verbose=False)
+            impact_models[key] = TreeEnsemble.from_booster(model)
+
+        return ModelBundle(
+            version="mock",
+            behavior_model=BehaviorLSTM().eval(),
+            behavior_backend="torch",
+            impact_models=impact_models
+        )
+
+    # ---- active bundle --------------------------------------------------
+
+    def bundle(self) -> ModelBundle:
+        """
+        Active bundle; loads on first use. Afterwards only returns the current reference -
+        following CURRENT (file read, hashing, loading) happens on a background thread.
+        """
+        if self._bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._bundle = self.load()
+        elif self.reload_interval and time.monotonic() - self._last_check > self.reload_interval:
+            self._last_check = time.monotonic()
+            self._follow_current_in_background()
+        return self._bundle
+
+    def _follow_current_in_background(self):
+        with self._lock:
+            if self._reloader is not None and self._reloader.is_alive():
+                return  # a check is already running
+            self._reloader = threading.Thread(target=self._follow_current, name="model-reload", daemon=True)
+            self._reloader.start()
+
+    def _follow_current(self):
+        """Swap in the version CURRENT names, if it changed; failures keep the active bundle"""
+        try:
+            current = self.current_version()
+            if current and current != self._bundle.version:
+                self.reload(current)
+        except Exception as e:
+            logger.error(f"Hot reload failed, keeping {self._bundle.version}: {e}")
+
+    def reload(self, version: Optional[str] = None) -> ModelBundle:
+        """Load a version fully, then swap it in; failures leave the active bundle untouched"""
+        new_bundle = self.load(version)
+        with self._lock:
+            previous = self._bundle.version if self._bundle else None
+            self._bundle = new_bundle
+        logger.info(f"🔄 Models reloaded: {previous} -> {new_bundle.version}")
+        return new_bundle
+
+
+@lru_cache()
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry(REGISTRY_DIR, reload_interval=get_settings().registry_reload_interval)
+
+
+def import_legacy(registry: ModelRegistry, model_dir: Path = MODELS_DIR) -> str:
+    """One-time migration: register the flat pickle/pth artifacts as a new version"""
+    import pickle
+    import warnings
+    import torch
+    from app.ml.networks import IndianBehaviorLSTM
+
+    behavior_model = IndianBehaviorLSTM()
+    behavior_model.load_state_dict(
+        torch.load(model_dir / "india_behavior_lstm.pth", map_location="cpu", weights_only=True)
+    )
+
+    impact_models = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pickles were written by an older xgboost
+        for target in IMPACT_TARGETS.values():
+            with open(model_dir / f"india_impact_{target}.pkl", "rb") as f:
+                impact_models[target] = pickle.load(f)
+        scaler_path = model_dir / "behavior_scaler.pkl"
+        scaler = pickle.load(open(scaler_path, "rb")) if scaler_path.exists() else None
+
+    return registry.register(
+        behavior_model, impact_models, scaler,
+        metadata={"source": "legacy pickles"}
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Manage registered model versions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    sub.add_parser("import-legacy")
+    promote = sub.add_parser("promote")
+    promote.add_argument("version")
+    verify = sub.add_parser("verify")
+    verify.add_argument("version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(REGISTRY_DIR)
+    if args.command == "list":
+        current = registry.current_version()
+        for version in registry.versions():
+            manifest = registry.read_manifest(version)
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {manifest['created_at']}  {manifest['metadata']}")
+    elif args.command == "import-legacy":
+        print(import_legacy(registry))
+    elif args.command == "promote":
+        registry.promote(args.version)
+    elif args.command == "verify":
+        registry.verify(args.version)
+        print(f"{args.version} OK")
@@ -0,0 +1,37 @@
+"""
+Neural network definitions used at inference time.
+Kept out of the agent modules so torch is only imported when a model is built.
+"""
+
+import torch.nn as nn
+
+
+class BehaviorLSTM(nn.Module):
+    """Lightweight LSTM for citizen behavior prediction - OPTIMIZED"""
+    def __init__(self, input_size=10, hidden_size=32, output_size=4):
+        super().__init__()
+        self.lstm = nn.LSTM(input_size, hidden_size, batch_first=True)
+        self.fc = nn.Linear(hidden_size, output_size)
+        self.sigmoid = nn.Sigmoid()
+    
+    def forward(self, x):
+        lstm_out, _ = self.lstm(x)
+        output = self.fc(lstm_out[:, -1, :])
+        return self.sigmoid(output)
+
+
+class IndianBehaviorLSTM(nn.Module):
+    """LSTM trained on Indian behavioral patterns"""
+    def __init__(self, input_size=10, hidden_size=64, output_size=4):
+        super().__init__()
+        self.lstm = nn.LSTM(input_size, hidden_size, num_layers=2, batch_first=True, dropout=0.2)
+        self.fc1 = nn.Linear(hidden_size, 32)
+        self.fc2 = nn.Linear(32, output_size)
+        self.relu = nn.ReLU()
+        self.sigmoid = nn.Sigmoid()
+    
+    def forward(self, x):
+        lstm_out, _ = self.lstm(x)
+        x = self.relu(self.fc1(lstm_out[:, -1, :]))
+        output = self.sigmoid(self.fc2(x))
+        return output
@@ -0,0 +1,88 @@
+"""
+Pure-NumPy LSTM inference
+Runs the behavior LSTM forward pass from exported weights without importing torch,
+so inference-only deployments can drop the PyTorch dependency.
+
+Weight files are produced by app.ml.model_export.export_behavior_numpy and follow
+PyTorch's layout: gates stacked as (input, forget, cell, output).
+"""
+
+import json
+from typing import List, Tuple
+
+import numpy as np
+
+NUMPY_WEIGHTS_FILE = "india_behavior_lstm.npz"
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # tanh form never overflows, so large (unscaled) inputs stay on numpy's fast path
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+class NumpyLSTM:
+    """Multi-layer LSTM + feed-forward head evaluated with NumPy"""
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, np.ndarray]], head: List[Tuple]):
+        # layers: (W_ih^T, W_hh^T, b_ih + b_hh) per LSTM layer
+        self.layers = layers
+        self.head = head
+        self.hidden_size = layers[0][1].shape[0]
+
+    @classmethod
+    def load(cls, path) -> "NumpyLSTM":
+        with np.load(path) as weights:
+            num_layers = int(weights["num_layers"])
+            layers = [
+                (
+                    np.ascontiguousarray(weights[f"lstm.weight_ih_l{k}"].T),
+                    np.ascontiguousarray(weights[f"lstm.weight_hh_l{k}"].T),
+                    weights[f"lstm.bias_ih_l{k}"] + weights[f"lstm.bias_hh_l{k}"],
+                )
+                for k in range(num_layers)
+            ]
+            head = []
+            for step in json.loads(str(weights["head"])):
+                if step[0] == "linear":
+                    name = step[1]
+                    head.append(("linear", np.ascontiguousarray(weights[f"{name}.weight"].T), weights[f"{name}.bias"]))
+                else:
+                    head.append((step[0],))
+        return cls(layers, head)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """
+        x: (batch, seq_len, input_size) -> (batch, output_size)
+        Zero initial state, like nn.LSTM called without (h0, c0).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        batch, seq_len, _ = x.shape
+        hs = self.hidden_size
+        sequence = x
+        for w_ih, w_hh, bias in self.layers:
+            # Input projections for every timestep in one 2-D matmul (a 3-D @ runs one small GEMM per row)
+            projected = (sequence.reshape(batch * seq_len, -1) @ w_ih + bias).reshape(batch, seq_len, -1)
+            outputs = np.empty((batch, seq_len, hs), dtype=np.float32)
+            for t in range(seq_len):
+                if t == 0:
+                    # Zero initial state: no recurrent term and no forget path
+                    gates = projected[:, 0]
+                    act = _sigmoid(gates)
+                    c = act[:, :hs] * np.tanh(gates[:, 2 * hs:3 * hs])
+                else:
+                    gates = projected[:, t] + h @ w_hh
+                    act = _sigmoid(gates)
+                    c = act[:, hs:2 * hs] * c + act[:, :hs] * np.tanh(gates[:, 2 * hs:3 * hs])
+                h = act[:, 3 * hs:] * np.tanh(c)
+                outputs[:, t] = h
+            sequence = outputs
+
+        out = sequence[:, -1, :]
+        for step in self.head:
+            if step[0] == "linear":
+                out = out @ step[1] + step[2]
+            elif step[0] == "relu":
+                out = np.maximum(out, 0.0)
+            elif step[0] == "sigmoid":
+                out = _sigmoid(out)
+        return out
@@ -0,0 +1,146 @@
+"""
+Pareto Utilities - 100% FREE
+Vectorized multi-objective building blocks used by the policy optimizer:
+NSGA-II non-dominated sorting, crowding distance and exact hypervolume.
+
+All functions take (n, k) arrays of objective values where every objective
+is minimized - negate "higher is better" objectives before calling.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def domination_matrix(points: np.ndarray) -> np.ndarray:
+    """(n, n) bool: [i, j] is True when point i dominates point j"""
+    # One (n, n) comparison per objective, accumulated in place - no (n, n, k) temporaries
+    n = len(points)
+    le = np.ones((n, n), dtype=bool)
+    lt = np.zeros((n, n), dtype=bool)
+    for column in points.T:
+        le &= column[:, None] <= column[None, :]
+        lt |= column[:, None] < column[None, :]
+    return le & lt
+
+
+def non_dominated_mask(points: np.ndarray) -> np.ndarray:
+    """
+    True for rows no other row dominates (<= everywhere, < somewhere).
+    Each surviving point sweeps away everything it dominates, so the cost is
+    O(n * front size) rather than the O(n^2) of a full domination matrix.
+    """
+    n = len(points)
+    # Visit points that are good on the sum first - they dominate the most
+    candidates = np.argsort(points.sum(axis=1), kind="stable")
+    i = 0
+    while i < len(candidates):
+        p = points[candidates[i]]
+        rest = points[candidates]
+        dominated = (rest >= p).all(axis=1) & (rest > p).any(axis=1)
+        candidates = candidates[~dominated]
+        i += 1
+    mask = np.zeros(n, dtype=bool)
+    mask[candidates] = True
+    return mask
+
+
+def non_dominated_sort(points: np.ndarray) -> np.ndarray:
+    """
+    NSGA-II front index per row (0 = Pareto front, 1 = front once 0 is removed, ...).
+    One domination matrix, then each front is peeled off with a single column sum.
+    Duplicate rows (common once candidates hit the action bounds) share a rank,
+    so the matrix is only built over the distinct points.
+    """
+    distinct, inverse = np.unique(points, axis=0, return_inverse=True)
+    if len(distinct) < len(points):
+        return non_dominated_sort(distinct)[inverse.reshape(-1)]
+
+    dominates = domination_matrix(points)
+    dominated_by = dominates.sum(axis=0)
+    ranks = np.full(len(points), -1, dtype=np.int64)
+    current = dominated_by == 0
+    rank = 0
+    while current.any():
+        ranks[current] = rank
+        dominated_by = dominated_by - dominates[current].sum(axis=0)
+        dominated_by[ranks >= 0] = -1  # never pick an assigned row again
+        current = dominated_by == 0
+        rank += 1
+    return ranks
+
+
+def crowding_distance(points: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance within one front; boundary points get inf"""
+    return _crowding(points, np.zeros(len(points), dtype=np.int64))
+
+
+def _crowding(points: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """Crowding distance of every row within its own front, all fronts at once"""
+    n, k = points.shape
+    distance = np.zeros(n)
+    for j in range(k):
+        # Sorted by front, then by this objective: neighbours in a front are adjacent
+        order = np.lexsort((points[:, j], ranks))
+        front, values = ranks[order], points[order, j]
+        first = np.r_[True, front[1:] != front[:-1]]
+        last = np.r_[front[1:] != front[:-1], True]
+        starts, ends = np.flatnonzero(first), np.flatnonzero(last)
+        span = values[ends] - values[starts]
+        span[span == 0] = 1.0
+        span = np.repeat(span, ends - starts + 1)
+
+        contribution = np.full(n, np.inf)
+        interior = ~(first | last)
+        contribution[interior] = (values[2:] - values[:-2])[interior[1:-1]] / span[interior]
+        distance[order] += contribution
+    return distance
+
+
+def hypervolume(points: np.ndarray, reference: np.ndarray) -> float:
+    """
+    Exact volume dominated by the points and bounded by the reference point.
+    Slices along the last objective down to a vectorized 2-D sweep; fine for
+    the few dozen points of a returned front.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    points = points[(points < reference).all(axis=1)]
+    if not len(points):
+        return 0.0
+    return float(_hypervolume(points[non_dominated_mask(points)], reference))
+
+
+def _hypervolume(points: np.ndarray, reference: np.ndarray) -> float:
+    k = points.shape[1]
+    if k == 1:
+        return reference[0] - points[:, 0].min()
+    if k == 2:
+        order = np.argsort(points[:, 0], kind="stable")
+        xs = points[order, 0]
+        ys = np.minimum.accumulate(points[order, 1])
+        widths = np.diff(np.append(xs, reference[0]))
+        return float(np.sum(widths * (reference[1] - ys)))
+
+    order = np.argsort(points[:, -1], kind="stable")
+    points = points[order]
+    bounds = np.append(points[:, -1], reference[-1])
+    total = 0.0
+    for i in range(len(points)):
+        depth = bounds[i + 1] - bounds[i]
+        if depth > 0:
+            slab = points[:i + 1, :-1]
+            total += depth * _hypervolume(slab[non_dominated_mask(slab)], reference[:-1])
+    return total
+
+
+def rank_and_crowding(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(front index, crowding distance within that front) per row"""
+    ranks = non_dominated_sort(points)
+    return ranks, _crowding(points, ranks)
+
+
+def select_by_rank_and_crowding(points: np.ndarray, count: int) -> np.ndarray:
+    """NSGA-II environmental selection: indices of the `count` best rows by (rank, -crowding)"""
+    ranks, crowding = rank_and_crowding(points)
+    return np.lexsort((-crowding, ranks))[:count]
@@ -0,0 +1,57 @@
+"""
+Gymnasium environment for PPO-based policy optimization.
+Kept out of the agent module so gymnasium is only imported when PPO runs.
+"""
+
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+
+
+class PolicyOptimizationEnv(gym.Env):
+    """Custom environment for policy optimization"""
+    
+    def __init__(self, base_policy):
+        super().__init__()
+        self.base_policy = base_policy
+        
+        # Action space: adjustments to policy parameters
+        self.action_space = spaces.Box(
+            low=-0.3, high=0.3, shape=(5,), dtype=np.float32
+        )
+        
+        # Observation space: current policy state
+        self.observation_space = spaces.Box(
+            low=0, high=1, shape=(8,), dtype=np.float32
+        )
+        
+        self.current_step = 0
+        self.max_steps = 10
+    
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            np.random.seed(seed)
+        self.current_step = 0
+        return self._get_observation(), {}
+    
+    def step(self, action):
+        self.current_step += 1
+        
+        # Apply action to policy parameters
+        reward = self._compute_reward(action)
+        terminated = self.current_step >= self.max_steps
+        truncated = False
+        
+        return self._get_observation(), reward, terminated, truncated, {}
+    
+    def _get_observation(self):
+        return np.random.rand(8).astype(np.float32)
+    
+    def _compute_reward(self, action):
+        # Multi-objective reward
+        congestion_penalty = -abs(action[0])
+        dissatisfaction_penalty = -abs(action[1])
+        energy_penalty = -abs(action[2])
+        economic_bonus = abs(action[3])
+        
+        return congestion_penalty + dissatisfaction_penalty + energy_penalty + economic_bonus
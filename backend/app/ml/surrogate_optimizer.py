@@ -0,0 +1,379 @@
+"""
+Surrogate Policy Optimizer - 100% FREE
+Batched search over the optimizer's 5-dimensional action space, using the
+vectorized simulation (and the behavior LSTM feeding it) as a black-box objective.
+
+Two searches share every evaluation:
+  - CMA-ES on the scalar reward finds the single recommended policy
+  - NSGA-II on the four raw objectives spreads candidates along the tradeoffs
+The union is sorted into a Pareto front and summarized by its hypervolume.
+
+Each generation evaluates the whole population in one call: one batched LSTM
+forward pass plus one vectorized simulation step. A full search (hundreds of
+candidates x tens of generations) runs in milliseconds, versus training PPO on
+an environment that never sees the simulation.
+
+Actions match OptimizationAgent._apply_optimizations:
+    [budget multiplier, enforcement delta, timeline multiplier, tax reduction delta, subsidy multiplier]
+each in [-ACTION_BOUND, ACTION_BOUND].
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.ml.features import behavior_features, impact_features
+from app.ml.pareto import hypervolume, non_dominated_mask, rank_and_crowding, select_by_rank_and_crowding
+
+logger = logging.getLogger(__name__)
+
+ACTION_BOUND = 0.3
+ACTION_NAMES = ["budget", "enforcement", "timeline", "tax_reduction", "subsidy"]
+
+# Simulation outputs the optimizer trades off, with the direction that is better
+OBJECTIVES = {
+    "congestion_score": "min",
+    "dissatisfaction_index": "min",
+    "energy_load": "min",
+    "economic_stability": "max"
+}
+
+# Hypervolume reference in minimization space: the worst value each objective can take
+# (scores live in [0, 1]; economic stability is negated, so its worst is 0)
+HYPERVOLUME_REFERENCE = np.array([1.0, 1.0, 1.0, 0.0])
+
+
+@dataclass
+class SurrogateConfig:
+    population: int = 256  # candidates per generation (one vectorized evaluation)
+    generations: int = 30
+    sigma: float = 0.1  # initial step size, in action units
+    tol_sigma: float = 1e-4  # stop once the search distribution has collapsed
+    stall_generations: int = 5  # ...or once the best reward stops improving
+    front_generations: int = 15  # NSGA-II generations spent spreading the front
+    mutation_sigma: float = 0.05
+    max_front: int = 20  # Pareto points returned (most spread out, by crowding distance)
+    seed: int = 42
+
+
+@dataclass
+class SurrogateResult:
+    best_action: np.ndarray
+    best_reward: float
+    best_metrics: Dict[str, float]
+    baseline_reward: float
+    baseline_metrics: Dict[str, float]
+    pareto_front: List[Dict[str, Any]]
+    front_size: int  # non-dominated candidates found (pareto_front keeps at most max_front)
+    hypervolume: float
+    baseline_hypervolume: float
+    evaluations: int
+    generations: int
+    elapsed_ms: float
+    history: List[float] = field(default_factory=list)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "algorithm": "CMA-ES + NSGA-II",
+            "evaluations": self.evaluations,
+            "generations": self.generations,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+            "best_reward_per_generation": [round(r, 4) for r in self.history]
+        }
+
+    def hypervolume_summary(self) -> Dict[str, Any]:
+        return {
+            "front": round(self.hypervolume, 6),
+            "baseline": round(self.baseline_hypervolume, 6),
+            "gain": round(self.hypervolume - self.baseline_hypervolume, 6),
+            "front_size": self.front_size,
+            "objectives": OBJECTIVES,
+            "reference_point": dict(zip(OBJECTIVES, HYPERVOLUME_REFERENCE.tolist()))
+        }
+
+
+def reward(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized OptimizationAgent._compute_final_reward"""
+    return (-metrics["congestion_score"] - metrics["dissatisfaction_index"]
+            - metrics["energy_load"] + metrics["economic_stability"])
+
+
+def objective_points(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    (n, 4) objectives, all turned into minimization, at the precision reported
+    (differences in the 5th decimal are simulation noise, not tradeoffs)
+    """
+    return np.round(np.column_stack([
+        metrics[name] if sense == "min" else -metrics[name] for name, sense in OBJECTIVES.items()
+    ]), 4)
+
+
+class PolicyObjective:
+    """
+    Black-box objective for one policy in one state: actions (n, 5) -> simulation metrics (n,).
+    Mirrors the pipeline - behavior LSTM on the adjusted policy, then the simulation step.
+    """
+
+    def __init__(self, policy, state_data, traffic_data, behavior_agent, simulation_agent,
+                 behavior_model=None, infrastructure_stress: Optional[Dict] = None):
+        self.policy = policy
+        self.state_data = state_data
+        self.traffic_data = traffic_data
+        self.behavior_agent = behavior_agent
+        self.simulation_agent = simulation_agent
+        self.behavior_model = behavior_model
+        # Shared by every candidate (infrastructure changes aren't searched); feeds impact_features
+        self.infrastructure_stress = infrastructure_stress
+
+        self.base_features = behavior_features(policy, state_data).astype(np.float64)
+        self.budget = float(getattr(policy, 'budget_allocation_inr', None) or getattr(policy, 'budget_allocation', 1000000))
+        self.timeline = float(getattr(policy, 'implementation_timeline_days', None) or getattr(policy, 'implementation_timeline', 90))
+        self.enforcement = float(policy.enforcement_level)
+        tax = policy.incentive_structure.get("tax_reduction", 0)
+        self.tax_reduction = float(tax) if isinstance(tax, (int, float)) else 0.0
+        subsidy = policy.incentive_structure.get("subsidy", 0)
+        self.subsidy = float(subsidy) if isinstance(subsidy, (int, float)) else 0.0
+
+    def parameters(self, actions: np.ndarray) -> Dict[str, np.ndarray]:
+        """Candidate policy parameters, as _apply_optimizations would set them"""
+        actions = np.atleast_2d(actions)
+        return {
+            "budget": self.budget * (1 + actions[:, 0]),
+            "enforcement": np.clip(self.enforcement + actions[:, 1], 0, 1),
+            "timeline": np.trunc(self.timeline * (1 + actions[:, 2])),
+            "tax_reduction": np.clip(self.tax_reduction + actions[:, 3], 0, 1),
+            "subsidy": self.subsidy * (1 + actions[:, 4])
+        }
+
+    def __call__(self, actions: np.ndarray) -> Dict[str, np.ndarray]:
+        params = self.parameters(actions)
+        features = np.tile(self.base_features, (len(params["budget"]), 1))
+        features[:, 0] = params["budget"] / 1e6
+        features[:, 1] = params["timeline"] / 365
+        features[:, 2] = params["enforcement"]
+        features[:, 3] = params["tax_reduction"]
+        features[:, 4] = params["subsidy"]
+
+        behavior = self.behavior_agent.predict_batch(features, self.state_data, self.behavior_model)
+        # The simulation reads the budget from the policy's INR field (defaulting to 10 crore)
+        budget = params["budget"] if hasattr(self.policy, 'budget_allocation_inr') else np.full(len(features), 100000000.0)
+        metrics = self.simulation_agent._run_simulation_batch(
+            self.policy, behavior, self.state_data, self.traffic_data,
+            budget=budget, enforcement=params["enforcement"]
+        )
+        metrics["reward"] = reward(metrics)
+        return metrics
+
+    def impact_predictions(self, actions: np.ndarray, metrics: Dict[str, np.ndarray],
+                           impact_models: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Impact model outputs for a (small) set of evaluated candidates"""
+        params = self.parameters(actions)
+        rows = []
+        for i in range(len(params["budget"])):
+            candidate_metrics = {name: float(metrics[name][i]) for name in OBJECTIVES}
+            candidate_metrics["infrastructure_stress"] = self.infrastructure_stress
+            candidate = _CandidatePolicy(params["budget"][i], params["enforcement"][i], params["timeline"][i])
+            rows.append(impact_features(candidate_metrics, candidate))
+        X = np.array(rows, dtype=np.float32)
+        return {target: model.predict(X) for target, model in impact_models.items()}
+
+
+class _CandidatePolicy:
+    """Just the attributes impact_features reads"""
+
+    def __init__(self, budget: float, enforcement: float, timeline: float):
+        self.budget_allocation_inr = float(budget)
+        self.enforcement_level = float(enforcement)
+        self.implementation_timeline_days = float(timeline)
+
+
+def cma_es(fitness: Callable[[np.ndarray], np.ndarray], dim: int, config: SurrogateConfig,
+           lower: float = -ACTION_BOUND, upper: float = ACTION_BOUND) -> Dict[str, Any]:
+    """
+    Maximize fitness over the box [lower, upper]^dim with (mu/mu_w, lambda)-CMA-ES.
+    fitness receives the whole (population, dim) generation at once. Samples outside
+    the box are evaluated at their clipped position with a quadratic penalty, which
+    keeps the mean inside without distorting the objective there.
+    """
+    rng = np.random.default_rng(config.seed)
+    n, lam = dim, config.population
+    mu = lam // 2
+    weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+    weights /= weights.sum()
+    mueff = 1.0 / np.sum(weights ** 2)
+
+    cc = (4 + mueff / n) / (n + 4 + 2 * mueff / n)
+    cs = (mueff + 2) / (n + mueff + 5)
+    c1 = 2 / ((n + 1.3) ** 2 + mueff)
+    cmu = min(1 - c1, 2 * (mueff - 2 + 1 / mueff) / ((n + 2) ** 2 + mueff))
+    damps = 1 + 2 * max(0.0, np.sqrt((mueff - 1) / (n + 1)) - 1) + cs
+    chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+    mean = np.zeros(n)
+    sigma = config.sigma
+    C = np.eye(n)
+    pc, ps = np.zeros(n), np.zeros(n)
+
+    best_x, best_f = mean.copy(), -np.inf
+    stalled = 0
+    history: List[float] = []
+    generation = 0
+
+    for generation in range(1, config.generations + 1):
+        eigenvalues, B = np.linalg.eigh(C)
+        D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+        z = rng.standard_normal((lam, n))
+        y = (z * D) @ B.T
+        x = mean + sigma * y
+        clipped = np.clip(x, lower, upper)
+        raw = fitness(clipped)
+        f = raw - np.sum((x - clipped) ** 2, axis=1)
+
+        order = np.argsort(-f)
+        if raw[order[0]] > best_f + 1e-9:
+            best_f, best_x = float(raw[order[0]]), clipped[order[0]].copy()
+            stalled = 0
+        else:
+            stalled += 1
+        history.append(best_f)
+        if stalled >= config.stall_generations:
+            break
+
+        selected = y[order[:mu]]
+        y_w = weights @ selected
+        mean = mean + sigma * y_w
+
+        inv_sqrt_C = (B / D) @ B.T
+        ps = (1 - cs) * ps + np.sqrt(cs * (2 - cs) * mueff) * (inv_sqrt_C @ y_w)
+        h_sigma = (np.linalg.norm(ps) / np.sqrt(1 - (1 - cs) ** (2 * generation)) / chi_n) < 1.4 + 2 / (n + 1)
+        pc = (1 - cc) * pc + h_sigma * np.sqrt(cc * (2 - cc) * mueff) * y_w
+
+        C = ((1 - c1 - cmu) * C
+             + c1 * (np.outer(pc, pc) + (1 - h_sigma) * cc * (2 - cc) * C)
+             + cmu * (selected.T * weights) @ selected)
+        sigma *= np.exp((cs / damps) * (np.linalg.norm(ps) / chi_n - 1))
+
+        if sigma * np.sqrt(D.max()) < config.tol_sigma:
+            break
+
+    return {"x": best_x, "f": best_f, "generations": generation, "history": history}
+
+
+def nsga2(evaluate: Callable[[np.ndarray], np.ndarray], dim: int, config: SurrogateConfig,
+          lower: float = -ACTION_BOUND, upper: float = ACTION_BOUND,
+          initial: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Spread a population along the Pareto front. evaluate maps (population, dim)
+    actions to (population, k) minimized objectives in one call. Tournament
+    selection on (rank, crowding), uniform crossover and Gaussian mutation are
+    all whole-population array operations. Returns the final population.
+    """
+    rng = np.random.default_rng(config.seed + 1)
+    lam = config.population
+    population = rng.uniform(lower, upper, (lam, dim))
+    if initial is not None:
+        population[:len(initial)] = initial[:lam]
+    points = evaluate(population)
+    ranks, crowding = rank_and_crowding(points)
+
+    for _ in range(config.front_generations):
+        a, b = rng.integers(0, lam, (2, lam))
+        a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] > crowding[b]))
+        parents = np.where(a_wins, a, b)
+        mates = parents[rng.permutation(lam)]
+
+        children = np.where(rng.random((lam, dim)) < 0.5, population[parents], population[mates])
+        children = children + rng.normal(0, config.mutation_sigma, (lam, dim))
+        children = np.clip(children, lower, upper)
+
+        merged = np.vstack([population, children])
+        merged_points = np.vstack([points, evaluate(children)])
+        # Environmental selection; survivors keep their rank/crowding for the next tournament
+        merged_ranks, merged_crowding = rank_and_crowding(merged_points)
+        survivors = np.lexsort((-merged_crowding, merged_ranks))[:lam]
+        population, points = merged[survivors], merged_points[survivors]
+        ranks, crowding = merged_ranks[survivors], merged_crowding[survivors]
+
+    return population
+
+
+def optimize(objective: PolicyObjective, config: Optional[SurrogateConfig] = None,
+             impact_models: Optional[Dict[str, Any]] = None) -> SurrogateResult:
+    """Search the action space and return the best candidate plus the Pareto front of everything evaluated"""
+    config = config or SurrogateConfig()
+    start = time.perf_counter()
+
+    evaluated_actions: List[np.ndarray] = []
+    evaluated_metrics: List[Dict[str, np.ndarray]] = []
+
+    def run(actions: np.ndarray) -> Dict[str, np.ndarray]:
+        metrics = objective(actions)
+        evaluated_actions.append(actions)
+        evaluated_metrics.append(metrics)
+        return metrics
+
+    baseline = objective(np.zeros((1, len(ACTION_NAMES))))
+    search = cma_es(lambda actions: run(actions)["reward"], len(ACTION_NAMES), config)
+    # Seed NSGA-II with the scalar optimum so the front always contains it
+    nsga2(lambda actions: objective_points(run(actions)), len(ACTION_NAMES), config,
+          initial=search["x"][None, :])
+
+    actions = np.vstack(evaluated_actions)
+    metrics = {name: np.concatenate([m[name] for m in evaluated_metrics]) for name in evaluated_metrics[0]}
+    points = objective_points(metrics)
+
+    # Many candidates land on identical objective values once clipping kicks in - keep the best of each
+    by_reward = np.argsort(-metrics["reward"], kind="stable")
+    _, first = np.unique(points[by_reward], axis=0, return_index=True)
+    unique_idx = by_reward[first]
+    front_idx = unique_idx[non_dominated_mask(points[unique_idx])]
+    front_hypervolume = hypervolume(points[front_idx], HYPERVOLUME_REFERENCE)
+    front_size = len(front_idx)
+
+    # Too many to return: keep the most spread out, always including the recommended point
+    if front_size > config.max_front:
+        best = front_idx[np.argmax(metrics["reward"][front_idx])]
+        spread = front_idx[select_by_rank_and_crowding(points[front_idx], len(front_idx))]
+        front_idx = np.concatenate([[best], spread[spread != best][:config.max_front - 1]])
+    front_idx = front_idx[np.argsort(-metrics["reward"][front_idx], kind="stable")]
+
+    front_metrics = {name: values[front_idx] for name, values in metrics.items()}
+    predictions = (objective.impact_predictions(actions[front_idx], front_metrics, impact_models)
+                   if impact_models else {})
+
+    pareto_front = []
+    for rank, i in enumerate(front_idx):
+        point = {
+            "action": {name: round(float(a), 4) for name, a in zip(ACTION_NAMES, actions[i])},
+            "parameters": {name: round(float(v[0]), 4) for name, v in objective.parameters(actions[i]).items()},
+            "metrics": {name: round(float(metrics[name][i]), 4) for name in OBJECTIVES},
+            "reward_score": round(float(metrics["reward"][i]), 4)
+        }
+        if predictions:
+            point["model_predictions"] = {target: round(float(p[rank]), 4) for target, p in predictions.items()}
+        pareto_front.append(point)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    best_metrics = objective(search["x"][None, :])
+    logger.info(f"Surrogate optimizer: {len(actions)} candidates, {front_size} non-dominated, "
+                f"{elapsed_ms:.1f}ms, reward {float(baseline['reward'][0]):.4f} -> {search['f']:.4f}")
+
+    return SurrogateResult(
+        best_action=search["x"],
+        best_reward=search["f"],
+        best_metrics={name: float(best_metrics[name][0]) for name in OBJECTIVES},
+        baseline_reward=float(baseline["reward"][0]),
+        baseline_metrics={name: float(baseline[name][0]) for name in OBJECTIVES},
+        pareto_front=pareto_front,
+        front_size=front_size,
+        hypervolume=front_hypervolume,
+        baseline_hypervolume=hypervolume(objective_points(baseline), HYPERVOLUME_REFERENCE),
+        evaluations=len(actions),
+        generations=search["generations"] + config.front_generations,
+        elapsed_ms=elapsed_ms,
+        history=search["history"]
+    )
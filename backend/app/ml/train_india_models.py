@@ -3,265 +3,80 @@ Train ML/DL models on REAL Indian data
 Using FREE data sources only
 """
 
+import argparse
 import numpy as np
-import pandas as pd
 import torch
-import torch.nn as nn
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import xgboost as xgb
 import pickle
 import logging
 from pathlib import Path
+from typing import Optional
+from app.ml.networks import IndianBehaviorLSTM
+from app.ml.training_data import IndianDataGenerator
+from app.ml.lstm_training import TrainingConfig, make_loaders, train_lstm, evaluate
+from app.ml.impact_search import search_impact_models, score_on_test, write_report
+from app.ml.model_registry import ModelRegistry, MODELS_DIR, REGISTRY_DIR
 
 logger = logging.getLogger(__name__)
 
-class IndianDataGenerator:
-    """Generate training data from real Indian statistics"""
-    
-    def __init__(self):
-        # Real Indian city data
-        self.cities_data = {
-            "Bengaluru": {"congestion": 74.4, "population": 8443675, "vehicles": 7200000, "income": 48000},
-            "Mumbai": {"congestion": 65.0, "population": 12442373, "vehicles": 3500000, "income": 45000},
-            "Delhi": {"congestion": 62.0, "population": 16787941, "vehicles": 11000000, "income": 50000},
-            "Pune": {"congestion": 59.0, "population": 3124458, "vehicles": 2800000, "income": 42000},
-            "Chennai": {"congestion": 54.0, "population": 4646732, "vehicles": 3200000, "income": 43000},
-            "Kolkata": {"congestion": 58.0, "population": 4496694, "vehicles": 2100000, "income": 38000}
-        }
-        
-        # Real policy types in India
-        self.policy_types = [
-            "congestion_pricing", "metro_expansion", "bus_rapid_transit",
-            "ev_incentives", "parking_restrictions", "odd_even_scheme"
-        ]
-    
-    def generate_behavioral_training_data(self, n_samples=10000):
-        """Generate behavioral training data based on real Indian patterns"""
-        
-        data = []
-        for _ in range(n_samples):
-            # Random city
-            city = np.random.choice(list(self.cities_data.keys()))
-            city_data = self.cities_data[city]
-            
-            # Policy parameters (in INR)
-            budget_inr = np.random.uniform(1e7, 5e8)  # 1 crore to 50 crore
-            enforcement = np.random.uniform(0.3, 1.0)
-            timeline_days = np.random.randint(30, 365)
-            
-            # Citizen features (Indian context)
-            income_level = np.random.normal(city_data["income"], 15000)
-            vehicle_ownership = np.random.binomial(1, 0.3)  # 30% own vehicles
-            public_transport_access = np.random.uniform(0, 1)
-            age = np.random.normal(32, 12)  # Indian median age
-            
-            # Behavioral response (based on real patterns)
-            # Indians are price-sensitive but adapt to good infrastructure
-            price_sensitivity = 1.0 - (income_level / 100000)
-            infrastructure_preference = 0.7  # High preference for good infrastructure
-            
-            adaptation_rate = (
-                0.3 * (1 - price_sensitivity) +
-                0.4 * infrastructure_preference +
-                0.2 * enforcement +
-                0.1 * public_transport_access
-            )
-            
-            compliance = (
-                0.4 * enforcement +
-                0.3 * (income_level / 100000) +
-                0.3 * adaptation_rate
-            )
-            
-            satisfaction = (
-                0.4 * (1 - price_sensitivity) +
-                0.3 * public_transport_access +
-                0.3 * (1 - city_data["congestion"] / 100)
-            )
-            
-            # Features
-            features = [
-                budget_inr / 1e8,  # Normalized budget
-                timeline_days / 365,
-                enforcement,
-                income_level / 100000,
-                vehicle_ownership,
-                public_transport_access,
-                age / 100,
-                city_data["congestion"] / 100,
-                city_data["vehicles"] / 10000000,
-                city_data["population"] / 20000000
-            ]
-            
-            # Labels
-            labels = [
-                np.clip(adaptation_rate, 0, 1),
-                np.clip(compliance, 0, 1),
-                np.clip(satisfaction, 0, 1),
-                np.random.uniform(-0.1, 0.2)  # Economic impact
-            ]
-            
-            data.append(features + labels)
-        
-        df = pd.DataFrame(data, columns=[
-            'budget', 'timeline', 'enforcement', 'income', 'vehicle_ownership',
-            'public_transport', 'age', 'congestion', 'vehicles', 'population',
-            'adaptation_rate', 'compliance', 'satisfaction', 'economic_impact'
-        ])
-        
-        return df
-    
-    def generate_impact_training_data(self, n_samples=5000):
-        """Generate impact prediction training data"""
-        
-        data = []
-        for _ in range(n_samples):
-            city = np.random.choice(list(self.cities_data.keys()))
-            city_data = self.cities_data[city]
-            
-            # Policy features
-            budget_inr = np.random.uniform(1e7, 5e8)
-            enforcement = np.random.uniform(0.3, 1.0)
-            policy_type = np.random.choice(range(len(self.policy_types)))
-            
-            # Behavioral response
-            adaptation = np.random.uniform(0.3, 0.9)
-            compliance = np.random.uniform(0.4, 0.95)
-            
-            # Calculate impacts (based on real correlations)
-            base_congestion = city_data["congestion"]
-            
-            # Congestion reduction
-            congestion_impact = base_congestion * (
-                1 - 0.15 * adaptation * compliance * (budget_inr / 1e8)
-            )
-            
-            # Inflation (fuel prices in India are sensitive)
-            inflation_impact = 0.05 + 0.02 * (budget_inr / 1e8)
-            
-            # Dissatisfaction
-            dissatisfaction = 0.5 * (1 - adaptation) + 0.3 * (congestion_impact / 100)
-            
-            # Energy stress (India's growing EV adoption)
-            energy_stress = 0.4 + 0.1 * (policy_type == 3)  # EV policy
-            
-            features = [
-                budget_inr / 1e8,
-                enforcement,
-                policy_type / len(self.policy_types),
-                adaptation,
-                compliance,
-                city_data["congestion"] / 100,
-                city_data["vehicles"] / 10000000,
-                city_data["population"] / 20000000
-            ]
-            
-            labels = [
-                congestion_impact / 100,
-                inflation_impact,
-                dissatisfaction,
-                energy_stress
-            ]
-            
-            data.append(features + labels)
-        
-        df = pd.DataFrame(data, columns=[
-            'budget', 'enforcement', 'policy_type', 'adaptation', 'compliance',
-            'base_congestion', 'vehicles', 'population',
-            'congestion_score', 'inflation_rate', 'dissatisfaction', 'energy_stress'
-        ])
-        
-        return df
-
-class IndianBehaviorLSTM(nn.Module):
-    """LSTM trained on Indian behavioral patterns"""
-    def __init__(self, input_size=10, hidden_size=64, output_size=4):
-        super().__init__()
-        self.lstm = nn.LSTM(input_size, hidden_size, num_layers=2, batch_first=True, dropout=0.2)
-        self.fc1 = nn.Linear(hidden_size, 32)
-        self.fc2 = nn.Linear(32, output_size)
-        self.relu = nn.ReLU()
-        self.sigmoid = nn.Sigmoid()
-    
-    def forward(self, x):
-        lstm_out, _ = self.lstm(x)
-        x = self.relu(self.fc1(lstm_out[:, -1, :]))
-        output = self.sigmoid(self.fc2(x))
-        return output
-
 class IndiaModelTrainer:
     """Train all models on real Indian data"""
     
-    def __init__(self, save_dir="backend/app/ml/models"):
+    def __init__(self, save_dir=MODELS_DIR, registry_dir=REGISTRY_DIR, seed=42,
+                 training_config: Optional[TrainingConfig] = None, behavior_samples=10000):
         self.save_dir = Path(save_dir)
+        self.training_config = training_config or TrainingConfig(seed=seed)
+        self.behavior_samples = behavior_samples
+        self.registry = ModelRegistry(registry_dir)
+        self.metrics = {}
+        self.seed = seed
         self.save_dir.mkdir(parents=True, exist_ok=True)
-        self.data_gen = IndianDataGenerator()
+        self.data_gen = IndianDataGenerator(seed=seed)
     
     def train_behavioral_model(self):
         """Train LSTM on Indian behavioral data"""
         logger.info("Training behavioral LSTM on Indian data...")
         
         # Generate training data
-        df = self.data_gen.generate_behavioral_training_data(n_samples=10000)
+        df = self.data_gen.generate_behavioral_training_data(n_samples=self.behavior_samples)
         
         # Prepare data
         X = df.iloc[:, :10].values
         y = df.iloc[:, 10:].values
         
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        # Early stopping watches a validation split carved out of train; test stays unseen until the end
+        X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
         
         # Normalize
         scaler_X = StandardScaler()
         X_train = scaler_X.fit_transform(X_train)
+        X_val = scaler_X.transform(X_val)
         X_test = scaler_X.transform(X_test)
         
-        # Convert to tensors
-        X_train_tensor = torch.FloatTensor(X_train).unsqueeze(1)
-        y_train_tensor = torch.FloatTensor(y_train)
-        X_test_tensor = torch.FloatTensor(X_test).unsqueeze(1)
-        y_test_tensor = torch.FloatTensor(y_test)
-        
-        # Train model
+        # Train model (shuffled DataLoader, per-epoch validation, early stopping)
         model = IndianBehaviorLSTM()
-        criterion = nn.MSELoss()
-        optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
-        
-        epochs = 50
-        batch_size = 64
-        
-        for epoch in range(epochs):
-            model.train()
-            total_loss = 0
-            
-            for i in range(0, len(X_train_tensor), batch_size):
-                batch_X = X_train_tensor[i:i+batch_size]
-                batch_y = y_train_tensor[i:i+batch_size]
-                
-                optimizer.zero_grad()
-                outputs = model(batch_X)
-                loss = criterion(outputs, batch_y)
-                loss.backward()
-                optimizer.step()
-                
-                total_loss += loss.item()
-            
-            if (epoch + 1) % 10 == 0:
-                model.eval()
-                with torch.no_grad():
-                    test_outputs = model(X_test_tensor)
-                    test_loss = criterion(test_outputs, y_test_tensor)
-                    logger.info(f"Epoch {epoch+1}/{epochs}, Train Loss: {total_loss/len(X_train_tensor):.4f}, Test Loss: {test_loss:.4f}")
+        train_loader, val_loader = make_loaders(X_train, y_train, X_val, y_val, self.training_config)
+        result = train_lstm(model, train_loader, val_loader, self.training_config)
+        _, test_loader = make_loaders(X_train, y_train, X_test, y_test, self.training_config)
+        test_loss = evaluate(model, test_loader, torch.nn.MSELoss())
+        logger.info(f"Training throughput: {result.samples_per_sec:,.0f} samples/s "
+                    f"({result.epochs_run} epochs, {result.train_seconds:.1f}s)")
         
         # Save model
         torch.save(model.state_dict(), self.save_dir / "india_behavior_lstm.pth")
         pickle.dump(scaler_X, open(self.save_dir / "behavior_scaler.pkl", "wb"))
+        self.metrics["behavior_val_loss"] = float(result.best_val_loss)
+        self.metrics["behavior_test_loss"] = float(test_loss)
+        self.metrics["behavior_training"] = result.summary()
         
-        logger.info(f"✅ Behavioral model trained! Test Loss: {test_loss:.4f}")
+        logger.info(f"✅ Behavioral model trained! Val Loss: {result.best_val_loss:.4f}, Test Loss: {test_loss:.4f}")
         return model, scaler_X
     
-    def train_impact_models(self):
-        """Train XGBoost models on Indian impact data"""
+    def train_impact_models(self, search: bool = False, grid=None, max_workers=None):
+        """Train XGBoost models on Indian impact data (optionally with a parallel hyperparameter search)"""
         logger.info("Training XGBoost impact models on Indian data...")
         
         # Generate training data
@@ -269,9 +84,12 @@ class IndiaModelTrainer:
         
         X = df.iloc[:, :8].values
         
-        models = {}
         targets = ['congestion_score', 'inflation_rate', 'dissatisfaction', 'energy_stress']
         
+        if search:
+            return self._search_impact_models(df, X, targets, grid, max_workers)
+        
+        models = {}
         for target in targets:
             y = df[target].values
             
@@ -295,37 +113,101 @@ class IndiaModelTrainer:
             
             # Save model
             pickle.dump(model, open(self.save_dir / f"india_impact_{target}.pkl", "wb"))
+            self.metrics[f"{target}_test_r2"] = float(test_score)
             models[target] = model
         
         logger.info("✅ All impact models trained!")
         return models
     
-    def train_all(self):
+    def _search_impact_models(self, df, X, targets, grid, max_workers):
+        """Fan target x hyperparameter configs over a process pool, keep the best per target"""
+        # Same split for every target (train_test_split with one seed shuffles identically)
+        X_train, X_test, train_idx, test_idx = train_test_split(X, np.arange(len(X)), test_size=0.2, random_state=42)
+        # Configurations compete on a validation split of train; test only scores the winners
+        X_fit, X_val, fit_idx, val_idx = train_test_split(X_train, train_idx, test_size=0.2, random_state=42)
+        target_data = {t: (df[t].values[fit_idx], df[t].values[val_idx]) for t in targets}
+        
+        models, report = search_impact_models(X_fit, X_val, target_data, grid=grid,
+                                              max_workers=max_workers, seed=self.seed)
+        test_r2 = score_on_test(models, report, X_test, {t: df[t].values[test_idx] for t in targets})
+        report_path = write_report(report, self.save_dir)
+        
+        for target, model in models.items():
+            pickle.dump(model, open(self.save_dir / f"india_impact_{target}.pkl", "wb"))
+            best = report["targets"][target]["best"]
+            self.metrics[f"{target}_val_r2"] = best["val_r2"]
+            self.metrics[f"{target}_test_r2"] = test_r2[target]
+            self.metrics[f"{target}_params"] = best["params"]
+        
+        logger.info(f"✅ Impact model search done in {report['wall_seconds']}s, report: {report_path}")
+        return models
+    
+    def train_all(self, search_impact: bool = False, search_workers=None):
         """Train all models"""
         logger.info("🇮🇳 Training all models on REAL Indian data...")
         
         behavior_model, scaler = self.train_behavioral_model()
-        impact_models = self.train_impact_models()
+        impact_models = self.train_impact_models(search=search_impact, max_workers=search_workers)
+        
+        # Versioned, hash-verified copy (plus NumPy/TorchScript/compiled-tree exports) for serving
+        version = self.registry.register(
+            behavior_model, impact_models, scaler,
+            metadata={
+                "behavior_samples": self.behavior_samples,
+                "impact_samples": 5000,
+                "seed": self.seed,
+                "metrics": self.metrics
+            }
+        )
         
         logger.info("✅ All models trained successfully!")
-        logger.info(f"Models saved to: {self.save_dir}")
+        logger.info(f"Models saved to: {self.save_dir} (registered as {version})")
         
         return {
             "behavior_model": behavior_model,
             "behavior_scaler": scaler,
-            "impact_models": impact_models
+            "impact_models": impact_models,
+            "version": version
         }
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     
-    trainer = IndiaModelTrainer()
-    models = trainer.train_all()
+    parser = argparse.ArgumentParser(description="Train and register the behavior LSTM and impact models")
+    parser.add_argument("--behavior-samples", type=int, default=10000)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads")
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--patience", type=int, default=5, help="Early-stopping patience (0 = off)")
+    parser.add_argument("--checkpoint-dir", default=None)
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--search-impact", action="store_true",
+                        help="Parallel hyperparameter search for the XGBoost impact models")
+    parser.add_argument("--search-workers", type=int, default=None, help="Process pool size (default: all cores)")
+    args = parser.parse_args()
+    
+    trainer = IndiaModelTrainer(
+        seed=args.seed,
+        behavior_samples=args.behavior_samples,
+        training_config=TrainingConfig(
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+            num_threads=args.threads,
+            num_workers=args.workers,
+            patience=args.patience,
+            checkpoint_dir=args.checkpoint_dir,
+            resume=args.resume,
+            seed=args.seed
+        )
+    )
+    models = trainer.train_all(search_impact=args.search_impact, search_workers=args.search_workers)
     
     print("\n🎉 Training Complete!")
     print("Models trained on REAL Indian data:")
     print("  - Behavioral LSTM (Indian patterns)")
     print("  - XGBoost Impact Models (4 models)")
     print("  - Data sources: Census India, TomTom, RBI")
-    print("  - Training samples: 15,000")
-    print("\nModels saved to: backend/app/ml/models/")
+    print(f"  - Training samples: {args.behavior_samples + 5000:,}")
+    print(f"\nModels saved to: {trainer.save_dir} (registered as {models['version']})")
@@ -0,0 +1,277 @@
+"""
+Synthetic Training Data - 100% FREE
+Vectorized generators built on real Indian city statistics (Census, TomTom, RBI)
+
+Every sample is drawn with array operations from a seeded np.random.Generator,
+so millions of rows take seconds. Large corpora are written as fixed-size
+shards (NPY by default, Parquet when pyarrow is installed) and never need to
+fit in memory at once.
+
+Usage:
+    python -m app.ml.training_data behavior --samples 10000000 --out data/behavior
+    python -m app.ml.training_data impact --samples 5000000 --out data/impact --format parquet
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BEHAVIOR_FEATURE_COLUMNS = [
+    'budget', 'timeline', 'enforcement', 'income', 'vehicle_ownership',
+    'public_transport', 'age', 'congestion', 'vehicles', 'population'
+]
+BEHAVIOR_LABEL_COLUMNS = ['adaptation_rate', 'compliance', 'satisfaction', 'economic_impact']
+IMPACT_FEATURE_COLUMNS = [
+    'budget', 'enforcement', 'policy_type', 'adaptation', 'compliance',
+    'base_congestion', 'vehicles', 'population'
+]
+IMPACT_LABEL_COLUMNS = ['congestion_score', 'inflation_rate', 'dissatisfaction', 'energy_stress']
+
+SHARD_MANIFEST = "shards.json"
+
+
+class IndianDataGenerator:
+    """Generate training data from real Indian statistics"""
+
+    def __init__(self, seed: Optional[int] = None):
+        # Real Indian city data
+        self.cities_data = {
+            "Bengaluru": {"congestion": 74.4, "population": 8443675, "vehicles": 7200000, "income": 48000},
+            "Mumbai": {"congestion": 65.0, "population": 12442373, "vehicles": 3500000, "income": 45000},
+            "Delhi": {"congestion": 62.0, "population": 16787941, "vehicles": 11000000, "income": 50000},
+            "Pune": {"congestion": 59.0, "population": 3124458, "vehicles": 2800000, "income": 42000},
+            "Chennai": {"congestion": 54.0, "population": 4646732, "vehicles": 3200000, "income": 43000},
+            "Kolkata": {"congestion": 58.0, "population": 4496694, "vehicles": 2100000, "income": 38000}
+        }
+
+        # Real policy types in India
+        self.policy_types = [
+            "congestion_pricing", "metro_expansion", "bus_rapid_transit",
+            "ev_incentives", "parking_restrictions", "odd_even_scheme"
+        ]
+
+        self.rng = np.random.default_rng(seed)
+
+        # City columns as arrays so a sampled city index gathers all its stats at once
+        cities = list(self.cities_data.values())
+        self._city_congestion = np.array([c["congestion"] for c in cities])
+        self._city_population = np.array([c["population"] for c in cities], dtype=np.float64)
+        self._city_vehicles = np.array([c["vehicles"] for c in cities], dtype=np.float64)
+        self._city_income = np.array([c["income"] for c in cities], dtype=np.float64)
+
+    def behavioral_arrays(self, n_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Behavioral features (n, 10) and labels (n, 4) as float32"""
+        rng = self.rng
+        city = rng.integers(0, len(self._city_income), n_samples)
+        congestion = self._city_congestion[city]
+
+        # Policy parameters (in INR)
+        budget_inr = rng.uniform(1e7, 5e8, n_samples)  # 1 crore to 50 crore
+        enforcement = rng.uniform(0.3, 1.0, n_samples)
+        timeline_days = rng.integers(30, 365, n_samples)
+
+        # Citizen features (Indian context)
+        income_level = rng.normal(self._city_income[city], 15000)
+        vehicle_ownership = rng.binomial(1, 0.3, n_samples)  # 30% own vehicles
+        public_transport_access = rng.uniform(0, 1, n_samples)
+        age = rng.normal(32, 12, n_samples)  # Indian median age
+
+        # Behavioral response (based on real patterns)
+        # Indians are price-sensitive but adapt to good infrastructure
+        price_sensitivity = 1.0 - income_level / 100000
+        infrastructure_preference = 0.7  # High preference for good infrastructure
+
+        adaptation_rate = (
+            0.3 * (1 - price_sensitivity) +
+            0.4 * infrastructure_preference +
+            0.2 * enforcement +
+            0.1 * public_transport_access
+        )
+        compliance = (
+            0.4 * enforcement +
+            0.3 * (income_level / 100000) +
+            0.3 * adaptation_rate
+        )
+        satisfaction = (
+            0.4 * (1 - price_sensitivity) +
+            0.3 * public_transport_access +
+            0.3 * (1 - congestion / 100)
+        )
+
+        X = np.column_stack([
+            budget_inr / 1e8,  # Normalized budget
+            timeline_days / 365,
+            enforcement,
+            income_level / 100000,
+            vehicle_ownership,
+            public_transport_access,
+            age / 100,
+            congestion / 100,
+            self._city_vehicles[city] / 10000000,
+            self._city_population[city] / 20000000
+        ]).astype(np.float32)
+        y = np.column_stack([
+            np.clip(adaptation_rate, 0, 1),
+            np.clip(compliance, 0, 1),
+            np.clip(satisfaction, 0, 1),
+            rng.uniform(-0.1, 0.2, n_samples)  # Economic impact
+        ]).astype(np.float32)
+        return X, y
+
+    def impact_arrays(self, n_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Impact features (n, 8) and labels (n, 4) as float32"""
+        rng = self.rng
+        city = rng.integers(0, len(self._city_income), n_samples)
+        base_congestion = self._city_congestion[city]
+
+        # Policy features
+        budget_inr = rng.uniform(1e7, 5e8, n_samples)
+        enforcement = rng.uniform(0.3, 1.0, n_samples)
+        policy_type = rng.integers(0, len(self.policy_types), n_samples)
+
+        # Behavioral response
+        adaptation = rng.uniform(0.3, 0.9, n_samples)
+        compliance = rng.uniform(0.4, 0.95, n_samples)
+
+        # Congestion reduction
+        congestion_impact = base_congestion * (1 - 0.15 * adaptation * compliance * (budget_inr / 1e8))
+        # Inflation (fuel prices in India are sensitive)
+        inflation_impact = 0.05 + 0.02 * (budget_inr / 1e8)
+        # Dissatisfaction
+        dissatisfaction = 0.5 * (1 - adaptation) + 0.3 * (congestion_impact / 100)
+        # Energy stress (India's growing EV adoption)
+        energy_stress = 0.4 + 0.1 * (policy_type == 3)  # EV policy
+
+        X = np.column_stack([
+            budget_inr / 1e8,
+            enforcement,
+            policy_type / len(self.policy_types),
+            adaptation,
+            compliance,
+            base_congestion / 100,
+            self._city_vehicles[city] / 10000000,
+            self._city_population[city] / 20000000
+        ]).astype(np.float32)
+        y = np.column_stack([
+            congestion_impact / 100,
+            inflation_impact,
+            dissatisfaction,
+            energy_stress
+        ]).astype(np.float32)
+        return X, y
+
+    def generate_behavioral_training_data(self, n_samples=10000) -> pd.DataFrame:
+        """Generate behavioral training data based on real Indian patterns"""
+        X, y = self.behavioral_arrays(n_samples)
+        return pd.DataFrame(np.hstack([X, y]), columns=BEHAVIOR_FEATURE_COLUMNS + BEHAVIOR_LABEL_COLUMNS)
+
+    def generate_impact_training_data(self, n_samples=5000) -> pd.DataFrame:
+        """Generate impact prediction training data"""
+        X, y = self.impact_arrays(n_samples)
+        return pd.DataFrame(np.hstack([X, y]), columns=IMPACT_FEATURE_COLUMNS + IMPACT_LABEL_COLUMNS)
+
+    def iter_batches(self, kind: str, n_samples: int, batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (X, y) batches until n_samples rows have been produced"""
+        generate = {"behavior": self.behavioral_arrays, "impact": self.impact_arrays}[kind]
+        for start in range(0, n_samples, batch_size):
+            yield generate(min(batch_size, n_samples - start))
+
+    def write_shards(self, kind: str, n_samples: int, out_dir, shard_size: int = 1_000_000,
+                     fmt: str = "npy") -> List[Path]:
+        """
+        Stream a dataset to disk one shard at a time.
+        npy: <kind>-00000.X.npy / .y.npy pairs (memory-mappable)
+        parquet: <kind>-00000.parquet with named columns (requires pyarrow)
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        features, labels = _columns(kind)
+        if fmt == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet shards need pyarrow: pip install pyarrow")
+        elif fmt != "npy":
+            raise ValueError(f"Unknown shard format: {fmt}")
+
+        paths = []
+        for index, (X, y) in enumerate(self.iter_batches(kind, n_samples, shard_size)):
+            stem = out_dir / f"{kind}-{index:05d}"
+            if fmt == "npy":
+                np.save(f"{stem}.X.npy", X)
+                np.save(f"{stem}.y.npy", y)
+                paths.append(Path(f"{stem}.X.npy"))
+            else:
+                table = pa.table({name: X[:, i] for i, name in enumerate(features)} |
+                                 {name: y[:, i] for i, name in enumerate(labels)})
+                pq.write_table(table, f"{stem}.parquet")
+                paths.append(Path(f"{stem}.parquet"))
+
+        with open(out_dir / SHARD_MANIFEST, "w") as f:
+            json.dump({
+                "kind": kind,
+                "format": fmt,
+                "samples": n_samples,
+                "shard_size": shard_size,
+                "features": features,
+                "labels": labels,
+                "shards": [p.name for p in paths]
+            }, f, indent=2)
+        return paths
+
+
+def _columns(kind: str) -> Tuple[List[str], List[str]]:
+    if kind == "behavior":
+        return BEHAVIOR_FEATURE_COLUMNS, BEHAVIOR_LABEL_COLUMNS
+    if kind == "impact":
+        return IMPACT_FEATURE_COLUMNS, IMPACT_LABEL_COLUMNS
+    raise ValueError(f"Unknown dataset kind: {kind}")
+
+
+def read_shards(out_dir) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (X, y) per shard; NPY shards are memory-mapped, not read into RAM"""
+    out_dir = Path(out_dir)
+    with open(out_dir / SHARD_MANIFEST) as f:
+        manifest: Dict = json.load(f)
+
+    for name in manifest["shards"]:
+        if manifest["format"] == "npy":
+            stem = name[:-len(".X.npy")]
+            yield (np.load(out_dir / name, mmap_mode="r"),
+                   np.load(out_dir / f"{stem}.y.npy", mmap_mode="r"))
+        else:
+            import pyarrow.parquet as pq
+            table = pq.read_table(out_dir / name)
+            X = np.column_stack([table[c].to_numpy() for c in manifest["features"]])
+            y = np.column_stack([table[c].to_numpy() for c in manifest["labels"]])
+            yield X, y
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Generate sharded synthetic training data")
+    parser.add_argument("kind", choices=["behavior", "impact"])
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--shard-size", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["npy", "parquet"], default="npy")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = IndianDataGenerator(seed=args.seed).write_shards(
+        args.kind, args.samples, args.out, shard_size=args.shard_size, fmt=args.format
+    )
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ {args.samples:,} {args.kind} rows in {len(paths)} shards, {elapsed:.1f}s "
+                f"({args.samples / elapsed:,.0f} rows/s)")
@@ -0,0 +1,167 @@
+"""
+Compiled tree-ensemble inference
+Flattens a trained XGBoost regressor into plain NumPy arrays and evaluates it
+without DMatrix construction, so single-row predictions cost microseconds and
+batches are evaluated for all rows and trees at once.
+
+Arrays are produced from the booster's JSON dump (Booster.save_raw("json")):
+a row goes left when x < threshold, missing values (NaN) follow default_left,
+and the prediction is base_score + sum of the reached leaf values.
+"""
+
+import json
+from typing import List
+
+import numpy as np
+
+TREE_ENSEMBLE_SUFFIX = ".trees.npz"
+
+
+class TreeEnsemble:
+    """Array-based gradient-boosted tree regressor"""
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, default_left: np.ndarray, value: np.ndarray,
+                 roots: np.ndarray, max_depth: int, base_score: float, num_feature: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_score = base_score
+        self.num_feature = num_feature
+
+    @classmethod
+    def from_booster(cls, booster) -> "TreeEnsemble":
+        """Compile an xgboost.Booster (or XGBRegressor) into flat node arrays"""
+        if hasattr(booster, "get_booster"):
+            booster = booster.get_booster()
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective != "reg:squarederror":
+            raise ValueError(f"Unsupported objective for compiled trees: {objective}")
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+        feature: List[np.ndarray] = []
+        threshold: List[np.ndarray] = []
+        left: List[np.ndarray] = []
+        right: List[np.ndarray] = []
+        default_left: List[np.ndarray] = []
+        value: List[np.ndarray] = []
+        roots = []
+        max_depth = 0
+        offset = 0
+
+        for tree in trees:
+            lc = np.asarray(tree["left_children"], dtype=np.int32)
+            rc = np.asarray(tree["right_children"], dtype=np.int32)
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            is_leaf = lc == -1
+            own = np.arange(len(lc), dtype=np.int32)
+
+            # Leaves point at themselves so extra traversal steps are no-ops
+            left.append(np.where(is_leaf, own, lc) + offset)
+            right.append(np.where(is_leaf, own, rc) + offset)
+            feature.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+            threshold.append(conditions)
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            # XGBoost stores leaf outputs in split_conditions
+            value.append(np.where(is_leaf, conditions, 0.0).astype(np.float32))
+            roots.append(offset)
+            max_depth = max(max_depth, cls._depth(lc, rc))
+            offset += len(lc)
+
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            base_score=float(learner["learner_model_param"]["base_score"]),
+            num_feature=int(learner["learner_model_param"]["num_feature"]),
+        )
+
+    @staticmethod
+    def _depth(lc: np.ndarray, rc: np.ndarray) -> int:
+        depth, frontier = 0, [0]
+        while True:
+            children = [c for n in frontier for c in (lc[n], rc[n]) if c != -1]
+            if not children:
+                return depth
+            depth += 1
+            frontier = children
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X: (n_rows, n_features) -> (n_rows,) float32, matching XGBRegressor.predict"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[0] == 1:
+            leaves = self._leaves_single(X[0])
+            return np.array([self.value[leaves].sum(dtype=np.float64) + self.base_score], dtype=np.float32)
+        leaves = self._leaves_batch(X)
+        return (self.value[leaves].sum(axis=1, dtype=np.float64) + self.base_score).astype(np.float32)
+
+    def _leaves_single(self, row: np.ndarray) -> np.ndarray:
+        """One row: decide every split at once, then pointer-jump from the roots"""
+        x = row[self.feature]
+        go_left = x < self.threshold
+        if np.isnan(row).any():
+            go_left = np.where(np.isnan(x), self.default_left, go_left)
+        next_node = np.where(go_left, self.left, self.right)
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = next_node[nodes]
+        return nodes
+
+    def _leaves_batch(self, X: np.ndarray) -> np.ndarray:
+        """Many rows: advance every (row, tree) pair one level per step"""
+        n_rows, n_cols = X.shape
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_cols)[:, None]
+        missing = np.isnan(flat).any()
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat[row_offset + self.feature[nodes]]
+            go_left = x < self.threshold[nodes]
+            if missing:
+                go_left = np.where(np.isnan(x), self.default_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def save(self, path):
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            default_left=self.default_left,
+            value=self.value,
+            roots=self.roots,
+            max_depth=np.array(self.max_depth),
+            base_score=np.array(self.base_score),
+            num_feature=np.array(self.num_feature),
+        )
+
+    @classmethod
+    def load(cls, path) -> "TreeEnsemble":
+        with np.load(path) as arrays:
+            return cls(
+                feature=arrays["feature"],
+                threshold=arrays["threshold"],
+                left=arrays["left"],
+                right=arrays["right"],
+                default_left=arrays["default_left"],
+                value=arrays["value"],
+                roots=arrays["roots"],
+                max_depth=int(arrays["max_depth"]),
+                base_score=float(arrays["base_score"]),
+                num_feature=int(arrays["num_feature"]),
+            )
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from typing import Any, Dict
 from app.models.india_schema import IndianPolicyInput, IndianRegion
 from app.services.free_india_data import india_data_service
 from app.services.cache_service import (
@@ -8,8 +10,14 @@ from app.services.cache_service import (
     get_cached_traffic_data,
     get_cached_economic_data
 )
+from app.services.job_scheduler import get_job_scheduler, run_off_loop, DEFAULT_TENANT
+from app.services.admission_control import get_admission_controller, AdmissionRejected
+from app.services.bulk_writer import get_bulk_writer
+from app.services.simulation_schema import compact_indian_simulation
+from app.routes.job_routes import submit_job
 from app.db import get_database
 from datetime import datetime
+from contextlib import nullcontext
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +27,8 @@ class IndianSimulationRequest(BaseModel):
     policy_text: str
     region: IndianRegion
     enable_optimization: bool = True
+    background: bool = False  # queue as a job and return its id instead of holding the connection
+    priority: str = "normal"  # background jobs only: high, normal or low
 
 @router.get("/cities")
 async def get_available_cities():
@@ -116,77 +126,118 @@ async def get_city_data(state: str, city: str):
         "cached": True
     }
 
+async def _simulate(request: IndianSimulationRequest, db, offload: bool = False) -> Dict[str, Any]:
+    """Run the pipeline with real state data and store it; offload=True keeps the CPU work off the event loop"""
+    from app.services.simulation_engine import get_simulation_engine
+    
+    # Get real state data
+    state_data = india_data_service.get_state_data(request.region.state)
+    
+    if not state_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No data available for {request.region.state}"
+        )
+    
+    # Run simulation with real data on the shared, warmed-up engine
+    engine = get_simulation_engine()
+    
+    # Limited to admission_max_in_flight pipelines; background jobs queue without a deadline
+    # A request joining an identical in-flight run shares its slot instead of taking another
+    joining = not offload and engine.is_in_flight(
+        request.policy_text, request.enable_optimization, {"state": request.region.state}
+    )
+    async with nullcontext() if joining else get_admission_controller().admit(background=offload):
+        if offload:
+            result = await run_off_loop(
+                engine.run_simulation, request.policy_text, request.enable_optimization,
+                region={"state": request.region.state}
+            )
+        else:
+            result = await engine.run_simulation(
+                request.policy_text,
+                request.enable_optimization,
+                region={"state": request.region.state}
+            )
+    
+    # Calculate real impact
+    if "structured_policy" in result:
+        policy_obj = result["structured_policy"]
+        budget_inr = getattr(policy_obj, 'budget_allocation_inr', getattr(policy_obj, 'budget_allocation', 1000000))
+        policy_type = getattr(policy_obj, 'policy_type', 'transportation')
+        
+        real_impact = india_data_service.calculate_policy_impact(
+            state=request.region.state,
+            policy_type=policy_type,
+            budget_inr=budget_inr
+        )
+        
+        result["real_india_impact"] = real_impact
+    
+    # Store in MongoDB
+    simulation_doc = {
+        "region": request.region.dict(),
+        "policy_text": request.policy_text,
+        "structured_policy": result["structured_policy"].dict() if hasattr(result.get("structured_policy"), "dict") else result.get("structured_policy"),
+        "results": {
+            k: v.dict() if hasattr(v, "dict") else v 
+            for k, v in result.items() 
+            if k != "structured_policy"
+        },
+        "real_data_used": True,
+        "data_sources": ["Census India (State-level)", "TomTom Traffic Index", "RBI"],
+        "timestamp": datetime.utcnow(),
+        "optimized": request.enable_optimization
+    }
+    
+    # Stored in the compact v2 schema; buffered and written in the next batch with bulky fields by reference
+    simulation_doc = compact_indian_simulation(simulation_doc)
+    simulation_id = str(await get_bulk_writer().add(db, "indian_simulations", simulation_doc))
+    
+    logger.info(f"Indian simulation completed: {simulation_id} for {request.region.state}")
+    
+    return {
+        "simulation_id": simulation_id,
+        "region": request.region.dict(),
+        "results": result,
+        "data_quality": "REAL - Free public sources (State-level)",
+        "note": "Using 100% FREE data - State/UT level coverage!",
+        "performance": "OPTIMIZED with caching"
+    }
+
+async def simulation_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for background /india/simulate requests"""
+    db = await get_database()
+    return jsonable_encoder(await _simulate(IndianSimulationRequest(**payload), db, offload=True))
+
+get_job_scheduler().register("india_simulation", simulation_job)
+
 @router.post("/simulate")
 async def simulate_indian_policy(
     request: IndianSimulationRequest,
+    response: Response,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
     db = Depends(get_database)
 ):
-    """Run simulation for Indian state with REAL data - OPTIMIZED"""
+    """
+    Run simulation for Indian state with REAL data - OPTIMIZED.
+    With background=true the run is queued and 202 + a job id (see /jobs/{job_id}) come back immediately.
+    """
+    if request.background:
+        payload = request.dict(exclude={"background", "priority"})
+        return await submit_job("india_simulation", payload, x_tenant_id, request.priority, response, db)
+    
     try:
-        from app.services.simulation_engine import SimulationEngine
-        
-        # Get real state data
-        state_data = india_data_service.get_state_data(request.region.state)
-        
-        if not state_data:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No data available for {request.region.state}"
-            )
-        
-        # Run simulation with real data
-        engine = SimulationEngine()
-        
-        result = await engine.run_simulation(
-            request.policy_text,
-            request.enable_optimization,
-            region={"state": request.region.state}
-        )
-        
-        # Calculate real impact
-        if "structured_policy" in result:
-            policy_obj = result["structured_policy"]
-            budget_inr = getattr(policy_obj, 'budget_allocation_inr', getattr(policy_obj, 'budget_allocation', 1000000))
-            policy_type = getattr(policy_obj, 'policy_type', 'transportation')
-            
-            real_impact = india_data_service.calculate_policy_impact(
-                state=request.region.state,
-                policy_type=policy_type,
-                budget_inr=budget_inr
-            )
-            
-            result["real_india_impact"] = real_impact
-        
-        # Store in MongoDB
-        simulation_doc = {
-            "region": request.region.dict(),
-            "policy_text": request.policy_text,
-            "structured_policy": result["structured_policy"].dict() if hasattr(result.get("structured_policy"), "dict") else result.get("structured_policy"),
-            "results": {
-                k: v.dict() if hasattr(v, "dict") else v 
-                for k, v in result.items() 
-                if k != "structured_policy"
-            },
-            "real_data_used": True,
-            "data_sources": ["Census India (State-level)", "TomTom Traffic Index", "RBI"],
-            "timestamp": datetime.utcnow(),
-            "optimized": request.enable_optimization
-        }
-        
-        sim_result = await db.indian_simulations.insert_one(simulation_doc)
-        simulation_id = str(sim_result.inserted_id)
-        
-        logger.info(f"Indian simulation completed: {simulation_id} for {request.region.state}")
-        
-        return {
-            "simulation_id": simulation_id,
-            "region": request.region.dict(),
-            "results": result,
-            "data_quality": "REAL - Free public sources (State-level)",
-            "note": "Using 100% FREE data - State/UT level coverage!",
-            "performance": "OPTIMIZED with caching"
-        }
+        return await _simulate(request, db)
     
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Simulation capacity saturated ({e.reason}) - retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Indian simulation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any
+from app.services.job_scheduler import get_job_scheduler, job_object_id, QueueFullError, DEFAULT_TENANT
+from app.db import get_database
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+async def get_scheduler(db = Depends(get_database)):
+    """The process scheduler, started on first use if the startup hook didn't run"""
+    scheduler = get_job_scheduler()
+    await scheduler.start(db)
+    return scheduler
+
+
+async def submit_job(kind: str, payload: Dict[str, Any], tenant: str, priority: str,
+                     response: Response, db, dedupe_key: Optional[str] = None) -> Dict[str, Any]:
+    """Queue a job for a route's background mode: 202, Location and the job view"""
+    scheduler = await get_scheduler(db)
+    try:
+        job = await scheduler.submit(kind, payload, tenant=tenant, priority=priority, dedupe_key=dedupe_key)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {str(e)}", headers={"Retry-After": "30"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response.status_code = 202
+    response.headers["Location"] = job["status_url"]
+    return job
+
+
+@router.get("")
+async def list_jobs(
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+    scheduler = Depends(get_scheduler)
+):
+    """Most recent jobs of the calling tenant"""
+    jobs = await scheduler.list_jobs(x_tenant_id, status=status, limit=limit)
+    return {"tenant": x_tenant_id, "jobs": jobs, "queued": scheduler.queued()}
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: seconds to wait for the job to finish"),
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+    scheduler = Depends(get_scheduler)
+):
+    """Job status; includes the result once completed. Other tenants' jobs are 404"""
+    if job_object_id(job_id) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid id: {job_id}")
+
+    job = await (scheduler.wait(job_id, wait, x_tenant_id) if wait else scheduler.get(job_id, x_tenant_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+    scheduler = Depends(get_scheduler)
+):
+    """Server-sent events: one `status` event per change, the stream ends when the job finishes"""
+    if job_object_id(job_id) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid id: {job_id}")
+    if not await scheduler.get(job_id, x_tenant_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        async for job in scheduler.watch(job_id, x_tenant_id):
+            yield f"event: status\ndata: {json.dumps(job)}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.delete("/{job_id}")
+async def cancel_job(
+    job_id: str,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+    scheduler = Depends(get_scheduler)
+):
+    """Cancel a queued or running job of the calling tenant"""
+    job = await scheduler.cancel(job_id, x_tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']} and can't be cancelled here")
+    return job
@@ -4,13 +4,89 @@ High-performance routes using MongoDB for policy data
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from app.services.knowledge_base_service import get_kb_service
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime
+import json
+from app.services.knowledge_base_service import (
+    get_kb_service, state_policies_filter, national_policies_filter, impact_area_filter,
+    encode_cursor, ID_SORT, CATEGORY_SORT
+)
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/knowledge/v2", tags=["knowledge-v2"])
 
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK = 100  # Policies serialized per chunk written to the client
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default)
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    return [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+async def _policy_page(header: Dict, query: Dict, after: Optional[str], limit: Optional[int],
+                       fields: Optional[str], not_found: Optional[str] = None,
+                       group_by: Optional[str] = None) -> StreamingResponse:
+    """
+    Matching policies streamed as JSON while the cursor is read:
+    {**header, "total_policies", "policies": [...], "count", "next_cursor"}
+    With group_by the policies come ordered by that field and grouped under "categories": {value: [...]}.
+    Everything is returned unless `limit` is given; then pass next_cursor back as `after`
+    for the following page (it is null on the last one).
+    """
+    kb_service = await get_kb_service()
+    sort = (group_by, "_id") if group_by else ID_SORT
+    
+    # One extra row tells us whether another page follows
+    policies = kb_service.iter_policies(query, after, limit + 1 if limit else None, _parse_fields(fields), sort)
+    try:
+        first = await anext(policies, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if first is None and not_found and not after:
+        raise HTTPException(status_code=404, detail=not_found)
+    
+    total = await kb_service.count_policies(query)
+    
+    async def body() -> AsyncIterator[str]:
+        count, last, more, group = 0, None, False, None
+        key = "categories" if group_by else "policies"
+        chunk = [_dumps({**header, "total_policies": total})[:-1] + f', "{key}": ' + ("{" if group_by else "[")]
+        try:
+            policy = first
+            while policy is not None:
+                if count == limit:
+                    more = True
+                    break
+                separator = "," if count else ""
+                if group_by:
+                    value = policy.get(group_by)
+                    value = "other" if value is None else str(value)
+                    if count == 0 or value != group:
+                        separator = ("]," if count else "") + _dumps(value) + ":["
+                        group = value
+                chunk.append(separator + _dumps(policy))
+                count += 1
+                last = policy
+                if len(chunk) >= STREAM_CHUNK:
+                    yield "".join(chunk)
+                    chunk = []
+                policy = await anext(policies, None)
+        finally:
+            await policies.aclose()
+        close = (("]" if count else "") + "}") if group_by else "]"
+        next_cursor = encode_cursor(last, sort) if more else None
+        chunk.append(f'{close}, "count": {count}, "next_cursor": {_dumps(next_cursor)}}}')
+        yield "".join(chunk)
+    
+    return StreamingResponse(body(), media_type="application/json")
+
 @router.get("/")
 async def knowledge_base_info():
     """Get information about the MongoDB knowledge base"""
@@ -40,28 +116,20 @@ async def knowledge_base_info():
             "get_national": "/knowledge/v2/national/{category}",
             "top_by_budget": "/knowledge/v2/top-budget",
             "by_impact_area": "/knowledge/v2/impact/{area}"
-        }
+        },
+        "pagination": "state, national and impact lists stream every policy, or pages with ?limit=&after={next_cursor}; ?fields=name,budget_allocation"
     }
 
 @router.get("/states")
 async def list_states():
     """List all states with policy data"""
     kb_service = await get_kb_service()
-    states = await kb_service.get_all_states()
-    
-    # Get summary for each state
-    state_info = []
-    for state in states:
-        summary = await kb_service.get_state_summary(state)
-        state_info.append({
-            "state": state,
-            "policy_count": summary.get("total_policies", 0),
-            "total_budget": summary.get("total_budget", 0),
-            "categories": list(summary.get("categories", {}).keys())
-        })
+    
+    # One cached aggregation for all states instead of a summary query per state
+    state_info = await kb_service.get_states_overview()
     
     return {
-        "total_states": len(states),
+        "total_states": len(state_info),
         "states": state_info
     }
 
@@ -85,30 +153,17 @@ async def get_policy(state: str, category: str, policy_key: str):
     }
 
 @router.get("/state/{state}")
-async def get_state_policies(state: str):
-    """Get all policies for a specific state"""
-    kb_service = await get_kb_service()
-    policies = await kb_service.get_state_policies(state)
-    
-    if not policies:
-        raise HTTPException(
-            status_code=404,
-            detail=f"No policies found for state: {state}"
-        )
-    
-    # Group by category
-    grouped = {}
-    for policy in policies:
-        category = policy.get("category", "other")
-        if category not in grouped:
-            grouped[category] = []
-        grouped[category].append(policy)
-    
-    return {
-        "state": state,
-        "total_policies": len(policies),
-        "categories": grouped
-    }
+async def get_state_policies(
+    state: str,
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; all policies when omitted"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """Get all policies for a specific state, grouped by category (pageable)"""
+    return await _policy_page(
+        {"state": state}, state_policies_filter(state), after, limit, fields,
+        not_found=f"No policies found for state: {state}", group_by=CATEGORY_SORT[0]
+    )
 
 @router.get("/state/{state}/summary")
 async def get_state_summary(state: str):
@@ -175,8 +230,13 @@ async def get_budget(state: str, year: str = "2025_26"):
     }
 
 @router.get("/national/{category}")
-async def get_national_policies(category: str):
-    """Get national policies by category"""
+async def get_national_policies(
+    category: str,
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; all policies when omitted"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """Get national policies by category (pageable)"""
     valid_categories = ["economic", "social", "infrastructure", "agriculture", "education"]
     
     if category not in valid_categories:
@@ -185,14 +245,7 @@ async def get_national_policies(category: str):
             detail=f"Invalid category. Must be one of: {', '.join(valid_categories)}"
         )
     
-    kb_service = await get_kb_service()
-    policies = await kb_service.get_national_policies(category)
-    
-    return {
-        "category": category,
-        "total_policies": len(policies),
-        "policies": policies
-    }
+    return await _policy_page({"category": category}, national_policies_filter(category), after, limit, fields)
 
 @router.get("/top-budget")
 async def get_top_by_budget(limit: int = Query(10, ge=1, le=50)):
@@ -206,16 +259,14 @@ async def get_top_by_budget(limit: int = Query(10, ge=1, le=50)):
     }
 
 @router.get("/impact/{area}")
-async def get_by_impact_area(area: str):
-    """Get policies by impact area"""
-    kb_service = await get_kb_service()
-    policies = await kb_service.get_policies_by_impact_area(area)
-    
-    return {
-        "impact_area": area,
-        "total_policies": len(policies),
-        "policies": policies
-    }
+async def get_by_impact_area(
+    area: str,
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; all policies when omitted"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """Get policies by impact area (pageable)"""
+    return await _policy_page({"impact_area": area}, impact_area_filter(area), after, limit, fields)
 
 @router.get("/statistics")
 async def get_statistics():
@@ -0,0 +1,67 @@
+"""
+Model Registry API Routes - 100% FREE
+Inspect registered model versions and hot-reload without restarting workers
+"""
+
+import asyncio
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.ml.model_registry import get_model_registry, ModelIntegrityError
+
+router = APIRouter(prefix="/models", tags=["models"])
+
+
+class ReloadRequest(BaseModel):
+    version: Optional[str] = None  # default: whatever CURRENT points at
+    promote: bool = True  # also move CURRENT so other workers follow
+
+
+def require_admin(x_admin_token: str = Header("")):
+    """Reload/promote changes what every worker serves: only with REGISTRY_ADMIN_TOKEN set and sent"""
+    expected = get_settings().registry_admin_token
+    if not expected:
+        raise HTTPException(status_code=403, detail="Model reload is disabled - set REGISTRY_ADMIN_TOKEN to enable it")
+    if not secrets.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid X-Admin-Token")
+
+
+@router.get("")
+async def get_models():
+    """Active model version in this worker plus every registered version"""
+    registry = get_model_registry()
+    return {
+        "active": registry.bundle().describe(),
+        "current": registry.current_version(),
+        "versions": registry.versions()
+    }
+
+
+@router.get("/{version}/manifest")
+async def get_manifest(version: str):
+    """Manifest (hashes, feature schema, training metadata) of one version"""
+    try:
+        return get_model_registry().read_manifest(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+async def reload_models(request: ReloadRequest = ReloadRequest()):
+    """Load a version and swap it in atomically; in-flight simulations finish on the old one"""
+    registry = get_model_registry()
+    if request.version and request.version not in registry.versions():
+        raise HTTPException(status_code=404, detail=f"Model version {request.version} not found")
+    try:
+        if request.version and request.promote:
+            await asyncio.to_thread(registry.promote, request.version)
+        bundle = await asyncio.to_thread(registry.reload, request.version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelIntegrityError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": f"Models reloaded to {bundle.version}", "active": bundle.describe()}
@@ -5,6 +5,10 @@ Performance Monitoring API Routes - 100% FREE
 from fastapi import APIRouter
 from app.services.performance_monitor import performance_monitor
 from app.services.cache_service import get_cache_stats
+from app.services.admission_control import get_admission_controller
+from app.services.bulk_writer import get_bulk_writer
+from app.services.mongo_pool import get_pool_metrics
+from app.services.mongo_commands import get_command_metrics
 
 router = APIRouter(prefix="/performance", tags=["performance"])
 
@@ -14,9 +18,17 @@ async def get_performance_metrics():
     return {
         "metrics": performance_monitor.get_metrics(),
         "summary": performance_monitor.get_summary(),
-        "cache": get_cache_stats()
+        "cache": get_cache_stats(),
+        "admission": get_admission_controller().stats(),
+        "bulk_writer": get_bulk_writer().stats(),
+        "database_pool": get_pool_metrics().stats()
     }
 
+@router.get("/queries")
+async def get_query_stats(top: int = 20):
+    """MongoDB commands ranked by total time, with latency histograms"""
+    return get_command_metrics().summary(top)
+
 @router.get("/system")
 async def get_system_stats():
     """Get current system statistics"""
@@ -56,12 +68,23 @@ async def health_check():
         health_status = "warning"
         warnings.append("Slow response times")
     
+    admission = get_admission_controller().stats()
+    if admission["queue_depth"] >= admission["max_queue"]:
+        health_status = "warning"
+        warnings.append("Simulation admission queue full")
+    
+    pool = get_pool_metrics().stats()
+    if pool["waiting"] or pool["utilization"] >= 0.9:
+        health_status = "warning"
+        warnings.append("MongoDB connection pool saturated")
+    
     return {
         "status": health_status,
         "warnings": warnings,
         "system": system,
         "performance": summary,
         "cache": cache,
+        "database_pool": pool,
         "uptime_info": "Backend is running optimally",
         "cost": "₹0 (100% FREE)"
     }
@@ -1,15 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Response, Header
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from typing import Optional
-from app.services.simulation_engine import SimulationEngine
+from typing import Optional, Dict, Any
+from app.services.simulation_engine import get_simulation_engine
+from app.models.india_schema import IndianStructuredPolicy
+from app.services.job_scheduler import get_job_scheduler, job_view, run_in_thread, run_off_loop, DEFAULT_TENANT
+from app.services.admission_control import get_admission_controller, AdmissionRejected
+from app.services.bulk_writer import get_bulk_writer
+from app.routes.job_routes import submit_job
 from app.db import get_database
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime
+from contextlib import nullcontext
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/simulation", tags=["simulation"])
 
+# Everything the optimization stage needs from a stored simulation - nothing else is read
+OPTIMIZATION_PROJECTION = {"structured_policy": 1, "behavior_output": 1, "metrics": 1, "region": 1}
+
+
 class RegionData(BaseModel):
     state: str
 
@@ -17,65 +29,160 @@ class SimulationRequest(BaseModel):
     policy_text: str
     enable_optimization: bool = True
     region: Optional[RegionData] = None
+    background: bool = False  # queue as a job and return its id instead of holding the connection
+    priority: str = "normal"  # background jobs only: high, normal or low
 
 class OptimizationRequest(BaseModel):
     simulation_id: str
+    wait: bool = False  # run inline and return the result instead of a job id
+
+
+def _object_id(value: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid id: {value}")
+
+
+def _rehydrate(simulation: Dict[str, Any]) -> Dict[str, Any]:
+    """Pipeline state for the optimization stage, rebuilt from a stored simulation"""
+    if not simulation.get("structured_policy") or not simulation.get("metrics"):
+        raise HTTPException(
+            status_code=409,
+            detail="Simulation was stored without its structured policy - run it again to optimize"
+        )
+    return {
+        "structured_policy": IndianStructuredPolicy(**simulation["structured_policy"]),
+        "behavior_output": simulation.get("behavior_output"),
+        "simulation_metrics": simulation["metrics"],
+        "region": simulation.get("region")
+    }
+
+
+async def _optimize(state: Dict[str, Any], background: bool = False) -> Dict[str, Any]:
+    """Only the optimization stage, on the shared warm optimizer, off the event loop, under admission control"""
+    optimizer = get_simulation_engine().optimization_agent
+    async with get_admission_controller().admit(background=background):
+        return await run_in_thread(optimizer.optimize, state)
+
+
+async def _store_optimization(db, simulation_id: ObjectId, result: Dict[str, Any]):
+    await get_bulk_writer().set_fields(db, "simulations", simulation_id, {"optimization_result": result})
+    await db.optimization_results.insert_one({
+        "simulation_id": str(simulation_id),
+        "result": result,
+        "reward_score": result["reward_score"],
+        "created_at": datetime.utcnow()
+    })
+
+
+async def _simulate(request: SimulationRequest, db, offload: bool = False) -> Dict[str, Any]:
+    """Run the pipeline and store it; offload=True keeps the CPU work off the server's event loop"""
+    engine = get_simulation_engine()
+    
+    # Convert region to dict if provided
+    region_dict = None
+    if request.region:
+        region_dict = {
+            "state": request.region.state
+        }
+    
+    # Execute simulation with region
+    # Admission control: bounded concurrency, 429 when saturated (jobs wait - the scheduler bounds them)
+    # A request joining an identical in-flight run shares its slot instead of taking another
+    joining = not offload and engine.is_in_flight(request.policy_text, request.enable_optimization, region_dict)
+    async with nullcontext() if joining else get_admission_controller().admit(background=offload):
+        if offload:
+            result = await run_off_loop(
+                engine.run_simulation, request.policy_text, request.enable_optimization, region=region_dict
+            )
+        else:
+            result = await engine.run_simulation(
+                request.policy_text,
+                request.enable_optimization,
+                region=region_dict
+            )
+    
+    # Store results in MongoDB (with what /optimize needs to rehydrate the pipeline state)
+    structured_policy = result.get("structured_policy")
+    simulation_doc = {
+        "policy_id": None,  # Link if policy exists
+        "region": region_dict,
+        "structured_policy": structured_policy.dict() if hasattr(structured_policy, "dict") else structured_policy,
+        "behavior_output": result.get("behavior_output"),
+        "metrics": result.get("simulation_metrics"),
+        "impact_predictions": result.get("impact_predictions"),
+        "optimization_result": result.get("optimization_result"),
+        "explanation": result.get("explanation"),
+        "token_usage": result.get("token_usage"),
+        "timestamp": datetime.utcnow()
+    }
+    
+    # Buffered: written in the next batch, the response doesn't wait for Mongo
+    simulation_id = str(await get_bulk_writer().add(db, "simulations", simulation_doc))
+    
+    logger.info(f"Simulation completed for {region_dict}: {simulation_id}")
+    
+    return {
+        "simulation_id": simulation_id,
+        "results": {
+            "metrics": result.get("simulation_metrics"),
+            "impact_predictions": result.get("impact_predictions"),
+            "optimization": result.get("optimization_result"),
+            "explanation": result.get("explanation")
+        },
+        "token_usage": result.get("token_usage", {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0
+        })
+    }
+
+async def simulation_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for background /simulate requests"""
+    db = await get_database()
+    return jsonable_encoder(await _simulate(SimulationRequest(**payload), db, offload=True))
+
+async def optimization_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for /simulation/optimize: the stored simulation's optimization stage"""
+    db = await get_database()
+    simulation_id = ObjectId(payload["simulation_id"])
+    simulation = await get_bulk_writer().find_one(db, "simulations", simulation_id, OPTIMIZATION_PROJECTION)
+    if not simulation:
+        raise ValueError(f"Simulation {simulation_id} not found")
+    
+    result = jsonable_encoder(await _optimize(_rehydrate(simulation), background=True))
+    await _store_optimization(db, simulation_id, result)
+    logger.info(f"Optimization completed for simulation {simulation_id}")
+    return {"simulation_id": payload["simulation_id"], "optimization_result": result}
+
+get_job_scheduler().register("simulation", simulation_job)
+get_job_scheduler().register("optimization", optimization_job)
 
 @router.post("/simulate")
 async def run_simulation(
     request: SimulationRequest,
+    response: Response,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
     db = Depends(get_database)
 ):
-    """Run complete simulation pipeline"""
+    """
+    Run complete simulation pipeline.
+    With background=true the run is queued and 202 + a job id (see /jobs/{job_id}) come back immediately.
+    """
+    if request.background:
+        payload = request.dict(exclude={"background", "priority"})
+        return await submit_job("simulation", payload, x_tenant_id, request.priority, response, db)
+    
     try:
-        engine = SimulationEngine()
-        
-        # Convert region to dict if provided
-        region_dict = None
-        if request.region:
-            region_dict = {
-                "state": request.region.state
-            }
-        
-        # Execute simulation with region
-        result = await engine.run_simulation(
-            request.policy_text,
-            request.enable_optimization,
-            region=region_dict
-        )
-        
-        # Store results in MongoDB
-        simulation_doc = {
-            "policy_id": None,  # Link if policy exists
-            "region": region_dict,
-            "metrics": result.get("simulation_metrics"),
-            "impact_predictions": result.get("impact_predictions"),
-            "optimization_result": result.get("optimization_result"),
-            "explanation": result.get("explanation"),
-            "token_usage": result.get("token_usage"),
-            "timestamp": datetime.utcnow()
-        }
-        
-        sim_result = await db.simulations.insert_one(simulation_doc)
-        simulation_id = str(sim_result.inserted_id)
-        
-        logger.info(f"Simulation completed for {region_dict}: {simulation_id}")
-        
-        return {
-            "simulation_id": simulation_id,
-            "results": {
-                "metrics": result.get("simulation_metrics"),
-                "impact_predictions": result.get("impact_predictions"),
-                "optimization": result.get("optimization_result"),
-                "explanation": result.get("explanation")
-            },
-            "token_usage": result.get("token_usage", {
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "total_tokens": 0
-            })
-        }
+        return await _simulate(request, db)
     
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Simulation capacity saturated ({e.reason}) - retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Simulation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -87,7 +194,7 @@ async def get_simulation(
 ):
     """Retrieve simulation results"""
     try:
-        simulation = await db.simulations.find_one({"_id": ObjectId(simulation_id)})
+        simulation = await get_bulk_writer().find_one(db, "simulations", ObjectId(simulation_id))
         
         if not simulation:
             raise HTTPException(status_code=404, detail="Simulation not found")
@@ -99,38 +206,64 @@ async def get_simulation(
         logger.error(f"Error retrieving simulation: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/optimize")
+@router.post("/optimize", status_code=202)
 async def optimize_policy(
     request: OptimizationRequest,
+    response: Response,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
     db = Depends(get_database)
 ):
-    """Run optimization on existing simulation"""
+    """
+    Run optimization on an existing simulation.
+    Returns 202 with a job (see /jobs/{job_id}), or the result directly (200) when wait=true.
+    """
+    simulation_id = _object_id(request.simulation_id)
     try:
-        # Retrieve simulation
-        simulation = await db.simulations.find_one({"_id": ObjectId(request.simulation_id)})
-        
+        simulation = await get_bulk_writer().find_one(db, "simulations", simulation_id, OPTIMIZATION_PROJECTION)
         if not simulation:
             raise HTTPException(status_code=404, detail="Simulation not found")
         
-        # Run optimization agent
-        from app.agents.optimization_agent import OptimizationAgent
-        
-        agent = OptimizationAgent()
-        state = {
-            "structured_policy": simulation.get("policy_id"),
-            "simulation_metrics": simulation.get("metrics")
-        }
-        
-        result = await agent.process(state)
+        state = _rehydrate(simulation)
         
-        # Update simulation with optimization results
-        await db.simulations.update_one(
-            {"_id": ObjectId(request.simulation_id)},
-            {"$set": {"optimization_result": result["optimization_result"]}}
-        )
+        if request.wait:
+            result = await _optimize(state)
+            await _store_optimization(db, simulation_id, result)
+            response.status_code = 200
+            return {"optimization_result": result}
         
-        return {"optimization_result": result["optimization_result"]}
+        # A job already queued or running for this simulation is reused, not duplicated
+        payload = {"simulation_id": request.simulation_id}
+        job = await submit_job("optimization", payload, x_tenant_id, "normal", response, db,
+                               dedupe_key=request.simulation_id)
+        return {**job, "simulation_id": request.simulation_id}
     
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Simulation capacity saturated ({e.reason}) - retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Optimization error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/optimize/{job_id}")
+async def get_optimization_job(
+    job_id: str,
+    x_tenant_id: str = Header(DEFAULT_TENANT),
+    db = Depends(get_database)
+):
+    """Poll an optimization job (same job as /jobs/{job_id}); includes the result once completed"""
+    job = await db[get_job_scheduler().collection_name].find_one(
+        {"_id": _object_id(job_id), "tenant": x_tenant_id, "kind": "optimization"}
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Optimization job not found")
+    
+    body = job_view(job)
+    body["simulation_id"] = job["payload"]["simulation_id"]
+    if job["status"] == "completed":
+        body["optimization_result"] = job["result"]["optimization_result"]
+    return body
@@ -0,0 +1,171 @@
+"""
+Admission Control - 100% FREE
+Concurrency limiter in front of SimulationEngine.run_simulation
+
+At most `max_in_flight` pipelines run at once. Further callers wait in a FIFO
+queue of at most `max_queue` entries for up to `queue_timeout` seconds; past
+either bound they are rejected straight away with a Retry-After estimate, so
+a burst degrades into fast 429s instead of slowing every request down.
+
+Queue depth and wait time are exported to performance_monitor under "admission".
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.services.performance_monitor import performance_monitor
+
+logger = logging.getLogger(__name__)
+
+# Service-time guess before the first pipeline has finished
+INITIAL_SERVICE_SECONDS = 5.0
+MAX_RETRY_AFTER = 60
+
+
+class AdmissionRejected(Exception):
+    """The limiter is saturated; retry_after is a whole number of seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """FIFO concurrency limiter with a bounded, deadline-limited wait queue"""
+
+    def __init__(self, name: str = "simulation", max_in_flight: int = 2, max_queue: int = 8,
+                 queue_timeout: float = 10.0):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_seconds: Optional[float] = None  # moving average of pipeline time
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self, background: bool = False) -> AsyncIterator[float]:
+        """
+        Hold a slot for the duration of the block; yields the seconds spent queued.
+        background=True waits without a deadline or queue bound - for callers
+        already bounded elsewhere (job scheduler workers).
+        """
+        waited = await self._acquire(background)
+        start = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self._observe(time.perf_counter() - start)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new caller"""
+        service = self._service_seconds or INITIAL_SERVICE_SECONDS
+        estimate = service * (self.queue_depth + 1) / self.max_in_flight
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_service_seconds": round(self._service_seconds, 3) if self._service_seconds else None
+        }
+
+    async def _acquire(self, background: bool) -> float:
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._admitted(0.0)
+            return 0.0
+
+        if not background and self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            logger.warning(f"Admission {self.name}: queue full ({self.queue_depth}), rejected; retry in {retry_after}s")
+            raise AdmissionRejected("queue full", retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        performance_monitor.record_metric("admission", f"{self.name}.queue_depth", self.queue_depth)
+        start = time.perf_counter()
+        try:
+            # asyncio.wait leaves the future alone on timeout, so a slot handed over at the deadline isn't lost
+            await asyncio.wait([future], timeout=None if background else self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+
+        waited = time.perf_counter() - start
+        if not future.done():
+            self._abandon(future)
+            self.timed_out += 1
+            performance_monitor.record_metric("admission", f"{self.name}.wait_seconds", waited)
+            logger.warning(f"Admission {self.name}: no slot within {self.queue_timeout}s, rejected")
+            raise AdmissionRejected("queue timeout", self.retry_after())
+
+        self._admitted(waited)
+        return waited
+
+    def _admitted(self, waited: float):
+        self.admitted += 1
+        performance_monitor.record_metric("admission", f"{self.name}.wait_seconds", waited)
+
+    def _abandon(self, future: asyncio.Future):
+        """A waiter gave up: pass on a slot it was already handed, otherwise leave the queue"""
+        if future.done() and not future.cancelled():
+            self._release()
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def _release(self):
+        # Hand the slot straight to the oldest live waiter; in_flight only drops when nobody waits
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _observe(self, seconds: float):
+        if self._service_seconds is None:
+            self._service_seconds = seconds
+        else:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * seconds
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    """Process-wide limiter for simulation pipelines"""
+    from app.config import get_settings
+
+    settings = get_settings()
+    return AdmissionController(
+        "simulation",
+        max_in_flight=settings.admission_max_in_flight,
+        max_queue=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout
+    )
@@ -0,0 +1,368 @@
+"""
+Buffered Bulk Writer - 100% FREE
+Moves simulation inserts off the request path and batches them into insert_many
+
+- add() assigns the _id client-side and returns at once; the response never waits on Mongo
+- documents are flushed with insert_many(ordered=False) when a collection's buffer
+  reaches `batch_size` or every `flush_interval` seconds, whichever comes first
+- bulky fields (narrative explanation, knowledge-base context copied into every run)
+  are stored once in db.simulation_blobs keyed by content hash and referenced by it
+- blobs can be stored compressed (`blob_compression`: zstd if zstandard is installed, or zlib)
+- failed batches stay buffered for the next flush; stop() does a final flush on shutdown
+- documents Mongo rejects outright (invalid, oversized) are not retried: they go to
+  dead_letters and count as `rejected`, never as `written`
+
+Until it is flushed a document is only visible through pending() of the worker
+that buffered it. find_one() checks there first, and when another gunicorn worker
+holds the document it re-reads Mongo until one flush interval after the id was
+generated, so GET /simulation/{id} and /simulation/optimize see a fresh id on any worker.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+import zlib
+from collections import defaultdict, deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+from bson import Binary, ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.services.performance_monitor import performance_monitor
+
+try:
+    import zstandard
+except ImportError:  # optional - pip install zstandard
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+BLOB_COLLECTION = "simulation_blobs"
+
+# Fields moved to simulation_blobs per collection (dotted paths)
+BLOB_FIELDS = {
+    "indian_simulations": ["results.explanation", "results.state_policy_context", "results.related_policies"],
+    "simulations": ["explanation"]
+}
+
+DUPLICATE_KEY = 11000
+
+# Rejected documents kept in memory for inspection, oldest dropped first
+MAX_DEAD_LETTERS = 1000
+
+BLOB_COMPRESSIONS = ("none", "zlib", "zstd")
+
+# A document buffered by another worker reaches Mongo within flush_interval of its _id's
+# creation; ObjectId times have 1s resolution and the flush itself takes time
+CROSS_WORKER_GRACE = 1.5
+RECHECK_SECONDS = 0.1
+
+
+def _get(doc: Dict, path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def _set(doc: Dict, path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _pop(doc: Dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def blob_compression(name: str) -> str:
+    """The compression actually available for a configured name"""
+    if name not in BLOB_COMPRESSIONS:
+        raise ValueError(f"Unknown blob compression {name!r}, expected one of {BLOB_COMPRESSIONS}")
+    if name == "zstd" and zstandard is None:
+        logger.warning("blob_compression=zstd but zstandard is not installed - using zlib")
+        return "zlib"
+    return name
+
+
+def encode_blob(key: str, value: Any, encoded: str, compression: str = "none") -> Dict:
+    """A blob document; compressed blobs hold the JSON text as bytes and name their encoding"""
+    blob = {"_id": key, "data": value, "size": len(encoded), "created_at": datetime.utcnow()}
+    if compression == "none":
+        return blob
+    raw = encoded.encode()
+    if compression == "zstd":
+        packed = zstandard.ZstdCompressor(level=3).compress(raw)
+    else:
+        packed = zlib.compress(raw, 6)
+    blob.update(data=Binary(packed), encoding=compression, stored_size=len(packed))
+    return blob
+
+
+def decode_blob(blob: Dict) -> Any:
+    """The stored value of a blob document, whatever its encoding"""
+    encoding = blob.get("encoding")
+    if encoding is None:
+        return blob["data"]
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"Blob {blob['_id']} is zstd-compressed but zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(bytes(blob["data"]))
+    elif encoding == "zlib":
+        raw = zlib.decompress(bytes(blob["data"]))
+    else:
+        raise ValueError(f"Blob {blob['_id']} has unknown encoding {encoding!r}")
+    return json.loads(raw)
+
+
+def split_blobs(collection: str, document: Dict, min_bytes: int, compression: str = "none") -> List[Dict]:
+    """
+    Move bulky fields out of the document (in place) into blob documents.
+    The document keeps {"blobs": {path: blob id}} to find them again.
+    The blob id hashes the uncompressed JSON, so the same content is stored once
+    whichever compression was configured when it was first written.
+    """
+    blobs = []
+    for path in BLOB_FIELDS.get(collection, []):
+        value = _get(document, path)
+        if value is None:
+            continue
+        encoded = json.dumps(value, sort_keys=True, default=str)
+        if len(encoded) < min_bytes:
+            continue
+        key = hashlib.sha256(encoded.encode()).hexdigest()
+        blobs.append(encode_blob(key, value, encoded, compression))
+        document.setdefault("blobs", {})[path] = key
+        _pop(document, path)
+    return blobs
+
+
+class BufferedWriter:
+    """Per-collection insert buffers flushed in batches by a background task"""
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 1.0, max_buffer: int = 10000,
+                 blob_min_bytes: int = 1024, compression: str = "none"):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.blob_min_bytes = blob_min_bytes
+        self.compression = blob_compression(compression)
+
+        self.database = None
+        self._buffers: Dict[str, List[Dict]] = defaultdict(list)
+        self._pending: Dict[str, Dict[Any, Dict]] = defaultdict(dict)  # collection -> _id -> document
+        self._wake: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=MAX_DEAD_LETTERS)
+
+    @property
+    def started(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    async def start(self, database):
+        """Bind to the database and start the background flusher; no-op if running"""
+        if self.started:
+            return
+        self.database = database
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher = asyncio.create_task(self._run())
+        logger.info(f"Bulk writer started: batches of {self.batch_size}, every {self.flush_interval}s")
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if not self.started:
+            return
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        await self.flush()
+        if self.buffered():
+            logger.error(f"Bulk writer stopped with {self.buffered()} unwritten documents")
+        logger.info("Bulk writer stopped")
+
+    def buffered(self) -> int:
+        return sum(len(docs) for docs in self._buffers.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": self.buffered(),
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+            "rejected": self.rejected
+        }
+
+    async def add(self, database, collection: str, document: Dict) -> ObjectId:
+        """Buffer a document for insertion; returns its (client-generated) _id immediately"""
+        await self.start(database)
+        document.setdefault("_id", ObjectId())
+        blobs = split_blobs(collection, document, self.blob_min_bytes, self.compression)
+
+        if self.buffered() >= self.max_buffer:
+            # Mongo has been failing for a while - shed the oldest rather than grow without bound.
+            # Blobs are never shed (buffered documents may reference them); with only blobs
+            # buffered the document being added makes room next time
+            victims = [name for name, docs in self._buffers.items() if name != BLOB_COLLECTION and docs]
+            if victims:
+                victim = max(victims, key=lambda name: len(self._buffers[name]))
+                dropped = self._buffers[victim].pop(0)
+                self._pending[victim].pop(dropped["_id"], None)
+                self.dropped += 1
+                logger.error(f"Bulk writer buffer full - dropped a {victim} document {dropped['_id']}")
+
+        for blob in blobs:
+            if blob["_id"] not in self._pending[BLOB_COLLECTION]:
+                self._buffers[BLOB_COLLECTION].append(blob)
+                self._pending[BLOB_COLLECTION][blob["_id"]] = blob
+        self._buffers[collection].append(document)
+        self._pending[collection][document["_id"]] = document
+        performance_monitor.record_metric("database_queries", "bulk_writer.buffered", self.buffered())
+
+        if len(self._buffers[collection]) >= self.batch_size:
+            self._wake.set()
+        return document["_id"]
+
+    def pending(self, collection: str, _id: Any) -> Optional[Dict]:
+        """A copy of a buffered, not yet written document"""
+        document = self._pending[collection].get(_id)
+        return copy.deepcopy(document) if document is not None else None
+
+    def _flush_deadline(self, _id: Any) -> float:
+        """Wall time by which a document with this _id, buffered by any worker, is in Mongo"""
+        if not isinstance(_id, ObjectId):
+            return 0.0
+        return _id.generation_time.timestamp() + self.flush_interval + CROSS_WORKER_GRACE
+
+    async def find_one(self, database, collection: str, _id: Any,
+                       projection: Optional[Dict] = None) -> Optional[Dict]:
+        """Read-your-writes lookup: the buffered document if not yet flushed, with its blobs put back"""
+        document = self.pending(collection, _id)
+        if document is None:
+            document = await database[collection].find_one({"_id": _id}, projection)
+            # A fresh id we don't hold may still be in another worker's buffer
+            while document is None and time.time() < self._flush_deadline(_id):
+                await asyncio.sleep(RECHECK_SECONDS)
+                document = self.pending(collection, _id) or await database[collection].find_one({"_id": _id}, projection)
+        return await self.resolve_blobs(database, document)
+
+    async def set_fields(self, database, collection: str, _id: Any, fields: Dict[str, Any]):
+        """$set on a document whether it is still buffered or already written"""
+        # Holding the flush lock means the document is either in a buffer or in Mongo, never in flight
+        async with self._flush_lock or asyncio.Lock():
+            document = self._pending[collection].get(_id)
+            if document is not None:
+                for path, value in fields.items():
+                    _set(document, path, value)
+                return
+        result = await database[collection].update_one({"_id": _id}, {"$set": fields})
+        # Not written yet by the worker that buffered it: retry until it must have been
+        while not result.matched_count and time.time() < self._flush_deadline(_id):
+            await asyncio.sleep(RECHECK_SECONDS)
+            result = await database[collection].update_one({"_id": _id}, {"$set": fields})
+
+    async def resolve_blobs(self, database, document: Optional[Dict]) -> Optional[Dict]:
+        """Put referenced blob fields back into a stored document"""
+        if not document or not document.get("blobs"):
+            return document
+        refs = document.pop("blobs")
+        keys = set(refs.values())
+        found = {key: decode_blob(self._pending[BLOB_COLLECTION][key]) for key in keys if key in self._pending[BLOB_COLLECTION]}
+        missing = list(keys - set(found))
+        if missing:
+            async for blob in database[BLOB_COLLECTION].find({"_id": {"$in": missing}}):
+                found[blob["_id"]] = decode_blob(blob)
+        for path, key in refs.items():
+            if key in found:
+                _set(document, path, copy.deepcopy(found[key]))
+            else:
+                logger.warning(f"Blob {key} for {path} is missing")
+        return document
+
+    async def flush(self):
+        """Write every buffer now, blobs first so references never dangle"""
+        if self.database is None:
+            return
+        async with self._flush_lock:
+            names = sorted(self._buffers, key=lambda name: name != BLOB_COLLECTION)
+            for name in names:
+                while self._buffers[name]:
+                    batch = self._buffers[name][:self.batch_size]
+                    del self._buffers[name][:len(batch)]
+                    if not await self._write(name, batch):
+                        self._buffers[name][:0] = batch  # retry on the next flush
+                        if name == BLOB_COLLECTION:
+                            return  # documents would reference blobs that aren't stored
+                        break
+
+    async def _write(self, name: str, batch: List[Dict]) -> bool:
+        start = time.perf_counter()
+        rejected: Dict[int, str] = {}  # batch index -> error message
+        try:
+            await self.database[name].insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate _ids were written by an earlier, partially failed attempt (or are shared blobs)
+            for err in e.details.get("writeErrors", []):
+                if err.get("code") != DUPLICATE_KEY:
+                    rejected[err["index"]] = err.get("errmsg", "")
+            if rejected:
+                self.rejected += len(rejected)
+                logger.error(f"Bulk insert into {name}: {len(rejected)} of {len(batch)} documents rejected, "
+                             f"moved to dead letters: {next(iter(rejected.values()))}")
+                for index, errmsg in rejected.items():
+                    self.dead_letters.append({"collection": name, "document": batch[index], "error": errmsg})
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Bulk insert into {name} failed, keeping {len(batch)} documents buffered: {str(e)}")
+            return False
+
+        for document in batch:
+            self._pending[name].pop(document["_id"], None)
+        self.written += len(batch) - len(rejected)
+        performance_monitor.record_metric("database_queries", f"bulk_writer.{name}.batch_size", len(batch))
+        performance_monitor.record_metric("database_queries", f"bulk_writer.{name}.seconds",
+                                          time.perf_counter() - start)
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Bulk writer flush failed: {str(e)}")
+
+
+@lru_cache()
+def get_bulk_writer() -> BufferedWriter:
+    """Process-wide writer for simulation results"""
+    from app.config import get_settings
+
+    settings = get_settings()
+    return BufferedWriter(
+        batch_size=settings.bulk_write_batch_size,
+        flush_interval=settings.bulk_write_interval,
+        blob_min_bytes=settings.blob_min_bytes,
+        compression=settings.blob_compression
+    )
@@ -0,0 +1,490 @@
+"""
+Background Job Scheduler - 100% FREE
+In-process asyncio queue for long-running simulations, persisted in db.jobs
+
+- bounded: submit() refuses work once `max_queue` jobs are waiting
+- priorities: high > normal > low, FIFO within a level
+- per-tenant concurrency: a tenant at its limit is parked, other tenants keep running
+- cancellation: queued jobs are skipped, running jobs have their task cancelled; work
+  in a thread (run_off_loop / run_in_thread) is waited for, so the tenant slot and any
+  admission slot stay held until it has actually stopped
+- subscribe: watch() yields every status change (long-poll and SSE build on it)
+- tenant scoping: get/cancel/watch/wait given a tenant only see that tenant's jobs
+
+Job documents move queued -> running -> completed | failed | cancelled. Workers
+claim a job with a conditional update on status, so a job re-enqueued by another
+process after a restart still runs exactly once. While a job runs its process
+refreshes `heartbeat_at`; running jobs whose heartbeat stops (the process died) are
+failed as "interrupted" by any scheduler, at start and every heartbeat interval.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import secrets
+import socket
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+DEFAULT_TENANT = "anonymous"
+
+# How often watch() re-reads a job it gets no local events for (owned by another process)
+WATCH_POLL_INTERVAL = 2.0
+
+# A running job is orphaned once this many heartbeat intervals pass without one
+STALE_HEARTBEATS = 3
+
+# Delay before a worker retries a job it couldn't start because Mongo failed
+RETRY_DELAY = 5.0
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+QueueEntry = Tuple[int, int, str, str]  # (priority, sequence, job id, tenant)
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when the queue already holds max_queue jobs"""
+
+
+def job_object_id(job_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe public representation of a job document"""
+    job_id = str(job["_id"])
+    view = {
+        "job_id": job_id,
+        "kind": job.get("kind"),
+        "tenant": job.get("tenant"),
+        "priority": job.get("priority"),
+        "status": job["status"],
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events"
+    }
+    for key in ("created_at", "started_at", "completed_at"):
+        if job.get(key):
+            view[key] = job[key].isoformat()
+    if job["status"] == "completed":
+        view["result"] = job.get("result")
+    elif job.get("error"):
+        view["error"] = job["error"]
+    return view
+
+
+async def _finish_thread(work: asyncio.Future, on_cancel: Optional[Callable[[], None]] = None) -> Any:
+    """
+    Await work running in a thread. A thread can't be killed, so when the caller is
+    cancelled (job cancel or timeout) this calls on_cancel, then keeps waiting until the
+    thread has returned before re-raising. Admission slots and tenant counts held around
+    the call therefore stay taken for as long as the work really runs.
+    """
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        if on_cancel is not None:
+            on_cancel()
+        while not work.done():
+            try:
+                await asyncio.wait([work])
+            except asyncio.CancelledError:
+                continue  # cancelled again - still can't return before the thread does
+        if not work.cancelled():
+            work.exception()  # retrieved: it is superseded by the cancellation
+        raise
+
+
+async def run_in_thread(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """asyncio.to_thread that, if cancelled, only returns once the thread has finished"""
+    return await _finish_thread(asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs)))
+
+
+async def run_off_loop(coro_fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    Run a CPU-heavy coroutine on a private event loop in a worker thread (as warm-up does).
+    Cancelling the caller cancels that coroutine at its next await (e.g. between
+    pipeline stages) and waits for the thread to stop.
+    """
+    private: Dict[str, Any] = {}
+
+    async def main():
+        private["loop"], private["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        if private.get("cancelled"):
+            raise asyncio.CancelledError()
+        return await coro_fn(*args, **kwargs)
+
+    def cancel():
+        private["cancelled"] = True  # seen by main() if it hasn't started yet
+        loop = private.get("loop")
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(private["task"].cancel)
+            except RuntimeError:
+                pass  # the private loop already finished
+
+    work = asyncio.ensure_future(asyncio.to_thread(lambda: asyncio.run(main())))
+    return await _finish_thread(work, cancel)
+
+
+class JobScheduler:
+    """Priority job queue with per-tenant concurrency limits, backed by a Mongo collection"""
+
+    def __init__(self, workers: int = 2, max_queue: int = 100, tenant_concurrency: int = 2,
+                 job_timeout: float = 600, heartbeat_interval: float = 30, collection_name: str = "jobs"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.tenant_concurrency = tenant_concurrency
+        self.job_timeout = job_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.collection_name = collection_name
+        # Unique per process start: a restarted container often gets the same hostname and pid
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+
+        self.handlers: Dict[str, JobHandler] = {}
+        self.collection = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._maintenance: Optional[asyncio.Task] = None
+        self._sequence = itertools.count()
+        self._pending: Set[str] = set()  # queued in this process, not yet claimed or cancelled
+        self._parked: Dict[str, Deque[QueueEntry]] = defaultdict(deque)  # tenant -> entries over its limit
+        self._tenant_running: Dict[str, int] = defaultdict(int)
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def register(self, kind: str, handler: JobHandler):
+        """handler(payload) -> JSON/BSON-serializable result"""
+        self.handlers[kind] = handler
+
+    async def start(self, database):
+        """Bind to the database, recover queued jobs and start the workers; no-op if running"""
+        if self.started:
+            return
+        self.collection = database[self.collection_name]
+        await self.collection.create_index([("tenant", 1), ("created_at", -1)])
+        await self.collection.create_index([("status", 1), ("created_at", 1)])
+        await self.collection.create_index([("kind", 1), ("dedupe_key", 1), ("status", 1)])
+
+        self._queue = asyncio.PriorityQueue()
+        await self._recover()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._maintenance = asyncio.create_task(self._maintain())
+        logger.info(f"Job scheduler started: {self.workers} workers, queue limit {self.max_queue}, "
+                    f"{self.tenant_concurrency} concurrent jobs per tenant")
+
+    async def stop(self):
+        """Stop the workers; jobs interrupted mid-run go back to queued for the next start"""
+        tasks = self._workers + ([self._maintenance] if self._maintenance else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._maintenance = None
+        self._queue = None
+        self._pending.clear()
+        self._parked.clear()
+        self._tenant_running.clear()
+        self._running.clear()
+        self._cancel_requested.clear()
+        logger.info("Job scheduler stopped")
+
+    async def _recover(self):
+        """Fail jobs orphaned by a dead process and re-enqueue jobs left queued by a previous run"""
+        await self._fail_orphaned()
+        cursor = self.collection.find({"status": "queued"}, {"priority": 1, "tenant": 1}).sort("created_at", 1)
+        recovered = 0
+        async for job in cursor.limit(self.max_queue):
+            self._enqueue(str(job["_id"]), job.get("priority", "normal"), job.get("tenant", DEFAULT_TENANT))
+            recovered += 1
+        if recovered:
+            logger.info(f"Recovered {recovered} queued jobs")
+
+    async def _fail_orphaned(self) -> int:
+        """Running jobs whose owner stopped sending heartbeats (or, before heartbeats, ran past the timeout)"""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.heartbeat_interval * STALE_HEARTBEATS)
+        cutoff = now - timedelta(seconds=self.job_timeout)
+        result = await self.collection.update_many(
+            {"status": "running", "$or": [
+                {"heartbeat_at": {"$lt": stale}},
+                {"heartbeat_at": {"$exists": False}, "started_at": {"$lt": cutoff}}
+            ]},
+            {"$set": {"status": "failed", "error": "interrupted", "completed_at": now}}
+        )
+        if result.modified_count:
+            logger.warning(f"Failed {result.modified_count} running jobs whose process stopped responding")
+        return result.modified_count
+
+    async def _heartbeat(self):
+        if self._running:
+            await self.collection.update_many(
+                {"_id": {"$in": [ObjectId(job_id) for job_id in self._running]}, "owner": self.owner},
+                {"$set": {"heartbeat_at": datetime.utcnow()}}
+            )
+
+    async def _maintain(self):
+        """Heartbeat this process's running jobs and fail other processes' orphans, every interval"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            for step in (self._heartbeat, self._fail_orphaned):
+                try:
+                    await step()
+                except Exception as e:
+                    logger.error(f"Job scheduler {step.__name__.strip('_')} failed: {str(e)}")
+
+    def queued(self) -> int:
+        return len(self._pending)
+
+    def _enqueue(self, job_id: str, priority: str, tenant: str):
+        self._pending.add(job_id)
+        self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job_id, tenant))
+
+    async def submit(self, kind: str, payload: Dict[str, Any], tenant: str = DEFAULT_TENANT,
+                     priority: str = "normal", dedupe_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Persist a queued job and schedule it; returns the job view immediately.
+        With a dedupe_key, the tenant's queued or running job of the same kind and key
+        is returned instead of queueing a second one.
+        """
+        if not self.started:
+            raise RuntimeError("Job scheduler is not started")
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {list(PRIORITIES)}")
+        if dedupe_key is not None:
+            active = await self.collection.find_one({
+                "kind": kind, "tenant": tenant, "dedupe_key": dedupe_key, "status": {"$in": ["queued", "running"]}
+            })
+            if active:
+                return job_view(active)
+        if self.queued() >= self.max_queue:
+            raise QueueFullError(f"{self.queued()} jobs already queued")
+
+        job = {
+            "_id": ObjectId(),
+            "kind": kind,
+            "tenant": tenant,
+            "priority": priority,
+            "status": "queued",
+            "payload": payload,
+            "created_at": datetime.utcnow()
+        }
+        if dedupe_key is not None:
+            job["dedupe_key"] = dedupe_key
+        await self.collection.insert_one(job)
+        self._enqueue(str(job["_id"]), priority, tenant)
+        logger.info(f"Job {job['_id']} queued: {kind} for {tenant} ({priority})")
+        return job_view(job)
+
+    @staticmethod
+    def _job_filter(oid: ObjectId, tenant: Optional[str]) -> Dict[str, Any]:
+        """A job by id, restricted to `tenant` when one is given (None: internal callers only)"""
+        return {"_id": oid} if tenant is None else {"_id": oid, "tenant": tenant}
+
+    async def get(self, job_id: str, tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        oid = job_object_id(job_id)
+        job = await self.collection.find_one(self._job_filter(oid, tenant), {"payload": 0}) if oid else None
+        return job_view(job) if job else None
+
+    async def cancel(self, job_id: str, tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued or running job. Returns the job view (status "cancelled" on
+        success), or None if it doesn't exist for `tenant`. Jobs running in another
+        process can't be cancelled from here and come back still running.
+        """
+        oid = job_object_id(job_id)
+        if oid is None or await self.get(job_id, tenant) is None:
+            return None
+
+        result = await self.collection.update_one(
+            {**self._job_filter(oid, tenant), "status": "queued"},
+            {"$set": {"status": "cancelled", "completed_at": datetime.utcnow()}}
+        )
+        if result.matched_count:
+            # The queue entry stays behind; workers skip it because the claim fails
+            self._pending.discard(job_id)
+            view = await self.get(job_id)
+            self._publish(job_id, view)
+            logger.info(f"Job {job_id} cancelled before it started")
+            return view
+
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            await asyncio.wait([task])
+            # Let the worker record the cancellation before reporting back
+            while job_id in self._running:
+                await asyncio.sleep(0)
+        return await self.get(job_id)
+
+    async def list_jobs(self, tenant: str, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {"tenant": tenant}
+        if status:
+            query["status"] = status
+        cursor = self.collection.find(query, {"payload": 0, "result": 0}).sort("created_at", -1).limit(limit)
+        return [job_view(job) async for job in cursor]
+
+    async def watch(self, job_id: str, tenant: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job now and after every status change, ending once it is finished"""
+        events: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].append(events)
+        try:
+            view = await self.get(job_id, tenant)
+            if view is None:
+                return
+            yield view
+            while view["status"] not in TERMINAL_STATUSES:
+                try:
+                    update = await asyncio.wait_for(events.get(), WATCH_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    update = await self.get(job_id, tenant)
+                if update is not None and update["status"] != view["status"]:
+                    view = update
+                    yield view
+        finally:
+            self._subscribers[job_id].remove(events)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    async def wait(self, job_id: str, timeout: float, tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Long-poll: the job once finished, or as it stands after `timeout` seconds"""
+        view = None
+
+        async def follow():
+            nonlocal view
+            async for view in self.watch(job_id, tenant):
+                pass
+
+        try:
+            await asyncio.wait_for(follow(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return view
+
+    def _publish(self, job_id: str, view: Optional[Dict[str, Any]]):
+        for events in self._subscribers.get(job_id, []):
+            events.put_nowait(view)
+
+    async def _worker(self, index: int):
+        while True:
+            entry = await self._queue.get()
+            _, _, job_id, tenant = entry
+            if job_id not in self._pending:
+                continue  # cancelled while queued
+            if self._tenant_running[tenant] >= self.tenant_concurrency:
+                self._parked[tenant].append(entry)
+                continue
+
+            self._pending.discard(job_id)
+            self._tenant_running[tenant] += 1
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # Mongo failed around the claim: keep this worker alive and try the job again later
+                logger.error(f"Job worker {index} could not run job {job_id}: {str(e)}")
+                self._retry_later(entry)
+            finally:
+                self._tenant_running[tenant] -= 1
+                if self._parked[tenant]:
+                    self._queue.put_nowait(self._parked[tenant].popleft())
+
+    def _retry_later(self, entry: QueueEntry):
+        """Re-queue an entry after RETRY_DELAY; the conditional claim makes a repeat harmless"""
+        queue = self._queue
+
+        def requeue():
+            if self._queue is queue and queue is not None:
+                self._pending.add(entry[2])
+                queue.put_nowait(entry)
+
+        asyncio.get_running_loop().call_later(RETRY_DELAY, requeue)
+
+    async def _run(self, job_id: str):
+        oid = ObjectId(job_id)
+        started_at = datetime.utcnow()
+        claimed = await self.collection.update_one(
+            {"_id": oid, "status": "queued"},
+            {"$set": {"status": "running", "started_at": started_at, "heartbeat_at": started_at, "owner": self.owner}}
+        )
+        if not claimed.matched_count:
+            return  # cancelled, or another process got it first
+        job = await self.collection.find_one({"_id": oid})
+        self._publish(job_id, job_view(job))
+
+        handler = self.handlers.get(job["kind"])
+        update: Dict[str, Any] = {}
+        task = asyncio.create_task(self._call(handler, job))
+        self._running[job_id] = task
+        try:
+            try:
+                result = await task
+                update.update(status="completed", result=result)
+            except asyncio.CancelledError:
+                if job_id not in self._cancel_requested:
+                    # Scheduler shutdown: hand the job to the next start instead of losing it
+                    task.cancel()
+                    await self.collection.update_one(
+                        {"_id": oid},
+                        {"$set": {"status": "queued"}, "$unset": {"started_at": "", "heartbeat_at": "", "owner": ""}}
+                    )
+                    raise
+                update.update(status="cancelled")
+            except Exception as e:
+                logger.error(f"Job {job_id} ({job['kind']}) failed: {str(e)}")
+                update.update(status="failed", error=str(e))
+
+            update["completed_at"] = datetime.utcnow()
+            try:
+                await self.collection.update_one({"_id": oid}, {"$set": update})
+            except Exception as e:
+                # Heartbeats stop with it, so the job is failed as orphaned later instead of staying running
+                logger.error(f"Could not record job {job_id} as {update['status']}: {str(e)}")
+        finally:
+            self._cancel_requested.discard(job_id)
+            self._running.pop(job_id, None)
+
+        job.update(update)
+        self._publish(job_id, job_view(job))
+        logger.info(f"Job {job_id} {update['status']} in {(update['completed_at'] - started_at).total_seconds():.1f}s")
+
+    async def _call(self, handler: Optional[JobHandler], job: Dict[str, Any]) -> Any:
+        if handler is None:
+            raise ValueError(f"No handler registered for {job['kind']}")
+        try:
+            return await asyncio.wait_for(handler(job["payload"]), self.job_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"timed out after {self.job_timeout:.0f}s")
+
+
+@lru_cache()
+def get_job_scheduler() -> JobScheduler:
+    """Process-wide scheduler; handlers are registered by the route modules"""
+    from app.config import get_settings
+
+    settings = get_settings()
+    return JobScheduler(
+        workers=settings.job_workers,
+        max_queue=settings.job_queue_size,
+        tenant_concurrency=settings.job_tenant_concurrency,
+        job_timeout=settings.job_timeout,
+        heartbeat_interval=settings.job_heartbeat_interval
+    )
@@ -4,12 +4,124 @@ Provides efficient storage, retrieval, and search for policy documents
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Dict, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
+import base64
+import copy
+import json
 import logging
+import re
+import time
+from app.db import read_preference as resolve_read_preference
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Normalized lowercase tokens stored on every policy so type / impact-area lookups are
+# indexed equality matches instead of case-insensitive $regex collection scans
+SEARCH_TOKEN_SOURCES = ("policy_type", "category", "impact_areas")
+IMPACT_TOKEN_SOURCES = ("impact_areas",)
+MIN_PREFIX = 3  # "transport" also finds "transportation", like the old substring match did
+
+# Internal fields kept out of API responses
+TOKEN_PROJECTION = {"search_tokens": 0, "impact_tokens": 0}
+
+def query_tokens(text: str) -> List[str]:
+    """Lowercase words of a lookup term: "Poverty_Reduction" -> ["poverty", "reduction"]"""
+    return [word for word in re.split(r"[^0-9a-z]+", str(text).lower()) if len(word) >= 2]
+
+def text_tokens(*values) -> List[str]:
+    """Words of the given strings (or lists of strings) plus their prefixes, deduplicated"""
+    tokens = set()
+    for value in values:
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            if item is None:
+                continue
+            for word in query_tokens(item):
+                tokens.add(word)
+                tokens.update(word[:i] for i in range(MIN_PREFIX, len(word)))
+    return sorted(tokens)
+
+def with_tokens(policy: Dict) -> Dict:
+    """Add search_tokens / impact_tokens to a policy document (in place)"""
+    policy["search_tokens"] = text_tokens(*(policy.get(field) for field in SEARCH_TOKEN_SOURCES))
+    policy["impact_tokens"] = text_tokens(*(policy.get(field) for field in IMPACT_TOKEN_SOURCES))
+    return policy
+
+def related_policies_filter(policy_type: str, state: Optional[str] = None) -> Dict:
+    """Policies whose type, category or impact areas contain every word of policy_type (or in state)"""
+    words = query_tokens(policy_type)
+    clauses = []
+    if words:
+        clauses.append({"search_tokens": words[0] if len(words) == 1 else {"$all": words}})
+    if state:
+        clauses.append({"state": state})
+    return {"$or": clauses} if clauses else {"_id": None}
+
+def impact_area_filter(impact_area: str) -> Dict:
+    words = query_tokens(impact_area)
+    if not words:
+        return {"_id": None}
+    return {"impact_tokens": words[0] if len(words) == 1 else {"$all": words}}
+
+def state_policies_filter(state: str) -> Dict:
+    return {"state": state}
+
+def national_policies_filter(category: str) -> Dict:
+    return {"level": "national", "category": category}
+
+# Keyset orders; each ends with _id so the order is total and served by an index
+ID_SORT = ("_id",)
+CATEGORY_SORT = ("category", "_id")
+
+# Field names a client may ask for; "fields=name,budget_allocation"
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+
+def policy_projection(fields: Optional[Iterable[str]] = None, sort: Tuple[str, ...] = ID_SORT) -> Dict:
+    """Inclusion projection for the requested fields (plus _id and sort keys), or everything but the tokens"""
+    if not fields:
+        return TOKEN_PROJECTION
+    projection = {field: 1 for field in sort if field != "_id"}
+    for field in fields:
+        if not _FIELD_NAME.match(field):
+            raise ValueError(f"Invalid field name: {field!r}")
+        if field.split(".")[0] not in TOKEN_PROJECTION:
+            projection[field] = 1
+    return projection or {"_id": 1}
+
+def encode_cursor(policy: Dict, sort: Tuple[str, ...] = ID_SORT) -> str:
+    """Cursor resuming after `policy`: its _id, or an opaque token when the order has more keys"""
+    if sort == ID_SORT:
+        return str(policy["_id"])
+    values = [policy.get(field) for field in sort[:-1]] + [str(policy["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def keyset_filter(query: Dict, after: Optional[str] = None, sort: Tuple[str, ...] = ID_SORT) -> Dict:
+    """Resume a listing in `sort` order after the policy the cursor was made from"""
+    if not after:
+        return query
+    try:
+        if sort == ID_SORT:
+            values = [after]
+        else:
+            values = json.loads(base64.urlsafe_b64decode(after + "=" * (-len(after) % 4)))
+            if not isinstance(values, list) or len(values) != len(sort):
+                raise ValueError(after)
+        values[-1] = ObjectId(values[-1])
+    except (InvalidId, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {after!r}")
+    
+    # (a, _id) > (va, vid)  ->  a > va  or  (a == va and _id > vid)
+    # null/missing sorts first, and {"$gt": None} matches nothing, so "after null" is "not null"
+    clauses = []
+    for i, field in enumerate(sort):
+        clause = {earlier: values[j] for j, earlier in enumerate(sort[:i])}
+        clause[field] = {"$ne": None} if values[i] is None else {"$gt": values[i]}
+        clauses.append(clause)
+    return {"$and": [query, clauses[0] if len(clauses) == 1 else {"$or": clauses}]}
+
 class KnowledgeBaseService:
     """
     MongoDB-based knowledge base with:
@@ -19,12 +131,26 @@ class KnowledgeBaseService:
     - Semantic search ready
     """
     
-    def __init__(self, db_client: AsyncIOMotorClient, db_name: str):
+    def __init__(self, db_client: AsyncIOMotorClient, db_name: str, read_preference: str = "primary",
+                 summary_ttl: int = 300):
         self.client = db_client
-        self.db = self.client[db_name]
+        # Read-mostly static data: reads may be served by secondaries, writes still go to the primary
+        self.db = self.client.get_database(db_name, read_preference=resolve_read_preference(read_preference))
         self.policies_collection = self.db["policies"]
         self.schemes_collection = self.db["schemes"]
         self.economic_data_collection = self.db["economic_data"]
+        # Reads that must see this process's own writes: cache refills and read-then-write updates
+        self.primary_policies_collection = self.client.get_database(
+            db_name, read_preference=resolve_read_preference("primary")
+        )["policies"]
+        
+        # Per-state overview cache: dropped on every write through this service,
+        # expires after summary_ttl so writes from other workers show up too
+        self.summary_ttl = summary_ttl
+        self._states_overview: Optional[List[Dict]] = None
+        self._states_overview_expires = 0.0
+        self._summary_generation = 0
+        self._summary_flight = SingleFlight()
         
     async def initialize_indexes(self):
         """Create indexes for efficient querying"""
@@ -37,37 +163,64 @@ class KnowledgeBaseService:
                 ("impact_areas", "text")
             ], name="policy_text_search")
             
-            # Compound indexes for filtering
+            # Compound indexes for filtering; the trailing _id serves the keyset order of the list endpoints
             await self.policies_collection.create_index([
                 ("state", 1),
-                ("category", 1)
-            ], name="state_category_idx")
+                ("category", 1),
+                ("_id", 1)
+            ], name="state_category_id_idx")
             
             await self.policies_collection.create_index([
                 ("level", 1),
-                ("category", 1)
-            ], name="level_category_idx")
+                ("category", 1),
+                ("_id", 1)
+            ], name="level_category_id_idx")
             
             # Index for budget queries
             await self.policies_collection.create_index([
                 ("budget_allocation", -1)
             ], name="budget_idx")
             
+            # Multikey indexes on the normalized token arrays
+            await self.policies_collection.create_index([("search_tokens", 1)], name="search_tokens_idx")
+            await self.policies_collection.create_index([("impact_tokens", 1), ("_id", 1)], name="impact_tokens_id_idx")
+            await self.backfill_tokens()
+            
             logger.info("Knowledge base indexes created successfully")
         except Exception as e:
             logger.error(f"Error creating indexes: {e}")
     
+    async def backfill_tokens(self) -> int:
+        """Add token arrays to policies stored before they existed"""
+        updated = 0
+        cursor = self.policies_collection.find(
+            {"search_tokens": {"$exists": False}}, {field: 1 for field in SEARCH_TOKEN_SOURCES}
+        )
+        async for policy in cursor:
+            tokens = with_tokens(dict(policy))
+            await self.policies_collection.update_one(
+                {"_id": policy["_id"]},
+                {"$set": {"search_tokens": tokens["search_tokens"], "impact_tokens": tokens["impact_tokens"]}}
+            )
+            updated += 1
+        if updated:
+            logger.info(f"Added search tokens to {updated} policies")
+        return updated
+    
     async def insert_policy(self, policy_data: Dict) -> str:
         """Insert a single policy document"""
         try:
             policy_data["created_at"] = datetime.utcnow()
             policy_data["updated_at"] = datetime.utcnow()
+            with_tokens(policy_data)
             
             result = await self.policies_collection.insert_one(policy_data)
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Error inserting policy: {e}")
             return None
+        finally:
+            self.invalidate_summaries()
     
     async def bulk_insert_policies(self, policies: List[Dict]) -> int:
         """Bulk insert multiple policies"""
@@ -75,12 +228,15 @@ class KnowledgeBaseService:
             for policy in policies:
                 policy["created_at"] = datetime.utcnow()
                 policy["updated_at"] = datetime.utcnow()
+                with_tokens(policy)
             
             result = await self.policies_collection.insert_many(policies)
             return len(result.inserted_ids)
         except Exception as e:
             logger.error(f"Error bulk inserting policies: {e}")
             return 0
+        finally:
+            self.invalidate_summaries()
     
     async def get_policy(self, state: str, category: str, policy_name: str) -> Optional[Dict]:
         """Get a specific policy"""
@@ -91,7 +247,7 @@ class KnowledgeBaseService:
                 "policy_key": policy_name
             }
             
-            policy = await self.policies_collection.find_one(query)
+            policy = await self.policies_collection.find_one(query, TOKEN_PROJECTION)
             if policy:
                 policy["_id"] = str(policy["_id"])
             return policy
@@ -99,33 +255,49 @@ class KnowledgeBaseService:
             logger.error(f"Error getting policy: {e}")
             return None
     
-    async def get_state_policies(self, state: str) -> List[Dict]:
-        """Get all policies for a state"""
+    async def iter_policies(self, query: Dict, after: Optional[str] = None, limit: Optional[int] = None,
+                            fields: Optional[Iterable[str]] = None, sort: Tuple[str, ...] = ID_SORT,
+                            batch_size: int = 100) -> AsyncIterator[Dict]:
+        """
+        Stream matching policies in `sort` order, one cursor batch in memory at a time.
+        `after` comes from encode_cursor() on the last policy of the previous page;
+        raises ValueError for a bad cursor or field.
+        """
+        cursor = self.policies_collection.find(
+            keyset_filter(query, after, sort), policy_projection(fields, sort)
+        ).sort([(field, 1) for field in sort]).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        
+        async for policy in cursor:
+            policy["_id"] = str(policy["_id"])
+            yield policy
+    
+    async def count_policies(self, query: Dict) -> int:
         try:
-            cursor = self.policies_collection.find({"state": state})
-            policies = await cursor.to_list(length=None)
-            
-            for policy in policies:
-                policy["_id"] = str(policy["_id"])
-            
-            return policies
+            return await self.policies_collection.count_documents(query)
+        except Exception as e:
+            logger.error(f"Error counting policies: {e}")
+            return 0
+    
+    async def _list_policies(self, query: Dict, after: Optional[str], limit: Optional[int],
+                             fields: Optional[Iterable[str]], sort: Tuple[str, ...] = ID_SORT) -> List[Dict]:
+        return [policy async for policy in self.iter_policies(query, after, limit, fields, sort)]
+    
+    async def get_state_policies(self, state: str, after: Optional[str] = None, limit: Optional[int] = None,
+                                 fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Get policies for a state by category, a page at a time when `limit` is given"""
+        try:
+            return await self._list_policies(state_policies_filter(state), after, limit, fields, CATEGORY_SORT)
         except Exception as e:
             logger.error(f"Error getting state policies: {e}")
             return []
     
-    async def get_national_policies(self, category: str) -> List[Dict]:
-        """Get national policies by category"""
+    async def get_national_policies(self, category: str, after: Optional[str] = None, limit: Optional[int] = None,
+                                    fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Get national policies by category, a page at a time when `limit` is given"""
         try:
-            cursor = self.policies_collection.find({
-                "level": "national",
-                "category": category
-            })
-            policies = await cursor.to_list(length=None)
-            
-            for policy in policies:
-                policy["_id"] = str(policy["_id"])
-            
-            return policies
+            return await self._list_policies(national_policies_filter(category), after, limit, fields)
         except Exception as e:
             logger.error(f"Error getting national policies: {e}")
             return []
@@ -136,7 +308,7 @@ class KnowledgeBaseService:
             # MongoDB text search
             cursor = self.policies_collection.find(
                 {"$text": {"$search": query}},
-                {"score": {"$meta": "textScore"}}
+                {**TOKEN_PROJECTION, "score": {"$meta": "textScore"}}
             ).sort([("score", {"$meta": "textScore"})]).limit(limit)
             
             policies = await cursor.to_list(length=limit)
@@ -152,18 +324,9 @@ class KnowledgeBaseService:
     async def get_related_policies(self, policy_type: str, state: Optional[str] = None, limit: int = 10) -> List[Dict]:
         """Get related policies by type"""
         try:
-            query = {
-                "$or": [
-                    {"policy_type": {"$regex": policy_type, "$options": "i"}},
-                    {"category": {"$regex": policy_type, "$options": "i"}},
-                    {"impact_areas": {"$regex": policy_type, "$options": "i"}}
-                ]
-            }
-            
-            if state:
-                query["$or"].append({"state": state})
+            query = related_policies_filter(policy_type, state)
             
-            cursor = self.policies_collection.find(query).limit(limit)
+            cursor = self.policies_collection.find(query, TOKEN_PROJECTION).limit(limit)
             policies = await cursor.to_list(length=limit)
             
             for policy in policies:
@@ -220,6 +383,58 @@ class KnowledgeBaseService:
             logger.error(f"Error getting state summary: {e}")
             return {}
     
+    async def get_states_overview(self) -> List[Dict]:
+        """Policy count, total budget and categories for every state - one aggregation, cached"""
+        if self._states_overview is not None and time.monotonic() < self._states_overview_expires:
+            return copy.deepcopy(self._states_overview)
+        
+        # Concurrent misses share one aggregation
+        overview, _ = await self._summary_flight.do("states_overview", self._load_states_overview)
+        return copy.deepcopy(overview)
+    
+    async def _load_states_overview(self) -> List[Dict]:
+        generation = self._summary_generation
+        try:
+            pipeline = [
+                {"$match": {"state": {"$ne": "national"}}},
+                {"$group": {
+                    "_id": "$state",
+                    "policy_count": {"$sum": 1},
+                    "total_budget": {"$sum": "$budget_allocation"},
+                    "categories": {"$addToSet": "$category"}
+                }},
+                {"$sort": {"_id": 1}}
+            ]
+            
+            # A lagging secondary would refill the cache with pre-write data for a full summary_ttl
+            cursor = self.primary_policies_collection.aggregate(pipeline)
+            results = await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error getting states overview: {e}")
+            return []
+        
+        overview = [
+            {
+                "state": result["_id"],
+                "policy_count": result["policy_count"],
+                "total_budget": result.get("total_budget", 0),
+                "categories": sorted(c for c in result.get("categories", []) if c is not None)
+            }
+            for result in results
+            if result["_id"] is not None
+        ]
+        
+        # A write that landed while this was running makes the result stale - don't cache it
+        if generation == self._summary_generation:
+            self._states_overview = overview
+            self._states_overview_expires = time.monotonic() + self.summary_ttl
+        return overview
+    
+    def invalidate_summaries(self):
+        """Drop cached summaries after a write"""
+        self._summary_generation += 1
+        self._states_overview = None
+    
     async def get_budget_data(self, state: str, year: str = "2025_26") -> Optional[Dict]:
         """Get budget data for a state"""
         try:
@@ -227,7 +442,7 @@ class KnowledgeBaseService:
                 "state": state,
                 "document_type": "budget",
                 "year": year
-            })
+            }, TOKEN_PROJECTION)
             
             if budget:
                 budget["_id"] = str(budget["_id"])
@@ -241,7 +456,8 @@ class KnowledgeBaseService:
         """Get policies with highest budget allocations"""
         try:
             cursor = self.policies_collection.find(
-                {"budget_allocation": {"$exists": True, "$ne": None}}
+                {"budget_allocation": {"$exists": True, "$ne": None}},
+                TOKEN_PROJECTION
             ).sort("budget_allocation", -1).limit(limit)
             
             policies = await cursor.to_list(length=limit)
@@ -254,19 +470,12 @@ class KnowledgeBaseService:
             logger.error(f"Error getting top policies: {e}")
             return []
     
-    async def get_policies_by_impact_area(self, impact_area: str) -> List[Dict]:
-        """Get policies by impact area"""
+    async def get_policies_by_impact_area(self, impact_area: str, after: Optional[str] = None,
+                                          limit: Optional[int] = None,
+                                          fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Get policies by impact area, a page at a time when `limit` is given"""
         try:
-            cursor = self.policies_collection.find({
-                "impact_areas": {"$regex": impact_area, "$options": "i"}
-            })
-            
-            policies = await cursor.to_list(length=None)
-            
-            for policy in policies:
-                policy["_id"] = str(policy["_id"])
-            
-            return policies
+            return await self._list_policies(impact_area_filter(impact_area), after, limit, fields)
         except Exception as e:
             logger.error(f"Error getting policies by impact area: {e}")
             return []
@@ -275,20 +484,29 @@ class KnowledgeBaseService:
         """Update a policy document"""
         try:
             update_data["updated_at"] = datetime.utcnow()
+            query = {
+                "state": state,
+                "category": category,
+                "policy_key": policy_key
+            }
             
-            result = await self.policies_collection.update_one(
-                {
-                    "state": state,
-                    "category": category,
-                    "policy_key": policy_key
-                },
-                {"$set": update_data}
-            )
+            # Keep the token arrays in step with the fields they are built from
+            if any(field in update_data for field in SEARCH_TOKEN_SOURCES):
+                current = await self.primary_policies_collection.find_one(
+                    query, {field: 1 for field in SEARCH_TOKEN_SOURCES}
+                ) or {}
+                tokens = with_tokens({**current, **update_data})
+                update_data["search_tokens"] = tokens["search_tokens"]
+                update_data["impact_tokens"] = tokens["impact_tokens"]
+            
+            result = await self.policies_collection.update_one(query, {"$set": update_data})
             
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Error updating policy: {e}")
             return False
+        finally:
+            self.invalidate_summaries()
     
     async def delete_policy(self, state: str, category: str, policy_key: str) -> bool:
         """Delete a policy document"""
@@ -303,6 +521,8 @@ class KnowledgeBaseService:
         except Exception as e:
             logger.error(f"Error deleting policy: {e}")
             return False
+        finally:
+            self.invalidate_summaries()
     
     async def get_statistics(self) -> Dict:
         """Get overall knowledge base statistics"""
@@ -344,9 +564,10 @@ async def get_kb_service() -> KnowledgeBaseService:
     """Get knowledge base service instance"""
     return kb_service
 
-async def initialize_kb_service(db_client: AsyncIOMotorClient, db_name: str):
+async def initialize_kb_service(db_client: AsyncIOMotorClient, db_name: str, read_preference: str = "primary",
+                                summary_ttl: int = 300):
     """Initialize knowledge base service"""
     global kb_service
-    kb_service = KnowledgeBaseService(db_client, db_name)
+    kb_service = KnowledgeBaseService(db_client, db_name, read_preference, summary_ttl)
     await kb_service.initialize_indexes()
     logger.info("Knowledge base service initialized")
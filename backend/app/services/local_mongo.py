@@ -0,0 +1,536 @@
+"""
+Local MongoDB Stand-in - No server needed!
+In-memory, Motor-compatible client for offline benchmarks and tests
+"""
+
+import copy
+import re
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+def _get_path(doc: Any, path: str) -> Any:
+    """Resolve a dotted field path, returning _MISSING when absent"""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _set_path(doc: Dict, path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc: Dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _sort_key(value: Any):
+    """Order values roughly like BSON: missing/None < numbers < strings < others"""
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (2, int(value))
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, ObjectId):
+        return (4, str(value))
+    return (5, str(value))
+
+
+def _compare(op: str, value: Any, operand: Any) -> bool:
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    return False
+
+
+def _equals(value: Any, operand: Any) -> bool:
+    if operand is None:
+        return value is _MISSING or value is None
+    if isinstance(value, list) and not isinstance(operand, list):
+        return operand in value
+    return value == operand
+
+
+def _match_operator(value: Any, op: str, operand: Any, condition: Dict) -> bool:
+    if op == "$eq":
+        return _equals(value, operand)
+    if op == "$ne":
+        return not _equals(value, operand)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        if isinstance(value, list):
+            return any(_compare(op, v, operand) for v in value)
+        return _compare(op, value, operand)
+    if op == "$in":
+        return any(_equals(value, candidate) for candidate in operand)
+    if op == "$nin":
+        return not any(_equals(value, candidate) for candidate in operand)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if op == "$all":
+        return isinstance(value, list) and all(item in value for item in operand)
+    if op == "$size":
+        return isinstance(value, list) and len(value) == operand
+    if op == "$regex":
+        flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+        pattern = re.compile(operand, flags)
+        values = value if isinstance(value, list) else [value]
+        return any(isinstance(v, str) and pattern.search(v) for v in values)
+    if op == "$options":
+        return True
+    if op == "$elemMatch":
+        return isinstance(value, list) and any(
+            _match(v, operand) if isinstance(v, dict) else _match_condition(v, operand)
+            for v in value
+        )
+    raise NotImplementedError(f"Local Mongo stand-in does not support {op}")
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        return all(_match_operator(value, op, operand, condition) for op, operand in condition.items())
+    if isinstance(condition, re.Pattern):
+        values = value if isinstance(value, list) else [value]
+        return any(isinstance(v, str) and condition.search(v) for v in values)
+    return _equals(value, condition)
+
+
+def _text_match(doc: Dict, search: str) -> bool:
+    """Approximate $text: any search term appears in any string field"""
+    terms = [t.lower() for t in search.split() if t]
+    haystack = " ".join(_iter_strings(doc)).lower()
+    return any(term in haystack for term in terms)
+
+
+def _iter_strings(value: Any):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _iter_strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _iter_strings(v)
+
+
+def _match(doc: Dict, query: Optional[Dict]) -> bool:
+    """Evaluate a MongoDB filter document against a document"""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(_match(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(_match(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(_match(doc, q) for q in condition):
+                return False
+        elif key == "$text":
+            if not _text_match(doc, condition.get("$search", "")):
+                return False
+        elif not _match_condition(_get_path(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return doc
+    fields = {k: v for k, v in projection.items() if not isinstance(v, dict)}
+    if not fields:
+        return doc
+    include = any(v for k, v in fields.items() if k != "_id")
+    if include:
+        result = {}
+        if fields.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        for key, flag in fields.items():
+            if flag and key != "_id":
+                value = _get_path(doc, key)
+                if value is not _MISSING:
+                    _set_path(result, key, value)
+        return result
+    result = copy.deepcopy(doc)
+    for key in fields:
+        _unset_path(result, key)
+    return result
+
+
+def _evaluate(expression: Any, doc: Dict) -> Any:
+    """Evaluate an aggregation expression (field paths, literals, sub-documents)"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get_path(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            op, args = next(iter(expression.items()))
+            if op == "$ifNull":
+                value = _evaluate(args[0], doc)
+                return _evaluate(args[1], doc) if value is None else value
+            if op == "$literal":
+                return args
+        return {k: _evaluate(v, doc) for k, v in expression.items()}
+    return expression
+
+
+def _accumulate(spec: Dict, docs: List[Dict]) -> Any:
+    op, expression = next(iter(spec.items()))
+    values = [_evaluate(expression, d) for d in docs]
+    numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if op == "$sum":
+        return sum(numbers)
+    if op == "$avg":
+        return sum(numbers) / len(numbers) if numbers else None
+    if op == "$min":
+        present = [v for v in values if v is not None]
+        return min(present, key=_sort_key) if present else None
+    if op == "$max":
+        present = [v for v in values if v is not None]
+        return max(present, key=_sort_key) if present else None
+    if op == "$first":
+        return values[0] if values else None
+    if op == "$last":
+        return values[-1] if values else None
+    if op == "$push":
+        return values
+    if op == "$addToSet":
+        unique = []
+        for v in values:
+            if v not in unique:
+                unique.append(v)
+        return unique
+    raise NotImplementedError(f"Local Mongo stand-in does not support accumulator {op}")
+
+
+def _sort_docs(docs: List[Dict], sort_spec: List) -> List[Dict]:
+    for key, direction in reversed(sort_spec):
+        if isinstance(direction, dict):
+            continue  # {"$meta": "textScore"} - relevance is not modelled
+        docs.sort(key=lambda d: _sort_key(_get_path(d, key)), reverse=direction < 0)
+    return docs
+
+
+def _normalize_sort(key_or_list, direction=None) -> List:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+class LocalCursor:
+    """Async cursor over an in-memory result set"""
+
+    def __init__(self, producer):
+        self._producer = producer
+        self._sort: List = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[List[Dict]] = None
+
+    def sort(self, key_or_list, direction=None) -> "LocalCursor":
+        self._sort.extend(_normalize_sort(key_or_list, direction))
+        return self
+
+    def skip(self, count: int) -> "LocalCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "LocalCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "LocalCursor":
+        return self
+
+    def _materialize(self) -> List[Dict]:
+        if self._results is None:
+            docs = _sort_docs(self._producer(), self._sort)[self._skip:]
+            if self._limit:
+                docs = docs[:self._limit]
+            self._results = docs
+        return self._results
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        docs = self._materialize()
+        taken = docs if length is None else docs[:length]
+        self._results = docs[len(taken):]
+        return taken
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict:
+        docs = self._materialize()
+        if not docs:
+            raise StopAsyncIteration
+        return docs.pop(0)
+
+
+class LocalCollection:
+    """Subset of AsyncIOMotorCollection backed by a Python list"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._docs: List[Dict] = []
+        self._indexes: Dict[str, Any] = {}
+
+    async def create_index(self, keys, name: Optional[str] = None, **kwargs) -> str:
+        spec = _normalize_sort(keys)
+        index_name = name or "_".join(f"{k}_{v}" for k, v in spec)
+        self._indexes[index_name] = spec
+        return index_name
+
+    async def index_information(self) -> Dict[str, Any]:
+        return {"_id_": {"key": [("_id", 1)]}, **{k: {"key": v} for k, v in self._indexes.items()}}
+
+    def _duplicate(self, _id: Any) -> bool:
+        return any(d["_id"] == _id for d in self._docs)
+
+    async def insert_one(self, document: Dict, **kwargs) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        if self._duplicate(document["_id"]):
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} dup key: {document['_id']}", 11000)
+        self._docs.append(copy.deepcopy(document))
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: List[Dict], ordered: bool = True, **kwargs) -> InsertManyResult:
+        """Like the server: duplicate _ids fail individually; ordered=True stops at the first error"""
+        ids, errors = [], []
+        existing = {d["_id"] for d in self._docs if isinstance(d["_id"], (ObjectId, str, int))}
+        for index, document in enumerate(documents):
+            document.setdefault("_id", ObjectId())
+            if document["_id"] in existing:
+                errors.append({"index": index, "code": 11000, "errmsg": f"E11000 duplicate key: {document['_id']}"})
+                if ordered:
+                    break
+                continue
+            existing.add(document["_id"])
+            self._docs.append(copy.deepcopy(document))
+            ids.append(document["_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids)})
+        return InsertManyResult(ids, True)
+
+    def find(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs) -> LocalCursor:
+        def produce():
+            return [
+                _project(copy.deepcopy(d), projection)
+                for d in self._docs if _match(d, filter)
+            ]
+        cursor = LocalCursor(produce)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    async def find_one(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs) -> Optional[Dict]:
+        docs = await self.find(filter, projection, **kwargs).to_list(length=1)
+        return docs[0] if docs else None
+
+    def _apply_update(self, doc: Dict, update: Dict, inserting: bool = False):
+        for op, fields in update.items():
+            for key, value in fields.items():
+                if op == "$set" or (op == "$setOnInsert" and inserting):
+                    _set_path(doc, key, copy.deepcopy(value))
+                elif op == "$unset":
+                    _unset_path(doc, key)
+                elif op == "$inc":
+                    current = _get_path(doc, key)
+                    _set_path(doc, key, (0 if current is _MISSING else current) + value)
+                elif op == "$push":
+                    current = _get_path(doc, key)
+                    _set_path(doc, key, ([] if current is _MISSING else current) + [copy.deepcopy(value)])
+                elif op != "$setOnInsert":
+                    raise NotImplementedError(f"Local Mongo stand-in does not support {op}")
+
+    async def _update(self, filter: Dict, update: Dict, upsert: bool, multi: bool) -> UpdateResult:
+        matched = 0
+        for doc in self._docs:
+            if _match(doc, filter):
+                self._apply_update(doc, update)
+                matched += 1
+                if not multi:
+                    break
+        raw = {"n": matched, "nModified": matched, "ok": 1.0}
+        if not matched and upsert:
+            doc = {k: v for k, v in filter.items() if not k.startswith("$") and not isinstance(v, dict)}
+            doc.setdefault("_id", ObjectId())
+            self._apply_update(doc, update, inserting=True)
+            self._docs.append(doc)
+            raw.update({"n": 1, "upserted": doc["_id"]})
+        return UpdateResult(raw, True)
+
+    async def update_one(self, filter: Dict, update: Dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return await self._update(filter, update, upsert, multi=False)
+
+    async def update_many(self, filter: Dict, update: Dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return await self._update(filter, update, upsert, multi=True)
+
+    async def replace_one(self, filter: Dict, replacement: Dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        for i, doc in enumerate(self._docs):
+            if _match(doc, filter):
+                self._docs[i] = {"_id": doc["_id"], **copy.deepcopy(replacement)}
+                return UpdateResult({"n": 1, "nModified": 1, "ok": 1.0}, True)
+        if upsert:
+            doc = copy.deepcopy(replacement)
+            doc.setdefault("_id", ObjectId())
+            self._docs.append(doc)
+            return UpdateResult({"n": 1, "upserted": doc["_id"], "ok": 1.0}, True)
+        return UpdateResult({"n": 0, "nModified": 0, "ok": 1.0}, True)
+
+    async def delete_one(self, filter: Dict, **kwargs) -> DeleteResult:
+        for i, doc in enumerate(self._docs):
+            if _match(doc, filter):
+                del self._docs[i]
+                return DeleteResult({"n": 1, "ok": 1.0}, True)
+        return DeleteResult({"n": 0, "ok": 1.0}, True)
+
+    async def delete_many(self, filter: Dict, **kwargs) -> DeleteResult:
+        before = len(self._docs)
+        self._docs = [d for d in self._docs if not _match(d, filter)]
+        return DeleteResult({"n": before - len(self._docs), "ok": 1.0}, True)
+
+    async def count_documents(self, filter: Dict, **kwargs) -> int:
+        return sum(1 for d in self._docs if _match(d, filter))
+
+    async def distinct(self, key: str, filter: Optional[Dict] = None, **kwargs) -> List:
+        values = []
+        for doc in self._docs:
+            if not _match(doc, filter):
+                continue
+            value = _get_path(doc, key)
+            for v in (value if isinstance(value, list) else [value]):
+                if v is not _MISSING and v not in values:
+                    values.append(v)
+        return values
+
+    def aggregate(self, pipeline: List[Dict], **kwargs) -> LocalCursor:
+        def produce():
+            docs = [copy.deepcopy(d) for d in self._docs]
+            for stage in pipeline:
+                (name, spec), = stage.items()
+                if name == "$match":
+                    docs = [d for d in docs if _match(d, spec)]
+                elif name == "$group":
+                    groups: Dict[Any, List[Dict]] = {}
+                    keys: Dict[Any, Any] = {}
+                    for d in docs:
+                        group_id = _evaluate(spec["_id"], d)
+                        marker = repr(group_id)
+                        keys[marker] = group_id
+                        groups.setdefault(marker, []).append(d)
+                    docs = [
+                        {"_id": keys[marker], **{
+                            field: _accumulate(acc, members)
+                            for field, acc in spec.items() if field != "_id"
+                        }}
+                        for marker, members in groups.items()
+                    ]
+                elif name == "$sort":
+                    docs = _sort_docs(docs, _normalize_sort(spec))
+                elif name == "$skip":
+                    docs = docs[spec:]
+                elif name == "$limit":
+                    docs = docs[:spec]
+                elif name == "$project":
+                    computed = {k: v for k, v in spec.items() if not isinstance(v, (int, bool))}
+                    docs = [
+                        {**_project(d, {k: v for k, v in spec.items() if k not in computed}),
+                         **{k: _evaluate(v, d) for k, v in computed.items()}}
+                        for d in docs
+                    ]
+                elif name == "$count":
+                    docs = [{spec: len(docs)}] if docs else []
+                else:
+                    raise NotImplementedError(f"Local Mongo stand-in does not support stage {name}")
+            return docs
+        return LocalCursor(produce)
+
+
+class LocalDatabase:
+    """Database handle supporting both db["name"] and db.name access"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, LocalCollection] = {}
+
+    def __getitem__(self, name: str) -> LocalCollection:
+        if name not in self._collections:
+            self._collections[name] = LocalCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> LocalCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs) -> LocalCollection:
+        return self[name]
+
+    async def list_collection_names(self) -> List[str]:
+        return list(self._collections)
+
+    async def command(self, command, *args, **kwargs) -> Dict:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        if name == "dbstats":
+            return {"collections": len(self._collections), "dataSize": 0, "indexSize": 0, "ok": 1.0}
+        raise NotImplementedError(f"Local Mongo stand-in does not support command {name}")
+
+
+class LocalMongoClient:
+    """Drop-in replacement for AsyncIOMotorClient in offline runs"""
+
+    def __init__(self, *args, **kwargs):
+        self._databases: Dict[str, LocalDatabase] = {}
+
+    def __getitem__(self, name: str) -> LocalDatabase:
+        if name not in self._databases:
+            self._databases[name] = LocalDatabase(name)
+        return self._databases[name]
+
+    def get_database(self, name: str, **kwargs) -> LocalDatabase:
+        return self[name]
+
+    @property
+    def admin(self) -> LocalDatabase:
+        return self["admin"]
+
+    def close(self):
+        pass
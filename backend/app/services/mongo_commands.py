@@ -0,0 +1,152 @@
+"""
+MongoDB Command Instrumentation - 100% FREE
+pymongo CommandListener that fills performance_monitor's `database_queries` category
+
+Registered on every client built by app.db.create_mongo_client. Per
+"<collection>.<command>" (e.g. "policies.find", "indian_simulations.insert") it keeps:
+- calls, errors, total/avg/min/max seconds and a latency histogram
+- documents: documents returned (find/aggregate/getMore batches, distinct values)
+  or affected (insert/update/delete n)
+
+Commands slower than `slow_query_ms` are logged with the shape of their filter -
+field names and operators with every value replaced by its type - so the log
+shows which query pattern is slow without leaking the values.
+"""
+
+import json
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.services.performance_monitor import performance_monitor
+
+logger = logging.getLogger(__name__)
+
+CATEGORY = "database_queries"
+
+# Handshake, auth and session housekeeping - not queries
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "getnonce", "authenticate",
+    "saslStart", "saslContinue", "endSessions", "killCursors", "getLastError", "dbstats", "dbStats"
+}
+
+# Where each command keeps its filter
+FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query",
+                 "aggregate": "pipeline"}
+
+
+def query_shape(value: Any) -> Any:
+    """A filter with its values replaced by type names: {"state": {"$in": "<list>"}}"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        return [query_shape(item) for item in value]  # $and / $or clauses, pipeline stages
+    return f"<{type(value).__name__}>"
+
+
+def filter_shape(command_name: str, command: Dict) -> Any:
+    if command_name in FILTER_FIELDS:
+        return query_shape(command.get(FILTER_FIELDS[command_name], {}))
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        shape = query_shape(statements[0].get("q", {}))
+        return shape if len(statements) == 1 else {"statements": len(statements), "first": shape}
+    return None
+
+
+def collection_name(command_name: str, command: Dict) -> Optional[str]:
+    target = command.get("collection") if command_name == "getMore" else command.get(command_name)
+    return target if isinstance(target, str) else None
+
+
+def documents_in_reply(command_name: str, reply: Dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    return int(reply.get("n", 0))
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Latency histograms and documents per collection and command"""
+
+    def __init__(self, slow_query_ms: float = 100):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._started: Dict[Tuple[Any, int], Tuple[str, str, Dict]] = {}  # (connection, request id) -> (db, collection, command)
+        self.slow_queries = 0
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = collection_name(event.command_name, event.command)
+        if collection is None:
+            return
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = (event.database_name, collection, event.command)
+
+    def succeeded(self, event):
+        self._finish(event, success=True, documents=documents_in_reply(event.command_name, event.reply or {}))
+
+    def failed(self, event):
+        self._finish(event, success=False, documents=0)
+
+    def _finish(self, event, success: bool, documents: int):
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+            if started is None:
+                return
+            database, collection, command = started
+            seconds = event.duration_micros / 1e6
+            performance_monitor.record_timing(
+                CATEGORY, f"{collection}.{event.command_name}", seconds, success, documents=documents
+            )
+
+        if seconds * 1000 >= self.slow_query_ms:
+            self.slow_queries += 1
+            shape = filter_shape(event.command_name, command)
+            logger.warning(
+                f"SLOW QUERY: {database}.{collection} {event.command_name} took {seconds * 1000:.1f}ms, "
+                f"{documents} docs{'' if success else ' (failed)'}, filter={json.dumps(shape, default=str)}"
+            )
+
+    def summary(self, top: int = 20) -> Dict[str, Any]:
+        """The most expensive collection/command pairs by total time"""
+        with self._lock:
+            timings = {
+                name: dict(stats, histogram=dict(stats["histogram"]))
+                for name, stats in performance_monitor.get_metrics().get(CATEGORY, {}).items()
+                if "histogram" in stats
+            }
+        ranked = sorted(timings.items(), key=lambda item: item[1]["total_time"], reverse=True)[:top]
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "slow_queries": self.slow_queries,
+            "commands": [
+                {
+                    "command": name,
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "total_ms": round(stats["total_time"] * 1000, 3),
+                    "avg_ms": round(stats["avg_time"] * 1000, 3),
+                    "max_ms": round(stats["max_time"] * 1000, 3),
+                    "documents": stats.get("documents", 0),
+                    "histogram": stats["histogram"]
+                }
+                for name, stats in ranked
+            ]
+        }
+
+
+@lru_cache()
+def get_command_metrics() -> CommandMetrics:
+    """Process-wide command listener shared by every client the app creates"""
+    from app.config import get_settings
+
+    return CommandMetrics(slow_query_ms=get_settings().slow_query_ms)
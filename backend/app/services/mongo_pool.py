@@ -0,0 +1,151 @@
+"""
+MongoDB Connection Pool Metrics - 100% FREE
+pymongo ConnectionPoolListener that keeps live pool utilization per server
+
+Registered on every client built by app.db.create_mongo_client. Shows up under
+`database_pool` in /performance/metrics:
+- open / in_use / peak_in_use connections and utilization (in_use / max_pool_size)
+- waiting: operations currently blocked on a checkout (pool exhausted)
+- checkout wait time (total / max) and checkout failures by reason
+- pool clears (pymongo drops every connection after a network error)
+
+pymongo calls the listener from whatever thread runs the operation (Motor uses
+a thread pool), so all counters sit behind one lock.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+
+def _server() -> Dict[str, Any]:
+    return {
+        "open": 0,
+        "in_use": 0,
+        "peak_in_use": 0,
+        "waiting": 0,
+        "created": 0,
+        "closed": 0,
+        "checkouts": 0,
+        "checkout_failures": defaultdict(int),
+        "wait_seconds_total": 0.0,
+        "wait_seconds_max": 0.0,
+        "cleared": 0
+    }
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters per server address"""
+
+    def __init__(self, max_pool_size: int = 100):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._servers: Dict[str, Dict[str, Any]] = defaultdict(_server)
+        self._checkout_started = threading.local()  # a checkout starts and ends on the same thread
+
+    @staticmethod
+    def _key(address) -> str:
+        return f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+
+    def pool_created(self, event):
+        with self._lock:
+            self._servers[self._key(event.address)]
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._servers[self._key(event.address)]["cleared"] += 1
+        logger.warning(f"MongoDB connection pool for {self._key(event.address)} cleared")
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(self._key(event.address), None)
+
+    def connection_created(self, event):
+        with self._lock:
+            server = self._servers[self._key(event.address)]
+            server["open"] += 1
+            server["created"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._servers[self._key(event.address)]
+            server["open"] = max(server["open"] - 1, 0)
+            server["closed"] += 1
+
+    def connection_check_out_started(self, event):
+        self._checkout_started.at = time.perf_counter()
+        with self._lock:
+            self._servers[self._key(event.address)]["waiting"] += 1
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited()
+        with self._lock:
+            server = self._servers[self._key(event.address)]
+            server["waiting"] = max(server["waiting"] - 1, 0)
+            server["checkout_failures"][str(event.reason)] += 1
+        logger.warning(f"MongoDB checkout from {self._key(event.address)} failed after {waited:.3f}s: {event.reason}")
+
+    def connection_checked_out(self, event):
+        waited = self._waited()
+        with self._lock:
+            server = self._servers[self._key(event.address)]
+            server["waiting"] = max(server["waiting"] - 1, 0)
+            server["in_use"] += 1
+            server["peak_in_use"] = max(server["peak_in_use"], server["in_use"])
+            server["checkouts"] += 1
+            server["wait_seconds_total"] += waited
+            server["wait_seconds_max"] = max(server["wait_seconds_max"], waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._servers[self._key(event.address)]
+            server["in_use"] = max(server["in_use"] - 1, 0)
+
+    def _waited(self) -> float:
+        started = getattr(self._checkout_started, "at", None)
+        self._checkout_started.at = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            servers = {}
+            for address, server in self._servers.items():
+                view = dict(server, checkout_failures=dict(server["checkout_failures"]))
+                view["utilization"] = round(server["in_use"] / self.max_pool_size, 3) if self.max_pool_size else 0.0
+                view["avg_wait_ms"] = round(1000 * server["wait_seconds_total"] / server["checkouts"], 3) \
+                    if server["checkouts"] else 0.0
+                view["wait_seconds_total"] = round(server["wait_seconds_total"], 6)
+                view["wait_seconds_max"] = round(server["wait_seconds_max"], 6)
+                servers[address] = view
+
+        return {
+            "max_pool_size": self.max_pool_size,
+            "utilization": max((s["utilization"] for s in servers.values()), default=0.0),
+            "waiting": sum(s["waiting"] for s in servers.values()),
+            "servers": servers
+        }
+
+    def reset(self):
+        with self._lock:
+            self._servers.clear()
+
+
+@lru_cache()
+def get_pool_metrics() -> PoolMetrics:
+    """Process-wide pool listener shared by every client the app creates"""
+    from app.config import get_settings
+
+    return PoolMetrics(max_pool_size=get_settings().mongo_max_pool_size)
@@ -6,18 +6,22 @@ No external services needed - uses Python's built-in tools
 import time
 import logging
 from functools import wraps
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, Sequence
 import psutil
 import os
 
 logger = logging.getLogger(__name__)
 
+# Upper bounds (ms) of the latency histogram buckets used by record_timing
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
 # Performance metrics storage
 _metrics = {
     "api_calls": {},
     "agent_execution": {},
     "ml_inference": {},
-    "database_queries": {}
+    "database_queries": {},
+    "admission": {}
 }
 
 class PerformanceMonitor:
@@ -137,6 +141,50 @@ class PerformanceMonitor:
         
         return decorator
     
+    @staticmethod
+    def record_metric(category: str, name: str, value: float):
+        """Record one sample of a non-timing value (queue depth, wait seconds, ...)"""
+        stats = _metrics.setdefault(category, {}).setdefault(name, {
+            "samples": 0,
+            "total": 0,
+            "avg": 0,
+            "min": float('inf'),
+            "max": 0,
+            "last": 0
+        })
+        stats["samples"] += 1
+        stats["total"] += value
+        stats["avg"] = stats["total"] / stats["samples"]
+        stats["min"] = min(stats["min"], value)
+        stats["max"] = max(stats["max"], value)
+        stats["last"] = value
+    
+    @staticmethod
+    def record_timing(category: str, name: str, seconds: float, success: bool = True,
+                      buckets: Sequence[float] = LATENCY_BUCKETS_MS, **counters: float):
+        """Record one operation timed elsewhere (e.g. by a driver listener) with a latency histogram"""
+        stats = _metrics.setdefault(category, {}).setdefault(name, {
+            "calls": 0,
+            "total_time": 0,
+            "avg_time": 0,
+            "min_time": float('inf'),
+            "max_time": 0,
+            "errors": 0,
+            "histogram": {**{f"<={b}ms": 0 for b in buckets}, f">{buckets[-1]}ms": 0}
+        })
+        stats["calls"] += 1
+        stats["total_time"] += seconds
+        stats["avg_time"] = stats["total_time"] / stats["calls"]
+        stats["min_time"] = min(stats["min_time"], seconds)
+        stats["max_time"] = max(stats["max_time"], seconds)
+        if not success:
+            stats["errors"] += 1
+        ms = seconds * 1000
+        bucket = next((f"<={b}ms" for b in buckets if ms <= b), f">{buckets[-1]}ms")
+        stats["histogram"][bucket] += 1
+        for counter, value in counters.items():
+            stats[counter] = stats.get(counter, 0) + value
+    
     @staticmethod
     def get_metrics() -> Dict[str, Any]:
         """Get all performance metrics"""
@@ -169,15 +217,18 @@ class PerformanceMonitor:
             "total_api_calls": sum(m["calls"] for m in _metrics["api_calls"].values()),
             "total_agent_executions": sum(m["calls"] for m in _metrics["agent_execution"].values()),
             "total_ml_inferences": sum(m["calls"] for m in _metrics["ml_inference"].values()),
+            "total_database_queries": sum(m.get("calls", 0) for m in _metrics["database_queries"].values()),
             "avg_response_time": 0,
             "system": PerformanceMonitor.get_system_stats()
         }
         
         # Calculate average response time
         all_times = []
-        for category in _metrics.values():
+        for name, category in _metrics.items():
+            if name == "database_queries":
+                continue  # per-command driver timings, not responses
             for metrics in category.values():
-                if metrics["calls"] > 0:
+                if metrics.get("calls", 0) > 0:  # timings only, not record_metric samples
                     all_times.append(metrics["avg_time"])
         
         if all_times:
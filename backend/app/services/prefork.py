@@ -0,0 +1,94 @@
+"""
+Pre-fork Model Sharing
+Loads models and static knowledge structures once in the gunicorn master so
+forked workers share those memory pages copy-on-write instead of each holding
+a private copy.
+
+The sequence follows the CPython gc.freeze() recipe:
+    master: gc.disable() -> load everything -> gc.freeze() -> fork
+    worker: gc.enable()
+Frozen objects move to the permanent generation, so the collector never writes
+to their headers and the pages stay shared.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_preloaded = False
+
+
+def limit_native_threads():
+    """
+    Keep OpenMP/MKL single-threaded in the master before any library initializes
+    its thread pool - thread pools don't survive fork() and can deadlock workers.
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")
+
+
+def _prime_static_caches():
+    """Build the read-only static data and cached lookups in the master"""
+    from app.knowledge import policy_kb
+    from app.services.free_india_data import india_data_service
+    from app.services.cache_service import (
+        get_cached_city_list,
+        get_cached_states_list,
+        get_cached_economic_data,
+        get_cached_traffic_data
+    )
+
+    get_cached_city_list()
+    get_cached_states_list()
+    get_cached_economic_data()
+    for state, cities in india_data_service.CENSUS_DATA.items():
+        for city in cities:
+            get_cached_traffic_data(city)
+
+    # Touch the knowledge base so it's fully materialized before fork
+    return len(policy_kb.policies) + len(policy_kb.schemes) + len(policy_kb.economic_data)
+
+
+def preload_shared_state() -> Dict[str, float]:
+    """Load models + static data in the current (master) process, then freeze the heap"""
+    global _preloaded
+    from app.services.model_warmup import warm_up
+
+    timings = {}
+    gc.disable()
+
+    start = time.perf_counter()
+    _prime_static_caches()
+    timings["static_data"] = round(time.perf_counter() - start, 3)
+
+    # Full warm-up: models loaded, lazy paths and PPO training done before fork
+    start = time.perf_counter()
+    readiness = asyncio.run(warm_up())
+    timings["models"] = round(time.perf_counter() - start, 3)
+    if not readiness["ready"]:
+        logger.warning(f"Pre-fork warm-up failed, workers will warm up themselves: {readiness['error']}")
+
+    freeze_heap()
+    _preloaded = True
+    logger.info(f"Pre-fork preload complete: {timings}, frozen objects: {gc.get_freeze_count()}")
+    return timings
+
+
+def freeze_heap():
+    """Collect garbage once, then move every surviving object to the permanent generation"""
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork_in_worker():
+    """Re-enable the collector in a worker; frozen master objects stay untouched"""
+    gc.enable()
+
+
+def is_preloaded() -> bool:
+    return _preloaded
@@ -1,11 +1,12 @@
-from typing import Dict, Any, TypedDict
-from langgraph.graph import StateGraph, END
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
+from functools import lru_cache
 from app.agents.policy_agent import PolicyAgent
 from app.agents.behavior_agent import BehaviorAgent
 from app.agents.simulation_agent import SimulationAgent
 from app.agents.impact_agent import ImpactAgent
 from app.agents.optimization_agent import OptimizationAgent
 from app.agents.explainability_agent import ExplainabilityAgent
+from app.services.single_flight import SingleFlight
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,14 @@ class SimulationState(TypedDict):
     enable_optimization: bool
     region: Dict
     token_usage: Dict
+    related_policies: List[Dict]
+    state_policy_context: Dict
+
+def simulation_key(policy_input: str, enable_optimization: bool, region: Optional[Dict[str, str]]) -> Tuple:
+    """Requests that only differ in whitespace or case run the same simulation"""
+    policy = " ".join(policy_input.split()).casefold()
+    region_key = tuple(sorted((k, str(v).strip().casefold()) for k, v in (region or {}).items()))
+    return policy, region_key, bool(enable_optimization)
 
 class SimulationEngine:
     """LangGraph-based orchestration of all agents"""
@@ -30,13 +39,17 @@ class SimulationEngine:
         self.behavior_agent = BehaviorAgent()
         self.simulation_agent = SimulationAgent()
         self.impact_agent = ImpactAgent()
-        self.optimization_agent = OptimizationAgent()
+        self.optimization_agent = OptimizationAgent(self.behavior_agent, self.simulation_agent)
         self.explainability_agent = ExplainabilityAgent()
         
         self.graph = self._build_graph()
+        self.single_flight = SingleFlight()
     
-    def _build_graph(self) -> StateGraph:
+    def _build_graph(self):
         """Build LangGraph workflow"""
+        # langgraph pulls in langchain - import when the engine is first built
+        from langgraph.graph import StateGraph, END
+        
         workflow = StateGraph(SimulationState)
         
         # Add nodes
@@ -72,13 +85,34 @@ class SimulationEngine:
         """Decide whether to run optimization"""
         return "optimize" if state.get("enable_optimization", True) else "skip"
     
+    def is_in_flight(self, policy_input: str, enable_optimization: bool = True,
+                     region: Dict[str, str] = None) -> bool:
+        """True when an identical simulation is running - a new call would join it"""
+        return self.single_flight.in_flight(simulation_key(policy_input, enable_optimization, region))
+    
     async def run_simulation(
         self, 
         policy_input: str, 
         enable_optimization: bool = True,
         region: Dict[str, str] = None
     ) -> Dict[str, Any]:
-        """Execute full simulation pipeline"""
+        """Execute full simulation pipeline; concurrent identical requests share one run"""
+        key = simulation_key(policy_input, enable_optimization, region)
+        final_state, shared = await self.single_flight.do(
+            key, lambda: self._run(policy_input, enable_optimization, region)
+        )
+        if shared:
+            logger.info(f"Joined in-flight simulation for {region['state'] if region else 'default region'}")
+        
+        # Callers add keys to the result - each gets its own top-level dict
+        return dict(final_state)
+    
+    async def _run(
+        self,
+        policy_input: str,
+        enable_optimization: bool,
+        region: Dict[str, str]
+    ) -> Dict[str, Any]:
         region_info = f"{region['state']}" if region else "default region"
         logger.info(f"Starting simulation for {region_info}: {policy_input[:50]}...")
         
@@ -94,3 +128,8 @@ class SimulationEngine:
         logger.info(f"Simulation completed successfully for {region_info}")
         
         return final_state
+
+@lru_cache()
+def get_simulation_engine() -> SimulationEngine:
+    """Shared engine so agents, models and the compiled graph are built once per worker"""
+    return SimulationEngine()
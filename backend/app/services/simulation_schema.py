@@ -0,0 +1,163 @@
+"""
+Compact Simulation Schema - 100% FREE
+Versioned storage layout for db.indian_simulations
+
+Version 1 (unversioned documents) stored every key of the pipeline's final state.
+Version 2 keeps only what can't be recomputed:
+- no copies of request fields (results.policy_input / region / enable_optimization
+  when they equal the top-level policy_text / region / optimized)
+- no derived or constant fields (budget_in_lakhs / budget_in_crores, data_sources);
+  real_data_used stays because db_optimize indexes it for queries
+- knowledge-base content (state_policy_context, related_policies) becomes a reference
+  under `refs`; it is inlined only if it no longer matches the current knowledge base
+- numbers are stored as plain int/float/bool, never as numpy scalars
+
+The fields incremental training projects (structured_policy, results.simulation_metrics,
+results.behavior_output, results.impact_predictions, region, timestamp) keep their paths.
+expand_indian_simulation() turns a v2 document back into the full v1 shape. No API
+endpoint reads indian_simulations back today and incremental training only projects
+the paths above, so nothing calls it yet; any reader of whole documents must.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+DATA_SOURCES = ["Census India (State-level)", "TomTom Traffic Index", "RBI"]
+
+# Result keys that only repeat top-level fields: result key -> top-level key
+DUPLICATE_RESULT_KEYS = {"policy_input": "policy_text", "enable_optimization": "optimized", "region": "region"}
+
+# Structured policy fields derived from budget_allocation_inr
+DERIVED_BUDGET_FIELDS = {"budget_in_lakhs": 100000, "budget_in_crores": 10000000}
+
+
+def typed(value: Any) -> Any:
+    """Numpy scalars/arrays (and nested containers of them) as plain Python values"""
+    if isinstance(value, dict):
+        return {str(k): typed(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [typed(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _kb_content(key: str, ref: Dict[str, Any]) -> Any:
+    """Current knowledge-base content a reference points at"""
+    from app.knowledge.policy_knowledge_base import policy_kb
+    from app.agents.policy_agent import related_policies
+
+    if key == "state_policy_context":
+        return policy_kb.get_all_policies_for_state(ref["state"])
+    if key == "related_policies":
+        return related_policies(ref["policy_type"], ref["state"])
+    raise KeyError(key)
+
+
+def _kb_ref(key: str, value: Any, document: Dict) -> Optional[Dict[str, Any]]:
+    """A reference for a knowledge-base copy, or None if the value doesn't match the knowledge base"""
+    state = (document.get("region") or {}).get("state")
+    if not state:
+        return None
+    if key == "state_policy_context":
+        ref = {"state": state}
+    elif key == "related_policies":
+        policy_type = (document.get("structured_policy") or {}).get("policy_type")
+        if not policy_type:
+            return None
+        ref = {"policy_type": policy_type, "state": state}
+    else:
+        return None
+    try:
+        current = _kb_content(key, ref)
+    except Exception as e:
+        logger.warning(f"Knowledge base lookup for {key} failed, storing it inline: {str(e)}")
+        return None
+    return ref if _canonical(current) == _canonical(value) else None
+
+
+def is_compact(document: Dict) -> bool:
+    return document.get("schema_version", 1) >= SCHEMA_VERSION
+
+
+def compact_indian_simulation(document: Dict) -> Dict:
+    """A v2 document from a v1 one (already compact documents come back unchanged)"""
+    if is_compact(document):
+        return document
+
+    compact = {
+        key: typed(value) for key, value in document.items()
+        if key not in ("results", "structured_policy")
+    }
+    if compact.get("data_sources") == DATA_SOURCES:
+        del compact["data_sources"]
+    compact["schema_version"] = SCHEMA_VERSION
+
+    policy = typed(document.get("structured_policy"))
+    if isinstance(policy, dict) and "budget_allocation_inr" in policy:
+        budget = policy["budget_allocation_inr"]
+        policy = {
+            k: v for k, v in policy.items()
+            if k not in DERIVED_BUDGET_FIELDS or v != budget / DERIVED_BUDGET_FIELDS[k]
+        }
+    compact["structured_policy"] = policy
+
+    results, refs = {}, {}
+    for key, value in (document.get("results") or {}).items():
+        if key in DUPLICATE_RESULT_KEYS and _canonical(value) == _canonical(document.get(DUPLICATE_RESULT_KEYS[key])):
+            continue
+        ref = _kb_ref(key, value, document)
+        if ref is not None:
+            refs[key] = ref
+        else:
+            results[key] = typed(value)
+    compact["results"] = results
+    if refs:
+        compact["refs"] = refs
+    return compact
+
+
+def expand_indian_simulation(document: Optional[Dict]) -> Optional[Dict]:
+    """The full v1 shape of a stored document (v1 documents come back unchanged)"""
+    if not document or not is_compact(document):
+        return document
+
+    expanded = {key: value for key, value in document.items() if key not in ("schema_version", "refs")}
+    expanded.setdefault("real_data_used", True)
+    expanded.setdefault("data_sources", list(DATA_SOURCES))
+
+    policy = expanded.get("structured_policy")
+    if isinstance(policy, dict) and "budget_allocation_inr" in policy:
+        policy = dict(policy)
+        for field, divisor in DERIVED_BUDGET_FIELDS.items():
+            policy.setdefault(field, policy["budget_allocation_inr"] / divisor)
+        expanded["structured_policy"] = policy
+
+    results = dict(expanded.get("results") or {})
+    for key, top_level in DUPLICATE_RESULT_KEYS.items():
+        if top_level in expanded:
+            results.setdefault(key, expanded[top_level])
+    for key, ref in (document.get("refs") or {}).items():
+        try:
+            results[key] = _kb_content(key, ref)
+        except Exception as e:
+            logger.warning(f"Could not resolve {key} reference {ref}: {str(e)}")
+    expanded["results"] = results
+    return expanded
@@ -0,0 +1,73 @@
+"""
+Single-flight Request Coalescing - 100% FREE
+Concurrent callers with the same key share one execution instead of each running it
+
+The first caller (the leader) starts the work as a task; everyone who arrives
+while it is running awaits the same result. Nothing is cached: once the call
+finishes the key is free and the next caller runs it again.
+
+Results are shared through a concurrent.futures.Future, so callers on other
+event loops (job workers and warm-up run the engine on private loops in threads)
+can join too. Each caller awaits through asyncio.shield - a caller that goes
+away never cancels the work the others are waiting for.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls per key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()  # strong refs - the loop only keeps weak ones
+        self.calls = 0
+        self.shared = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "calls": self.calls, "shared": self.shared}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(result of fn(), whether it was shared with an earlier caller)"""
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+            if shared:
+                self.shared += 1
+            else:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+                self.calls += 1
+
+        if not shared:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+
+        result = await asyncio.shield(asyncio.wrap_future(future))
+        return result, shared
+
+    def _settle(self, key: Hashable, future: concurrent.futures.Future, task: asyncio.Task):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        self._tasks.discard(task)
+
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
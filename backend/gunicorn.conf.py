@@ -0,0 +1,42 @@
+"""
+Gunicorn configuration for CivicSim AI
+Picked up automatically when gunicorn is started from the backend directory;
+command-line flags (Procfile, start_production.sh) still take precedence.
+
+Set PRELOAD_MODELS=true to load models in the master before forking workers
+so they share model and knowledge-base memory (see app/services/prefork.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import get_settings  # noqa: E402
+
+settings = get_settings()
+
+bind = f"{settings.host}:{settings.port}"
+workers = settings.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+
+preload_app = settings.preload_models
+
+if preload_app:
+    from app.services.prefork import limit_native_threads
+    limit_native_threads()
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before workers are forked"""
+    if preload_app:
+        from app.services.prefork import preload_shared_state
+        timings = preload_shared_state()
+        server.log.info(f"Models and static data preloaded for sharing: {timings}")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app.services.prefork import after_fork_in_worker
+        after_fork_in_worker()
@@ -34,7 +34,7 @@ pip install -r requirements.txt --quiet
 REM Check if ML models exist
 if not exist backend\app\ml\models\india_behavior_lstm.pth (
     echo ⚠️  ML models not found! Training models...
-    python app\ml\train_india_models.py
+    python -m app.ml.train_india_models
 )
 
 REM Start server with Uvicorn (Gunicorn not available on Windows)
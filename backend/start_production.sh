@@ -36,7 +36,7 @@ pip install -r requirements.txt --quiet
 # Check if ML models exist
 if [ ! -f "backend/app/ml/models/india_behavior_lstm.pth" ]; then
     echo "⚠️  ML models not found! Training models..."
-    python app/ml/train_india_models.py
+    python -m app.ml.train_india_models
 fi
 
 # Start server with Gunicorn
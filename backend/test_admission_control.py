@@ -0,0 +1,134 @@
+"""
+Test admission control: bounded in-flight pipelines, FIFO wait queue with a
+deadline, fast 429 + Retry-After when saturated, metrics in performance_monitor
+"""
+import asyncio
+
+import httpx
+
+from app.services.admission_control import AdmissionController, AdmissionRejected
+from app.services.performance_monitor import performance_monitor
+
+
+async def _expect_rejection(controller, reason, **kwargs):
+    try:
+        async with controller.admit(**kwargs):
+            raise AssertionError("admitted past the limit")
+    except AdmissionRejected as e:
+        assert e.reason == reason and e.retry_after >= 1, (e.reason, e.retry_after)
+        return e
+
+
+async def _exercise_controller():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=1, queue_timeout=0.2)
+    order = []
+    release_first = asyncio.Event()
+
+    async def hold(name):
+        async with controller.admit() as waited:
+            order.append(name)
+            await release_first.wait()
+        return waited
+
+    first = asyncio.create_task(hold("first"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(hold("second"))
+    await asyncio.sleep(0)
+    assert controller.in_flight == 1 and controller.queue_depth == 1
+
+    # Queue full: rejected immediately, no waiting
+    start = asyncio.get_running_loop().time()
+    await _expect_rejection(controller, "queue full")
+    assert asyncio.get_running_loop().time() - start < 0.05
+
+    release_first.set()
+    assert await first == 0.0
+    assert await second > 0.0
+    assert order == ["first", "second"]
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+
+    # Deadline: a waiter that never gets a slot is rejected after queue_timeout
+    blocker = asyncio.Event()
+
+    async def occupy():
+        async with controller.admit():
+            await blocker.wait()
+
+    occupant = asyncio.create_task(occupy())
+    await asyncio.sleep(0)
+    await _expect_rejection(controller, "queue timeout")
+    assert controller.queue_depth == 0
+
+    # A cancelled waiter (client went away) leaves the queue without leaking the slot
+    waiter = asyncio.create_task(hold("cancelled"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert controller.queue_depth == 0
+
+    # Background callers skip the queue bound and deadline
+    background = [asyncio.create_task(controller.admit(background=True).__aenter__()) for _ in range(3)]
+    await asyncio.sleep(0.3)
+    assert controller.queue_depth == 3 and not any(t.done() for t in background)
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+
+    blocker.set()
+    await occupant
+    assert controller.in_flight == 0, controller.stats()
+
+    stats = controller.stats()
+    assert stats["rejected"] == 1 and stats["timed_out"] == 1 and stats["admitted"] == 3, stats
+    assert stats["avg_service_seconds"] is not None
+
+    metrics = performance_monitor.get_metrics()["admission"]
+    assert metrics["test.queue_depth"]["max"] == 3
+    assert metrics["test.wait_seconds"]["samples"] >= 3
+    return stats
+
+
+def test_admission_controller():
+    stats = asyncio.run(_exercise_controller())
+    print(f"✓ Admission: {stats['admitted']} admitted, {stats['rejected']} rejected, "
+          f"{stats['timed_out']} timed out, in flight back to {stats['in_flight']}")
+
+
+async def _exercise_saturated_route():
+    from app.main import app
+    from app.db import db
+    from app.services.admission_control import get_admission_controller
+    from app.services.local_mongo import LocalMongoClient
+
+    db.client = LocalMongoClient()
+    controller = get_admission_controller()
+    saved = controller.max_in_flight, controller.max_queue
+    controller.max_in_flight, controller.max_queue = 1, 0
+    try:
+        async with controller.admit():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+                response = await http.post("/simulation/simulate", json={"policy_text": "Add 5 new bus lanes"})
+                assert response.status_code == 429, response.text
+                assert int(response.headers["retry-after"]) >= 1
+
+                response = await http.post("/india/simulate", json={
+                    "policy_text": "Add 5 new bus lanes",
+                    "region": {"state": "Karnataka", "country": "India"}
+                })
+                assert response.status_code == 429, response.text
+
+                metrics = (await http.get("/performance/metrics")).json()
+                assert metrics["admission"]["in_flight"] == 1
+    finally:
+        controller.max_in_flight, controller.max_queue = saved
+    return response.headers["retry-after"]
+
+
+def test_saturated_routes_return_429():
+    retry_after = asyncio.run(_exercise_saturated_route())
+    print(f"✓ Saturated /simulate returns 429 with Retry-After: {retry_after}s")
+
+
+if __name__ == "__main__":
+    test_admission_controller()
+    test_saturated_routes_return_429()
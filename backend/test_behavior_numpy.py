@@ -0,0 +1,76 @@
+"""
+Parity of the pure-NumPy behavior LSTM against PyTorch, and torch-free loading
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import torch
+
+from app.ml.networks import BehaviorLSTM, IndianBehaviorLSTM
+from app.ml.model_export import export_behavior_numpy
+from app.ml.numpy_lstm import NumpyLSTM
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "ml", "models")
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ATOL = 1e-5
+
+
+def _trained_model():
+    model = IndianBehaviorLSTM()
+    model.load_state_dict(torch.load(os.path.join(MODEL_DIR, "india_behavior_lstm.pth"), map_location="cpu"))
+    return model.eval()
+
+
+def test_numpy_matches_torch():
+    """NumPy forward pass matches PyTorch for both architectures and multi-step sequences"""
+    torch.manual_seed(0)
+    for model in (_trained_model(), BehaviorLSTM().eval()):
+        with tempfile.TemporaryDirectory() as tmp:
+            numpy_model = NumpyLSTM.load(export_behavior_numpy(model, tmp))
+
+        for seq_len in (1, 3):
+            inputs = torch.randn(256, seq_len, 10)
+            with torch.no_grad():
+                expected = model(inputs).numpy()
+            actual = numpy_model.predict(inputs.numpy())
+
+            error = np.abs(expected - actual).max()
+            print(f"{type(model).__name__} seq_len={seq_len}: max abs error {error:.2e}")
+            assert actual.shape == expected.shape
+            assert error < ATOL
+
+
+def test_behavior_agent_uses_numpy_backend():
+    """The registered v1 bundle serves the NumPy model by default"""
+    from app.agents.behavior_agent import BehaviorAgent
+
+    agent = BehaviorAgent()
+    assert isinstance(agent.model, NumpyLSTM)
+    predictions = agent._predict(np.zeros(10, dtype=np.float32))
+    assert predictions.shape == (4,)
+    assert np.all((predictions >= 0) & (predictions <= 1))
+
+
+def test_numpy_inference_does_not_import_torch():
+    """Loading and running the NumPy model never pulls torch into the process"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = export_behavior_numpy(_trained_model(), tmp)
+        script = (
+            "import sys, numpy as np\n"
+            "from app.ml.numpy_lstm import NumpyLSTM\n"
+            f"model = NumpyLSTM.load({str(path)!r})\n"
+            "model.predict(np.zeros((1, 1, 10), dtype=np.float32))\n"
+            "assert 'torch' not in sys.modules, 'torch was imported'\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, check=True)
+
+
+if __name__ == "__main__":
+    test_numpy_matches_torch()
+    test_behavior_agent_uses_numpy_backend()
+    test_numpy_inference_does_not_import_torch()
+    print("✓ NumPy behavior model parity OK")
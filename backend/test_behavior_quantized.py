@@ -0,0 +1,66 @@
+"""
+Accuracy parity of the TorchScript int8 behavior model against the float model
+"""
+import os
+import tempfile
+
+import torch
+
+from app.ml.networks import IndianBehaviorLSTM
+from app.ml.model_export import export_behavior_torchscript
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "ml", "models")
+
+# Outputs are sigmoid probabilities; int8 weights may shift them slightly
+MAX_ABS_ERROR = 0.03
+MEAN_ABS_ERROR = 0.01
+
+
+def _float_model():
+    model = IndianBehaviorLSTM()
+    model.load_state_dict(torch.load(os.path.join(MODEL_DIR, "india_behavior_lstm.pth"), map_location="cpu"))
+    return model.eval()
+
+
+def test_quantized_matches_float_model():
+    """TorchScript int8 export stays within tolerance of the float32 model"""
+    model = _float_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        scripted = torch.jit.load(str(export_behavior_torchscript(model, tmp)))
+
+    torch.manual_seed(0)
+    inputs = torch.randn(1024, 1, 10)  # standardized features
+    with torch.no_grad():
+        expected = model(inputs)
+        actual = scripted(inputs)
+
+    error = (expected - actual).abs()
+    print(f"max abs error: {error.max():.4f}, mean abs error: {error.mean():.4f}")
+    assert actual.shape == expected.shape
+    assert error.max() < MAX_ABS_ERROR
+    assert error.mean() < MEAN_ABS_ERROR
+
+
+def test_registry_loads_quantized_export_for_torch_backend():
+    """With the torch backend selected the registry serves the TorchScript int8 model"""
+    from app.config import get_settings
+    from app.ml.model_registry import ModelRegistry
+
+    settings = get_settings()
+    original_backend = settings.behavior_inference_backend
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp)
+        registry.register(_float_model(), {})
+        settings.behavior_inference_backend = "torch"
+        try:
+            model, backend = registry._load_behavior(registry.root / "v1", registry.read_manifest("v1"))
+            assert backend == "torchscript_int8"
+            assert isinstance(model, torch.jit.ScriptModule)
+        finally:
+            settings.behavior_inference_backend = original_backend
+
+
+if __name__ == "__main__":
+    test_quantized_matches_float_model()
+    test_registry_loads_quantized_export_for_torch_backend()
+    print("✓ Quantized behavior model parity OK")
@@ -0,0 +1,227 @@
+"""
+Test the buffered bulk writer: size/time-triggered insert_many, bulky fields
+stored once by reference, read-your-writes, retry after failures, flush on stop
+"""
+import asyncio
+import time
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.services.bulk_writer import BufferedWriter, BLOB_COLLECTION
+from app.services.local_mongo import LocalMongoClient
+
+NARRATIVE = "The metro expansion reduces congestion. " * 100
+CONTEXT = {"existing_policies": [{"name": f"Policy {i}", "summary": "x" * 80} for i in range(20)]}
+
+
+def _indian_doc(state="Karnataka"):
+    return {
+        "region": {"state": state},
+        "results": {
+            "simulation_metrics": {"congestion_score": 0.4},
+            "explanation": {"narrative": NARRATIVE, "feature_importance": {"budget": 0.3}},
+            "state_policy_context": CONTEXT,
+            "related_policies": []
+        }
+    }
+
+
+def _count_batches(collection):
+    batches = []
+    insert_many = collection.insert_many
+
+    async def counting(documents, ordered=True, **kwargs):
+        batches.append((len(documents), ordered))
+        return await insert_many(documents, ordered=ordered, **kwargs)
+
+    collection.insert_many = counting
+    return batches
+
+
+async def _exercise_writer():
+    database = LocalMongoClient()["civicsim_ai"]
+    batches = _count_batches(database.indian_simulations)
+
+    # Size trigger: nothing is written until a batch fills
+    writer = BufferedWriter(batch_size=3, flush_interval=30)
+    ids = [await writer.add(database, "indian_simulations", _indian_doc()) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert await database.indian_simulations.count_documents({}) == 0
+
+    # ... but the buffered document is readable, with its blobs put back
+    pending = await writer.find_one(database, "indian_simulations", ids[0])
+    assert pending["results"]["explanation"]["narrative"] == NARRATIVE and "blobs" not in pending
+
+    ids.append(await writer.add(database, "indian_simulations", _indian_doc("Kerala")))
+    await asyncio.sleep(0.05)
+    assert await database.indian_simulations.count_documents({}) == 3
+    assert batches == [(3, False)], batches
+
+    # Bulky fields are stored once by content hash and referenced
+    stored = await database.indian_simulations.find_one({"_id": ids[2]})
+    assert "explanation" not in stored["results"] and "state_policy_context" not in stored["results"]
+    assert set(stored["blobs"]) == {"results.explanation", "results.state_policy_context"}
+    assert stored["results"]["related_policies"] == []  # small fields stay inline
+    assert await database[BLOB_COLLECTION].count_documents({}) == 2  # same narrative + context for all three
+    loaded = await writer.find_one(database, "indian_simulations", ids[2])
+    assert loaded["results"]["state_policy_context"] == CONTEXT
+
+    # Updates land whether the document is buffered or written
+    buffered_id = await writer.add(database, "indian_simulations", _indian_doc())
+    await writer.set_fields(database, "indian_simulations", buffered_id, {"observed_outcomes": {"impact": 1}})
+    await writer.set_fields(database, "indian_simulations", ids[0], {"observed_outcomes": {"impact": 2}})
+    assert (await database.indian_simulations.find_one({"_id": ids[0]}))["observed_outcomes"] == {"impact": 2}
+
+    # Mongo down: the batch stays buffered and goes out on the next flush
+    working = database.indian_simulations.insert_many
+
+    async def down(documents, **kwargs):
+        raise ConnectionError("mongo unavailable")
+
+    database.indian_simulations.insert_many = down
+    await writer.flush()
+    assert writer.failed_batches == 1 and writer.buffered() == 1
+    database.indian_simulations.insert_many = working
+
+    # A retry of a partially written batch skips the duplicates instead of failing
+    retried = _indian_doc()
+    retried["_id"] = ids[1]
+    writer._buffers["indian_simulations"].append(retried)
+
+    # Durable shutdown: stop() flushes everything that is left
+    await writer.stop()
+    assert writer.buffered() == 0
+    assert await database.indian_simulations.count_documents({}) == 4
+    stored = await database.indian_simulations.find_one({"_id": buffered_id})
+    assert stored["observed_outcomes"] == {"impact": 1}
+
+    # Time trigger: a partial batch is written after flush_interval
+    writer = BufferedWriter(batch_size=100, flush_interval=0.1)
+    await writer.add(database, "simulations", {"metrics": {"congestion_score": 0.2}, "explanation": {"x": "short"}})
+    await asyncio.sleep(0.3)
+    stored = await database.simulations.find_one({})
+    assert stored["explanation"] == {"x": "short"}  # under blob_min_bytes
+    await writer.stop()
+    return writer.stats()
+
+
+def test_bulk_writer():
+    stats = asyncio.run(_exercise_writer())
+    print(f"✓ Bulk writer: batched inserts, blobs by reference, retry and flush on stop ({stats})")
+
+
+async def _exercise_failures_and_workers():
+    database = LocalMongoClient()["civicsim_ai"]
+
+    # Blob batch fails: the documents referencing those blobs stay buffered too
+    writer = BufferedWriter(batch_size=100, flush_interval=30)
+    _id = await writer.add(database, "indian_simulations", _indian_doc())
+    working = database[BLOB_COLLECTION].insert_many
+
+    async def down(documents, **kwargs):
+        raise ConnectionError("mongo unavailable")
+
+    database[BLOB_COLLECTION].insert_many = down
+    await writer.flush()
+    assert await database.indian_simulations.count_documents({}) == 0 and writer.buffered() == 3
+
+    # A full buffer holding only blobs doesn't break add()
+    writer._buffers["indian_simulations"].clear()
+    writer.max_buffer = writer.buffered()
+    await writer.add(database, "simulations", {"metrics": {}})
+    assert writer.dropped == 0
+
+    database[BLOB_COLLECTION].insert_many = working
+    await writer.stop()
+
+    # Documents Mongo rejects (not duplicates) are dead-lettered, not counted as written
+    writer = BufferedWriter(batch_size=100, flush_interval=30)
+    good, bad = ObjectId(), ObjectId()
+    await database.simulations.insert_one({"_id": good})  # written by an earlier, partial attempt
+    for _id in (good, bad):
+        await writer.add(database, "simulations", {"_id": _id, "metrics": {}})
+    fresh = await writer.add(database, "simulations", {"metrics": {}})
+    working = database.simulations.insert_many
+
+    async def partly_rejected(documents, **kwargs):
+        await working([d for d in documents if d["_id"] == fresh], **kwargs)
+        errors = {good: (11000, "duplicate key"), bad: (10334, "document is too large")}
+        raise BulkWriteError({"writeErrors": [
+            {"index": i, "code": errors[d["_id"]][0], "errmsg": errors[d["_id"]][1]}
+            for i, d in enumerate(documents) if d["_id"] in errors
+        ]})
+
+    database.simulations.insert_many = partly_rejected
+    await writer.flush()
+    database.simulations.insert_many = working
+    assert writer.written == 2 and writer.rejected == 1 and writer.buffered() == 0
+    assert [(letter["document"]["_id"], letter["error"]) for letter in writer.dead_letters] == [
+        (bad, "document is too large")
+    ]
+    assert await database.simulations.count_documents({"_id": {"$in": [good, fresh]}}) == 2
+    await writer.stop()
+
+    # Another worker reading a fresh id waits for the flush instead of answering 404
+    worker_a = BufferedWriter(batch_size=100, flush_interval=0.3)
+    worker_b = BufferedWriter(batch_size=100, flush_interval=0.3)
+    _id = await worker_a.add(database, "indian_simulations", _indian_doc("Goa"))
+    start = time.perf_counter()
+    loaded = await worker_b.find_one(database, "indian_simulations", _id)
+    assert loaded["region"]["state"] == "Goa" and loaded["results"]["explanation"]["narrative"] == NARRATIVE
+    await worker_b.set_fields(database, "indian_simulations", _id, {"observed_outcomes": {"impact": 3}})
+    waited = time.perf_counter() - start
+
+    # ... but an old id that was never stored is a miss straight away
+    start = time.perf_counter()
+    assert await worker_b.find_one(database, "indian_simulations", ObjectId("5f0000000000000000000000")) is None
+    assert time.perf_counter() - start < 0.1
+    await worker_a.stop()
+    assert (await database.indian_simulations.find_one({"_id": _id}))["observed_outcomes"] == {"impact": 3}
+    return waited
+
+
+def test_failed_blobs_and_other_workers():
+    waited = asyncio.run(_exercise_failures_and_workers())
+    print(f"✓ Bulk writer: no dangling blob refs, fresh ids readable from another worker after {waited:.2f}s")
+
+
+async def _exercise_route():
+    import httpx
+    from app.main import app
+    from app.db import db
+    from app.services.bulk_writer import get_bulk_writer
+
+    client = LocalMongoClient()
+    db.client = client
+    database = client["civicsim_ai"]
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.post("/simulation/simulate", json={
+                "policy_text": "Add 10 metro stations with ₹200 crore budget",
+                "region": {"state": "Karnataka"},
+                "enable_optimization": False
+            })
+            assert response.status_code == 200, response.text
+            simulation_id = response.json()["simulation_id"]
+
+            # Readable straight away even though it hasn't been written yet
+            fetched = (await http.get(f"/simulation/{simulation_id}")).json()
+            assert fetched["_id"] == simulation_id
+            assert fetched["explanation"] == response.json()["results"]["explanation"]
+    finally:
+        await get_bulk_writer().stop()
+
+    assert await database.simulations.count_documents({}) == 1
+    return simulation_id
+
+
+def test_simulate_route_writes_through_buffer():
+    simulation_id = asyncio.run(_exercise_route())
+    print(f"✓ /simulation/simulate buffered write, read-your-writes for {simulation_id}")
+
+
+if __name__ == "__main__":
+    test_bulk_writer()
+    test_failed_blobs_and_other_workers()
+    test_simulate_route_writes_through_buffer()
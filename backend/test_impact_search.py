@@ -0,0 +1,78 @@
+"""
+Parallel impact-model hyperparameter search: core budgeting, best-model selection, report
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from app.ml import impact_search
+from app.ml.impact_search import (
+    BASELINE_PARAMS, expand_grid, plan_workers, search_impact_models, score_on_test, write_report,
+    REPORT_JSON, REPORT_MD
+)
+from app.ml.training_data import IndianDataGenerator
+
+
+def test_core_budget_never_oversubscribes():
+    original = os.cpu_count
+    try:
+        os.cpu_count = lambda: 16
+        assert plan_workers(48) == (16, 1)
+        assert plan_workers(48, max_workers=4) == (4, 4)
+        assert plan_workers(3) == (3, 5)
+        os.cpu_count = lambda: 1
+        assert plan_workers(48) == (1, 1)
+    finally:
+        os.cpu_count = original
+
+
+def test_grid_always_includes_baseline_once():
+    configs = expand_grid({"n_estimators": [100], "max_depth": [3, 5], "learning_rate": [0.1]})
+    assert configs[0] == BASELINE_PARAMS
+    assert len(configs) == 2  # baseline is in the grid, not duplicated
+    assert len(expand_grid(impact_search.DEFAULT_GRID)) == 25
+
+
+def test_search_picks_best_by_validation_r2():
+    df = IndianDataGenerator(seed=3).generate_impact_training_data(2000)
+    X = df.iloc[:, :8].values
+    targets = {t: (df[t].values[:1600], df[t].values[1600:]) for t in ("congestion_score", "dissatisfaction")}
+
+    grid = {"n_estimators": [20], "max_depth": [1, 4], "learning_rate": [0.3]}
+    models, report = search_impact_models(X[:1600], X[1600:], targets, grid=grid, max_workers=2)
+
+    assert set(models) == set(targets)
+    for target, info in report["targets"].items():
+        r2s = [r["val_r2"] for r in info["ranking"]]
+        assert r2s == sorted(r2s, reverse=True)
+        assert info["best"]["val_r2"] == r2s[0]
+        assert len(r2s) == 3  # baseline + 2 grid configs
+        # The returned model is the winning one
+        preds = models[target].predict(X[1600:])
+        y_val = targets[target][1]
+        r2 = 1 - ((y_val - preds) ** 2).sum() / ((y_val - y_val.mean()) ** 2).sum()
+        assert np.isclose(r2, info["best"]["val_r2"], atol=1e-5)
+
+    # Winners are scored once on a test split they were not selected on
+    X_test = IndianDataGenerator(seed=4).generate_impact_training_data(400)
+    y_test = {t: X_test[t].values for t in targets}
+    scores = score_on_test(models, report, X_test.iloc[:, :8].values, y_test)
+    for target, score in scores.items():
+        assert report["targets"][target]["test_r2"] == score
+        assert score != report["targets"][target]["best"]["val_r2"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_report(report, tmp)
+        with open(os.path.join(tmp, REPORT_JSON)) as f:
+            assert json.load(f)["jobs"] == 6
+        markdown = open(os.path.join(tmp, REPORT_MD)).read()
+        assert "| rank | params |" in markdown and "test R²" in markdown
+
+
+if __name__ == "__main__":
+    test_core_budget_never_oversubscribes()
+    test_grid_always_includes_baseline_once()
+    test_search_picks_best_by_validation_r2()
+    print("✓ Impact model search OK")
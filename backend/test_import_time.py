@@ -0,0 +1,63 @@
+"""
+Import-time budget test
+Workers must be able to serve /health, knowledge and state-data routes
+without loading the heavy ML stack at import.
+"""
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = {
+    "torch", "xgboost", "stable_baselines3", "gymnasium", "shap",
+    "networkx", "langgraph", "langchain_core", "pandas", "sklearn",
+}
+
+# Generous default so slow CI machines don't flake; override via env
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_S", "3.0"))
+
+
+def _importtime(module: str) -> dict:
+    """Run `python -X importtime -c 'import module'` and parse cumulative times (µs)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative_us)
+    return timings
+
+
+def test_app_import_skips_heavy_ml_dependencies():
+    """Importing app.main must not pull in torch, xgboost, stable_baselines3, ..."""
+    timings = _importtime("app.main")
+    loaded = HEAVY_MODULES & set(timings)
+    assert not loaded, f"Heavy modules imported at startup: {sorted(loaded)}"
+
+
+def test_app_import_within_budget():
+    """Total import time of app.main stays within the budget"""
+    timings = _importtime("app.main")
+    seconds = timings["app.main"] / 1e6
+    print(f"app.main import: {seconds:.3f}s (budget {IMPORT_BUDGET_SECONDS}s)")
+    assert seconds < IMPORT_BUDGET_SECONDS
+
+
+def test_light_routes_import_fast():
+    """Knowledge and state-data routes don't depend on the simulation stack"""
+    for module in ("app.routes.knowledge_routes", "app.routes.india_routes"):
+        timings = _importtime(module)
+        assert not HEAVY_MODULES & set(timings), module
+
+
+if __name__ == "__main__":
+    test_app_import_skips_heavy_ml_dependencies()
+    test_app_import_within_budget()
+    test_light_routes_import_fast()
+    print("✓ Import-time budget respected")
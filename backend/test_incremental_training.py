@@ -0,0 +1,161 @@
+"""
+Incremental retraining from stored simulations: streaming, warm start, versioning, watermark
+"""
+import asyncio
+import copy
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import warnings
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+import torch
+
+from app.ml.incremental_training import IncrementalConfig, run_incremental_training, document_rows
+from app.ml.model_registry import ModelRegistry, IMPACT_TARGETS
+from app.ml.networks import IndianBehaviorLSTM
+from app.services.local_mongo import LocalMongoClient
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "ml", "models")
+
+
+async def _stored_simulation(client) -> dict:
+    """One document written by the real /india/simulate route"""
+    from app.main import app
+    from app.db import db
+    from app.services.bulk_writer import get_bulk_writer
+
+    db.client = client
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        response = await http.post("/india/simulate", json={
+            "policy_text": "Expand metro rail with ₹100 crore budget and add 50 EV charging stations",
+            "region": {"state": "Karnataka"},
+            "enable_optimization": False
+        })
+        assert response.status_code == 200, response.text
+    await get_bulk_writer().stop()  # write the buffered simulation
+    return await client["civicsim_ai"].indian_simulations.find_one({})
+
+
+def _variants(doc: dict, n: int, start: datetime, observed: str = "impact") -> list:
+    """Perturbed copies of a stored simulation (different budgets/outcomes over time), with measured outcomes"""
+    rng = np.random.default_rng(0)
+    docs = []
+    for i in range(n):
+        d = copy.deepcopy(doc)
+        d.pop("_id")
+        d["timestamp"] = start + timedelta(seconds=i)
+        d["structured_policy"]["budget_allocation_inr"] *= float(rng.uniform(0.2, 3))
+        d["structured_policy"]["enforcement_level"] = float(rng.uniform(0.3, 1))
+        metrics = d["results"]["simulation_metrics"]
+        for key in ("congestion_score", "energy_load", "dissatisfaction_index", "economic_stability"):
+            metrics[key] = float(rng.uniform(0.1, 0.9))
+        impact = d["results"]["impact_predictions"]
+        impact["congestion_score"] = metrics["congestion_score"]
+        impact["dissatisfaction_index"] = metrics["dissatisfaction_index"]
+        impact["energy_stress"] = metrics["energy_load"]
+        if observed == "impact":
+            d["observed_outcomes"] = {"impact": {
+                "congestion_score": metrics["congestion_score"] * float(rng.uniform(0.8, 1.2)),
+                "inflation_rate": float(rng.uniform(0.03, 0.07)),
+                "dissatisfaction_index": float(rng.uniform(0.1, 0.9)),
+                "energy_stress": metrics["energy_load"] * float(rng.uniform(0.8, 1.2))
+            }}
+        elif observed == "behavior":
+            d["observed_outcomes"] = {"behavior": {
+                key: float(rng.uniform(0, 1)) for key in d["results"]["behavior_output"]
+            }}
+        docs.append(d)
+    return docs
+
+
+def _registry(tmp: str) -> ModelRegistry:
+    behavior = IndianBehaviorLSTM()
+    behavior.load_state_dict(torch.load(os.path.join(MODEL_DIR, "india_behavior_lstm.pth"), map_location="cpu"))
+    impact = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for target in IMPACT_TARGETS.values():
+            with open(os.path.join(MODEL_DIR, f"india_impact_{target}.pkl"), "rb") as f:
+                impact[target] = pickle.load(f)
+    registry = ModelRegistry(tmp)
+    registry.register(behavior, impact)
+    return registry
+
+
+async def _run():
+    client = LocalMongoClient()
+    database = client["civicsim_ai"]
+    template = await _stored_simulation(client)
+    # The stored outputs are never labels: without observed outcomes a document is unusable
+    assert document_rows(template) is None
+    await database.indian_simulations.delete_many({})
+
+    tmp = tempfile.mkdtemp()
+    try:
+        registry = _registry(tmp)
+        config = IncrementalConfig(min_documents=40, batch_size=16, lstm_epochs=2, boost_rounds=5, max_regression=10.0,
+                                   min_behavior_labels=30, min_impact_labels=30)
+
+        # Simulations without observed outcomes aren't even streamed
+        await database.indian_simulations.insert_many(_variants(template, 60, datetime(2025, 12, 1), observed=None))
+        summary = await run_incremental_training(database, registry, config)
+        assert summary["status"] == "skipped" and summary["documents"] == 0
+
+        # Too little data: nothing happens
+        await database.indian_simulations.insert_many(_variants(template, 10, datetime(2026, 1, 1)))
+        summary = await run_incremental_training(database, registry, config)
+        assert summary["status"] == "skipped"
+
+        await database.indian_simulations.insert_many(_variants(template, 70, datetime(2026, 1, 2)))
+        summary = await run_incremental_training(database, registry, config)
+        print(summary)
+        assert summary["status"] == "promoted"
+        assert summary["version"] == "v2" and summary["parent_version"] == "v1"
+        assert summary["rows"] == summary["impact_rows"] == 80 and summary["impact_trained"]
+        assert registry.current_version() == "v2"
+
+        # No observed behavior outcomes: the LSTM is carried over, not trained on its own predictions
+        assert not summary["behavior_trained"] and "behavior" not in summary["comparison"]
+        parent_lstm, _, _ = registry.load_trainable("v1")
+        child_lstm, _, _ = registry.load_trainable("v2")
+        for name, weights in parent_lstm.state_dict().items():
+            assert torch.equal(weights, child_lstm.state_dict()[name]), name
+
+        # Warm start: new boosters keep the parent's trees and add boost_rounds more
+        _, parents, _ = registry.load_trainable("v1")
+        _, children, _ = registry.load_trainable("v2")
+        for target in parents:
+            assert children[target].get_booster().num_boosted_rounds() == \
+                parents[target].get_booster().num_boosted_rounds() + 5
+        assert registry.read_manifest("v2")["metadata"]["source"] == "incremental"
+
+        # Watermark: already-trained documents aren't streamed again
+        summary = await run_incremental_training(database, registry, config)
+        assert summary["status"] == "skipped" and summary["documents"] == 0
+
+        # Measured behavior outcomes alone fine-tune the LSTM and carry the impact models over
+        await database.indian_simulations.insert_many(_variants(template, 50, datetime(2026, 1, 3), observed="behavior"))
+        summary = await run_incremental_training(database, registry, config)
+        assert summary["behavior_trained"] and summary["behavior_rows"] == 50
+        assert not summary["impact_trained"] and set(summary["comparison"]) == {"behavior"}
+        _, grandchildren, _ = registry.load_trainable(summary["version"])
+        for target in children:
+            assert grandchildren[target].get_booster().num_boosted_rounds() == \
+                children[target].get_booster().num_boosted_rounds()
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_incremental_training():
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    test_incremental_training()
+    print("✓ Incremental training OK")
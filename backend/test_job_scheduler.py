@@ -0,0 +1,314 @@
+"""
+Test the background job scheduler: priorities, tenant limits, cancellation,
+bounded queue, restart recovery and the /jobs + background=true route flow
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from bson import ObjectId
+
+from app.services import job_scheduler
+from app.services.job_scheduler import JobScheduler, QueueFullError, run_in_thread, run_off_loop
+from app.services.local_mongo import LocalMongoClient
+
+
+def _scheduler(**kwargs):
+    """Scheduler with test handlers; 'block' jobs wait until their gate is opened"""
+    scheduler = JobScheduler(**kwargs)
+    gates = {}
+    finished = []
+
+    async def block(payload):
+        gate = gates.setdefault(payload["name"], asyncio.Event())
+        await gate.wait()
+        finished.append(payload["name"])
+        return {"name": payload["name"]}
+
+    async def fail(payload):
+        raise RuntimeError("boom")
+
+    scheduler.register("block", block)
+    scheduler.register("fail", fail)
+
+    def release(name):
+        gates.setdefault(name, asyncio.Event()).set()
+
+    return scheduler, release, finished
+
+
+async def _settle(scheduler, job_id, status, timeout=2.0):
+    job = await scheduler.wait(job_id, timeout)
+    assert job["status"] == status, job
+    return job
+
+
+async def _exercise_scheduler():
+    database = LocalMongoClient()["civicsim_ai"]
+
+    # Priorities: one worker, busy, while low/normal/high queue up behind it
+    scheduler, release, finished = _scheduler(workers=1, max_queue=10)
+    await scheduler.start(database)
+    first = await scheduler.submit("block", {"name": "first"})
+    await asyncio.sleep(0)
+    low = await scheduler.submit("block", {"name": "low"}, priority="low")
+    normal = await scheduler.submit("block", {"name": "normal"})
+    high = await scheduler.submit("block", {"name": "high"}, priority="high")
+    for name in ("first", "low", "normal", "high"):
+        release(name)
+    await _settle(scheduler, low["job_id"], "completed")
+    assert finished == ["first", "high", "normal", "low"], finished
+    done = await scheduler.get(high["job_id"])
+    assert done["result"] == {"name": "high"} and done["completed_at"]
+    assert (await database.jobs.find_one({}))["payload"] == {"name": "first"}
+
+    # Bounded queue and bad input
+    small = JobScheduler(workers=1, max_queue=2)
+    small.handlers = scheduler.handlers
+    await small.start(LocalMongoClient()["civicsim_ai"])
+    await small.submit("block", {"name": "q1"})
+    await small.submit("block", {"name": "q2"})
+    try:
+        await small.submit("block", {"name": "q3"})
+        raise AssertionError("full queue accepted a job")
+    except QueueFullError:
+        pass
+    for bad in ({"kind": "nope"}, {"kind": "block", "priority": "urgent"}):
+        try:
+            await small.submit(bad["kind"], {}, priority=bad.get("priority", "normal"))
+            raise AssertionError(f"accepted {bad}")
+        except ValueError:
+            pass
+    await small.stop()
+    await scheduler.stop()
+
+    # Per-tenant limit: tenant A is held to one running job while B still runs
+    database = LocalMongoClient()["civicsim_ai"]
+    scheduler, release, finished = _scheduler(workers=3, tenant_concurrency=1)
+    await scheduler.start(database)
+    a1 = await scheduler.submit("block", {"name": "a1"}, tenant="A")
+    a2 = await scheduler.submit("block", {"name": "a2"}, tenant="A")
+    b1 = await scheduler.submit("block", {"name": "b1"}, tenant="B")
+    await asyncio.sleep(0.05)
+    statuses = {j["job_id"]: j["status"] for j in await scheduler.list_jobs("A")}
+    assert statuses == {a1["job_id"]: "running", a2["job_id"]: "queued"}, statuses
+    assert (await scheduler.get(b1["job_id"]))["status"] == "running"
+    release("a1")
+    await _settle(scheduler, a1["job_id"], "completed")
+    await asyncio.sleep(0.05)
+    assert (await scheduler.get(a2["job_id"]))["status"] == "running"
+
+    # Cancellation: running and queued jobs
+    cancelled = await scheduler.cancel(a2["job_id"])
+    assert cancelled["status"] == "cancelled", cancelled
+    a3 = await scheduler.submit("block", {"name": "a3"}, tenant="B")
+    a4 = await scheduler.submit("block", {"name": "a4"}, tenant="B")
+    assert (await scheduler.cancel(a4["job_id"]))["status"] == "cancelled"
+    assert scheduler.queued() == 1
+    release("b1")
+    release("a3")
+    release("a4")
+    await _settle(scheduler, a3["job_id"], "completed")
+    assert "a4" not in finished and "a2" not in finished
+    assert (await scheduler.cancel(a3["job_id"]))["status"] == "completed"  # already finished
+    assert await scheduler.cancel("not-an-id") is None
+
+    # Tenant scoping: another tenant can neither see nor cancel a job
+    b2 = await scheduler.submit("block", {"name": "b2"}, tenant="B")
+    assert await scheduler.get(b2["job_id"], tenant="A") is None
+    assert await scheduler.cancel(b2["job_id"], tenant="A") is None
+    assert [job async for job in scheduler.watch(b2["job_id"], tenant="A")] == []
+    assert (await scheduler.get(b2["job_id"], tenant="B"))["status"] in ("queued", "running")
+    assert (await scheduler.cancel(b2["job_id"], tenant="B"))["status"] == "cancelled"
+
+    # Failures are recorded, and watch() streams every transition
+    failed = await scheduler.submit("fail", {})
+    seen = [job["status"] async for job in scheduler.watch(failed["job_id"])]
+    assert seen[-1] == "failed" and seen[0] in ("queued", "running"), seen
+    assert (await scheduler.get(failed["job_id"]))["error"] == "boom"
+
+    # Shutdown mid-run hands the job back; the next start finishes it
+    interrupted = await scheduler.submit("block", {"name": "restart"})
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+    assert (await database.jobs.find_one({"kind": "block", "payload.name": "restart"}))["status"] == "queued"
+    await scheduler.start(database)
+    release("restart")
+    await _settle(scheduler, interrupted["job_id"], "completed")
+    await scheduler.stop()
+
+
+def test_job_scheduler():
+    asyncio.run(_exercise_scheduler())
+    print("✓ Job scheduler: priority order, tenant limits, cancellation, bounded queue, recovery")
+
+
+async def _exercise_thread_cancellation():
+    scheduler = JobScheduler(workers=2, tenant_concurrency=1, job_timeout=0.1)
+    threads = {"active": 0, "peak": 0}
+
+    def busy(seconds):
+        threads["active"] += 1
+        threads["peak"] = max(threads["peak"], threads["active"])
+        time.sleep(seconds)
+        threads["active"] -= 1
+
+    async def in_thread(payload):
+        return await run_in_thread(busy, payload["seconds"])
+
+    async def stages(payload):
+        for _ in range(10):
+            await asyncio.sleep(0)
+            busy(0.05)
+
+    async def pipeline(payload):
+        return await run_off_loop(stages, payload)
+
+    scheduler.register("thread", in_thread)
+    scheduler.register("pipeline", pipeline)
+    await scheduler.start(LocalMongoClient()["civicsim_ai"])
+
+    # Cancel returns once the thread is done, so the tenant's next job never overlaps it
+    job = await scheduler.submit("thread", {"seconds": 0.05}, tenant="A")
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    assert (await scheduler.cancel(job["job_id"], tenant="A"))["status"] == "cancelled"
+    assert threads["active"] == 0 and time.perf_counter() - start >= 0.03
+    again = await scheduler.submit("thread", {"seconds": 0.01}, tenant="A")
+    await _settle(scheduler, again["job_id"], "completed")
+    assert threads["peak"] == 1
+
+    # A timed-out pipeline stops at its next stage and holds the slot until then
+    job = await scheduler.submit("pipeline", {}, tenant="A")
+    failed = await _settle(scheduler, job["job_id"], "failed")
+    assert "timed out" in failed["error"] and threads["active"] == 0 and threads["peak"] == 1
+    await scheduler.stop()
+
+
+def test_thread_jobs_hold_slots_until_stopped():
+    asyncio.run(_exercise_thread_cancellation())
+    print("✓ Cancelled and timed-out thread jobs keep their slots until the thread stops")
+
+
+async def _exercise_worker_failures():
+    database = LocalMongoClient()["civicsim_ai"]
+    scheduler, release, finished = _scheduler(workers=1, heartbeat_interval=0.05)
+    await scheduler.start(database)
+
+    # A Mongo error while claiming doesn't kill the worker; the job is retried
+    update_one = scheduler.collection.update_one
+    errors = []
+
+    async def flaky_update_one(*args, **kwargs):
+        if not errors:
+            errors.append(args[0])
+            raise ConnectionError("mongo down")
+        return await update_one(*args, **kwargs)
+
+    scheduler.collection.update_one = flaky_update_one
+    job = await scheduler.submit("block", {"name": "retried"})
+    release("retried")
+    await _settle(scheduler, job["job_id"], "completed")
+    assert errors and all(not task.done() for task in scheduler._workers)
+    scheduler.collection.update_one = update_one
+
+    # Running jobs get heartbeats; another process's job that stopped beating is failed
+    running = await scheduler.submit("block", {"name": "long"})
+    long_ago = datetime.utcnow() - timedelta(seconds=60)
+    orphan = await database.jobs.insert_one({
+        "kind": "block", "payload": {}, "tenant": "anonymous", "priority": "normal", "status": "running",
+        "created_at": long_ago, "started_at": long_ago, "heartbeat_at": long_ago, "owner": "gone:1:dead"
+    })
+    await asyncio.sleep(0.3)
+    beat = await database.jobs.find_one({"_id": ObjectId(running["job_id"])})
+    assert beat["status"] == "running" and beat["heartbeat_at"] > beat["started_at"]
+    reaped = await scheduler.get(str(orphan.inserted_id))
+    assert reaped["status"] == "failed" and reaped["error"] == "interrupted"
+    release("long")
+    await _settle(scheduler, running["job_id"], "completed")
+    await scheduler.stop()
+
+
+def test_workers_survive_mongo_errors():
+    retry_delay, job_scheduler.RETRY_DELAY = job_scheduler.RETRY_DELAY, 0.05
+    try:
+        asyncio.run(_exercise_worker_failures())
+    finally:
+        job_scheduler.RETRY_DELAY = retry_delay
+    print("✓ Job workers outlive Mongo errors; orphaned running jobs are failed by heartbeat")
+
+
+async def _exercise_job_routes():
+    from app.main import app
+    from app.db import db
+    from app.services.job_scheduler import get_job_scheduler
+    from app.services.bulk_writer import get_bulk_writer
+
+    client = LocalMongoClient()
+    db.client = client
+    database = client["civicsim_ai"]
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.post("/india/simulate", headers={"X-Tenant-ID": "team-a"}, json={
+                "policy_text": "Add 10 metro stations with ₹200 crore budget",
+                "region": {"state": "Karnataka", "country": "India"},
+                "enable_optimization": False,
+                "background": True
+            })
+            assert response.status_code == 202, response.text
+            job = response.json()
+            assert job["status"] == "queued" and job["tenant"] == "team-a"
+            assert response.headers["location"] == job["status_url"]
+
+            tenant = {"X-Tenant-ID": "team-a"}
+            polled = (await http.get(job["status_url"], params={"wait": 60}, headers=tenant)).json()
+            assert polled["status"] == "completed", polled
+            simulation_id = polled["result"]["simulation_id"]
+            await get_bulk_writer().flush()
+            assert await database.indian_simulations.count_documents({}) == 1
+            assert (await database.jobs.find_one({}))["payload"]["region"]["state"] == "Karnataka"
+
+            # A finished job's event stream is its final state
+            events = (await http.get(job["events_url"], headers=tenant)).text
+            assert events.startswith("event: status\ndata: ")
+            assert json.loads(events.split("data: ", 1)[1])["status"] == "completed"
+
+            listed = (await http.get("/jobs", headers={"X-Tenant-ID": "team-a"})).json()
+            assert [j["job_id"] for j in listed["jobs"]] == [job["job_id"]]
+            assert (await http.get("/jobs")).json()["jobs"] == []  # other tenants don't see it
+
+            # Other tenants get 404 for the job, its events and cancelling it
+            for request in (http.get(job["status_url"]), http.get(job["events_url"]), http.delete(job["status_url"]),
+                            http.get(job["status_url"], headers={"X-Tenant-ID": "team-b"})):
+                assert (await request).status_code == 404
+
+            assert (await http.delete(job["status_url"], headers=tenant)).status_code == 409
+            assert (await http.get("/jobs/not-an-id")).status_code == 400
+            assert (await http.get("/jobs/" + "0" * 24)).status_code == 404
+
+            response = await http.post("/simulation/simulate", json={
+                "policy_text": "Add 5 new bus lanes",
+                "background": True,
+                "priority": "urgent"
+            })
+            assert response.status_code == 400
+    finally:
+        await get_job_scheduler().stop()
+        await get_bulk_writer().stop()
+
+    return simulation_id
+
+
+def test_job_routes():
+    simulation_id = asyncio.run(_exercise_job_routes())
+    print(f"✓ Background /india/simulate completed as a job: simulation {simulation_id}")
+
+
+if __name__ == "__main__":
+    test_job_scheduler()
+    test_thread_jobs_hold_slots_until_stopped()
+    test_workers_survive_mongo_errors()
+    test_job_routes()
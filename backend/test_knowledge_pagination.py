@@ -0,0 +1,132 @@
+"""
+Test keyset pagination, field projections and streamed JSON on the
+/knowledge/v2 state, national and impact-area lists
+"""
+import asyncio
+
+import httpx
+
+from app.services.knowledge_base_service import (
+    initialize_kb_service, get_kb_service, encode_cursor, CATEGORY_SORT
+)
+from app.services.local_mongo import LocalMongoClient
+
+POLICIES = 250
+
+
+def _policies():
+    policies = []
+    for i in range(POLICIES):
+        policies.append({
+            "state": "Karnataka", "level": "state", "category": ["transport", "energy"][i % 2],
+            "policy_key": f"p{i}", "name": f"Policy {i}", "budget_allocation": i,
+            "description": "x" * 200, "impact_areas": ["Urban mobility"] if i % 5 == 0 else ["Rural jobs"]
+        })
+    policies.append({"state": "national", "level": "national", "category": "economic", "policy_key": "gst",
+                     "name": "GST", "impact_areas": ["Urban mobility"]})
+    # Uncategorized policies sort before every category
+    policies.append({"state": "Goa", "level": "state", "policy_key": "g0", "name": "No category"})
+    policies.append({"state": "Goa", "level": "state", "category": None, "policy_key": "g1", "name": "Null category"})
+    policies.append({"state": "Goa", "level": "state", "category": "tourism", "policy_key": "g2", "name": "Beaches"})
+    return policies
+
+
+async def _pages(http, url, **params):
+    pages, after = [], None
+    while True:
+        response = await http.get(url, params={**params, **({"after": after} if after else {})})
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/json"
+        body = response.json()
+        pages.append(body)
+        after = body["next_cursor"]
+        if after is None:
+            return pages
+
+
+def _grouped(page):
+    return [(category, policy) for category, policies in page["categories"].items() for policy in policies]
+
+
+async def _exercise():
+    from app.main import app
+    from app.db import db
+
+    client = LocalMongoClient()
+    db.client = client
+    await initialize_kb_service(client, "civicsim_ai")
+    kb = await get_kb_service()
+    await kb.bulk_insert_policies(_policies())
+    await kb.initialize_indexes()
+    indexes = await kb.policies_collection.index_information()
+    assert {"state_category_id_idx", "level_category_id_idx", "impact_tokens_id_idx"} <= set(indexes)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        # Without a limit: every policy, grouped by category, same shape as before pagination
+        body = (await http.get("/knowledge/v2/state/Karnataka")).json()
+        assert body["state"] == "Karnataka" and body["total_policies"] == body["count"] == POLICIES
+        assert body["next_cursor"] is None
+        assert {category: len(policies) for category, policies in body["categories"].items()} == {
+            "energy": POLICIES // 2, "transport": POLICIES // 2
+        }
+        assert all(policy["category"] == category for category, policy in _grouped(body))
+        first = body["categories"]["energy"][0]
+        assert first["name"] == "Policy 1" and "search_tokens" not in first and isinstance(first["created_at"], str)
+
+        # Walking the pages visits every policy once, in (category, _id) order, grouped per page
+        pages = await _pages(http, "/knowledge/v2/state/Karnataka", limit=100)
+        assert [page["count"] for page in pages] == [100, 100, 50]
+        rows = [row for page in pages for row in _grouped(page)]
+        ids = [policy["_id"] for _, policy in rows]
+        assert len(set(ids)) == POLICIES and rows == sorted(rows, key=lambda row: (row[0], row[1]["_id"]))
+        assert set(pages[1]["categories"]) == {"energy", "transport"}  # a page can span two categories
+        assert all(page["total_policies"] == POLICIES for page in pages)
+
+        # A cursor taken on an uncategorized policy resumes with the next one, then the categories
+        pages = await _pages(http, "/knowledge/v2/state/Goa", limit=1, fields="policy_key")
+        assert [[(category, policy["policy_key"]) for category, policy in _grouped(page)] for page in pages] == [
+            [("other", "g0")], [("other", "g1")], [("tourism", "g2")]
+        ]
+
+        # An exact multiple of the page size ends without an empty trailing page
+        assert [page["count"] for page in await _pages(http, "/knowledge/v2/state/Karnataka", limit=125)] == [125, 125]
+
+        # Only the requested fields (plus _id and the grouping key) come back
+        body = (await http.get("/knowledge/v2/state/Karnataka",
+                               params={"fields": "name, budget_allocation,search_tokens", "limit": 3})).json()
+        assert [set(policy) for _, policy in _grouped(body)] == [{"_id", "category", "name", "budget_allocation"}] * 3
+
+        # Impact areas and national lists keep their flat shape and page by _id
+        pages = await _pages(http, "/knowledge/v2/impact/urban mobility", limit=20, fields="policy_key")
+        impact_ids = [policy["_id"] for page in pages for policy in page["policies"]]
+        assert len(impact_ids) == POLICIES // 5 + 1 and impact_ids == sorted(impact_ids)
+        assert pages[0]["impact_area"] == "urban mobility" and pages[0]["total_policies"] == POLICIES // 5 + 1
+        assert len((await http.get("/knowledge/v2/impact/urban mobility")).json()["policies"]) == POLICIES // 5 + 1
+        body = (await http.get("/knowledge/v2/national/economic")).json()
+        assert body["category"] == "economic" and [p["policy_key"] for p in body["policies"]] == ["gst"]
+        assert body["next_cursor"] is None
+
+        # Bad input is a 400, an unknown state a 404, a past-the-end cursor an empty page
+        assert (await http.get("/knowledge/v2/state/Karnataka", params={"after": "nope"})).status_code == 400
+        assert (await http.get("/knowledge/v2/impact/urban", params={"after": "nope"})).status_code == 400
+        assert (await http.get("/knowledge/v2/state/Karnataka", params={"fields": "$where"})).status_code == 400
+        assert (await http.get("/knowledge/v2/state/Karnataka", params={"limit": 5000})).status_code == 422
+        assert (await http.get("/knowledge/v2/state/Atlantis")).status_code == 404
+        last = encode_cursor(rows[-1][1], CATEGORY_SORT)
+        body = (await http.get("/knowledge/v2/state/Karnataka", params={"after": last})).json()
+        assert body["count"] == 0 and body["categories"] == {} and body["next_cursor"] is None
+
+    # The service keeps its list API, now pageable too
+    first = await kb.get_state_policies("Karnataka", limit=10, fields=["policy_key"])
+    rest = await kb.get_state_policies("Karnataka", after=encode_cursor(first[-1], CATEGORY_SORT))
+    assert len(first) == 10 and len(rest) == POLICIES - 10
+    assert len(await kb.get_policies_by_impact_area("urban mobility")) == POLICIES // 5 + 1
+
+
+def test_knowledge_pagination():
+    asyncio.run(_exercise())
+    print(f"✓ /knowledge/v2 lists: {POLICIES} policies streamed whole or in keyset pages, projected, state grouped")
+
+
+if __name__ == "__main__":
+    test_knowledge_pagination()
@@ -0,0 +1,106 @@
+"""
+Test /knowledge/v2/states: one cached $group aggregation for every state instead of
+a distinct + one summary aggregation per state, invalidated by writes
+"""
+import asyncio
+
+import httpx
+
+from app.services.knowledge_base_service import initialize_kb_service, get_kb_service
+from app.services.local_mongo import LocalMongoClient
+
+STATES = ["Karnataka", "Kerala", "Goa", "Punjab", "Bihar"]
+CATEGORIES = ["transport", "energy", "housing"]
+
+
+def _policies():
+    policies = [{"state": "national", "level": "national", "category": "tax", "policy_key": "gst", "budget_allocation": 10}]
+    for i, state in enumerate(STATES):
+        for j, category in enumerate(CATEGORIES[:i % 3 + 1]):
+            policies.append({
+                "state": state, "level": "state", "category": category,
+                "policy_key": f"{state}_{category}", "budget_allocation": 100 * (i + 1) + j
+            })
+    return policies
+
+
+def _count_round_trips(collection):
+    calls = []
+    for name in ("aggregate", "distinct", "find", "count_documents"):
+        original = getattr(collection, name)
+
+        def counted(*args, _original=original, _name=name, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+
+        setattr(collection, name, counted)
+    return calls
+
+
+async def _exercise():
+    from app.main import app
+    from app.db import db
+
+    client = LocalMongoClient()
+    db.client = client
+    await initialize_kb_service(client, "civicsim_ai")
+    kb = await get_kb_service()
+    await kb.bulk_insert_policies(_policies())
+
+    # What the per-state loop used to return
+    expected = []
+    for state in sorted(await kb.get_all_states()):
+        summary = await kb.get_state_summary(state)
+        expected.append({
+            "state": state,
+            "policy_count": summary["total_policies"],
+            "total_budget": summary["total_budget"],
+            "categories": sorted(summary["categories"])
+        })
+
+    calls = _count_round_trips(kb.policies_collection)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        # Concurrent first requests share one aggregation
+        responses = await asyncio.gather(*(http.get("/knowledge/v2/states") for _ in range(5)))
+        body = responses[0].json()
+        assert all(r.json() == body for r in responses)
+        assert body["total_states"] == len(STATES) and body["states"] == expected
+        assert calls == ["aggregate"], calls
+
+        # Cached: no round trip at all
+        await http.get("/knowledge/v2/states")
+        assert calls == ["aggregate"], calls
+
+        # Writes through the service invalidate the overview
+        await kb.insert_policy({"state": "Assam", "category": "transport", "policy_key": "assam_bus",
+                                "budget_allocation": 5})
+        body = (await http.get("/knowledge/v2/states")).json()
+        assert body["total_states"] == len(STATES) + 1 and calls.count("aggregate") == 2
+
+        await kb.update_policy("Goa", "transport", "Goa_transport", {"budget_allocation": 1000})
+        goa = next(s for s in (await http.get("/knowledge/v2/states")).json()["states"] if s["state"] == "Goa")
+        assert goa["total_budget"] == 1000 + 301 + 302
+
+        await kb.delete_policy("Assam", "transport", "assam_bus")
+        body = (await http.get("/knowledge/v2/states")).json()
+        assert body["total_states"] == len(STATES) and calls.count("aggregate") == 4
+
+    # Callers can't corrupt the cache
+    overview = await kb.get_states_overview()
+    overview[0]["categories"].append("mutated")
+    assert "mutated" not in (await kb.get_states_overview())[0]["categories"]
+
+    # The TTL bounds staleness from writes made elsewhere (other workers)
+    await kb.policies_collection.insert_one({"state": "Sikkim", "category": "energy", "policy_key": "s"})
+    assert len(await kb.get_states_overview()) == len(STATES)
+    kb._states_overview_expires = 0
+    assert len(await kb.get_states_overview()) == len(STATES) + 1
+
+
+def test_states_overview_single_aggregation():
+    asyncio.run(_exercise())
+    print(f"✓ /knowledge/v2/states: 1 aggregation instead of {len(STATES) + 1} round trips, cached until a write")
+
+
+if __name__ == "__main__":
+    test_states_overview_single_aggregation()
@@ -0,0 +1,101 @@
+"""
+Test the token-array lookups that replaced $regex scans in KnowledgeBaseService:
+tokenizer, parity with the old regex results, upkeep on update and backfill
+"""
+import asyncio
+
+from app.benchmarks.knowledge_queries import (
+    legacy_related_filter, legacy_impact_filter, plan_stages, policy_documents
+)
+from app.services.knowledge_base_service import (
+    KnowledgeBaseService, query_tokens, text_tokens, related_policies_filter
+)
+from app.services.local_mongo import LocalMongoClient
+
+TERMS = ["transport", "tax", "electric", "Digital India", "agriculture", "employment", "health", "education"]
+
+
+def test_tokenizer():
+    assert query_tokens("Poverty_Reduction") == ["poverty", "reduction"]
+    assert query_tokens("  EV / Electric-Vehicles ") == ["ev", "electric", "vehicles"]
+    tokens = text_tokens("Transportation", ["Digital payments"], None)
+    assert {"transportation", "transport", "tra", "digital", "payments", "pay"} <= set(tokens)
+    assert "tr" not in tokens and tokens == sorted(set(tokens))
+    assert related_policies_filter("Electric Vehicles", "Goa") == {
+        "$or": [{"search_tokens": {"$all": ["electric", "vehicles"]}}, {"state": "Goa"}]
+    }
+    assert related_policies_filter("--") == {"_id": None}
+    print("✓ Tokens: lowercase words plus 3+ character prefixes")
+
+
+async def _exercise():
+    kb = KnowledgeBaseService(LocalMongoClient(), "civicsim_ai")
+    await kb.bulk_insert_policies(policy_documents())
+    collection = kb.policies_collection
+
+    # Word-prefix tokens find what the substring regex found (mid-word hits aside)
+    matched = 0
+    for term in TERMS:
+        old = {p["_id"] for p in await collection.find(legacy_related_filter(term)).to_list(length=None)}
+        new = {p["_id"] for p in await collection.find(related_policies_filter(term)).to_list(length=None)}
+        assert new <= old, term
+        if " " not in term:
+            mid_word = {p["_id"] for p in await collection.find({"$or": [
+                {field: {"$regex": rf"(^|[^a-z]){term}", "$options": "i"}}
+                for field in ("policy_type", "category", "impact_areas")
+            ]}).to_list(length=None)}
+            assert new == mid_word, term
+        matched += len(new)
+
+        old = await collection.count_documents(legacy_impact_filter(term))
+        assert len(await kb.get_policies_by_impact_area(term)) <= old
+    assert matched
+
+    # Responses never carry the token arrays
+    related = await kb.get_related_policies("agriculture", "Karnataka", limit=50)
+    assert related and all("search_tokens" not in p and "impact_tokens" not in p for p in related)
+
+    # Updating a source field recomputes the tokens
+    policy = await collection.find_one({"state": "Karnataka"})
+    await kb.update_policy(policy["state"], policy["category"], policy["policy_key"],
+                           {"impact_areas": ["Groundwater recharge"]})
+    updated = await collection.find_one({"_id": policy["_id"]})
+    assert "groundwater" in updated["impact_tokens"] and "recharge" in updated["search_tokens"]
+    assert policy["category"] in updated["search_tokens"]
+    assert [p["_id"] for p in await kb.get_policies_by_impact_area("groundwater")] == [str(policy["_id"])]
+
+    # Policies stored before the tokens existed get them from initialize_indexes
+    await collection.insert_one({"state": "Goa", "category": "tourism", "policy_key": "old",
+                                 "impact_areas": ["Mangrove restoration"]})
+    await kb.initialize_indexes()
+    assert await collection.count_documents({"search_tokens": {"$exists": False}}) == 0
+    assert await kb.backfill_tokens() == 0
+    assert [p["policy_key"] for p in await kb.get_related_policies("mangrove")] == ["old"]
+
+
+def test_token_lookups_match_regex():
+    asyncio.run(_exercise())
+    print("✓ Token lookups: same policies as the regex scans, kept current on update and backfilled")
+
+
+def test_plan_stages():
+    explain = {
+        "queryPlanner": {"winningPlan": {"queryPlan": {
+            "stage": "SUBPLAN", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "OR", "inputStages": [
+                {"stage": "IXSCAN", "indexName": "search_tokens_idx"},
+                {"stage": "IXSCAN", "indexName": "state_category_id_idx"}
+            ]}}
+        }}},
+        "executionStats": {"nReturned": 3, "totalDocsExamined": 3, "totalKeysExamined": 4}
+    }
+    assert plan_stages(explain) == [
+        "SUBPLAN", "FETCH", "OR", "IXSCAN search_tokens_idx", "IXSCAN state_category_id_idx"
+    ]
+    assert plan_stages({"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}) == ["COLLSCAN"]
+    print("✓ Benchmark reads winning plans from explain()")
+
+
+if __name__ == "__main__":
+    test_tokenizer()
+    test_token_lookups_match_regex()
+    test_plan_stages()
@@ -0,0 +1,28 @@
+"""
+Smoke test for the in-process load testing harness
+"""
+import asyncio
+
+from app.benchmarks.load_test import LoadTestConfig, run_load_test, parse_mix
+
+
+def test_load_harness_runs_offline():
+    """Short run against the local Mongo stand-in reports per-kind stats"""
+    config = LoadTestConfig(
+        concurrency=4,
+        duration=1.0,
+        mix=parse_mix("knowledge=1,state_data=1")
+    )
+    report = asyncio.run(run_load_test(config))
+
+    assert report["overall"]["requests"] > 0
+    assert report["overall"]["errors"] == 0
+    assert set(report["by_kind"]) == {"knowledge", "state_data"}
+    assert report["event_loop_lag_ms"]["max"] >= 0
+
+    print(f"✓ {report['overall']['requests']} requests, "
+          f"p99={report['overall']['latency_ms']['p99']}ms")
+
+
+if __name__ == "__main__":
+    test_load_harness_runs_offline()
@@ -0,0 +1,74 @@
+"""
+DataLoader LSTM training: learns, stops early, checkpoints and resumes
+"""
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+from app.ml.lstm_training import (
+    TrainingConfig, make_loaders, train_lstm, evaluate, LAST_CHECKPOINT, BEST_CHECKPOINT
+)
+from app.ml.networks import BehaviorLSTM
+from app.ml.training_data import IndianDataGenerator
+
+
+def _data(n=4000):
+    X, y = IndianDataGenerator(seed=0).behavioral_arrays(n)
+    X = (X - X.mean(axis=0)) / (X.std(axis=0) + 1e-6)
+    split = int(n * 0.8)
+    return X[:split], y[:split], X[split:], y[split:]
+
+
+def test_training_improves_and_restores_best_weights():
+    X_train, y_train, X_val, y_val = _data()
+    config = TrainingConfig(epochs=8, batch_size=128, learning_rate=5e-3, num_threads=2, patience=0)
+    train_loader, val_loader = make_loaders(X_train, y_train, X_val, y_val, config)
+
+    model = BehaviorLSTM()
+    initial = evaluate(model, val_loader, torch.nn.MSELoss())
+    result = train_lstm(model, train_loader, val_loader, config)
+
+    print(f"val loss {initial:.4f} -> {result.best_val_loss:.4f}, {result.samples_per_sec:,.0f} samples/s")
+    assert result.epochs_run == 8 and not result.stopped_early
+    assert result.best_val_loss < initial / 2
+    assert result.samples_per_sec > 0
+    assert len(result.history) == 8
+    # The model holds the best epoch's weights, not the last epoch's
+    assert np.isclose(evaluate(model, val_loader, torch.nn.MSELoss()), result.best_val_loss)
+
+
+def test_early_stopping_on_unlearnable_labels():
+    X_train, _, X_val, _ = _data()
+    rng = np.random.default_rng(0)
+    noise_train = rng.random((len(X_train), 4), dtype=np.float32)
+    noise_val = rng.random((len(X_val), 4), dtype=np.float32)
+    config = TrainingConfig(epochs=50, batch_size=128, learning_rate=5e-3, patience=2)
+    train_loader, val_loader = make_loaders(X_train, noise_train, X_val, noise_val, config)
+
+    result = train_lstm(BehaviorLSTM(), train_loader, val_loader, config)
+    assert result.stopped_early
+    assert result.epochs_run < 50
+    assert result.epochs_run - result.best_epoch == 2
+
+
+def test_checkpoint_resume_continues_from_last_epoch():
+    X_train, y_train, X_val, y_val = _data(2000)
+    with tempfile.TemporaryDirectory() as tmp:
+        first = TrainingConfig(epochs=3, batch_size=128, patience=0, checkpoint_dir=tmp)
+        train_lstm(BehaviorLSTM(), *make_loaders(X_train, y_train, X_val, y_val, first), first)
+        assert os.path.exists(os.path.join(tmp, LAST_CHECKPOINT))
+        assert os.path.exists(os.path.join(tmp, BEST_CHECKPOINT))
+
+        resumed = TrainingConfig(epochs=5, batch_size=128, patience=0, checkpoint_dir=tmp, resume=True)
+        result = train_lstm(BehaviorLSTM(), *make_loaders(X_train, y_train, X_val, y_val, resumed), resumed)
+        assert [h["epoch"] for h in result.history] == [1, 2, 3, 4, 5]
+        assert result.epochs_run == 5
+
+
+if __name__ == "__main__":
+    test_training_improves_and_restores_best_weights()
+    test_early_stopping_on_unlearnable_labels()
+    test_checkpoint_resume_continues_from_last_epoch()
+    print("✓ LSTM training loop OK")
@@ -0,0 +1,198 @@
+"""
+Model registry: versioned registration, hash verification and atomic hot reload
+"""
+import asyncio
+import os
+import pickle
+import tempfile
+import time
+import warnings
+
+import httpx
+import numpy as np
+import torch
+
+from app.config import Settings, get_settings
+from app.ml.model_registry import (
+    ModelRegistry, ModelIntegrityError, IMPACT_TARGETS, REGISTRY_DIR, get_model_registry
+)
+from app.ml.networks import IndianBehaviorLSTM
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "ml", "models")
+
+
+def _trained_models():
+    behavior = IndianBehaviorLSTM()
+    behavior.load_state_dict(torch.load(os.path.join(MODEL_DIR, "india_behavior_lstm.pth"), map_location="cpu"))
+    impact = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for target in IMPACT_TARGETS.values():
+            with open(os.path.join(MODEL_DIR, f"india_impact_{target}.pkl"), "rb") as f:
+                impact[target] = pickle.load(f)
+    return behavior, impact
+
+
+def test_register_and_load_round_trip():
+    """A registered version loads back with the same predictions and a full manifest"""
+    behavior, impact = _trained_models()
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp)
+        version = registry.register(behavior, impact, metadata={"note": "test"})
+        assert version == "v1"
+        assert registry.current_version() == "v1"
+
+        manifest = registry.read_manifest(version)
+        assert len(manifest["behavior"]["features"]) == 10
+        assert len(manifest["impact"]["features"]) == 8
+        assert manifest["metadata"] == {"note": "test"}
+        assert all(len(a["sha256"]) == 64 for a in manifest["artifacts"].values())
+
+        bundle = registry.load()
+        X = np.random.default_rng(0).random((16, 8), dtype=np.float32)
+        for key, target in IMPACT_TARGETS.items():
+            assert np.allclose(bundle.impact_models[key].predict(X), impact[target].predict(X), atol=1e-5)
+
+
+def test_tampered_artifact_is_rejected():
+    """Loading refuses an artifact whose bytes don't match the manifest"""
+    behavior, impact = _trained_models()
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp)
+        registry.register(behavior, impact)
+        with open(os.path.join(tmp, "v1", "impact_energy_stress.trees.npz"), "ab") as f:
+            f.write(b"\0")
+        try:
+            registry.load()
+        except ModelIntegrityError as e:
+            print(f"rejected: {e}")
+        else:
+            raise AssertionError("tampered artifact was loaded")
+
+
+def test_hot_reload_swaps_bundle_atomically():
+    """reload() swaps to the new version; a failed reload keeps the old bundle"""
+    behavior, impact = _trained_models()
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp)
+        registry.register(behavior, impact)
+        first = registry.bundle()
+        assert first.version == "v1"
+
+        registry.register(behavior, impact, promote=False)
+        assert registry.bundle() is first  # not promoted yet
+
+        second = registry.reload("v2")
+        assert second.version == "v2"
+        assert registry.bundle() is second
+        assert first.version == "v1"  # requests holding the old bundle are unaffected
+
+        try:
+            registry.reload("v9")
+        except FileNotFoundError:
+            pass
+        assert registry.bundle() is second
+
+
+def test_unregistered_versions_are_not_found():
+    """Only names listed by versions() resolve - no paths outside the registry"""
+    behavior, impact = _trained_models()
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(os.path.join(tmp, "registry"))
+        registry.register(behavior, impact)
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            f.write("{}")
+        for version in ("..", "../registry/v1", "v2"):
+            for action in (registry.read_manifest, registry.verify, registry.promote, registry.load_trainable):
+                try:
+                    action(version)
+                except FileNotFoundError:
+                    continue
+                raise AssertionError(f"{action.__name__}({version!r}) resolved")
+        assert registry.current_version() == "v1"
+
+
+async def _exercise_model_routes():
+    from app.main import app
+
+    settings = get_settings()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        assert (await http.get("/models/v999/manifest")).status_code == 404
+        assert (await http.get("/models/%2E%2E/manifest")).status_code == 404
+
+        # Reload is off until an admin token is configured, then needs it
+        assert (await http.post("/models/reload", json={})).status_code == 403
+        settings.registry_admin_token = "s3cret"
+        try:
+            response = await http.post("/models/reload", json={}, headers={"X-Admin-Token": "guess"})
+            assert response.status_code == 401
+            admin = {"X-Admin-Token": "s3cret"}
+            response = await http.post("/models/reload", json={"version": "../.."}, headers=admin)
+            assert response.status_code == 404
+            response = await http.post("/models/reload", json={"promote": False}, headers=admin)
+            assert response.status_code == 200, response.text
+        finally:
+            settings.registry_admin_token = ""
+
+
+def test_model_routes_validate_versions_and_admin_token():
+    asyncio.run(_exercise_model_routes())
+
+
+def test_workers_follow_promoted_version():
+    """A registry with reload_interval picks up a version promoted elsewhere"""
+    behavior, impact = _trained_models()
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp, reload_interval=1e-6)
+        registry.register(behavior, impact)
+        assert registry.bundle().version == "v1"
+
+        ModelRegistry(tmp).register(behavior, impact)  # another process promotes v2
+        start = time.perf_counter()
+        assert registry.bundle().version == "v1"  # returns at once; v2 loads in the background
+        assert time.perf_counter() - start < 0.05
+        registry._reloader.join(timeout=10)
+        assert registry.bundle().version == "v2"
+
+
+def test_missing_registry_without_mock_fallback_fails_loudly():
+    # Off unless a dev/test setup opts in with ALLOW_MOCK_MODELS=true
+    assert Settings.model_fields["allow_mock_models"].default is False
+    settings = get_settings()
+    allowed = settings.allow_mock_models
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            settings.allow_mock_models = False
+            try:
+                ModelRegistry(tmp).load()
+            except FileNotFoundError:
+                pass
+            else:
+                raise AssertionError("loaded without any registered version")
+
+            settings.allow_mock_models = True
+            assert ModelRegistry(tmp).load().is_mock
+        finally:
+            settings.allow_mock_models = allowed
+
+
+def test_shipped_registry_is_current():
+    """The repo ships a verified version and the shared registry resolves it from any cwd"""
+    registry = get_model_registry()
+    assert registry.root == REGISTRY_DIR
+    version = registry.current_version()
+    assert version is not None
+    registry.verify(version)
+    assert not registry.bundle().is_mock
+
+
+if __name__ == "__main__":
+    test_register_and_load_round_trip()
+    test_tampered_artifact_is_rejected()
+    test_hot_reload_swaps_bundle_atomically()
+    test_unregistered_versions_are_not_found()
+    test_model_routes_validate_versions_and_admin_token()
+    test_workers_follow_promoted_version()
+    test_missing_registry_without_mock_fallback_fails_loudly()
+    test_shipped_registry_is_current()
+    print("✓ Model registry OK")
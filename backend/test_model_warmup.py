@@ -0,0 +1,63 @@
+"""
+Test model warm-up and the /ready endpoint
+"""
+import asyncio
+
+import httpx
+
+from app.config import get_settings
+from app.main import app
+from app.services import model_warmup
+
+
+async def _get_ready():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/ready")
+
+
+def test_ready_only_after_warmup():
+    """/ready returns 503 until warm-up has run every pipeline stage"""
+    model_warmup._readiness.update({"ready": False, "status": "pending"})
+    response = asyncio.run(_get_ready())
+    assert response.status_code == 503
+
+    readiness = asyncio.run(model_warmup.warm_up())
+    assert readiness["ready"], readiness["error"]
+    assert set(readiness["stages"]) == {"preload_models", "dummy_inference"}
+
+    response = asyncio.run(_get_ready())
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    # The shared engine's optimizer ran (PPO mode also leaves a trained model behind)
+    from app.services.simulation_engine import get_simulation_engine
+    optimizer = get_simulation_engine().optimization_agent
+    assert optimizer.mode == "surrogate" or optimizer.model is not None
+
+    print(f"✓ Warm-up stages: {readiness['stages']}")
+
+
+def test_warmup_never_calls_the_llm():
+    """Outside demo mode warm-up still uses the deterministic extractor - no paid API call per boot"""
+    from app.services.simulation_engine import get_simulation_engine
+    policy_agent = get_simulation_engine().policy_agent
+    settings = get_settings()
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("warm-up called the LLM")
+
+    demo_mode, settings.demo_mode = settings.demo_mode, False
+    policy_agent._llm_extraction = no_llm
+    try:
+        readiness = asyncio.run(model_warmup.warm_up())
+    finally:
+        settings.demo_mode = demo_mode
+        del policy_agent._llm_extraction
+    assert readiness["ready"], readiness["error"]
+    print("✓ Warm-up without demo mode made no LLM call")
+
+
+if __name__ == "__main__":
+    test_ready_only_after_warmup()
+    test_warmup_never_calls_the_llm()
@@ -0,0 +1,118 @@
+"""
+Test the configured Motor client factory and the connection pool metrics listener
+"""
+import asyncio
+import threading
+import time
+
+from pymongo import ReadPreference, monitoring
+
+from app.config import Settings
+from app.db import create_mongo_client, available_compressors, read_preference
+from app.services.knowledge_base_service import KnowledgeBaseService
+from app.services.local_mongo import LocalMongoClient
+from app.services.mongo_pool import PoolMetrics, get_pool_metrics
+
+ADDRESS = ("localhost", 27017)
+
+
+def test_client_factory_options():
+    config = Settings(
+        mongo_max_pool_size=20, mongo_min_pool_size=2, mongo_max_idle_time_ms=60000,
+        mongo_server_selection_timeout_ms=1500, mongo_socket_timeout_ms=10000, mongo_compressors="zstd,snappy,zlib"
+    )
+
+    async def build():
+        client = create_mongo_client(config, connect=False)
+        try:
+            kb = KnowledgeBaseService(client, config.mongodb_db_name, "secondaryPreferred")
+            return (client.options, kb.db.read_preference, client[config.mongodb_db_name].read_preference,
+                    kb.primary_policies_collection.read_preference)
+        finally:
+            client.close()
+
+    options, kb_preference, default_preference, refill_preference = asyncio.run(build())
+    assert options.pool_options.max_pool_size == 20 and options.pool_options.min_pool_size == 2
+    assert options.pool_options.max_idle_time_seconds == 60
+    assert options.server_selection_timeout == 1.5 and options.pool_options.socket_timeout == 10
+    assert get_pool_metrics() in options.event_listeners
+    assert kb_preference == ReadPreference.SECONDARY_PREFERRED and default_preference == ReadPreference.PRIMARY
+    assert refill_preference == ReadPreference.PRIMARY  # cache refills and token rebuilds read their own writes
+
+    # Only compressors the driver can actually use are requested
+    assert "zlib" in available_compressors("zstd,snappy,zlib").split(",")
+    assert available_compressors("bogus, zlib ") == "zlib"
+    try:
+        read_preference("secondaryish")
+        assert False, "unknown read preference accepted"
+    except ValueError:
+        pass
+    print(f"✓ Client factory: pool 20/2, timeouts, compressors={available_compressors(config.mongo_compressors)!r}, "
+          f"knowledge reads secondaryPreferred")
+
+
+def test_pool_metrics():
+    metrics = PoolMetrics(max_pool_size=4)
+    metrics.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {}))
+
+    def checkout(connection_id, hold):
+        metrics.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        time.sleep(0.01)
+        metrics.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, connection_id))
+        metrics.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id))
+        hold.wait()
+        metrics.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, connection_id))
+
+    hold = threading.Event()
+    threads = [threading.Thread(target=checkout, args=(i, hold)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+
+    busy = metrics.stats()["servers"]["localhost:27017"]
+    assert busy["in_use"] == 3 and busy["open"] == 3 and busy["waiting"] == 0
+    assert metrics.stats()["utilization"] == 0.75
+    assert busy["wait_seconds_max"] >= 0.01
+
+    hold.set()
+    for thread in threads:
+        thread.join()
+
+    # Exhausted pool: a checkout that times out is counted by reason
+    metrics.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    assert metrics.stats()["waiting"] == 1
+    metrics.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(ADDRESS, monitoring.ConnectionCheckOutFailedReason.TIMEOUT)
+    )
+    metrics.pool_cleared(monitoring.PoolClearedEvent(ADDRESS))
+    metrics.connection_closed(monitoring.ConnectionClosedEvent(ADDRESS, 0, "stale"))
+
+    idle = metrics.stats()["servers"]["localhost:27017"]
+    assert idle["in_use"] == 0 and idle["peak_in_use"] == 3 and idle["open"] == 2 and idle["waiting"] == 0
+    assert idle["checkouts"] == 3 and idle["checkout_failures"] == {"timeout": 1} and idle["cleared"] == 1
+    print(f"✓ Pool metrics: peak 3/4 in use, avg checkout wait {idle['avg_wait_ms']}ms, 1 timeout")
+
+
+async def _exercise_metrics_route():
+    import httpx
+    from app.main import app
+    from app.db import db
+
+    db.client = LocalMongoClient()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        metrics = (await http.get("/performance/metrics")).json()
+        health = (await http.get("/performance/health")).json()
+    return metrics, health
+
+
+def test_pool_metrics_exposed():
+    metrics, health = asyncio.run(_exercise_metrics_route())
+    assert metrics["database_pool"]["max_pool_size"] == get_pool_metrics().max_pool_size
+    assert "servers" in health["database_pool"]
+    print("✓ Pool utilization in /performance/metrics and /performance/health")
+
+
+if __name__ == "__main__":
+    test_client_factory_options()
+    test_pool_metrics()
+    test_pool_metrics_exposed()
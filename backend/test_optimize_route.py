@@ -0,0 +1,124 @@
+"""
+Test /simulation/optimize: rehydrated state, optimization stage only, run as a
+scheduler job (202 + /jobs polling), deduplicated per simulation, admission-bounded
+"""
+import asyncio
+from datetime import datetime
+
+import httpx
+from bson import ObjectId
+
+from app.services.local_mongo import LocalMongoClient
+
+
+async def _exercise_optimize_route():
+    from app.main import app
+    from app.db import db
+    from app.services.simulation_engine import get_simulation_engine
+    from app.services.bulk_writer import get_bulk_writer
+    from app.services.job_scheduler import get_job_scheduler
+    from app.services.admission_control import AdmissionRejected
+    from app.routes import simulation_routes
+
+    client = LocalMongoClient()
+    db.client = client
+    database = client["civicsim_ai"]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        response = await http.post("/simulation/simulate", json={
+            "policy_text": "Add 10 metro stations and 5 new lanes with ₹200 crore budget",
+            "region": {"state": "Karnataka"},
+            "enable_optimization": False
+        })
+        assert response.status_code == 200, response.text
+        simulation_id = response.json()["simulation_id"]
+
+        await get_bulk_writer().flush()  # simulations are written in batches
+        stored = await database.simulations.find_one({"_id": ObjectId(simulation_id)})
+        assert stored["structured_policy"]["region"]["state"] == "Karnataka"
+        assert set(stored["behavior_output"]) >= {"adaptation_rate", "compliance_probability"}
+
+        # Only the optimization stage may run - never the full graph again
+        engine = get_simulation_engine()
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("optimize re-ran the whole pipeline")
+
+        engine.run_simulation = fail
+        tenant = {"X-Tenant-ID": "team-a"}
+        try:
+            response = await http.post("/simulation/optimize", json={"simulation_id": simulation_id}, headers=tenant)
+            assert response.status_code == 202, response.text
+            job = response.json()
+            assert job["status"] == "queued" and job["kind"] == "optimization" and job["tenant"] == "team-a"
+            assert job["simulation_id"] == simulation_id
+            assert response.headers["location"] == job["status_url"] == f"/jobs/{job['job_id']}"
+
+            polled = (await http.get(job["status_url"], params={"wait": 60}, headers=tenant)).json()
+            assert polled["status"] == "completed", polled
+            result = polled["result"]["optimization_result"]
+            assert result["pareto_front"] and "hypervolume" in result
+
+            # The old polling URL is a view of the same job, for the same tenant only
+            legacy_view = (await http.get(f"/simulation/optimize/{job['job_id']}", headers=tenant)).json()
+            assert legacy_view["simulation_id"] == simulation_id and legacy_view["optimization_result"] == result
+            assert (await http.get(f"/simulation/optimize/{job['job_id']}")).status_code == 404
+
+            await get_bulk_writer().flush()
+            stored = await database.simulations.find_one({"_id": ObjectId(simulation_id)})
+            assert stored["optimization_result"]["reward_score"] == result["reward_score"]
+            assert (await database.optimization_results.find_one({}))["simulation_id"] == simulation_id
+
+            response = await http.post("/simulation/optimize", json={"simulation_id": simulation_id, "wait": True})
+            assert response.status_code == 200
+            assert response.json()["optimization_result"]["optimized_parameters"] == result["optimized_parameters"]
+
+            # wait=true takes an admission slot like /simulate: 429 when saturated
+            async def saturated(state, background=False):
+                raise AdmissionRejected("queue full", 3)
+
+            simulation_routes._optimize, optimize = saturated, simulation_routes._optimize
+            try:
+                response = await http.post("/simulation/optimize", json={"simulation_id": simulation_id, "wait": True})
+                assert response.status_code == 429 and response.headers["retry-after"] == "3"
+            finally:
+                simulation_routes._optimize = optimize
+        finally:
+            del engine.run_simulation  # back to the class method
+
+        # A job already queued or running for the simulation is returned instead of queueing another
+        scheduler = get_job_scheduler()
+        queued = await scheduler.collection.insert_one({
+            "kind": "optimization", "tenant": "team-a", "priority": "normal", "status": "running",
+            "payload": {"simulation_id": simulation_id}, "dedupe_key": simulation_id,
+            "created_at": datetime.utcnow(), "started_at": datetime.utcnow(), "heartbeat_at": datetime.utcnow()
+        })
+        response = await http.post("/simulation/optimize", json={"simulation_id": simulation_id}, headers=tenant)
+        assert response.json()["job_id"] == str(queued.inserted_id)
+        response = await http.post("/simulation/optimize", json={"simulation_id": simulation_id})
+        assert response.json()["job_id"] != str(queued.inserted_id)  # other tenants get their own job
+
+        # Documents stored before the policy was persisted can't be optimized
+        legacy = await database.simulations.insert_one({"metrics": stored["metrics"]})
+        response = await http.post("/simulation/optimize", json={"simulation_id": str(legacy.inserted_id)})
+        assert response.status_code == 409
+
+        response = await http.post("/simulation/optimize", json={"simulation_id": str(ObjectId())})
+        assert response.status_code == 404
+        response = await http.post("/simulation/optimize", json={"simulation_id": "not-an-id"})
+        assert response.status_code == 400
+        assert (await http.get(f"/simulation/optimize/{ObjectId()}")).status_code == 404
+
+    await get_job_scheduler().stop()
+    await get_bulk_writer().stop()
+    return polled
+
+
+def test_optimize_route():
+    polled = asyncio.run(_exercise_optimize_route())
+    print(f"✓ Optimization job {polled['job_id']}: {polled['status']}, "
+          f"{polled['result']['optimization_result']['improvement_percentage']:.1f}% improvement")
+
+
+if __name__ == "__main__":
+    test_optimize_route()
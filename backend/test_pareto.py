@@ -0,0 +1,78 @@
+"""
+Test the vectorized NSGA-II sort, crowding distance and hypervolume
+"""
+import numpy as np
+
+from app.ml.pareto import (
+    crowding_distance, hypervolume, non_dominated_mask, non_dominated_sort, rank_and_crowding,
+    select_by_rank_and_crowding
+)
+
+
+def _brute_force_ranks(points):
+    ranks = np.full(len(points), -1)
+    remaining = np.arange(len(points))
+    rank = 0
+    while len(remaining):
+        front = non_dominated_mask(points[remaining])
+        ranks[remaining[front]] = rank
+        remaining = remaining[~front]
+        rank += 1
+    return ranks
+
+
+def test_non_dominated_mask():
+    points = np.array([[1, 5], [2, 2], [5, 1], [3, 3], [2, 2], [6, 6]], dtype=float)
+    assert non_dominated_mask(points).tolist() == [True, True, True, False, True, False]
+
+
+def test_non_dominated_sort_matches_peeling():
+    """Vectorized ranks equal repeatedly removing the Pareto front, duplicates included"""
+    rng = np.random.default_rng(0)
+    for n, k, decimals in [(200, 2, 3), (300, 3, 1), (400, 4, 2)]:
+        points = np.round(rng.random((n, k)), decimals)
+        assert (non_dominated_sort(points) == _brute_force_ranks(points)).all()
+    print("✓ Non-dominated sort matches front peeling")
+
+
+def test_crowding_distance():
+    points = np.array([[0.0, 1.0], [0.25, 0.5], [0.5, 0.25], [1.0, 0.0]])
+    distance = crowding_distance(points)
+    assert np.isinf(distance[[0, 3]]).all()
+    assert np.allclose(distance[1:3], [0.5 + 0.75, 0.75 + 0.5])
+
+    # Per-front crowding computed in one pass equals crowding of each front alone
+    rng = np.random.default_rng(1)
+    points = rng.random((150, 3))
+    ranks, crowding = rank_and_crowding(points)
+    for rank in np.unique(ranks):
+        members = ranks == rank
+        assert np.array_equal(crowding[members], crowding_distance(points[members]))
+
+    chosen = select_by_rank_and_crowding(points, 40)
+    assert len(chosen) == 40 and ranks[chosen].max() <= np.sort(ranks)[39]
+
+
+def test_hypervolume():
+    reference = np.ones(2)
+    assert hypervolume(np.array([[0.5, 0.5]]), reference) == 0.25
+    assert abs(hypervolume(np.array([[0.2, 0.6], [0.6, 0.2]]), reference) - 0.48) < 1e-12
+    # Dominated and out-of-bounds points add nothing
+    assert abs(hypervolume(np.array([[0.2, 0.6], [0.6, 0.2], [0.7, 0.7], [1.5, 0.0]]), reference) - 0.48) < 1e-12
+
+    # 4 objectives against Monte Carlo
+    rng = np.random.default_rng(2)
+    points = rng.random((200, 4)) * 0.8
+    front = points[non_dominated_mask(points)]
+    exact = hypervolume(front, np.ones(4))
+    samples = rng.random((200_000, 4))
+    estimate = (samples[:, None, :] >= front[None, :, :]).all(axis=2).any(axis=1).mean()
+    assert abs(exact - estimate) < 0.01
+    print(f"✓ Hypervolume {exact:.4f} (Monte Carlo {estimate:.4f}) over {len(front)} points")
+
+
+if __name__ == "__main__":
+    test_non_dominated_mask()
+    test_non_dominated_sort_matches_peeling()
+    test_crowding_distance()
+    test_hypervolume()
@@ -0,0 +1,90 @@
+"""
+Test Mongo command instrumentation: per-collection/command latency histograms,
+documents returned and slow-query logs with the filter shape (no values)
+"""
+import asyncio
+import datetime
+import logging
+
+from pymongo import monitoring
+
+from app.config import Settings
+from app.db import create_mongo_client
+from app.services.mongo_commands import CommandMetrics, get_command_metrics, query_shape, filter_shape
+from app.services.performance_monitor import performance_monitor
+
+CONNECTION = ("localhost", 27017)
+
+
+def _run(listener, request_id, command, reply, ms, fail=False):
+    name = next(iter(command))
+    listener.started(monitoring.CommandStartedEvent(command, "civicsim_ai", request_id, CONNECTION, request_id))
+    duration = datetime.timedelta(milliseconds=ms)
+    if fail:
+        listener.failed(monitoring.CommandFailedEvent(duration, {"ok": 0}, name, request_id, CONNECTION, request_id))
+    else:
+        listener.succeeded(monitoring.CommandSucceededEvent(duration, reply, name, request_id, CONNECTION, request_id))
+
+
+def test_command_metrics(caplog):
+    performance_monitor.reset_metrics()
+    listener = CommandMetrics(slow_query_ms=50)
+    batch = [{"_id": i} for i in range(3)]
+
+    with caplog.at_level(logging.WARNING, logger="app.services.mongo_commands"):
+        _run(listener, 1, {"find": "policies", "filter": {"state": "Karnataka", "category": {"$in": ["tax", "ev"]}}},
+             {"cursor": {"firstBatch": batch, "id": 7}}, 3)
+        _run(listener, 2, {"getMore": 7, "collection": "policies"}, {"cursor": {"nextBatch": batch[:2], "id": 0}}, 1)
+        _run(listener, 3, {"aggregate": "policies", "pipeline": [{"$match": {"level": "national"}},
+                                                                 {"$group": {"_id": "$state"}}]},
+             {"cursor": {"firstBatch": batch}}, 120)
+        _run(listener, 4, {"update": "indian_simulations", "updates": [{"q": {"_id": 1}, "u": {"$set": {"x": 1}}}]},
+             {"n": 1}, 2)
+        _run(listener, 5, {"find": "policies", "filter": {"state": "Goa"}}, {}, 80, fail=True)
+        _run(listener, 6, {"ping": 1}, {"ok": 1}, 500)  # housekeeping is ignored
+
+    queries = performance_monitor.get_metrics()["database_queries"]
+    assert set(queries) == {"policies.find", "policies.getMore", "policies.aggregate", "indian_simulations.update"}
+    find = queries["policies.find"]
+    assert find["calls"] == 2 and find["errors"] == 1 and find["documents"] == 3
+    assert find["histogram"]["<=5ms"] == 1 and find["histogram"]["<=100ms"] == 1
+    assert queries["policies.getMore"]["documents"] == 2
+    assert queries["indian_simulations.update"]["documents"] == 1
+    assert queries["policies.aggregate"]["histogram"]["<=250ms"] == 1
+
+    # Slow commands are logged with their shape, never their values
+    slow = [r.getMessage() for r in caplog.records if "SLOW QUERY" in r.getMessage()]
+    assert len(slow) == 2 and listener.slow_queries == 2
+    assert "civicsim_ai.policies aggregate took 120.0ms" in slow[0] and '"$match": {"level": "<str>"}' in slow[0]
+    assert "(failed)" in slow[1] and "Goa" not in slow[1]
+
+    summary = listener.summary()
+    assert summary["commands"][0]["command"] == "policies.aggregate"
+    print(f"✓ Command metrics: {len(queries)} collection/command pairs, {listener.slow_queries} slow queries logged")
+
+
+def test_filter_shapes():
+    assert query_shape({"$or": [{"state": "Goa"}, {"budget": {"$gt": 5}}], "tags": ["a", "b"]}) == \
+        {"$or": [{"state": "<str>"}, {"budget": {"$gt": "<int>"}}], "tags": "<list>"}
+    assert filter_shape("delete", {"delete": "jobs", "deletes": [{"q": {"status": "done"}}, {"q": {}}]}) == \
+        {"statements": 2, "first": {"status": "<str>"}}
+    assert filter_shape("count", {"count": "policies", "query": {"level": "national"}}) == {"level": "<str>"}
+    print("✓ Filter shapes keep fields and operators, drop values")
+
+
+def test_listener_registered_on_clients():
+    async def build(monitoring_on):
+        client = create_mongo_client(Settings(mongo_command_monitoring=monitoring_on), connect=False)
+        try:
+            return client.options.event_listeners
+        finally:
+            client.close()
+
+    assert get_command_metrics() in asyncio.run(build(True))
+    assert get_command_metrics() not in asyncio.run(build(False))
+    print("✓ Command listener registered on factory-built clients (MONGO_COMMAND_MONITORING)")
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,151 @@
+"""
+Test single-flight coalescing in SimulationEngine.run_simulation: concurrent
+identical requests share one pipeline run, from any event loop
+"""
+import asyncio
+
+import httpx
+
+from app.services.simulation_engine import get_simulation_engine, simulation_key
+from app.services.single_flight import SingleFlight
+
+POLICY = "Add 10 metro stations with ₹200 crore budget"
+
+
+def _fake_pipeline(engine, calls, delay=0.2, fail=False):
+    async def run(policy_input, enable_optimization, region):
+        calls.append((policy_input, region))
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("pipeline failed")
+        return {"policy_input": policy_input, "region": region, "simulation_metrics": {"congestion_score": 0.5}}
+
+    engine._run = run
+
+
+async def _exercise_engine():
+    engine = get_simulation_engine()
+    calls = []
+    _fake_pipeline(engine, calls)
+    try:
+        # Same policy up to whitespace/case, same state: one run, five results
+        variants = [POLICY, f"  {POLICY}  ", POLICY.upper(), POLICY.replace(" ", "  "), POLICY]
+        results = await asyncio.gather(*(
+            engine.run_simulation(text, False, region={"state": "Karnataka"}) for text in variants
+        ))
+        assert len(calls) == 1, calls
+        assert all(r["simulation_metrics"] == {"congestion_score": 0.5} for r in results)
+        results[0]["real_india_impact"] = "only mine"
+        assert "real_india_impact" not in results[1]
+
+        # Another state or optimization flag is a different simulation; a finished one isn't cached
+        await asyncio.gather(
+            engine.run_simulation(POLICY, False, region={"state": "Karnataka"}),
+            engine.run_simulation(POLICY, False, region={"state": "Kerala"}),
+            engine.run_simulation(POLICY, True, region={"state": "Karnataka"})
+        )
+        assert len(calls) == 4, calls
+
+        # A caller on a private loop in a thread (job workers, warm-up) joins too
+        leader = asyncio.create_task(engine.run_simulation(POLICY, False, region={"state": "Goa"}))
+        await asyncio.sleep(0.05)
+        assert engine.is_in_flight(POLICY, False, {"state": "goa"})
+        joined = await asyncio.to_thread(
+            lambda: asyncio.run(engine.run_simulation(POLICY, False, region={"state": "Goa"}))
+        )
+        assert (await leader)["region"] == joined["region"] and len(calls) == 5
+
+        # The leader going away doesn't cancel the run the others wait on
+        leader = asyncio.create_task(engine.run_simulation(POLICY, False, region={"state": "Bihar"}))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(engine.run_simulation(POLICY, False, region={"state": "Bihar"}))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert (await follower)["region"] == {"state": "Bihar"} and len(calls) == 6
+
+        # Failures reach every caller and free the key
+        _fake_pipeline(engine, calls, fail=True)
+        outcomes = await asyncio.gather(
+            *(engine.run_simulation(POLICY, False, region={"state": "Punjab"}) for _ in range(3)),
+            return_exceptions=True
+        )
+        assert all(isinstance(o, RuntimeError) for o in outcomes) and len(calls) == 7
+        assert not engine.is_in_flight(POLICY, False, {"state": "Punjab"})
+    finally:
+        del engine._run  # back to the real pipeline
+    return engine.single_flight.stats()
+
+
+def test_engine_coalesces_identical_requests():
+    stats = asyncio.run(_exercise_engine())
+    assert stats["in_flight"] == 0
+    print(f"✓ Single-flight: {stats['calls']} pipeline runs served {stats['calls'] + stats['shared']} requests")
+
+
+def test_simulation_key_normalization():
+    assert simulation_key(" Add  lanes ", True, {"state": "Goa "}) == simulation_key("add lanes", True, {"state": "goa"})
+    assert simulation_key("add lanes", True, None) != simulation_key("add lanes", False, None)
+    assert simulation_key("add lanes", True, None) != simulation_key("add lanes", True, {"state": "Goa"})
+    print("✓ Simulation keys ignore whitespace and case only")
+
+
+async def _exercise_routes():
+    from app.main import app
+    from app.db import db
+    from app.services.admission_control import get_admission_controller
+    from app.services.local_mongo import LocalMongoClient
+    from app.services.bulk_writer import get_bulk_writer
+
+    db.client = LocalMongoClient()
+    engine = get_simulation_engine()
+    calls = []
+    _fake_pipeline(engine, calls)
+    controller = get_admission_controller()
+    saved = controller.max_in_flight, controller.max_queue
+    controller.max_in_flight, controller.max_queue = 1, 0  # only joiners can get past a second request
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            responses = await asyncio.gather(*(
+                http.post("/simulation/simulate", json={
+                    "policy_text": POLICY, "region": {"state": "Karnataka"}, "enable_optimization": False
+                })
+                for _ in range(3)
+            ))
+        assert [r.status_code for r in responses] == [200, 200, 200], [r.text for r in responses]
+        assert len(calls) == 1
+        assert len({r.json()["simulation_id"] for r in responses}) == 3  # each request still stores its own
+    finally:
+        controller.max_in_flight, controller.max_queue = saved
+        del engine._run
+        await get_bulk_writer().stop()
+
+
+def test_routes_share_admission_slot():
+    asyncio.run(_exercise_routes())
+    print("✓ Identical concurrent /simulate requests: 1 pipeline run, 1 admission slot, 3 stored results")
+
+
+def test_single_flight_helper():
+    async def run():
+        flight = SingleFlight()
+        started = []
+
+        async def work():
+            started.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        outcomes = await asyncio.gather(*(flight.do("k", work) for _ in range(4)))
+        return outcomes, started, flight.stats()
+
+    outcomes, started, stats = asyncio.run(run())
+    assert outcomes == [(42, False), (42, True), (42, True), (42, True)] and len(started) == 1
+    assert stats == {"in_flight": 0, "calls": 1, "shared": 3}
+    print("✓ SingleFlight: 4 callers, 1 execution")
+
+
+if __name__ == "__main__":
+    test_simulation_key_normalization()
+    test_single_flight_helper()
+    test_engine_coalesces_identical_requests()
+    test_routes_share_admission_slot()
@@ -0,0 +1,168 @@
+"""
+Test the compact v2 simulation schema: knowledge-base references instead of copies,
+typed numbers, lossless expansion, compressed blobs and the v1 -> v2 migration
+"""
+import asyncio
+import json
+
+import numpy as np
+
+from app.agents.policy_agent import related_policies
+from app.knowledge.policy_knowledge_base import policy_kb
+from app.migrate_simulations import migrate_simulations, format_report
+from app.ml.incremental_training import document_rows
+from app.services.bulk_writer import BufferedWriter, BLOB_COLLECTION, blob_compression, zstandard
+from app.services.local_mongo import LocalMongoClient
+from app.services.simulation_schema import (
+    SCHEMA_VERSION, compact_indian_simulation, expand_indian_simulation, typed
+)
+
+POLICY = "Add 10 metro stations with ₹200 crore budget"
+NARRATIVE = "The metro expansion reduces congestion across Bengaluru. " * 120
+
+
+def _v1_doc(state="Karnataka", budget=2000000000.0):
+    structured = {
+        "policy_type": "transportation", "target_population": "commuters",
+        "budget_allocation_inr": budget, "budget_in_lakhs": budget / 100000, "budget_in_crores": budget / 10000000,
+        "implementation_timeline_days": 365, "enforcement_level": 0.7,
+        "incentive_structure": {"subsidy": 0.2}, "infrastructure_changes": {"new_lanes": 4, "charging_stations": 50},
+        "region": {"state": state}
+    }
+    return {
+        "region": {"state": state, "city": None},
+        "policy_text": POLICY,
+        "structured_policy": structured,
+        "results": {
+            "policy_input": POLICY,
+            "region": {"state": state},
+            "enable_optimization": False,
+            "behavior_output": {"adaptation_rate": np.float32(0.5), "compliance_probability": 0.6,
+                                "satisfaction_score": 0.2, "economic_impact_personal": 0.1},
+            "simulation_metrics": {"congestion_score": np.float64(0.41), "congestion_reduction_percent": 12.5,
+                                   "energy_load": 0.3, "dissatisfaction_index": 0.2, "economic_stability": 0.8,
+                                   "affected_population": np.int64(120000)},
+            "impact_predictions": {"congestion_score": 0.4, "inflation_rate": 0.02, "dissatisfaction_index": 0.2,
+                                   "energy_stress": 0.3, "infrastructure_stress": {"roads": 0.3}},
+            "explanation": {"narrative_summary": NARRATIVE, "shap_values": np.array([0.1, 0.2])},
+            "state_policy_context": policy_kb.get_all_policies_for_state(state),
+            "related_policies": related_policies("transportation", state),
+            "token_usage": {"total_tokens": 0}
+        },
+        "real_data_used": True,
+        "data_sources": ["Census India (State-level)", "TomTom Traffic Index", "RBI"],
+        "optimized": False
+    }
+
+
+def _same(a, b) -> bool:
+    return json.dumps(typed(a), sort_keys=True, default=str) == json.dumps(typed(b), sort_keys=True, default=str)
+
+
+def test_compact_schema_round_trip():
+    original = _v1_doc()
+    compact = compact_indian_simulation(original)
+
+    assert compact["schema_version"] == SCHEMA_VERSION
+    assert compact["refs"] == {
+        "state_policy_context": {"state": "Karnataka"},
+        "related_policies": {"policy_type": "transportation", "state": "Karnataka"}
+    }
+    for dropped in ("policy_input", "enable_optimization", "state_policy_context", "related_policies"):
+        assert dropped not in compact["results"], dropped
+    assert "region" in compact["results"]  # differs from the top-level region, so it is kept
+    assert "budget_in_crores" not in compact["structured_policy"] and "data_sources" not in compact
+    assert compact["real_data_used"] is True  # indexed by db_optimize, so it stays queryable
+    metrics = compact["results"]["simulation_metrics"]
+    assert type(metrics["congestion_score"]) is float and type(metrics["affected_population"]) is int
+    assert compact["results"]["explanation"]["shap_values"] == [0.1, 0.2]
+    assert compact_indian_simulation(compact) is compact
+
+    # Readers get the v1 shape back, knowledge-base content included
+    assert _same(expand_indian_simulation(compact), original)
+    assert expand_indian_simulation(original) is original
+
+    # Training still reads the same paths
+    labelled = _v1_doc()
+    labelled["observed_outcomes"] = {"impact": {
+        "congestion_score": 0.4, "inflation_rate": 0.05, "dissatisfaction_index": 0.3, "energy_stress": 0.6
+    }}
+    rows, compact_rows = document_rows(labelled), document_rows(compact_indian_simulation(labelled))
+    assert rows is not None and compact_rows is not None
+    assert np.array_equal(rows["impact_X"], compact_rows["impact_X"]) and rows["impact_y"] == compact_rows["impact_y"]
+
+    # Content that no longer matches the knowledge base is kept inline, not referenced
+    stale = _v1_doc()
+    stale["results"]["state_policy_context"] = {"note": "edited"}
+    compact = compact_indian_simulation(stale)
+    assert "state_policy_context" not in compact["refs"]
+    assert compact["results"]["state_policy_context"] == {"note": "edited"}
+
+    sizes = [len(json.dumps(typed(d), default=str)) for d in (original, compact_indian_simulation(_v1_doc()))]
+    print(f"✓ Compact schema: {sizes[0]:,} -> {sizes[1]:,} bytes as JSON, lossless expansion")
+
+
+def test_compressed_blobs():
+    async def run():
+        database = LocalMongoClient()["civicsim_ai"]
+        writer = BufferedWriter(batch_size=1, compression="zlib")
+        _id = await writer.add(database, "indian_simulations", compact_indian_simulation(_v1_doc()))
+        await writer.stop()
+
+        blob = await database[BLOB_COLLECTION].find_one({})
+        assert blob["encoding"] == "zlib" and blob["stored_size"] < blob["size"] / 4
+        loaded = await writer.find_one(database, "indian_simulations", _id)
+        assert loaded["results"]["explanation"]["narrative_summary"] == NARRATIVE
+        return blob
+
+    blob = asyncio.run(run())
+    if zstandard is None:
+        assert blob_compression("zstd") == "zlib"  # falls back rather than failing
+    print(f"✓ Compressed blobs: {blob['size']:,} -> {blob['stored_size']:,} bytes")
+
+
+async def _exercise_migration():
+    database = LocalMongoClient()["civicsim_ai"]
+
+    # Documents as the v1 writer stored them: every field, bulky ones in blobs
+    writer = BufferedWriter(batch_size=100)
+    originals = {}
+    for i, state in enumerate(["Karnataka", "Kerala", "Karnataka", "Goa"]):
+        doc = _v1_doc(state, budget=1e9 * (i + 1))
+        originals[await writer.add(database, "indian_simulations", typed(doc))] = _v1_doc(state, budget=1e9 * (i + 1))
+    await writer.stop()
+    blobs_v1 = await database[BLOB_COLLECTION].count_documents({})
+
+    dry = await migrate_simulations(database, batch_size=3, dry_run=True)
+    assert dry["documents"] == 4 and await database.indian_simulations.count_documents({"schema_version": 2}) == 0
+
+    report = await migrate_simulations(database, batch_size=3, compression="zlib")
+    assert report["documents"] == 4 and report["bytes_after"] < report["bytes_before"] / 2, report
+    assert await database.indian_simulations.count_documents({"schema_version": 2}) == 4
+    assert report["pruned_blobs"] > 0 and await database[BLOB_COLLECTION].count_documents({}) < blobs_v1
+
+    for _id, original in originals.items():
+        stored = await BufferedWriter().find_one(database, "indian_simulations", _id)
+        assert stored.pop("_id") == _id and _same(expand_indian_simulation(stored), original)
+
+    again = await migrate_simulations(database)
+    assert again["documents"] == 0 and again["restored_flags"] == 0
+
+    # v2 documents stored before real_data_used was kept get the flag back
+    await database.indian_simulations.update_many({}, {"$unset": {"real_data_used": ""}})
+    restored = await migrate_simulations(database)
+    assert restored["restored_flags"] == 4
+    assert await database.indian_simulations.count_documents({"real_data_used": True}) == 4
+    return report
+
+
+def test_migration():
+    report = asyncio.run(_exercise_migration())
+    print(format_report(report))
+    print(f"✓ Migration: {report['documents']} documents, {report['saved_percent']}% smaller, re-run is a no-op")
+
+
+if __name__ == "__main__":
+    test_compact_schema_round_trip()
+    test_compressed_blobs()
+    test_migration()
@@ -0,0 +1,120 @@
+"""
+Test the surrogate (batched CMA-ES) policy optimizer
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.agents.behavior_agent import BehaviorAgent
+from app.agents.optimization_agent import OptimizationAgent
+from app.agents.simulation_agent import SimulationAgent
+from app.ml.pareto import non_dominated_mask
+from app.ml.surrogate_optimizer import ACTION_BOUND, OBJECTIVES, PolicyObjective, SurrogateConfig, cma_es
+from app.services.free_india_data import india_data_service
+
+
+def _policy(**overrides):
+    fields = dict(
+        region=SimpleNamespace(state="Karnataka", city="Bengaluru"),
+        budget_allocation_inr=2_000_000_000,
+        implementation_timeline_days=180,
+        enforcement_level=0.7,
+        incentive_structure={"tax_reduction": 0.1, "subsidy": 0.2},
+        infrastructure_changes={"new_lanes": 5, "metro_stations": 10, "bus_routes": 3, "charging_stations": 500}
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_batch_simulation_matches_scalar():
+    """The vectorized simulation reproduces _run_simulation candidate by candidate"""
+    agent = SimulationAgent()
+    state_data = india_data_service.get_state_data("Karnataka")
+    traffic_data = india_data_service.get_traffic_data("Karnataka")
+    rng = np.random.default_rng(0)
+
+    budgets = rng.uniform(1e8, 5e9, 50)
+    enforcement = rng.uniform(0, 1, 50)
+    behavior = {
+        "adaptation_rate": rng.uniform(0.1, 0.95, 50),
+        "compliance_probability": rng.uniform(0.1, 0.95, 50),
+        "satisfaction_score": rng.uniform(0.1, 0.95, 50)
+    }
+    batch = agent._run_simulation_batch(_policy(), behavior, state_data, traffic_data, budgets, enforcement)
+
+    for i in range(50):
+        policy = _policy(budget_allocation_inr=budgets[i], enforcement_level=enforcement[i])
+        scalar = agent._run_simulation(policy, {k: v[i] for k, v in behavior.items()}, state_data, traffic_data)
+        for name in OBJECTIVES:
+            assert abs(scalar[name] - batch[name][i]) <= 5e-4, name
+
+    print("✓ Batch simulation matches 50 scalar runs")
+
+
+def test_cma_es_finds_optimum():
+    """CMA-ES converges on a quadratic with its optimum inside the box"""
+    target = np.array([0.2, -0.1, 0.05, 0.25, -0.2])
+    result = cma_es(lambda x: -np.sum((x - target) ** 2, axis=1), 5,
+                    SurrogateConfig(population=64, generations=60, stall_generations=60))
+
+    assert np.abs(result["x"] - target).max() < 1e-2
+    assert np.all(np.abs(result["x"]) <= ACTION_BOUND)
+    print(f"✓ CMA-ES optimum {np.round(result['x'], 3)} in {result['generations']} generations")
+
+
+def test_objective_baseline_matches_pipeline():
+    """Zero action in the objective gives the same behavior + simulation as the pipeline"""
+    behavior_agent, simulation_agent = BehaviorAgent(), SimulationAgent()
+    policy = _policy()
+    state = asyncio.run(simulation_agent.process(asyncio.run(behavior_agent.process({"structured_policy": policy}))))
+
+    objective = PolicyObjective(
+        policy,
+        india_data_service.get_state_data("Karnataka"),
+        india_data_service.get_traffic_data("Karnataka"),
+        behavior_agent, simulation_agent
+    )
+    baseline = objective(np.zeros((1, 5)))
+    for name in OBJECTIVES:
+        assert abs(baseline[name][0] - state["simulation_metrics"][name]) <= 5e-4, name
+
+
+def test_optimization_agent_surrogate():
+    """Surrogate mode improves on the original policy and returns a Pareto front quickly"""
+    agent = OptimizationAgent(BehaviorAgent(), SimulationAgent())
+    agent.mode = "surrogate"
+    policy = _policy()
+    state = {"structured_policy": policy}
+    state = asyncio.run(agent._behavior_agent.process(state))
+    state = asyncio.run(agent._simulation_agent.process(state))
+
+    start = time.perf_counter()
+    result = asyncio.run(agent.process(state))["optimization_result"]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert result["improvement_percentage"] >= 0
+    assert result["optimizer"]["evaluations"] >= agent.surrogate_config.population
+    assert set(result["optimized_parameters"]) == {
+        "budget_allocation_inr", "enforcement_level", "implementation_timeline_days", "tax_reduction", "subsidy"
+    }
+
+    front = result["pareto_front"]
+    assert 0 < len(front) <= agent.surrogate_config.max_front
+    assert max(p["reward_score"] for p in front) == round(result["reward_score"], 4)
+    points = np.array([[p["metrics"][k] * (1 if sense == "min" else -1) for k, sense in OBJECTIVES.items()]
+                       for p in front])
+    assert non_dominated_mask(points).all()
+    assert result["hypervolume"]["front"] >= result["hypervolume"]["baseline"]
+    assert result["hypervolume"]["front_size"] >= len(front)
+
+    print(f"✓ Surrogate optimizer: {result['improvement_percentage']:.1f}% improvement, "
+          f"{len(front)} Pareto points, {result['optimizer']['evaluations']} candidates in {elapsed_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    test_batch_simulation_matches_scalar()
+    test_cma_es_finds_optimum()
+    test_objective_baseline_matches_pipeline()
+    test_optimization_agent_surrogate()
@@ -0,0 +1,72 @@
+"""
+Compiled tree-ensemble predictions match XGBRegressor.predict for the impact models
+"""
+import glob
+import os
+import pickle
+import tempfile
+import warnings
+
+import numpy as np
+
+from app.ml.tree_ensemble import TreeEnsemble
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "ml", "models")
+
+ATOL = 1e-5
+
+
+def _impact_models():
+    models = {}
+    for path in sorted(glob.glob(os.path.join(MODEL_DIR, "india_impact_*.pkl"))):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # pickles come from an older xgboost
+            with open(path, "rb") as f:
+                models[os.path.basename(path)] = pickle.load(f)
+    return models
+
+
+def _features(n_rows: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    # Same ranges ImpactAgent feeds in: scores in [0, 1], budget in millions, stress count
+    X = rng.random((n_rows, 8)).astype(np.float32)
+    X[:, 4] *= 50
+    X[:, 7] = rng.integers(0, 10, n_rows)
+    return X
+
+
+def test_compiled_trees_match_xgboost():
+    """Single-row, batched and missing-value predictions agree with xgboost"""
+    models = _impact_models()
+    assert len(models) == 4
+
+    X = _features(2000)
+    X[::11, 2] = np.nan
+    for name, model in models.items():
+        compiled = TreeEnsemble.from_booster(model)
+        expected = model.predict(X)
+
+        batch_error = np.abs(compiled.predict(X) - expected).max()
+        single_error = max(abs(compiled.predict(X[i:i + 1])[0] - expected[i]) for i in range(0, 2000, 97))
+        print(f"{name}: batch max error {batch_error:.2e}, single-row max error {single_error:.2e}")
+        assert batch_error < ATOL
+        assert single_error < ATOL
+
+
+def test_compiled_trees_round_trip():
+    """Saved arrays reload into an identical evaluator"""
+    model = next(iter(_impact_models().values()))
+    compiled = TreeEnsemble.from_booster(model)
+    X = _features(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.trees.npz")
+        compiled.save(path)
+        loaded = TreeEnsemble.load(path)
+    assert loaded.max_depth == compiled.max_depth
+    assert np.array_equal(loaded.predict(X), compiled.predict(X))
+
+
+if __name__ == "__main__":
+    test_compiled_trees_match_xgboost()
+    test_compiled_trees_round_trip()
+    print("✓ Compiled tree ensembles match XGBoost")